@@ -0,0 +1,142 @@
+"""
+Shared diff analysis for the commit, review and PR agents.
+
+One LLM pass describes a diff: summary, change types, affected areas and
+risk, plus whether the commit agent should read more files. The result is
+cached under an id derived from the diff text, so agents that run on the
+same diff (as `inyeon auto` does) reuse it instead of analyzing again,
+and clients can pass the id back with later requests.
+"""
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any
+
+from backend.diff.packer import pack_diff
+from backend.services.llm.base import LLMProvider
+from backend.utils.cost import llm_diff_token_budget
+from backend.utils.metrics import cache_requests
+from backend.utils.profiling import record_cache
+
+_ANALYSIS_TTL_SECONDS = 1800
+_ANALYSIS_MAX_ENTRIES = 256
+
+ANALYSIS_PROMPT = """Analyze this git diff. The analysis is shared by the commit message, code review and PR description steps.
+
+Respond in JSON:
+{{
+    "summary": "Brief summary of changes",
+    "change_type": "feat|fix|refactor|docs|test|chore",
+    "change_types": ["feat", "fix"],
+    "scope": "brief description of what the change does",
+    "key_changes": ["list of significant changes"],
+    "affected_areas": ["area1", "area2"],
+    "risk": "low|medium|high",
+    "risk_reasons": ["what could break and why"],
+    "has_breaking_changes": false,
+    "has_tests": false,
+    "needs_context": true or false,
+    "files_to_read": ["path/to/file.py"] or [],
+    "reasoning": "Why you need/don't need more context"
+}}
+
+DIFF:
+{diff}
+"""
+
+
+def diff_analysis_id(diff: str) -> str:
+    """Id of the analysis of ``diff``."""
+    return hashlib.sha256(diff.encode()).hexdigest()[:16]
+
+
+class AnalysisCache:
+    """Analyses by id; entries expire after ``ttl`` seconds, oldest evicted first."""
+
+    def __init__(
+        self, ttl: float = _ANALYSIS_TTL_SECONDS, max_entries: int = _ANALYSIS_MAX_ENTRIES
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+
+    def get(self, key: str | None) -> dict[str, Any] | None:
+        if not key:
+            return None
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] > self.ttl:
+            del self._entries[key]
+            entry = None
+        cache_requests.inc(cache="analysis", result="miss" if entry is None else "hit")
+        record_cache(entry is not None)
+        return entry[1] if entry is not None else None
+
+    def put(self, analysis: dict[str, Any]) -> None:
+        key = analysis["analysis_id"]
+        self._entries.pop(key, None)
+        self._entries[key] = (time.monotonic(), analysis)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+analysis_cache = AnalysisCache()
+
+# Analyses being computed, so concurrent agents on one diff share a call
+_pending: dict[str, asyncio.Future] = {}
+# Callers waiting on each pending analysis
+_waiters: dict[asyncio.Future, int] = {}
+
+
+def lookup_analysis(diff: str, analysis_id: str | None = None) -> dict[str, Any] | None:
+    """A cached analysis by explicit id, else by the id of ``diff``; no LLM call."""
+    return analysis_cache.get(analysis_id) or analysis_cache.get(diff_analysis_id(diff))
+
+
+async def _analyze(diff: str, llm: LLMProvider, key: str) -> dict[str, Any]:
+    packed = pack_diff(diff, llm_diff_token_budget(llm)).text
+    response = await llm.generate(ANALYSIS_PROMPT.format(diff=packed), json_mode=True)
+    analysis = {**response, "analysis_id": key}
+    analysis_cache.put(analysis)
+    return analysis
+
+
+async def get_diff_analysis(
+    diff: str, llm: LLMProvider, analysis_id: str | None = None
+) -> dict[str, Any]:
+    """The shared analysis of ``diff``, computed at most once per diff.
+
+    Concurrent callers for the same diff wait on a single LLM call, which
+    is cancelled if every caller is. LLM errors propagate and leave
+    nothing cached.
+    """
+    analysis = lookup_analysis(diff, analysis_id)
+    if analysis is not None:
+        return analysis
+
+    key = diff_analysis_id(diff)
+    task = _pending.get(key)
+    if task is None or task.get_loop() is not asyncio.get_running_loop():
+        task = asyncio.ensure_future(_analyze(diff, llm, key))
+        _pending[key] = task
+
+        def forget(done: asyncio.Future) -> None:
+            if _pending.get(key) is done:
+                del _pending[key]
+
+        task.add_done_callback(forget)
+    # One caller being cancelled must not cancel the others' analysis, but
+    # when the last one leaves (a client disconnected) the call is cancelled
+    _waiters[task] = _waiters.get(task, 0) + 1
+    try:
+        return await asyncio.shield(task)
+    finally:
+        _waiters[task] -= 1
+        if not _waiters[task]:
+            del _waiters[task]
+            if not task.done():
+                task.cancel()
@@ -1,10 +1,69 @@
+import time
 from abc import ABC, abstractmethod
 from collections.abc import AsyncIterator
 from typing import Any
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
 
 from backend.models.events import EventType, StreamEvent
 from backend.services.llm.base import LLMProvider
 from backend.rag import CodeRetriever
+from backend.utils.metrics import agent_run_seconds, node_run_seconds
+from backend.utils.profiling import NodeProfile, node_profile, profile_nodes
+
+
+class GraphTimer(BaseCallbackHandler):
+    """Times one graph run and each node it runs, into the agent/node histograms.
+
+    The graph is the root chain run; its nodes are the chain runs whose
+    parent is the root. Nested runnables inside a node are ignored. Node
+    times are also added to ``profiles`` when a stream is profiling.
+    """
+
+    run_inline = True
+
+    def __init__(self, agent: str, profiles: dict[str, NodeProfile] | None = None):
+        self.agent = agent
+        self.profiles = profiles
+        self._root: UUID | None = None
+        self._started: dict[UUID, tuple[str | None, float]] = {}
+
+    def on_chain_start(
+        self,
+        serialized: dict[str, Any] | None,
+        inputs: Any,
+        *,
+        run_id: UUID,
+        parent_run_id: UUID | None = None,
+        metadata: dict[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        if parent_run_id is None:
+            self._root = run_id
+            self._started[run_id] = (None, time.perf_counter())
+        elif parent_run_id == self._root:
+            node = (metadata or {}).get("langgraph_node") or kwargs.get("name") or "-"
+            self._started[run_id] = (node, time.perf_counter())
+
+    def _finish(self, run_id: UUID, status: str) -> None:
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return
+        node, at = started
+        elapsed = time.perf_counter() - at
+        if node is None:
+            agent_run_seconds.observe(elapsed, agent=self.agent, status=status)
+        else:
+            node_run_seconds.observe(elapsed, agent=self.agent, node=node, status=status)
+            if self.profiles is not None:
+                node_profile(node, self.profiles).duration_ms += elapsed * 1000
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, "ok")
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, "error")
 
 
 class BaseAgent(ABC):
@@ -17,6 +76,74 @@ class BaseAgent(ABC):
         self.llm = llm
         self.retriever = retriever
 
+    @property
+    def graph_config(self) -> dict[str, Any]:
+        """LangGraph run config; its metadata attributes LLM usage to this agent."""
+        return self._run_config()
+
+    def _run_config(
+        self, profiles: dict[str, NodeProfile] | None = None, stream_tokens: bool = False
+    ) -> dict[str, Any]:
+        metadata: dict[str, Any] = {"agent": self.name}
+        if stream_tokens:
+            metadata["stream_tokens"] = True
+        return {
+            "metadata": metadata,
+            "callbacks": [GraphTimer(self.name, profiles)],
+        }
+
+    async def _stream_graph(
+        self, initial_state: dict[str, Any], final_state: dict[str, Any]
+    ) -> AsyncIterator[StreamEvent]:
+        """Run ``self.graph``, yielding node, token and reasoning events.
+
+        Each node gets NODE_START when it is scheduled and NODE_COMPLETE
+        with its profile (wall-clock and LLM time, tokens, cache hits)
+        when it finishes. Text generated by ``generate_json`` in between
+        arrives as PROGRESS events with ``field`` and ``delta``. Node
+        outputs are merged into ``final_state``.
+        """
+        prev_reasoning_len = 0
+        with profile_nodes() as profiles:
+            async for mode, chunk in self.graph.astream(
+                initial_state,
+                config=self._run_config(profiles, stream_tokens=True),
+                stream_mode=["tasks", "custom", "updates"],
+            ):
+                if mode == "custom":
+                    yield StreamEvent(
+                        event=EventType.PROGRESS,
+                        agent=self.name,
+                        node=chunk["node"],
+                        data={"field": chunk["field"], "delta": chunk["delta"]},
+                    )
+                    continue
+
+                if mode == "tasks":
+                    if "result" not in chunk:
+                        yield StreamEvent(
+                            event=EventType.NODE_START, agent=self.name, node=chunk["name"]
+                        )
+                    continue
+
+                for node_name, node_output in chunk.items():
+                    final_state.update(node_output or {})
+                    profile = profiles.pop(node_name, None) or NodeProfile()
+                    yield StreamEvent(
+                        event=EventType.NODE_COMPLETE,
+                        agent=self.name,
+                        node=node_name,
+                        data=profile.to_dict(),
+                    )
+                    reasoning = final_state.get("reasoning", [])
+                    for step in reasoning[prev_reasoning_len:]:
+                        yield StreamEvent(
+                            event=EventType.REASONING,
+                            agent=self.name,
+                            data={"step": step},
+                        )
+                    prev_reasoning_len = len(reasoning)
+
     @abstractmethod
     async def run(self, **kwargs) -> dict[str, Any]:
         """Run the agent with given inputs."""
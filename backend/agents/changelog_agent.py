@@ -74,7 +74,8 @@ class ChangelogAgent(BaseAgent):
         **kwargs,
     ) -> dict[str, Any]:
         final_state = await self.graph.ainvoke(
-            self._initial_state(commits, from_ref, to_ref, repo_path)
+            self._initial_state(commits, from_ref, to_ref, repo_path),
+            config=self.graph_config,
         )
 
         return {
@@ -93,28 +94,11 @@ class ChangelogAgent(BaseAgent):
     ) -> AsyncIterator[StreamEvent]:
         yield StreamEvent(event=EventType.AGENT_START, agent=self.name)
 
+        initial_state = self._initial_state(commits, from_ref, to_ref, repo_path)
         final_state: dict = {}
-        prev_reasoning_len = 0
-
         try:
-            async for state_update in self.graph.astream(
-                self._initial_state(commits, from_ref, to_ref, repo_path)
-            ):
-                for node_name, node_output in state_update.items():
-                    final_state.update(node_output)
-                    yield StreamEvent(
-                        event=EventType.NODE_COMPLETE,
-                        agent=self.name,
-                        node=node_name,
-                    )
-                    reasoning = final_state.get("reasoning", [])
-                    for step in reasoning[prev_reasoning_len:]:
-                        yield StreamEvent(
-                            event=EventType.REASONING,
-                            agent=self.name,
-                            data={"step": step},
-                        )
-                    prev_reasoning_len = len(reasoning)
+            async for event in self._stream_graph(initial_state, final_state):
+                yield event
 
             yield StreamEvent(
                 event=EventType.RESULT,
@@ -5,6 +5,7 @@ from typing import Any
 from backend.services.llm.base import LLMProvider
 from backend.prompts.changelog_prompt import build_changelog_prompt
 from .changelog_state import ChangelogAgentState
+from .generation import generate_json
 
 CONVENTIONAL_TYPES = {"feat", "fix", "docs", "style", "refactor", "perf", "test", "build", "ci", "chore"}
 SUBJECT_PATTERN = re.compile(r"^(\w+)(?:\(.+?\))?[!:]")
@@ -50,7 +51,7 @@ async def generate_changelog_node(
     )
 
     try:
-        response = await llm.generate(prompt, json_mode=True)
+        response = await generate_json(llm, prompt)
     except Exception as e:
         return {
             "error": f"Changelog generation failed: {e}",
@@ -73,11 +73,13 @@ class CommitAgent(BaseAgent):
 
         return graph.compile()
 
-    def _initial_state(self, diff: str, repo_path: str = ".") -> AgentState:
+    def _initial_state(
+        self, diff: str, repo_path: str = ".", analysis: dict | None = None
+    ) -> AgentState:
         return {
             "diff": diff,
             "repo_path": repo_path,
-            "analysis": None,
+            "analysis": analysis,
             "needs_context": False,
             "files_to_read": [],
             "file_contents": {},
@@ -87,9 +89,13 @@ class CommitAgent(BaseAgent):
             "reasoning": [],
         }
 
-    async def run(self, diff: str, repo_path: str = ".") -> dict[str, Any]:
-        """Run the agent on a diff."""
-        final_state = await self.graph.ainvoke(self._initial_state(diff, repo_path))
+    async def run(
+        self, diff: str, repo_path: str = ".", analysis: dict | None = None
+    ) -> dict[str, Any]:
+        """Run the agent on a diff, reusing ``analysis`` when one is given."""
+        final_state = await self.graph.ainvoke(
+            self._initial_state(diff, repo_path, analysis), config=self.graph_config
+        )
 
         return {
             "commit_message": final_state.get("commit_message"),
@@ -99,32 +105,15 @@ class CommitAgent(BaseAgent):
         }
 
     async def run_stream(
-        self, diff: str, repo_path: str = ".", **kwargs
+        self, diff: str, repo_path: str = ".", analysis: dict | None = None, **kwargs
     ) -> AsyncIterator[StreamEvent]:
         yield StreamEvent(event=EventType.AGENT_START, agent=self.name)
 
-        final_state = self._initial_state(diff, repo_path)
-        prev_reasoning_len = 0
-
+        final_state = self._initial_state(diff, repo_path, analysis)
+        initial_state = self._initial_state(diff, repo_path, analysis)
         try:
-            async for state_update in self.graph.astream(
-                self._initial_state(diff, repo_path)
-            ):
-                for node_name, node_output in state_update.items():
-                    final_state.update(node_output)
-                    yield StreamEvent(
-                        event=EventType.NODE_COMPLETE,
-                        agent=self.name,
-                        node=node_name,
-                    )
-                    reasoning = final_state.get("reasoning", [])
-                    for step in reasoning[prev_reasoning_len:]:
-                        yield StreamEvent(
-                            event=EventType.REASONING,
-                            agent=self.name,
-                            data={"step": step},
-                        )
-                    prev_reasoning_len = len(reasoning)
+            async for event in self._stream_graph(initial_state, final_state):
+                yield event
 
             yield StreamEvent(
                 event=EventType.RESULT,
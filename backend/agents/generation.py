@@ -0,0 +1,51 @@
+"""
+JSON generation for agent nodes, streamed as tokens when the run is.
+
+When an agent is run with ``run_stream`` and its provider streams tokens,
+``generate_json`` uses ``generate_stream`` and hands each chunk's text
+for the top-level string fields to LangGraph's stream writer; the agent
+turns those into PROGRESS events. Otherwise it is ``llm.generate``.
+"""
+
+import json
+from typing import Any
+
+from langgraph.config import get_config, get_stream_writer
+
+from backend.services.llm.base import LLMError, LLMProvider
+from backend.services.llm.json_stream import JSONStreamParser
+
+
+def _streaming_node() -> str | None:
+    """The node being run, if its graph run asked for token events."""
+    try:
+        metadata = get_config().get("metadata", {})
+    except RuntimeError:
+        return None
+    return metadata.get("langgraph_node") if metadata.get("stream_tokens") else None
+
+
+async def generate_json(
+    llm: LLMProvider, prompt: str, temperature: float = 0.3
+) -> dict[str, Any]:
+    """``llm.generate(prompt, json_mode=True)``, streaming field text when possible."""
+    node = _streaming_node()
+    if node is None or getattr(llm, "streams_tokens", False) is not True:
+        return await llm.generate(prompt, json_mode=True, temperature=temperature)
+
+    write = get_stream_writer()
+    parser = JSONStreamParser()
+    try:
+        async for chunk in llm.generate_stream(prompt, json_mode=True, temperature=temperature):
+            for field, delta in parser.feed(chunk).items():
+                write({"node": node, "field": field, "delta": delta})
+    except LLMError:
+        if parser.text:
+            raise
+        # Nothing shown yet: the non-streaming call retries rate limits
+        return await llm.generate(prompt, json_mode=True, temperature=temperature)
+
+    try:
+        return parser.result()
+    except json.JSONDecodeError as e:
+        raise LLMError(f"Invalid JSON response: {e}")
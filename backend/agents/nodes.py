@@ -1,5 +1,7 @@
 from typing import Any
 
+from .analysis import get_diff_analysis, lookup_analysis
+from .generation import generate_json
 from .state import AgentState
 from .tools import read_file
 from backend.services.llm.base import LLMProvider
@@ -7,32 +9,19 @@ from backend.rag import CodeRetriever
 
 
 async def analyze_diff(state: AgentState, llm: LLMProvider) -> dict[str, Any]:
-    """Analyze the diff and decide if more context is needed."""
-    prompt = f"""Analyze this git diff and determine:
-1. What files are being changed
-2. What kind of changes are being made
-3. Whether you need to read any related files for context
-
-Respond in JSON:
-{{
-    "summary": "Brief summary of changes",
-    "change_type": "feat|fix|refactor|docs|test|chore",
-    "needs_context": true or false,
-    "files_to_read": ["path/to/file.py"] or [],
-    "reasoning": "Why you need/don't need more context"
-}}
-
-DIFF:
-{state["diff"]}
-"""
-
-    response = await llm.generate(prompt, json_mode=True)
+    """Get the shared diff analysis and decide if more context is needed."""
+    analysis = state.get("analysis") or lookup_analysis(state["diff"])
+    if analysis is not None:
+        step = f"Reused diff analysis {analysis.get('analysis_id', '')}".rstrip()
+    else:
+        analysis = await get_diff_analysis(state["diff"], llm)
+        step = analysis.get("reasoning", "")
 
     return {
-        "analysis": response,
-        "needs_context": response.get("needs_context", False),
-        "files_to_read": response.get("files_to_read", []),
-        "reasoning": state["reasoning"] + [response.get("reasoning", "")],
+        "analysis": analysis,
+        "needs_context": analysis.get("needs_context", False),
+        "files_to_read": analysis.get("files_to_read", []),
+        "reasoning": state["reasoning"] + [step],
     }
 
 
@@ -108,7 +97,7 @@ Respond in JSON:
 }}
 """
 
-    response = await llm.generate(prompt, json_mode=True)
+    response = await generate_json(llm, prompt)
 
     return {
         "commit_message": response.get("message", ""),
@@ -54,6 +54,7 @@ class PRAgent(BaseAgent):
         branch_name: str = "",
         base_branch: str = "main",
         repo_path: str = ".",
+        analysis: dict | None = None,
     ) -> PRAgentState:
         return {
             "diff": diff,
@@ -61,7 +62,7 @@ class PRAgent(BaseAgent):
             "branch_name": branch_name,
             "base_branch": base_branch,
             "repo_path": repo_path,
-            "analysis": None,
+            "analysis": analysis,
             "pr_description": None,
             "reasoning": [],
             "error": None,
@@ -74,13 +75,18 @@ class PRAgent(BaseAgent):
         branch_name: str = "",
         base_branch: str = "main",
         repo_path: str = ".",
+        analysis: dict | None = None,
         **kwargs,
     ) -> dict[str, Any]:
         final_state = await self.graph.ainvoke(
-            self._initial_state(diff, commits, branch_name, base_branch, repo_path)
+            self._initial_state(
+                diff, commits, branch_name, base_branch, repo_path, analysis
+            ),
+            config=self.graph_config,
         )
 
         return {
+            "analysis_id": (final_state.get("analysis") or {}).get("analysis_id"),
             "pr_description": final_state.get("pr_description"),
             "reasoning": final_state.get("reasoning", []),
             "error": final_state.get("error"),
@@ -93,37 +99,24 @@ class PRAgent(BaseAgent):
         branch_name: str = "",
         base_branch: str = "main",
         repo_path: str = ".",
+        analysis: dict | None = None,
         **kwargs,
     ) -> AsyncIterator[StreamEvent]:
         yield StreamEvent(event=EventType.AGENT_START, agent=self.name)
 
+        initial_state = self._initial_state(
+            diff, commits, branch_name, base_branch, repo_path, analysis
+        )
         final_state: dict = {}
-        prev_reasoning_len = 0
-
         try:
-            async for state_update in self.graph.astream(
-                self._initial_state(diff, commits, branch_name, base_branch, repo_path)
-            ):
-                for node_name, node_output in state_update.items():
-                    final_state.update(node_output)
-                    yield StreamEvent(
-                        event=EventType.NODE_COMPLETE,
-                        agent=self.name,
-                        node=node_name,
-                    )
-                    reasoning = final_state.get("reasoning", [])
-                    for step in reasoning[prev_reasoning_len:]:
-                        yield StreamEvent(
-                            event=EventType.REASONING,
-                            agent=self.name,
-                            data={"step": step},
-                        )
-                    prev_reasoning_len = len(reasoning)
+            async for event in self._stream_graph(initial_state, final_state):
+                yield event
 
             yield StreamEvent(
                 event=EventType.RESULT,
                 agent=self.name,
                 data={
+                    "analysis_id": (final_state.get("analysis") or {}).get("analysis_id"),
                     "pr_description": final_state.get("pr_description"),
                     "reasoning": final_state.get("reasoning", []),
                     "error": final_state.get("error"),
@@ -1,41 +1,20 @@
 from typing import Any
 
 from backend.services.llm.base import LLMProvider
-from backend.utils.cost import truncate_diff, get_cached, set_cached
 from backend.prompts.pr_prompt import build_pr_prompt
+from .analysis import get_diff_analysis, lookup_analysis
+from .generation import generate_json
 from .pr_state import PRAgentState
 
 
 async def analyze_branch_node(
     state: PRAgentState, llm: LLMProvider
 ) -> dict[str, Any]:
-    """Analyze branch diff and commits to understand scope of changes."""
-    truncated = truncate_diff(state["diff"])
-    commits_text = "\n".join(
-        f"- {c['hash']} {c['subject']}" for c in state["commits"]
-    )
-
-    prompt = f"""Analyze these branch changes for a PR description.
-
-BRANCH: {state["branch_name"]} -> {state["base_branch"]}
+    """Get the shared analysis of the branch diff.
 
-COMMITS:
-{commits_text}
-
-DIFF:
-{truncated}
-
-Respond in JSON:
-{{
-    "scope": "brief description of what this branch does",
-    "change_types": ["feat", "fix", "refactor"],
-    "key_changes": ["list of significant changes"],
-    "has_breaking_changes": false,
-    "has_tests": false,
-    "affected_areas": ["area1", "area2"]
-}}"""
-
-    cached = get_cached(prompt)
+    Commits are not part of the analysis; the PR prompt lists them.
+    """
+    cached = state.get("analysis") or lookup_analysis(state["diff"])
     if cached:
         return {
             "analysis": cached,
@@ -43,19 +22,17 @@ Respond in JSON:
         }
 
     try:
-        response = await llm.generate(prompt, json_mode=True)
+        analysis = await get_diff_analysis(state["diff"], llm)
     except Exception as e:
         return {
             "error": f"Analysis failed: {e}",
             "reasoning": state["reasoning"] + [f"Analysis error: {e}"],
         }
 
-    set_cached(prompt, response)
-
     return {
-        "analysis": response,
+        "analysis": analysis,
         "reasoning": state["reasoning"]
-        + [f"Analyzed {len(state['commits'])} commits across branch"],
+        + [f"Analyzed branch diff ({len(state['commits'])} commits)"],
     }
 
 
@@ -78,7 +55,7 @@ async def generate_pr_node(
     )
 
     try:
-        response = await llm.generate(prompt, json_mode=True)
+        response = await generate_json(llm, prompt)
     except Exception as e:
         return {
             "error": f"PR generation failed: {e}",
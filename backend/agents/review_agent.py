@@ -4,7 +4,9 @@ from typing import Any
 from langgraph.graph import StateGraph, END
 
 from backend.models.events import EventType, StreamEvent
+from .analysis import lookup_analysis
 from .base import BaseAgent
+from .generation import generate_json
 from .state import AgentState
 from .nodes import search_rag_context
 
@@ -49,11 +51,22 @@ class ReviewAgent(BaseAgent):
             for item in state["rag_context"]:
                 rag_context += f"\n--- {item['path']} ---\n{item['content'][:500]}\n"
 
+        # Reuse the shared analysis when another agent already paid for it
+        analysis = state.get("analysis") or lookup_analysis(state["diff"])
+        analysis_context = ""
+        if analysis:
+            focus = {
+                key: analysis[key]
+                for key in ("summary", "affected_areas", "risk", "risk_reasons")
+                if analysis.get(key)
+            }
+            analysis_context = f"\n\nCHANGE ANALYSIS (focus the review here):\n{focus}\n"
+
         prompt = f"""You are a senior code reviewer. Review this diff and provide constructive feedback.
 
 DIFF:
 {state["diff"]}
-{rag_context}
+{rag_context}{analysis_context}
 
 Respond in JSON:
 {{
@@ -73,18 +86,21 @@ Focus on:
 - Performance issues
 - Best practices"""
 
-        response = await self.llm.generate(prompt, json_mode=True)
+        response = await generate_json(self.llm, prompt)
 
         return {
+            "analysis": analysis,
             "review": response,
             "reasoning": state["reasoning"] + ["Completed code review"],
         }
 
-    def _initial_state(self, diff: str, repo_path: str = ".") -> AgentState:
+    def _initial_state(
+        self, diff: str, repo_path: str = ".", analysis: dict | None = None
+    ) -> AgentState:
         return {
             "diff": diff,
             "repo_path": repo_path,
-            "analysis": None,
+            "analysis": analysis,
             "needs_context": False,
             "files_to_read": [],
             "file_contents": {},
@@ -94,48 +110,37 @@ Focus on:
             "reasoning": [],
         }
 
-    async def run(self, diff: str, repo_path: str = ".") -> dict[str, Any]:
-        """Run the review agent on a diff."""
-        final_state = await self.graph.ainvoke(self._initial_state(diff, repo_path))
+    async def run(
+        self, diff: str, repo_path: str = ".", analysis: dict | None = None
+    ) -> dict[str, Any]:
+        """Run the review agent on a diff, using ``analysis`` if given or cached."""
+        final_state = await self.graph.ainvoke(
+            self._initial_state(diff, repo_path, analysis), config=self.graph_config
+        )
 
         return {
+            "analysis_id": (final_state.get("analysis") or {}).get("analysis_id"),
             "review": final_state.get("review"),
             "reasoning": final_state.get("reasoning", []),
             "rag_context": final_state.get("rag_context", []),
         }
 
     async def run_stream(
-        self, diff: str, repo_path: str = ".", **kwargs
+        self, diff: str, repo_path: str = ".", analysis: dict | None = None, **kwargs
     ) -> AsyncIterator[StreamEvent]:
         yield StreamEvent(event=EventType.AGENT_START, agent=self.name)
 
+        initial_state = self._initial_state(diff, repo_path, analysis)
         final_state: dict = {}
-        prev_reasoning_len = 0
-
         try:
-            async for state_update in self.graph.astream(
-                self._initial_state(diff, repo_path)
-            ):
-                for node_name, node_output in state_update.items():
-                    final_state.update(node_output)
-                    yield StreamEvent(
-                        event=EventType.NODE_COMPLETE,
-                        agent=self.name,
-                        node=node_name,
-                    )
-                    reasoning = final_state.get("reasoning", [])
-                    for step in reasoning[prev_reasoning_len:]:
-                        yield StreamEvent(
-                            event=EventType.REASONING,
-                            agent=self.name,
-                            data={"step": step},
-                        )
-                    prev_reasoning_len = len(reasoning)
+            async for event in self._stream_graph(initial_state, final_state):
+                yield event
 
             yield StreamEvent(
                 event=EventType.RESULT,
                 agent=self.name,
                 data={
+                    "analysis_id": (final_state.get("analysis") or {}).get("analysis_id"),
                     "review": final_state.get("review"),
                     "reasoning": final_state.get("reasoning", []),
                     "rag_context": final_state.get("rag_context", []),
@@ -86,7 +86,8 @@ class SplitAgent(BaseAgent):
         strategy: str = "hybrid",
     ) -> dict[str, Any]:
         final_state = await self.graph.ainvoke(
-            self._initial_state(diff, repo_path, strategy)
+            self._initial_state(diff, repo_path, strategy),
+            config=self.graph_config,
         )
 
         return {
@@ -101,28 +102,11 @@ class SplitAgent(BaseAgent):
     ) -> AsyncIterator[StreamEvent]:
         yield StreamEvent(event=EventType.AGENT_START, agent=self.name)
 
+        initial_state = self._initial_state(diff, repo_path, strategy)
         final_state: dict = {}
-        prev_reasoning_len = 0
-
         try:
-            async for state_update in self.graph.astream(
-                self._initial_state(diff, repo_path, strategy)
-            ):
-                for node_name, node_output in state_update.items():
-                    final_state.update(node_output)
-                    yield StreamEvent(
-                        event=EventType.NODE_COMPLETE,
-                        agent=self.name,
-                        node=node_name,
-                    )
-                    reasoning = final_state.get("reasoning", [])
-                    for step in reasoning[prev_reasoning_len:]:
-                        yield StreamEvent(
-                            event=EventType.REASONING,
-                            agent=self.name,
-                            data={"step": step},
-                        )
-                    prev_reasoning_len = len(reasoning)
+            async for event in self._stream_graph(initial_state, final_state):
+                yield event
 
             splits = final_state.get("splits", [])
             yield StreamEvent(
@@ -16,7 +16,7 @@ from .split_state import SplitAgentState
 async def parse_diff_node(state: SplitAgentState) -> dict[str, Any]:
     parser = DiffParser()
     try:
-        parsed = parser.parse(state["diff"])
+        parsed = parser.parse_compact(state["diff"])
         return {
             "parsed_diff": parsed,
             "reasoning": state["reasoning"]
@@ -65,6 +65,10 @@ async def generate_messages_node(
 
     messages = {}
     splits = []
+    parsed = state.get("parsed_diff")
+    hunks_by_id = {
+        hunk.id: hunk for file in (parsed.files if parsed else []) for hunk in file.hunks
+    }
 
     for group in state["commit_groups"]:
         files_summary = "\n".join(f"- {f}" for f in group.files)
@@ -97,6 +101,15 @@ Respond in JSON:
                 "group_id": group.id,
                 "files": group.files,
                 "hunk_count": len(group.hunks),
+                "hunks": [
+                    {
+                        "file_path": ref.file_path,
+                        "source_start": hunks_by_id[ref.hunk_id].source_start,
+                        "source_length": hunks_by_id[ref.hunk_id].source_length,
+                    }
+                    for ref in group.hunks
+                    if ref.hunk_id in hunks_by_id
+                ],
                 "commit_message": message,
                 "commit_type": commit_type,
                 "scope": response.get("scope", group.suggested_scope),
@@ -1,6 +1,6 @@
 from typing import Any, TypedDict
 
-from backend.diff import ParsedDiff
+from backend.diff import CompactDiff
 from backend.clustering import CommitGroup
 
 
@@ -9,7 +9,7 @@ class SplitAgentState(TypedDict):
     repo_path: str
     strategy: str
 
-    parsed_diff: ParsedDiff | None
+    parsed_diff: CompactDiff | None
     commit_groups: list[CommitGroup]
     generated_messages: dict[str, str]
 
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 
-from backend.diff import ParsedDiff
+from backend.diff import DiffLike
 from .models import CommitGroup
 
 
@@ -10,5 +10,5 @@ class ClusteringStrategy(ABC):
     description: str = "Base clustering strategy"
 
     @abstractmethod
-    async def cluster(self, parsed_diff: ParsedDiff) -> list[CommitGroup]:
+    async def cluster(self, parsed_diff: DiffLike) -> list[CommitGroup]:
         pass
@@ -1,6 +1,6 @@
 import json
 
-from backend.diff import ParsedDiff, ParsedFile
+from backend.diff import CompactFile, DiffLike, ParsedFile
 from backend.services.llm.base import LLMProvider
 from .base import ClusteringStrategy
 from .models import CommitGroup, HunkReference
@@ -17,7 +17,7 @@ class ConventionalStrategy(ClusteringStrategy):
     def __init__(self, llm: LLMProvider):
         self.llm = llm
 
-    async def cluster(self, parsed_diff: ParsedDiff) -> list[CommitGroup]:
+    async def cluster(self, parsed_diff: DiffLike) -> list[CommitGroup]:
         if not parsed_diff.files:
             return []
 
@@ -44,7 +44,7 @@ class ConventionalStrategy(ClusteringStrategy):
 
         return list(groups.values())
 
-    async def _classify_files(self, files: list[ParsedFile]) -> dict[str, str]:
+    async def _classify_files(self, files: list[ParsedFile | CompactFile]) -> dict[str, str]:
         """Classify all files in a single LLM call to avoid per-file rate limit hits."""
         file_entries = []
         for file in files:
@@ -1,4 +1,4 @@
-from backend.diff import ParsedDiff
+from backend.diff import DiffLike
 from .base import ClusteringStrategy
 from .models import CommitGroup, HunkReference
 
@@ -11,7 +11,7 @@ class DirectoryStrategy(ClusteringStrategy):
     def __init__(self, max_depth: int = 2):
         self.max_depth = max_depth
 
-    async def cluster(self, parsed_diff: ParsedDiff) -> list[CommitGroup]:
+    async def cluster(self, parsed_diff: DiffLike) -> list[CommitGroup]:
         groups: dict[str, CommitGroup] = {}
 
         for file in parsed_diff.files:
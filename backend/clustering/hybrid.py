@@ -1,4 +1,4 @@
-from backend.diff import ParsedDiff
+from backend.diff import DiffLike
 from backend.services.llm.base import LLMProvider
 from backend.rag.embeddings import EmbeddingService
 from .base import ClusteringStrategy
@@ -25,7 +25,7 @@ class HybridStrategy(ClusteringStrategy):
         self.directory = DirectoryStrategy()
         self.conventional = ConventionalStrategy(llm)
 
-    async def cluster(self, parsed_diff: ParsedDiff) -> list[CommitGroup]:
+    async def cluster(self, parsed_diff: DiffLike) -> list[CommitGroup]:
         dir_groups = await self.directory.cluster(parsed_diff)
 
         refined_groups = []
@@ -50,9 +50,9 @@ class HybridStrategy(ClusteringStrategy):
 
         return refined_groups
 
-    def _extract_subdiff(self, full_diff: ParsedDiff, group: CommitGroup) -> ParsedDiff:
+    def _extract_subdiff(self, full_diff: DiffLike, group: CommitGroup) -> DiffLike:
         files = [f for f in full_diff.files if f.path in group.files]
-        return ParsedDiff(
+        return type(full_diff)(
             files=files,
             total_added=sum(h.added_count for f in files for h in f.hunks),
             total_removed=sum(h.removed_count for f in files for h in f.hunks),
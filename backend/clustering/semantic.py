@@ -1,13 +1,26 @@
 import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
 from sklearn.cluster import AgglomerativeClustering
 
-from backend.diff import ParsedDiff
+from backend.diff import DiffLike
 from backend.rag.embeddings import EmbeddingService
 from .base import ClusteringStrategy
 from .models import CommitGroup, HunkReference
 
+# Similarity-matrix entries computed per block in the graph mode (~16 MB)
+_BLOCK_ELEMENTS = 4_000_000
+
 
 class SemanticStrategy(ClusteringStrategy):
+    """Cluster hunks by embedding similarity.
+
+    Up to ``graph_threshold`` hunks this is average-linkage agglomerative
+    clustering on cosine distance. Above it, where the full distance matrix
+    no longer fits, hunks are linked to their ``n_neighbors`` most similar
+    hunks (computed block by block) when the similarity clears the
+    threshold, and groups are the connected components of that graph.
+    """
 
     name = "semantic"
     description = "Group semantically related changes using embeddings"
@@ -17,12 +30,16 @@ class SemanticStrategy(ClusteringStrategy):
         embedding_service: EmbeddingService,
         similarity_threshold: float = 0.5,
         max_clusters: int = 10,
+        graph_threshold: int = 1000,
+        n_neighbors: int = 10,
     ):
         self.embedding_service = embedding_service
         self.similarity_threshold = similarity_threshold
         self.max_clusters = max_clusters
+        self.graph_threshold = graph_threshold
+        self.n_neighbors = n_neighbors
 
-    async def cluster(self, parsed_diff: ParsedDiff) -> list[CommitGroup]:
+    async def cluster(self, parsed_diff: DiffLike) -> list[CommitGroup]:
         all_hunks = parsed_diff.get_all_hunks()
 
         if len(all_hunks) <= 1:
@@ -36,14 +53,16 @@ class SemanticStrategy(ClusteringStrategy):
         embeddings = await self.embedding_service.embed_texts(hunk_texts)
         embeddings_array = np.array(embeddings)
 
-        n_samples = len(all_hunks)
-        clustering = AgglomerativeClustering(
-            n_clusters=None,
-            distance_threshold=1 - self.similarity_threshold,
-            metric="cosine",
-            linkage="average",
-        )
-        labels = clustering.fit_predict(embeddings_array)
+        if len(all_hunks) > self.graph_threshold:
+            labels = self._graph_labels(embeddings_array)
+        else:
+            clustering = AgglomerativeClustering(
+                n_clusters=None,
+                distance_threshold=1 - self.similarity_threshold,
+                metric="cosine",
+                linkage="average",
+            )
+            labels = clustering.fit_predict(embeddings_array)
 
         groups: dict[int, CommitGroup] = {}
         for idx, (file, hunk) in enumerate(all_hunks):
@@ -65,6 +84,33 @@ class SemanticStrategy(ClusteringStrategy):
 
         return list(groups.values())
 
+    def _graph_labels(self, embeddings: np.ndarray) -> np.ndarray:
+        """Connected components of the thresholded kNN similarity graph."""
+        vectors = embeddings.astype(np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms == 0, 1, norms)
+
+        n = len(vectors)
+        k = min(self.n_neighbors, n - 1)
+        block = max(1, _BLOCK_ELEMENTS // n)
+        rows: list[np.ndarray] = []
+        cols: list[np.ndarray] = []
+
+        for start in range(0, n, block):
+            sims = vectors[start : start + block] @ vectors.T
+            local = np.arange(len(sims))
+            sims[local, start + local] = -np.inf
+            neighbors = np.argpartition(sims, -k, axis=1)[:, -k:]
+            keep = np.take_along_axis(sims, neighbors, axis=1) >= self.similarity_threshold
+            rows.append(np.repeat(start + local, k)[keep.ravel()])
+            cols.append(neighbors[keep])
+
+        row = np.concatenate(rows)
+        col = np.concatenate(cols)
+        graph = coo_matrix((np.ones(len(row), dtype=np.int8), (row, col)), shape=(n, n))
+        _, labels = connected_components(graph, directed=False)
+        return labels
+
     def _single_group(self, all_hunks: list) -> list[CommitGroup]:
         if not all_hunks:
             return []
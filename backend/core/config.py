@@ -1,4 +1,7 @@
+import os
+import tempfile
 from importlib.metadata import version, PackageNotFoundError
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -28,11 +31,41 @@ class Settings(BaseSettings):
     debug: bool = False
 
     max_diff_chars: int = 30000
+    # Overrides the per-provider diff token budget when set
+    diff_token_budget: int | None = None
     enable_cache: bool = True
 
     api_key: str | None = None
     cors_origins: str = "*"
     rate_limit_rpm: int = 30
+    # Requests a client may send at once before the rpm pacing applies; defaults to rpm
+    rate_limit_burst: int | None = None
+    # "sqlite" shares buckets between the worker processes on one host
+    rate_limit_backend: Literal["memory", "sqlite"] = "memory"
+    rate_limit_sqlite_path: str = os.path.join(
+        tempfile.gettempdir(), "inyeon-rate-limit.sqlite3"
+    )
+    # JSON objects: {"<api key>": rpm} and {"<path prefix>": rpm}
+    rate_limit_api_keys: dict[str, int] = {}
+    rate_limit_routes: dict[str, int] = {}
+
+    # Background provider probes served by /health
+    health_check_interval: int = 30
+    health_check_timeout: int = 5
+
+    # SSE streams: comment line after this many idle seconds, and the
+    # events read ahead of a slow client before the agent is paused
+    sse_heartbeat_seconds: float = 15
+    sse_max_buffered_events: int = 100
+
+    # Background jobs (/api/v1/jobs)
+    job_workers: int = 4
+    job_queue_size: int = 100
+    job_ttl_seconds: int = 3600
+
+    # /api/v1/batch
+    batch_max_tasks: int = 100
+    batch_concurrency: int = 4
 
 
 settings = Settings()
@@ -25,8 +25,19 @@ def _get_or_create_provider(name: str) -> LLMProvider:
         return _providers[name]
 
 
-def get_llm_provider() -> LLMProvider:
-    return _get_or_create_provider(settings.llm_provider)
+def get_llm_provider(name: str | None = None) -> LLMProvider:
+    return _get_or_create_provider(name or settings.llm_provider)
+
+
+def available_providers() -> dict[str, str]:
+    """Providers this server is configured for, mapped to their model."""
+    available = {}
+    if settings.gemini_api_key:
+        available["gemini"] = settings.gemini_model
+    if settings.openai_api_key:
+        available["openai"] = settings.openai_model
+    available["ollama"] = settings.ollama_model
+    return available
 
 
 def get_llm_from_request(request: Request) -> LLMProvider:
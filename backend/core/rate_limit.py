@@ -0,0 +1,243 @@
+"""
+Token-bucket rate limiting.
+
+Each client gets a bucket of ``burst`` tokens that refills at ``rpm / 60``
+tokens per second; a request spends one token. A bucket is two numbers
+(tokens left, last refill time), so checking a request is O(1).
+
+Buckets live in a backend:
+
+- ``MemoryBackend``: per process, with the keys spread over lock shards.
+- ``SQLiteBackend``: one database file shared by every worker process on
+  the host, so ``uvicorn --workers N`` does not multiply the limit.
+
+A backend for several hosts (e.g. Redis, running ``take`` as a Lua
+script) implements ``RateLimitBackend.take`` the same way.
+"""
+
+import asyncio
+import hashlib
+import math
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Limit:
+    """``rpm`` requests per minute with bursts of up to ``burst``."""
+
+    rpm: float
+    burst: float
+
+    @property
+    def rate(self) -> float:
+        """Tokens added per second."""
+        return self.rpm / 60
+
+    @property
+    def idle_seconds(self) -> float:
+        """Time for an empty bucket to refill completely."""
+        return self.burst / self.rate
+
+
+def refill(tokens: float, updated: float, now: float, limit: Limit) -> tuple[bool, float, float]:
+    """Spend one token from a bucket last seen at ``updated``.
+
+    Returns (allowed, tokens left, seconds until a token is available).
+    """
+    tokens = min(limit.burst, tokens + (now - updated) * limit.rate)
+    if tokens >= 1:
+        return True, tokens - 1, 0.0
+    return False, tokens, (1 - tokens) / limit.rate
+
+
+class RateLimitBackend:
+    """Where buckets are stored; ``take`` must be atomic per key."""
+
+    async def take(self, key: str, limit: Limit) -> tuple[bool, float, float]:
+        """Spend a token for ``key``; same result as ``refill``."""
+        raise NotImplementedError
+
+    def reset(self) -> None:
+        """Forget every bucket."""
+        raise NotImplementedError
+
+
+class MemoryBackend(RateLimitBackend):
+    """Buckets in this process, sharded so clients rarely share a lock.
+
+    Each shard keeps its buckets in least-recently-used order, so buckets
+    that have been idle long enough to be full again are dropped from the
+    front a couple at a time instead of in a full scan.
+    """
+
+    def __init__(self, shards: int = 16):
+        self._shards = [(threading.Lock(), OrderedDict()) for _ in range(shards)]
+
+    def _take(self, key: str, limit: Limit, now: float) -> tuple[bool, float, float]:
+        lock, buckets = self._shards[zlib.crc32(key.encode()) % len(self._shards)]
+        with lock:
+            tokens, updated, _ = buckets.pop(key, (limit.burst, now, now))
+            allowed, tokens, retry_after = refill(tokens, updated, now, limit)
+            buckets[key] = (tokens, now, now + limit.idle_seconds)
+            # A bucket idle for a full refill is the same as no bucket
+            for _ in range(2):
+                oldest_key, (_, _, full_at) = next(iter(buckets.items()))
+                if full_at > now or oldest_key == key:
+                    break
+                del buckets[oldest_key]
+        return allowed, tokens, retry_after
+
+    async def take(self, key: str, limit: Limit) -> tuple[bool, float, float]:
+        return self._take(key, limit, time.monotonic())
+
+    def reset(self) -> None:
+        for lock, buckets in self._shards:
+            with lock:
+                buckets.clear()
+
+    def __len__(self) -> int:
+        return sum(len(buckets) for _, buckets in self._shards)
+
+
+class SQLiteBackend(RateLimitBackend):
+    """Buckets in a SQLite file shared by every process on the host.
+
+    Each check is one short write transaction; WAL mode lets readers and
+    the writer overlap. Wall-clock time is used since processes do not
+    share a monotonic clock.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, "
+                "tokens REAL NOT NULL, updated REAL NOT NULL, full_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS buckets_full_at ON buckets (full_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _take(self, key: str, limit: Limit) -> tuple[bool, float, float]:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            row = conn.execute(
+                "SELECT tokens, updated FROM buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens, updated = row if row else (limit.burst, now)
+            allowed, tokens, retry_after = refill(tokens, updated, now, limit)
+            conn.execute(
+                "INSERT OR REPLACE INTO buckets (key, tokens, updated, full_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, tokens, now, now + limit.idle_seconds),
+            )
+            conn.execute(
+                "DELETE FROM buckets WHERE rowid IN "
+                "(SELECT rowid FROM buckets WHERE full_at < ? LIMIT 2)",
+                (now,),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return allowed, tokens, retry_after
+
+    async def take(self, key: str, limit: Limit) -> tuple[bool, float, float]:
+        return await asyncio.to_thread(self._take, key, limit)
+
+    def reset(self) -> None:
+        self._connect().execute("DELETE FROM buckets")
+
+
+def create_backend(name: str, sqlite_path: str | None = None) -> RateLimitBackend:
+    if name == "memory":
+        return MemoryBackend()
+    if name == "sqlite":
+        return SQLiteBackend(sqlite_path)
+    raise ValueError(f"Unknown rate limit backend: {name}")
+
+
+@dataclass
+class Decision:
+    allowed: bool
+    limit: Limit
+    remaining: int
+    retry_after: int
+
+
+class RateLimiter:
+    """Picks the limits that apply to a request and checks each bucket.
+
+    Clients sending a key listed in ``api_keys`` get that key's rpm and a
+    bucket per key; everyone else is limited per IP, so made-up keys do
+    not buy fresh buckets. ``routes`` maps a path prefix to an extra,
+    per-client limit on paths under it; the longest matching prefix
+    applies.
+    """
+
+    def __init__(
+        self,
+        backend: RateLimitBackend,
+        rpm: int,
+        burst: int | None = None,
+        api_keys: dict[str, int] | None = None,
+        routes: dict[str, int] | None = None,
+    ):
+        self.backend = backend
+        self.default = Limit(rpm, burst or rpm)
+        self.api_keys = {
+            self._key_id(key): Limit(key_rpm, max(burst or 0, key_rpm))
+            for key, key_rpm in (api_keys or {}).items()
+        }
+        self.routes = sorted(
+            ((prefix, Limit(route_rpm, route_rpm)) for prefix, route_rpm in (routes or {}).items()),
+            key=lambda item: len(item[0]),
+            reverse=True,
+        )
+
+    @staticmethod
+    def _key_id(api_key: str) -> str:
+        # Buckets may be stored outside the process, so never key them by the secret
+        return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+    async def check(self, path: str, client_ip: str, api_key: str | None = None) -> Decision:
+        key_id = self._key_id(api_key) if api_key else None
+        if key_id in self.api_keys:
+            client = f"key:{key_id}"
+            limit = self.api_keys[key_id]
+        else:
+            client = f"ip:{client_ip}"
+            limit = self.default
+
+        checks = [(client, limit)]
+        for prefix, route_limit in self.routes:
+            if path.startswith(prefix):
+                checks.append((f"{client}|{prefix}", route_limit))
+                break
+
+        decision = None
+        for key, bucket_limit in checks:
+            if bucket_limit.rpm <= 0:
+                continue
+            allowed, tokens, retry_after = await self.backend.take(key, bucket_limit)
+            current = Decision(allowed, bucket_limit, int(tokens), math.ceil(retry_after))
+            if not allowed:
+                return current
+            if decision is None or current.remaining < decision.remaining:
+                decision = current
+        return decision or Decision(True, limit, int(limit.burst), 0)
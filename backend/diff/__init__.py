@@ -6,7 +6,16 @@ from .models import (
     LineType,
     FileChangeType,
 )
-from .parser import DiffParser
+from .compact import (
+    CompactDiff,
+    CompactFile,
+    CompactHunk,
+    DiffLike,
+    DiffStats,
+    FileStat,
+)
+from .parser import DiffParser, DiffParseError
+from .packer import PackedDiff, pack_diff
 
 __all__ = [
     "ParsedDiff",
@@ -15,5 +24,14 @@ __all__ = [
     "ParsedLine",
     "LineType",
     "FileChangeType",
+    "CompactDiff",
+    "CompactFile",
+    "CompactHunk",
+    "DiffLike",
+    "DiffStats",
+    "FileStat",
     "DiffParser",
+    "DiffParseError",
+    "PackedDiff",
+    "pack_diff",
 ]
@@ -0,0 +1,283 @@
+"""
+Compact, slots-based diff representation used inside the backend.
+
+The Pydantic models in ``models.py`` allocate one validated object per diff
+line. For large diffs that dominates parse time and memory, so the parser
+builds these lightweight objects instead:
+
+- CompactHunk keeps offsets into the original diff text and only splits
+  it into lines (or joins its content) when asked
+- CompactFile and CompactDiff mirror the attribute names of ParsedFile and
+  ParsedDiff, so clustering strategies accept either representation
+
+Call ``to_model()`` to get the Pydantic models at API boundaries.
+"""
+
+import os
+from collections.abc import Iterator
+
+from .models import (
+    FileChangeType,
+    LineType,
+    ParsedDiff,
+    ParsedFile,
+    ParsedHunk,
+    ParsedLine,
+)
+
+_LINE_TYPES = {
+    "+": LineType.ADDED,
+    "-": LineType.REMOVED,
+    " ": LineType.CONTEXT,
+}
+
+
+class CompactHunk:
+    """A hunk stored as a span of the diff text it was parsed from."""
+
+    __slots__ = (
+        "id",
+        "source_start",
+        "source_length",
+        "target_start",
+        "target_length",
+        "section_header",
+        "added_count",
+        "removed_count",
+        "_buffer",
+        "_start",
+        "_end",
+        "_content",
+    )
+
+    def __init__(
+        self,
+        id: str,
+        source_start: int,
+        source_length: int,
+        target_start: int,
+        target_length: int,
+        section_header: str,
+        added_count: int,
+        removed_count: int,
+        buffer: str,
+        start: int,
+        end: int,
+    ):
+        self.id = id
+        self.source_start = source_start
+        self.source_length = source_length
+        self.target_start = target_start
+        self.target_length = target_length
+        self.section_header = section_header
+        self.added_count = added_count
+        self.removed_count = removed_count
+        self._buffer = buffer
+        self._start = start
+        self._end = end
+        self._content: str | None = None
+
+    def __repr__(self) -> str:
+        return f"<CompactHunk {self.id} +{self.added_count}/-{self.removed_count}>"
+
+    @property
+    def raw(self) -> str:
+        """Hunk body as it appears in the diff, line prefixes included."""
+        return self._buffer[self._start : self._end]
+
+    def _raw_lines(self) -> list[str]:
+        lines = self.raw.split("\n")
+        if lines and lines[-1] == "":
+            lines.pop()
+        return lines
+
+    @property
+    def content(self) -> str:
+        """Hunk content without line prefixes, joined once and cached."""
+        if self._content is None:
+            self._content = "\n".join(
+                line[1:] if line and line[0] in "+- \\" else line
+                for line in self._raw_lines()
+            )
+        return self._content
+
+    def iter_lines(self) -> Iterator[tuple[LineType, str, int | None, int | None]]:
+        """Yield ``(line_type, content, source_line_no, target_line_no)``."""
+        source_no = self.source_start
+        target_no = self.target_start
+        source_end = source_no + self.source_length
+        target_end = target_no + self.target_length
+
+        for line in self._raw_lines():
+            kind = line[:1]
+            text = line[1:] if kind and kind in "+- \\" else line
+            # Lines after the hunk is complete are trailing blanks or
+            # "\ No newline" markers and carry no line numbers.
+            if kind == "\\" or (source_no >= source_end and target_no >= target_end):
+                yield LineType.CONTEXT, text, None, None
+            elif kind == "+":
+                yield LineType.ADDED, text, None, target_no
+                target_no += 1
+            elif kind == "-":
+                yield LineType.REMOVED, text, source_no, None
+                source_no += 1
+            else:
+                yield _LINE_TYPES.get(kind, LineType.CONTEXT), text, source_no, target_no
+                source_no += 1
+                target_no += 1
+
+    @property
+    def lines(self) -> list[ParsedLine]:
+        """Materialize the hunk's lines as Pydantic models (not cached)."""
+        return [
+            ParsedLine(
+                content=text,
+                line_type=line_type,
+                source_line_no=source_no,
+                target_line_no=target_no,
+            )
+            for line_type, text, source_no, target_no in self.iter_lines()
+        ]
+
+    def to_model(self) -> ParsedHunk:
+        return ParsedHunk(
+            id=self.id,
+            source_start=self.source_start,
+            source_length=self.source_length,
+            target_start=self.target_start,
+            target_length=self.target_length,
+            section_header=self.section_header,
+            lines=self.lines,
+            added_count=self.added_count,
+            removed_count=self.removed_count,
+        )
+
+
+class CompactFile:
+    """A file with its compact hunks."""
+
+    __slots__ = ("path", "change_type", "hunks", "is_binary", "old_path")
+
+    def __init__(
+        self,
+        path: str,
+        change_type: FileChangeType,
+        hunks: list[CompactHunk] | None = None,
+        is_binary: bool = False,
+        old_path: str | None = None,
+    ):
+        self.path = path
+        self.change_type = change_type
+        self.hunks = hunks if hunks is not None else []
+        self.is_binary = is_binary
+        self.old_path = old_path
+
+    def __repr__(self) -> str:
+        return f"<CompactFile {self.path} {self.change_type.value}>"
+
+    @property
+    def directory(self) -> str:
+        return os.path.dirname(self.path) or "."
+
+    @property
+    def extension(self) -> str:
+        return os.path.splitext(self.path)[1]
+
+    @property
+    def added_count(self) -> int:
+        return sum(h.added_count for h in self.hunks)
+
+    @property
+    def removed_count(self) -> int:
+        return sum(h.removed_count for h in self.hunks)
+
+    def to_model(self) -> ParsedFile:
+        return ParsedFile(
+            path=self.path,
+            change_type=self.change_type,
+            hunks=[h.to_model() for h in self.hunks],
+            is_binary=self.is_binary,
+            old_path=self.old_path,
+        )
+
+
+class CompactDiff:
+    """Complete compact diff, interchangeable with ParsedDiff for clustering."""
+
+    __slots__ = ("files", "total_added", "total_removed")
+
+    def __init__(
+        self,
+        files: list[CompactFile] | None = None,
+        total_added: int = 0,
+        total_removed: int = 0,
+    ):
+        self.files = files if files is not None else []
+        self.total_added = total_added
+        self.total_removed = total_removed
+
+    def __repr__(self) -> str:
+        return (
+            f"<CompactDiff {len(self.files)} files "
+            f"+{self.total_added}/-{self.total_removed}>"
+        )
+
+    def get_all_hunks(self) -> list[tuple[CompactFile, CompactHunk]]:
+        return [(file, hunk) for file in self.files for hunk in file.hunks]
+
+    def to_model(self) -> ParsedDiff:
+        return ParsedDiff(
+            files=[f.to_model() for f in self.files],
+            total_added=self.total_added,
+            total_removed=self.total_removed,
+        )
+
+
+class FileStat:
+    """Per-file summary from a header-only scan: no hunk content is kept."""
+
+    __slots__ = ("path", "change_type", "added", "removed", "is_binary", "old_path")
+
+    def __init__(
+        self,
+        path: str,
+        change_type: FileChangeType,
+        added: int = 0,
+        removed: int = 0,
+        is_binary: bool = False,
+        old_path: str | None = None,
+    ):
+        self.path = path
+        self.change_type = change_type
+        self.added = added
+        self.removed = removed
+        self.is_binary = is_binary
+        self.old_path = old_path
+
+    def __repr__(self) -> str:
+        return f"<FileStat {self.path} +{self.added}/-{self.removed}>"
+
+
+class DiffStats:
+    """Files, change types and line counts of a diff, without hunks."""
+
+    __slots__ = ("files", "total_added", "total_removed")
+
+    def __init__(self, files: list[FileStat] | None = None):
+        self.files = files if files is not None else []
+        self.total_added = sum(f.added for f in self.files)
+        self.total_removed = sum(f.removed for f in self.files)
+
+    def __repr__(self) -> str:
+        return (
+            f"<DiffStats {len(self.files)} files "
+            f"+{self.total_added}/-{self.total_removed}>"
+        )
+
+    @property
+    def paths(self) -> list[str]:
+        return [f.path for f in self.files]
+
+
+# Either representation is accepted by the clustering strategies.
+DiffLike = ParsedDiff | CompactDiff
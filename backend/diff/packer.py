@@ -0,0 +1,427 @@
+"""
+Token-budgeted diff packing.
+
+Fits a diff into a prompt budget while keeping the parts that matter:
+
+1. Files are ranked: source code first, then docs and config, with
+   lockfiles, generated and vendored files last. Within a tier, larger
+   changes rank higher; hunks within a file are ranked the same way.
+2. Every hunk is first trimmed to the changed lines plus a little context,
+   and added in rank order while it fits.
+3. Leftover budget restores full context, best-ranked hunks first.
+4. Files (and hunks) that did not fit are listed as stat lines at the end,
+   so the model still knows they changed.
+"""
+
+import math
+import os
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from .compact import CompactFile, CompactHunk
+from .models import FileChangeType
+from .parser import DiffParser, DiffParseError
+
+TokenCounter = Callable[[str], int]
+
+_LOCKFILES = {
+    "package-lock.json",
+    "npm-shrinkwrap.json",
+    "yarn.lock",
+    "pnpm-lock.yaml",
+    "bun.lockb",
+    "poetry.lock",
+    "pipfile.lock",
+    "uv.lock",
+    "cargo.lock",
+    "gemfile.lock",
+    "composer.lock",
+    "go.sum",
+    "packages.lock.json",
+}
+_GENERATED_SUFFIXES = (
+    ".min.js",
+    ".min.css",
+    ".map",
+    ".lock",
+    ".snap",
+    "_pb2.py",
+    "_pb2_grpc.py",
+    ".pb.go",
+    ".g.dart",
+    ".designer.cs",
+)
+_GENERATED_DIRS = (
+    "vendor/",
+    "node_modules/",
+    "dist/",
+    "build/",
+    "third_party/",
+    "__snapshots__/",
+    "generated/",
+)
+_SOURCE_EXTENSIONS = {
+    ".py", ".pyi", ".js", ".jsx", ".ts", ".tsx", ".mjs", ".go", ".rs",
+    ".java", ".kt", ".scala", ".c", ".h", ".cc", ".cpp", ".hpp", ".cs",
+    ".rb", ".php", ".swift", ".m", ".sql", ".sh", ".vue", ".svelte",
+}
+
+_OMITTED_HEADER = "# Not shown to fit the token budget:\n"
+# Share of the budget the list of omitted files may take at most.
+_STAT_SHARE = 4
+_STATUS = {
+    FileChangeType.ADDED: "A",
+    FileChangeType.MODIFIED: "M",
+    FileChangeType.DELETED: "D",
+    FileChangeType.RENAMED: "R",
+}
+
+
+def estimate_tokens_ceil(text: str) -> int:
+    """chars / 4 rounded up, so piece estimates never undercount the whole."""
+    return math.ceil(len(text) / 4)
+
+
+@dataclass
+class PackedDiff:
+    """A diff fitted into a token budget, with what was left out."""
+
+    text: str
+    tokens: int
+    files_total: int = 0
+    files_omitted: list[str] = field(default_factory=list)
+    hunks_trimmed: int = 0
+    hunks_omitted: int = 0
+
+    @property
+    def truncated(self) -> bool:
+        return bool(self.files_omitted or self.hunks_trimmed or self.hunks_omitted)
+
+
+def file_priority(path: str) -> int:
+    """2 for source code, 1 for other text, 0 for lockfiles and generated code."""
+    normalized = path.replace("\\", "/").lower()
+    name = os.path.basename(normalized)
+    if (
+        name in _LOCKFILES
+        or normalized.endswith(_GENERATED_SUFFIXES)
+        or any(part in f"/{normalized}" for part in ("/" + d for d in _GENERATED_DIRS))
+    ):
+        return 0
+    if os.path.splitext(name)[1] in _SOURCE_EXTENSIONS:
+        return 2
+    return 1
+
+
+def _strip_prefix(path: str) -> str:
+    return path[2:] if len(path) > 2 and path[1] == "/" and path[0] in "abciow12" else path
+
+
+def _file_header(file: CompactFile) -> str:
+    source = _strip_prefix(file.old_path) if file.old_path else file.path
+    lines = [f"diff --git a/{source} b/{file.path}\n"]
+    if file.is_binary:
+        lines.append("Binary files differ\n")
+        return "".join(lines)
+    lines.append(
+        "--- /dev/null\n"
+        if file.change_type == FileChangeType.ADDED
+        else f"--- a/{source}\n"
+    )
+    lines.append(
+        "+++ /dev/null\n"
+        if file.change_type == FileChangeType.DELETED
+        else f"+++ b/{file.path}\n"
+    )
+    return "".join(lines)
+
+
+def _hunk_header(
+    source_start: int, source_length: int, target_start: int, target_length: int,
+    section: str = "",
+) -> str:
+    tail = f" {section}" if section else ""
+    return f"@@ -{source_start},{source_length} +{target_start},{target_length} @@{tail}\n"
+
+
+def _full_hunk(hunk: CompactHunk) -> str:
+    raw = hunk.raw
+    if raw and not raw.endswith("\n"):
+        raw += "\n"
+    return (
+        _hunk_header(
+            hunk.source_start, hunk.source_length,
+            hunk.target_start, hunk.target_length,
+            hunk.section_header,
+        )
+        + raw
+    )
+
+
+def _trimmed_hunk(hunk: CompactHunk, context: int) -> str:
+    """Keep changed lines and ``context`` lines around them, as valid sub-hunks."""
+    lines = hunk.raw.split("\n")
+    if lines and lines[-1] == "":
+        lines.pop()
+
+    # Drop trailing blanks past the hunk's line counts; "\ No newline"
+    # markers stay so they follow the line they belong to.
+    body = 0
+    source_left, target_left = hunk.source_length, hunk.target_length
+    for line in lines:
+        if source_left <= 0 and target_left <= 0 and line[:1] != "\\":
+            break
+        kind = line[:1]
+        if kind == "+":
+            target_left -= 1
+        elif kind == "-":
+            source_left -= 1
+        elif kind != "\\":
+            source_left -= 1
+            target_left -= 1
+        body += 1
+    lines = lines[:body]
+
+    # Merge the context windows around changed lines into runs
+    runs: list[list[int]] = []
+    for i, line in enumerate(lines):
+        if line[:1] in ("+", "-"):
+            low = max(0, i - context)
+            if runs and low <= runs[-1][1] + 1:
+                runs[-1][1] = i + context
+            else:
+                runs.append([low, i + context])
+
+    parts: list[str] = []
+    source_pos, target_pos = hunk.source_start, hunk.target_start
+    done = 0
+    for low, high in runs:
+        high = min(high, len(lines) - 1)
+        while high + 1 < len(lines) and lines[high + 1][:1] == "\\":
+            high += 1
+        for line in lines[done:low]:
+            kind = line[:1]
+            if kind != "+" and kind != "\\":
+                source_pos += 1
+            if kind != "-" and kind != "\\":
+                target_pos += 1
+        run = lines[low : high + 1]
+        source_length = target_length = 0
+        for line in run:
+            kind = line[:1]
+            if kind != "+" and kind != "\\":
+                source_length += 1
+            if kind != "-" and kind != "\\":
+                target_length += 1
+        parts.append(
+            _hunk_header(
+                source_pos if source_length else source_pos - 1,
+                source_length,
+                target_pos if target_length else target_pos - 1,
+                target_length,
+                "" if parts else hunk.section_header,
+            )
+        )
+        parts.append("\n".join(run))
+        parts.append("\n")
+        source_pos += source_length
+        target_pos += target_length
+        done = high + 1
+    return "".join(parts)
+
+
+def _stat_line(file: CompactFile, note: str = "") -> str:
+    kind = "binary" if file.is_binary else f"+{file.added_count}/-{file.removed_count}"
+    extra = f", {note}" if note else ""
+    return f"#   {_STATUS[file.change_type]} {file.path} ({kind}{extra})\n"
+
+
+def _hunks_note(missing: int, total: int | None = None) -> str:
+    return f"{missing} of {missing if total is None else total} hunks not shown"
+
+
+def _more_line(count: int) -> str:
+    return f"#   ... and {count} more files\n"
+
+
+class _FilePlan:
+    __slots__ = ("file", "order", "header", "hunks", "levels", "included")
+
+    def __init__(self, file: CompactFile, order: int):
+        self.file = file
+        self.order = order
+        self.header = _file_header(file)
+        # hunk indexes, best first
+        self.hunks = sorted(
+            range(len(file.hunks)),
+            key=lambda i: -(file.hunks[i].added_count + file.hunks[i].removed_count),
+        )
+        # per hunk: None (omitted), "trimmed" or "full"
+        self.levels: list[str | None] = [None] * len(file.hunks)
+        self.included = False
+
+
+def pack_diff(
+    diff: str,
+    max_tokens: int,
+    count_tokens: TokenCounter = estimate_tokens_ceil,
+    context_lines: int = 1,
+) -> PackedDiff:
+    """Fit ``diff`` into ``max_tokens`` as described in the module docstring.
+
+    Diffs that already fit are returned unchanged. Text that cannot be
+    parsed as a diff is cut at the last line boundary that fits.
+    """
+    total = count_tokens(diff)
+    if total <= max_tokens:
+        return PackedDiff(text=diff, tokens=total)
+
+    try:
+        files = DiffParser().parse_compact(diff).files
+    except DiffParseError:
+        files = []
+    if not files:
+        text = _cut_lines(diff, max_tokens, count_tokens)
+        return PackedDiff(text=text, tokens=count_tokens(text))
+
+    plans = [_FilePlan(f, i) for i, f in enumerate(files)]
+    ranked = sorted(
+        plans,
+        key=lambda p: (
+            -(0 if p.file.is_binary else file_priority(p.file.path)),
+            -(p.file.added_count + p.file.removed_count),
+            p.order,
+        ),
+    )
+
+    # Reserve room for the omitted-file list, sized for the longest note.
+    # When the whole list fits its share of the budget, fully included files
+    # give their line back; otherwise the share is fixed and the list is
+    # filled in rank order at the end.
+    stat_cost = {
+        id(p): count_tokens(_stat_line(p.file, _hunks_note(len(p.file.hunks))))
+        for p in plans
+    }
+    stat_total = sum(stat_cost.values())
+    stat_share = max_tokens // _STAT_SHARE
+    capped = stat_total > stat_share
+    reserved = stat_share if capped else stat_total
+    if capped:
+        stat_cost = dict.fromkeys(stat_cost, 0)
+    remaining = max_tokens - count_tokens(_OMITTED_HEADER) - reserved
+
+    trimmed_text: dict[tuple[int, int], str] = {}
+    full_text: dict[tuple[int, int], str] = {}
+
+    def trimmed(plan: _FilePlan, idx: int) -> str:
+        key = (plan.order, idx)
+        if key not in trimmed_text:
+            trimmed_text[key] = _trimmed_hunk(plan.file.hunks[idx], context_lines)
+        return trimmed_text[key]
+
+    # Pass 1: trimmed hunks, best files and hunks first.
+    for plan in ranked:
+        if plan.file.is_binary:
+            continue
+        header_cost = count_tokens(plan.header)
+        if header_cost > remaining + stat_cost[id(plan)]:
+            continue
+        if not plan.file.hunks:
+            plan.included = True
+            remaining -= header_cost - stat_cost[id(plan)]
+            continue
+
+        budget = remaining - header_cost
+        chosen = []
+        for idx in plan.hunks:
+            cost = count_tokens(trimmed(plan, idx))
+            if cost <= budget:
+                chosen.append(idx)
+                budget -= cost
+        if not chosen:
+            continue
+
+        plan.included = True
+        for idx in chosen:
+            plan.levels[idx] = "trimmed"
+        remaining = budget
+        if len(chosen) == len(plan.file.hunks):
+            remaining += stat_cost[id(plan)]
+
+    # Pass 2: restore full context where the budget allows.
+    for plan in ranked:
+        for idx in plan.hunks:
+            if plan.levels[idx] != "trimmed":
+                continue
+            full = _full_hunk(plan.file.hunks[idx])
+            extra = count_tokens(full) - count_tokens(trimmed(plan, idx))
+            if extra <= remaining:
+                full_text[(plan.order, idx)] = full
+                plan.levels[idx] = "full"
+                remaining -= extra
+
+    parts: list[str] = []
+    omitted: list[str] = []
+    notes: dict[int, str] = {}
+    hunks_trimmed = hunks_omitted = 0
+    for plan in plans:
+        if not plan.included:
+            omitted.append(plan.file.path)
+            notes[id(plan)] = _stat_line(plan.file)
+            hunks_omitted += len(plan.file.hunks)
+            continue
+        parts.append(plan.header)
+        for idx, level in enumerate(plan.levels):
+            if level == "full":
+                parts.append(full_text[(plan.order, idx)])
+            elif level == "trimmed":
+                parts.append(trimmed_text[(plan.order, idx)])
+                if trimmed_text[(plan.order, idx)] != _full_hunk(plan.file.hunks[idx]):
+                    hunks_trimmed += 1
+        missing = plan.levels.count(None)
+        if missing:
+            hunks_omitted += missing
+            notes[id(plan)] = _stat_line(
+                plan.file, _hunks_note(missing, len(plan.levels))
+            )
+
+    if notes:
+        parts.append(_OMITTED_HEADER)
+        listed = [notes[id(p)] for p in plans if id(p) in notes]
+        if capped:
+            room = remaining + reserved
+            listed = []
+            for plan in ranked:
+                if id(plan) not in notes:
+                    continue
+                more = _more_line(len(notes) - len(listed))
+                cost = count_tokens(notes[id(plan)])
+                if cost + count_tokens(more) > room:
+                    break
+                listed.append(notes[id(plan)])
+                room -= cost
+            if len(listed) < len(notes):
+                listed.append(_more_line(len(notes) - len(listed)))
+        parts.extend(listed)
+
+    text = "".join(parts)
+    return PackedDiff(
+        text=text,
+        tokens=count_tokens(text),
+        files_total=len(files),
+        files_omitted=omitted,
+        hunks_trimmed=hunks_trimmed,
+        hunks_omitted=hunks_omitted,
+    )
+
+
+def _cut_lines(text: str, max_tokens: int, count_tokens: TokenCounter) -> str:
+    parts: list[str] = []
+    used = 0
+    for line in text.splitlines(keepends=True):
+        cost = count_tokens(line)
+        if used + cost > max_tokens:
+            break
+        parts.append(line)
+        used += cost
+    return "".join(parts)
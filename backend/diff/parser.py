@@ -1,76 +1,343 @@
-from unidiff import PatchSet
-
-from .models import (
-    ParsedDiff,
-    ParsedFile,
-    ParsedHunk,
-    ParsedLine,
-    LineType,
-    FileChangeType,
+import io
+import re
+from collections.abc import Iterable, Iterator
+
+from .compact import CompactDiff, CompactFile, CompactHunk, DiffStats, FileStat
+from .models import ParsedDiff, ParsedFile, FileChangeType
+
+# Header formats follow unidiff so both parsers agree on paths and renames.
+_GIT_HEADERS = (
+    re.compile(r'^diff --git (?P<source>"?a/[^\t\n]+"?) (?P<target>"?b/[^\t\n]+"?)'),
+    re.compile(r"^diff --git (?P<source>.*://[^\t\n]+) (?P<target>.*://[^\t\n]+)"),
+    re.compile(r"^diff --git (?P<source>[^\t\n]+) (?P<target>[^\t\n]+)"),
 )
+_NEW_FILE = re.compile(r"^new file mode \d+$")
+_DELETED_FILE = re.compile(r"^deleted file mode \d+$")
+_OLD_MODE = re.compile(r"^old mode \d+$")
+_NEW_MODE = re.compile(r"^new mode \d+$")
+_INDEX = re.compile(r"^index [0-9a-f]+\.\.[0-9a-f]+ \d+$")
+_SOURCE_FILE = re.compile(r'^--- (?P<filename>"?[^\t\n]*"?)')
+_TARGET_FILE = re.compile(r'^\+\+\+ (?P<filename>"?[^\t\n]*"?)')
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))?\ @@[ ]?(.*)")
+_BINARY = re.compile(
+    r"^Binary files? (?P<source>[^\t]+?)(?:\t[\s0-9:\+-]+)?"
+    r"(?: and (?P<target>[^\t]+?)(?:\t[\s0-9:\+-]+)?)? (differ|has changed)"
+)
+_FILE_PREFIX = re.compile(r"^[abciow12]/")
 
+_DEV_NULL = "/dev/null"
+_NO_NEWLINE = "\\ No newline at end of file"
 
-class DiffParser:
 
-    def parse(self, diff_text: str) -> ParsedDiff:
-        if not diff_text.strip():
-            return ParsedDiff()
-
-        patch_set = PatchSet.from_string(diff_text)
-
-        files = []
-        for patched_file in patch_set:
-            hunks = []
-            for idx, hunk in enumerate(patched_file):
-                parsed_hunk = ParsedHunk(
-                    id=f"{patched_file.path}:{idx}",
-                    source_start=hunk.source_start,
-                    source_length=hunk.source_length,
-                    target_start=hunk.target_start,
-                    target_length=hunk.target_length,
-                    section_header=hunk.section_header or "",
-                    lines=[
-                        ParsedLine(
-                            content=line.value.rstrip("\n"),
-                            line_type=self._map_line_type(line.line_type),
-                            source_line_no=line.source_line_no,
-                            target_line_no=line.target_line_no,
-                        )
-                        for line in hunk
-                    ],
-                    added_count=hunk.added,
-                    removed_count=hunk.removed,
-                )
-                hunks.append(parsed_hunk)
-
-            parsed_file = ParsedFile(
-                path=patched_file.path,
-                change_type=self._determine_change_type(patched_file),
-                hunks=hunks,
-                is_binary=patched_file.is_binary_file,
-                old_path=patched_file.source_file if patched_file.is_rename else None,
-            )
-            files.append(parsed_file)
-
-        return ParsedDiff(
-            files=files,
-            total_added=patch_set.added,
-            total_removed=patch_set.removed,
+class DiffParseError(ValueError):
+    """Raised when diff text is malformed."""
+
+    pass
+
+
+class _OpenFile:
+    """A file whose header and hunks are still being read."""
+
+    __slots__ = ("source", "target", "is_binary", "hunks")
+
+    def __init__(self, source: str, target: str, is_binary: bool = False):
+        self.source = source
+        self.target = target
+        self.is_binary = is_binary
+        self.hunks: list[CompactHunk] = []
+
+    @property
+    def is_rename(self) -> bool:
+        return (
+            self.source != _DEV_NULL
+            and self.target != _DEV_NULL
+            and self.source[2:] != self.target[2:]
         )
 
-    def _determine_change_type(self, patched_file) -> FileChangeType:
-        if patched_file.is_added_file:
+    @property
+    def path(self) -> str:
+        path = self.source
+        if path == _DEV_NULL or (self.is_rename and self.target != _DEV_NULL):
+            path = self.target
+
+        quoted = path.startswith('"') and path.endswith('"')
+        if quoted:
+            path = path[1:-1]
+        if _FILE_PREFIX.match(path):
+            path = path[2:]
+        return f'"{path}"' if quoted else path
+
+    def change_type(self) -> FileChangeType:
+        hunks = self.hunks
+        if self.source == _DEV_NULL or (
+            len(hunks) == 1 and hunks[0].source_start == 0 and hunks[0].source_length == 0
+        ):
             return FileChangeType.ADDED
-        if patched_file.is_removed_file:
+        if self.target == _DEV_NULL or (
+            len(hunks) == 1 and hunks[0].target_start == 0 and hunks[0].target_length == 0
+        ):
             return FileChangeType.DELETED
-        if patched_file.is_rename:
+        if self.is_rename:
             return FileChangeType.RENAMED
         return FileChangeType.MODIFIED
 
-    def _map_line_type(self, unidiff_type: str) -> LineType:
-        mapping = {
-            "+": LineType.ADDED,
-            "-": LineType.REMOVED,
-            " ": LineType.CONTEXT,
-        }
-        return mapping.get(unidiff_type, LineType.CONTEXT)
+    def finish(self) -> CompactFile:
+        path = self.path
+        for idx, hunk in enumerate(self.hunks):
+            hunk.id = f"{path}:{idx}"
+        return CompactFile(
+            path=path,
+            change_type=self.change_type(),
+            hunks=self.hunks,
+            is_binary=self.is_binary,
+            old_path=self.source if self.is_rename else None,
+        )
+
+
+def _extend_last_hunk(
+    current: _OpenFile, line: str, pos: int, buffer: str | None
+) -> None:
+    """Attach a trailing blank or "\\ No newline" line to the last hunk."""
+    hunk = current.hunks[-1]
+    if buffer is None:
+        hunk._buffer += line
+        hunk._end = len(hunk._buffer)
+    else:
+        hunk._end = pos
+
+
+def _scan(
+    source: Iterable[str], buffer: str | None = None, keep_content: bool = True
+) -> Iterator[CompactFile]:
+    """Single pass over diff lines, yielding each file once it is complete.
+
+    When ``buffer`` is the text the lines were split from, hunks record
+    offsets into it instead of copying their lines. Otherwise each hunk
+    joins its own lines, so nothing but the open file is held in memory.
+    With ``keep_content=False`` hunk bodies are only counted, not kept.
+    """
+    lines = iter(source)
+    pos = 0
+    current: _OpenFile | None = None
+    # True while reading a file's extended header ("diff --git" .. "@@")
+    in_header = False
+    pending_source: str | None = None
+
+    def close() -> Iterator[CompactFile]:
+        if current is not None:
+            yield current.finish()
+
+    for line in lines:
+        pos += len(line)
+        first = line[0]
+
+        if first == "d" and line.startswith("diff --git "):
+            match = None
+            for pattern in _GIT_HEADERS:
+                match = pattern.match(line)
+                if match:
+                    break
+            if match:
+                yield from close()
+                current = _OpenFile(match.group("source"), match.group("target"))
+                in_header = True
+                pending_source = match.group("source")
+                continue
+
+        if first == "n" and _NEW_FILE.match(line):
+            if current is None or not in_header:
+                raise DiffParseError(f"Unexpected new file found: {line}")
+            current.source = _DEV_NULL
+            continue
+
+        if first == "d" and _DELETED_FILE.match(line):
+            if current is None or not in_header:
+                raise DiffParseError(f"Unexpected deleted file found: {line}")
+            current.target = _DEV_NULL
+            continue
+
+        if current is not None and in_header and (
+            (first == "o" and _OLD_MODE.match(line))
+            or (first == "n" and _NEW_MODE.match(line))
+            or (first == "i" and _INDEX.match(line))
+        ):
+            continue
+
+        if first == "-" and line.startswith("--- "):
+            pending_source = _SOURCE_FILE.match(line).group("filename")
+            if current is not None and not in_header:
+                yield from close()
+                current = None
+            continue
+
+        if first == "+" and line.startswith("+++ "):
+            target = _TARGET_FILE.match(line).group("filename")
+            if current is not None and current.target != target:
+                raise DiffParseError(f"Target without source: {line}")
+            if current is None:
+                if pending_source is None:
+                    raise DiffParseError(f"Target without source: {line}")
+                current = _OpenFile(pending_source, target)
+                in_header = False
+                pending_source = None
+            continue
+
+        if first == "@":
+            header = _HUNK_HEADER.match(line)
+            if header:
+                in_header = False
+                if current is None:
+                    raise DiffParseError(f"Unexpected hunk found: {line}")
+                src_start, src_len, tgt_start, tgt_len, section = header.groups()
+                source_start = int(src_start)
+                source_length = 1 if src_len is None else int(src_len)
+                target_start = int(tgt_start)
+                target_length = 1 if tgt_len is None else int(tgt_len)
+
+                body_start = pos
+                body_lines: list[str] = []
+                source_left = source_length
+                target_left = target_length
+                added = removed = 0
+                for body in lines:
+                    pos += len(body)
+                    if buffer is None and keep_content:
+                        body_lines.append(body)
+                    kind = body[0]
+                    if kind == "+":
+                        target_left -= 1
+                        added += 1
+                    elif kind == "-":
+                        source_left -= 1
+                        removed += 1
+                    elif kind == " " or kind == "\n" or kind == "\r":
+                        source_left -= 1
+                        target_left -= 1
+                    elif kind != "\\":
+                        raise DiffParseError(f"Hunk diff line expected: {body}")
+
+                    if source_left < 0 or target_left < 0:
+                        raise DiffParseError("Hunk is longer than expected")
+                    if source_left == 0 and target_left == 0:
+                        break
+
+                if source_left > 0 or target_left > 0:
+                    raise DiffParseError("Hunk is shorter than expected")
+
+                if buffer is None:
+                    hunk_text = "".join(body_lines)
+                    body_start, body_end = 0, len(hunk_text)
+                else:
+                    hunk_text, body_end = buffer, pos
+
+                current.hunks.append(
+                    CompactHunk(
+                        id="",
+                        source_start=source_start,
+                        source_length=source_length,
+                        target_start=target_start,
+                        target_length=target_length,
+                        section_header=section or "",
+                        added_count=added,
+                        removed_count=removed,
+                        buffer=hunk_text,
+                        start=body_start,
+                        end=body_end,
+                    )
+                )
+                continue
+
+        if first == "\\" and line.startswith(_NO_NEWLINE):
+            if current is None or not current.hunks:
+                raise DiffParseError(f"Unexpected marker: {line}")
+            _extend_last_hunk(current, line, pos, buffer)
+            continue
+
+        if line == "\n" and current is not None and current.hunks:
+            _extend_last_hunk(current, line, pos, buffer)
+            continue
+
+        # Anything else is extended header text ("similarity index", ...)
+        if not in_header:
+            yield from close()
+            current = None
+            in_header = True
+
+        if first == "B":
+            binary = _BINARY.match(line)
+            if binary:
+                if current is not None:
+                    current.is_binary = True
+                else:
+                    source = binary.group("source")
+                    current = _OpenFile(
+                        source, binary.group("target") or source, is_binary=True
+                    )
+                yield from close()
+                current = None
+                in_header = False
+                continue
+
+        if line == "GIT binary patch\n":
+            if current is None:
+                raise DiffParseError(f"Unexpected binary patch marker: {line}")
+            current.is_binary = True
+            yield from close()
+            current = None
+            in_header = False
+
+    yield from close()
+
+
+class DiffParser:
+
+    def iter_compact(self, lines: Iterable[str]) -> Iterator[CompactFile]:
+        """Parse diff lines incrementally, yielding each file as it completes.
+
+        ``lines`` can be any iterable of newline-terminated strings, such as
+        a ``git diff`` pipe or a file opened with ``newline="\\n"`` (which
+        keeps carriage returns inside lines, as ``parse`` does).
+        """
+        return _scan(lines)
+
+    def iter_files(self, lines: Iterable[str]) -> Iterator[ParsedFile]:
+        """Like ``iter_compact`` but yields Pydantic ParsedFile models."""
+        for file in _scan(lines):
+            yield file.to_model()
+
+    def scan_stats(self, diff: str | Iterable[str]) -> DiffStats:
+        """Cheap pre-pass: files, change types, line counts and binary flags.
+
+        Hunk bodies are counted but not stored, so this is the call to make
+        when only the file inventory is needed. ``diff`` may be the diff text
+        or an iterable of its lines.
+        """
+        lines = io.StringIO(diff) if isinstance(diff, str) else diff
+        return DiffStats(
+            [
+                FileStat(
+                    path=f.path,
+                    change_type=f.change_type,
+                    added=f.added_count,
+                    removed=f.removed_count,
+                    is_binary=f.is_binary,
+                    old_path=f.old_path,
+                )
+                for f in _scan(lines, keep_content=False)
+            ]
+        )
+
+    def parse_compact(self, diff_text: str) -> CompactDiff:
+        """Parse into the compact representation used inside the backend."""
+        if not diff_text.strip():
+            return CompactDiff()
+
+        files = list(_scan(io.StringIO(diff_text), buffer=diff_text))
+        return CompactDiff(
+            files=files,
+            total_added=sum(f.added_count for f in files),
+            total_removed=sum(f.removed_count for f in files),
+        )
+
+    def parse(self, diff_text: str) -> ParsedDiff:
+        return self.parse_compact(diff_text).to_model()
@@ -14,6 +14,8 @@ class EngineResult:
     data: dict[str, Any] = field(default_factory=dict)
     reasoning: list[str] = field(default_factory=list)
     error: str | None = None
+    # Token usage of the run, as reported by ``UsageTracker.to_dict``
+    usage: dict[str, Any] = field(default_factory=dict)
 
 
 @runtime_checkable
@@ -28,8 +30,10 @@ class ExecutionEngine(Protocol):
         self, diff: str, repo_path: str = ".", issue_ref: str | None = None
     ) -> EngineResult: ...
 
+    async def analyze_diff(self, diff: str) -> EngineResult: ...
+
     async def review(
-        self, diff: str, repo_path: str = "."
+        self, diff: str, repo_path: str = ".", analysis_id: str | None = None
     ) -> EngineResult: ...
 
     async def generate_pr(
@@ -39,6 +43,7 @@ class ExecutionEngine(Protocol):
         branch_name: str = "",
         base_branch: str = "main",
         repo_path: str = ".",
+        analysis_id: str | None = None,
     ) -> EngineResult: ...
 
     async def split_diff(
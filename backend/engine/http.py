@@ -24,6 +24,7 @@ class HttpEngine:
             data=data,
             reasoning=data.get("reasoning", []),
             error=data.get("error"),
+            usage=data.get("usage", {}),
         )
 
     async def _run_sync(self, fn, *args, **kwargs) -> EngineResult:
@@ -65,8 +66,13 @@ class HttpEngine:
             self._client.generate_commit, diff, issue_ref
         )
 
-    async def review(self, diff: str, repo_path: str = ".") -> EngineResult:
-        return await self._run_sync(self._client.review, diff)
+    async def analyze_diff(self, diff: str) -> EngineResult:
+        return await self._run_sync(self._client.diff_analysis, diff)
+
+    async def review(
+        self, diff: str, repo_path: str = ".", analysis_id: str | None = None
+    ) -> EngineResult:
+        return await self._run_sync(self._client.review, diff, analysis_id)
 
     async def generate_pr(
         self,
@@ -75,9 +81,10 @@ class HttpEngine:
         branch_name: str = "",
         base_branch: str = "main",
         repo_path: str = ".",
+        analysis_id: str | None = None,
     ) -> EngineResult:
         return await self._run_sync(
-            self._client.generate_pr, diff, commits, branch_name, base_branch
+            self._client.generate_pr, diff, commits, branch_name, base_branch, analysis_id
         )
 
     async def split_diff(
@@ -64,17 +64,51 @@ class LocalEngine:
                 return None
         return self._retriever
 
-    def _result_from(self, data: dict[str, Any]) -> EngineResult:
+    def _result_from(
+        self, data: dict[str, Any], usage: dict[str, Any] | None = None
+    ) -> EngineResult:
         return EngineResult(
             data=data,
             reasoning=data.get("reasoning", []),
             error=data.get("error"),
+            usage=usage or {},
         )
 
-    def _prepare_diff(self, diff: str, issue_ref: str | None = None) -> str:
-        from backend.utils.cost import truncate_diff
+    async def _run(self, agent, **kwargs) -> EngineResult:
+        """Run an agent, collecting the token usage of its LLM calls."""
+        from backend.utils.usage import track_usage
+
+        with track_usage(agent.name) as tracker:
+            result = await agent.run(**kwargs)
+        return self._result_from(result, tracker.to_dict())
+
+    def _stream(self, agent, **kwargs) -> AsyncIterator[StreamEvent]:
+        """Stream an agent's events; the RESULT event carries token usage."""
+        from backend.utils.usage import with_usage
+
+        return with_usage(agent.run_stream(**kwargs), agent.name)
 
-        diff = truncate_diff(diff)
+    async def aclose(self) -> None:
+        """Close the LLM provider's connections if it was created."""
+        if self._llm is not None:
+            await self._llm.aclose()
+            self._llm = None
+
+    def _prepare_diff(self, diff: str, issue_ref: str | None = None) -> str:
+        from backend.diff.packer import pack_diff
+        from backend.utils.cost import diff_token_budget
+        from backend.utils.usage import get_tokenizer
+
+        model = {
+            "ollama": self._ollama_model,
+            "gemini": self._gemini_model,
+            "openai": self._openai_model,
+        }.get(self._provider_name)
+        diff = pack_diff(
+            diff,
+            diff_token_budget(self._provider_name, model),
+            count_tokens=get_tokenizer(self._provider_name),
+        ).text
         if issue_ref:
             diff = f"{diff}\n\nReference issue: {issue_ref}"
         return diff
@@ -86,20 +120,39 @@ class LocalEngine:
 
         try:
             agent = CommitAgent(self._get_llm(), self._get_retriever())
-            result = await agent.run(
+            return await self._run(
+                agent,
                 diff=self._prepare_diff(diff, issue_ref), repo_path=repo_path
             )
-            return self._result_from(result)
         except Exception as e:
             return EngineResult(error=str(e))
 
-    async def review(self, diff: str, repo_path: str = ".") -> EngineResult:
+    async def analyze_diff(self, diff: str) -> EngineResult:
+        """Analyze a diff once so review and PR can reuse the result."""
+        from backend.agents.analysis import get_diff_analysis
+        from backend.utils.usage import track_usage
+
+        try:
+            with track_usage("analysis") as tracker:
+                analysis = await get_diff_analysis(self._prepare_diff(diff), self._get_llm())
+            return self._result_from(analysis, tracker.to_dict())
+        except Exception as e:
+            return EngineResult(error=str(e))
+
+    async def review(
+        self, diff: str, repo_path: str = ".", analysis_id: str | None = None
+    ) -> EngineResult:
+        from backend.agents.analysis import analysis_cache
         from backend.agents.review_agent import ReviewAgent
 
         try:
             agent = ReviewAgent(self._get_llm(), self._get_retriever())
-            result = await agent.run(diff=self._prepare_diff(diff), repo_path=repo_path)
-            return self._result_from(result)
+            return await self._run(
+                agent,
+                diff=self._prepare_diff(diff),
+                repo_path=repo_path,
+                analysis=analysis_cache.get(analysis_id),
+            )
         except Exception as e:
             return EngineResult(error=str(e))
 
@@ -110,19 +163,22 @@ class LocalEngine:
         branch_name: str = "",
         base_branch: str = "main",
         repo_path: str = ".",
+        analysis_id: str | None = None,
     ) -> EngineResult:
+        from backend.agents.analysis import analysis_cache
         from backend.agents.pr_agent import PRAgent
 
         try:
             agent = PRAgent(self._get_llm(), self._get_retriever())
-            result = await agent.run(
+            return await self._run(
+                agent,
                 diff=self._prepare_diff(diff),
                 commits=commits,
                 branch_name=branch_name,
                 base_branch=base_branch,
                 repo_path=repo_path,
+                analysis=analysis_cache.get(analysis_id),
             )
-            return self._result_from(result)
         except Exception as e:
             return EngineResult(error=str(e))
 
@@ -133,10 +189,10 @@ class LocalEngine:
 
         try:
             agent = SplitAgent(self._get_llm(), self._get_retriever())
-            result = await agent.run(
+            return await self._run(
+                agent,
                 diff=self._prepare_diff(diff), repo_path=repo_path, strategy=strategy
             )
-            return self._result_from(result)
         except Exception as e:
             return EngineResult(error=str(e))
 
@@ -147,8 +203,7 @@ class LocalEngine:
 
         try:
             agent = ConflictAgent(self._get_llm(), self._get_retriever())
-            result = await agent.run(conflicts=conflicts, repo_path=repo_path)
-            return self._result_from(result)
+            return await self._run(agent, conflicts=conflicts, repo_path=repo_path)
         except Exception as e:
             return EngineResult(error=str(e))
 
@@ -163,10 +218,10 @@ class LocalEngine:
 
         try:
             agent = ChangelogAgent(self._get_llm(), self._get_retriever())
-            result = await agent.run(
+            return await self._run(
+                agent,
                 commits=commits, from_ref=from_ref, to_ref=to_ref, repo_path=repo_path
             )
-            return self._result_from(result)
         except Exception as e:
             return EngineResult(error=str(e))
 
@@ -176,7 +231,8 @@ class LocalEngine:
         from backend.agents.commit_agent import CommitAgent
 
         agent = CommitAgent(self._get_llm(), self._get_retriever())
-        async for event in agent.run_stream(
+        async for event in self._stream(
+            agent,
             diff=self._prepare_diff(diff, issue_ref), repo_path=repo_path
         ):
             yield event
@@ -187,8 +243,8 @@ class LocalEngine:
         from backend.agents.review_agent import ReviewAgent
 
         agent = ReviewAgent(self._get_llm(), self._get_retriever())
-        async for event in agent.run_stream(
-            diff=self._prepare_diff(diff), repo_path=repo_path
+        async for event in self._stream(
+            agent, diff=self._prepare_diff(diff), repo_path=repo_path
         ):
             yield event
 
@@ -203,7 +259,8 @@ class LocalEngine:
         from backend.agents.pr_agent import PRAgent
 
         agent = PRAgent(self._get_llm(), self._get_retriever())
-        async for event in agent.run_stream(
+        async for event in self._stream(
+            agent,
             diff=self._prepare_diff(diff),
             commits=commits,
             branch_name=branch_name,
@@ -218,7 +275,8 @@ class LocalEngine:
         from backend.agents.split_agent import SplitAgent
 
         agent = SplitAgent(self._get_llm(), self._get_retriever())
-        async for event in agent.run_stream(
+        async for event in self._stream(
+            agent,
             diff=self._prepare_diff(diff), repo_path=repo_path, strategy=strategy
         ):
             yield event
@@ -229,7 +287,9 @@ class LocalEngine:
         from backend.agents.conflict_agent import ConflictAgent
 
         agent = ConflictAgent(self._get_llm(), self._get_retriever())
-        async for event in agent.run_stream(conflicts=conflicts, repo_path=repo_path):
+        async for event in self._stream(
+            agent, conflicts=conflicts, repo_path=repo_path
+        ):
             yield event
 
     async def generate_changelog_stream(
@@ -242,7 +302,8 @@ class LocalEngine:
         from backend.agents.changelog_agent import ChangelogAgent
 
         agent = ChangelogAgent(self._get_llm(), self._get_retriever())
-        async for event in agent.run_stream(
+        async for event in self._stream(
+            agent,
             commits=commits, from_ref=from_ref, to_ref=to_ref, repo_path=repo_path
         ):
             yield event
@@ -1,32 +1,43 @@
-import asyncio
 import hmac
 import time
 from contextlib import asynccontextmanager
+from typing import Literal
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from backend.core.config import settings
-from backend.core.dependencies import get_llm_provider
+from backend.core.dependencies import available_providers
 from backend.core.logging import logger
-from backend.routers import analyze, changelog, commit, agent, conflict, pr, rag, split, streaming
+from backend.core.rate_limit import RateLimiter, create_backend
+from backend.services.health import health_prober
+from backend.services.jobs import job_queue
+from backend.utils.metrics import (
+    http_request_seconds,
+    job_queue_depth,
+    jobs_running,
+    metrics_registry,
+)
+from backend.utils.usage import usage_metrics
+from backend.routers import (
+    analyze, batch, changelog, commit, agent, conflict, jobs, pr, rag, split, streaming,
+)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    logger.info("Starting Inyeon API...")
-    llm = get_llm_provider()
-
-    if await llm.is_healthy():
-        logger.info(f"LLM provider: {settings.llm_provider}")
-    else:
-        logger.warning("LLM provider not reachable")
+    logger.info(f"Starting Inyeon API (LLM provider: {settings.llm_provider})...")
+    health_prober.start()
+    job_queue.start()
 
     yield
 
     logger.info("Shutting down Inyeon API...")
+    await job_queue.stop()
+    await health_prober.stop()
 
 
 app = FastAPI(
@@ -48,68 +59,147 @@ app.add_middleware(
 )
 
 
-class APIKeyMiddleware(BaseHTTPMiddleware):
+class APIKeyMiddleware:
+    """Reject requests without the configured X-API-Key.
+
+    Plain ASGI rather than BaseHTTPMiddleware, so allowed requests (and
+    their SSE streams) go straight to the app without an extra task and
+    body-forwarding stream per request.
+    """
+
     OPEN_PATHS = {"/health", "/", "/docs", "/openapi.json", "/redoc", "/robots.txt"}
 
-    async def dispatch(self, request: Request, call_next):
-        if not settings.api_key:
-            return await call_next(request)
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-        if request.method == "OPTIONS" or request.url.path in self.OPEN_PATHS:
-            return await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or not settings.api_key
+            or scope["method"] == "OPTIONS"
+            or scope["path"] in self.OPEN_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
 
-        key = request.headers.get("X-API-Key", "")
+        key = Headers(scope=scope).get("X-API-Key", "")
         if not hmac.compare_digest(key, settings.api_key):
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=401,
                 content={"detail": "Invalid or missing API key"},
             )
-
-        return await call_next(request)
-
-
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, rpm: int = 30):
-        super().__init__(app)
-        self.rpm = rpm
-        self._requests: dict[str, list[float]] = {}
-        self._lock = asyncio.Lock()
-        self._last_prune = 0.0
-
-    async def dispatch(self, request: Request, call_next):
-        if self.rpm <= 0 or request.method == "OPTIONS" or not request.url.path.startswith("/api/"):
-            return await call_next(request)
-
-        client_ip = request.client.host if request.client else "unknown"
-        now = time.time()
-        window_start = now - 60
-
-        async with self._lock:
-            # Prune stale IPs every 5 minutes
-            if now - self._last_prune > 300:
-                stale = [ip for ip, ts in self._requests.items() if not ts or ts[-1] < window_start]
-                for ip in stale:
-                    del self._requests[ip]
-                self._last_prune = now
-
-            reqs = self._requests.get(client_ip, [])
-            reqs = [t for t in reqs if t > window_start]
-
-            if len(reqs) >= self.rpm:
-                self._requests[client_ip] = reqs
-                return JSONResponse(
-                    status_code=429,
-                    content={"detail": "Rate limit exceeded"},
-                )
-
-            reqs.append(now)
-            self._requests[client_ip] = reqs
-
-        return await call_next(request)
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
+
+
+class RateLimitMiddleware:
+    """Token-bucket limits on /api/*; see backend.core.rate_limit."""
+
+    def __init__(self, app: ASGIApp, limiter: RateLimiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] == "OPTIONS"
+            or not scope["path"].startswith("/api/")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        decision = await self.limiter.check(
+            scope["path"],
+            client[0] if client else "unknown",
+            Headers(scope=scope).get("X-API-Key"),
+        )
+        if not decision.allowed:
+            response = JSONResponse(
+                status_code=429,
+                content={"detail": "Rate limit exceeded"},
+                headers={"Retry-After": str(decision.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        if decision.limit.rpm <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_remaining(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("X-RateLimit-Remaining", str(decision.remaining))
+            await send(message)
+
+        await self.app(scope, receive, send_with_remaining)
+
+
+def _route_template(scope: Scope) -> str:
+    """The matched route's path template including router prefixes, e.g.
+    ``/api/v1/jobs/{job_id}``; ``unmatched`` when no route matched."""
+    route = scope.get("route")
+    template = getattr(route, "path_format", None)
+    if template is None:
+        return "unmatched"
+    # Routes of included routers hold their path relative to the prefix
+    matched = template.format(**scope.get("path_params", {}))
+    path = scope["path"]
+    prefix = path[: len(path) - len(matched)] if path.endswith(matched) else ""
+    return prefix + template
+
+
+class MetricsMiddleware:
+    """Time each HTTP request into ``http_request_seconds``.
+
+    Routes are labelled by their template (``/api/v1/jobs/{job_id}``), and
+    requests that match no route share one label, so label values stay
+    bounded.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_request_seconds.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=_route_template(scope),
+                status=status,
+            )
 
 
 app.add_middleware(APIKeyMiddleware)
-app.add_middleware(RateLimitMiddleware, rpm=settings.rate_limit_rpm)
+app.add_middleware(
+    RateLimitMiddleware,
+    limiter=RateLimiter(
+        create_backend(settings.rate_limit_backend, settings.rate_limit_sqlite_path),
+        rpm=settings.rate_limit_rpm,
+        burst=settings.rate_limit_burst,
+        api_keys=settings.rate_limit_api_keys,
+        routes=settings.rate_limit_routes,
+    ),
+)
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(analyze.router, prefix="/api/v1", tags=["analyze"])
 app.include_router(commit.router, prefix="/api/v1", tags=["commit"])
@@ -120,34 +210,53 @@ app.include_router(conflict.router, prefix="/api/v1")
 app.include_router(pr.router, prefix="/api/v1")
 app.include_router(split.router, prefix="/api/v1")
 app.include_router(streaming.router, prefix="/api/v1")
+app.include_router(jobs.router, prefix="/api/v1")
+app.include_router(batch.router, prefix="/api/v1")
 
 
 @app.get("/health", tags=["health"])
 async def health_check():
-    llm = get_llm_provider()
-    llm_healthy = await llm.is_healthy()
+    llm = await health_prober.get(settings.llm_provider)
+    stale = health_prober.is_stale(llm)
 
     return {
-        "status": "healthy" if llm_healthy else "degraded",
+        "status": "healthy" if llm.connected and not stale else "degraded",
         "version": settings.api_version,
         "llm": {
             "provider": settings.llm_provider,
-            "connected": llm_healthy,
+            "connected": llm.connected,
+            "checked_at": llm.checked_at,
+            "age_seconds": round(llm.age_seconds, 3),
+            "stale": stale,
         },
+        "providers": health_prober.snapshot(),
     }
 
 
+@app.get("/metrics", tags=["health"])
+async def metrics(format: Literal["prometheus", "json"] = "prometheus"):
+    jobs = job_queue.snapshot()
+    job_queue_depth.set(jobs["queue_depth"])
+    jobs_running.set(jobs["running"])
+
+    if format == "json":
+        return {
+            "llm_usage": usage_metrics.snapshot(),
+            "jobs": jobs,
+            "metrics": metrics_registry.snapshot(),
+        }
+    return PlainTextResponse(
+        metrics_registry.render(), media_type="text/plain; version=0.0.4"
+    )
+
+
 @app.get("/providers", tags=["health"])
 async def list_providers():
-    available = []
-    if settings.gemini_api_key:
-        available.append({"name": "gemini", "model": settings.gemini_model})
-    if settings.openai_api_key:
-        available.append({"name": "openai", "model": settings.openai_model})
-    available.append({"name": "ollama", "model": settings.ollama_model})
     return {
         "default": settings.llm_provider,
-        "available": available,
+        "available": [
+            {"name": name, "model": model} for name, model in available_providers().items()
+        ],
     }
 
 
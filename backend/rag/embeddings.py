@@ -1,6 +1,7 @@
 from google import genai
 
 from backend.core.config import settings
+from backend.utils.metrics import embedding_seconds
 
 
 class RAGError(Exception):
@@ -30,10 +31,11 @@ class EmbeddingService:
     async def embed_text(self, text: str) -> list[float]:
         """Generate embedding for a single text."""
         try:
-            response = await self.client.aio.models.embed_content(
-                model=self.model,
-                contents=text,
-            )
+            with embedding_seconds.time(op="text"):
+                response = await self.client.aio.models.embed_content(
+                    model=self.model,
+                    contents=text,
+                )
             return response.embeddings[0].values
         except Exception as e:
             raise EmbeddingError(f"Failed to generate embedding: {e}")
@@ -41,10 +43,11 @@ class EmbeddingService:
     async def embed_texts(self, texts: list[str]) -> list[list[float]]:
         """Generate embeddings for multiple texts."""
         try:
-            response = await self.client.aio.models.embed_content(
-                model=self.model,
-                contents=texts,
-            )
+            with embedding_seconds.time(op="texts"):
+                response = await self.client.aio.models.embed_content(
+                    model=self.model,
+                    contents=texts,
+                )
             return [emb.values for emb in response.embeddings]
         except Exception as e:
             raise EmbeddingError(f"Failed to generate embeddings: {e}")
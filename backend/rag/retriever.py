@@ -1,8 +1,18 @@
+import hashlib
+import time
+from collections import OrderedDict
 from typing import Any
 
+from backend.utils.metrics import cache_requests
+from backend.utils.profiling import record_cache
+
 from .embeddings import EmbeddingService, RAGError
 from .vectorstore import VectorStore
 
+_SEARCH_CACHE_SIZE = 128
+# How long the store's document count is trusted before it is read again
+_STORE_CHECK_SECONDS = 5.0
+
 
 class RetrieverError(RAGError):
     """Raised when retrieval operations fail."""
@@ -11,16 +21,83 @@ class RetrieverError(RAGError):
 
 
 class CodeRetriever:
-    """High-level interface for indexing and searching code."""
+    """High-level interface for indexing and searching code.
+
+    Search results are kept in a small LRU cache keyed by (index version,
+    n_results, query hash). Any write to the index bumps the version, so
+    commit, review and PR on the same diff share one retrieval until the
+    index changes.
+
+    Writes by other processes sharing the store do not go through this
+    object, so the store's document count doubles as a change marker: it
+    is re-read at most every ``store_check_seconds``, and a new value
+    bumps the version the same way a local write does.
+    """
 
     def __init__(
         self,
         embedding_service: EmbeddingService | None = None,
         vector_store: VectorStore | None = None,
         persist_dir: str | None = None,
+        cache_size: int = _SEARCH_CACHE_SIZE,
+        store_check_seconds: float = _STORE_CHECK_SECONDS,
     ):
         self.embeddings = embedding_service or EmbeddingService()
         self.store = vector_store or VectorStore(persist_dir=persist_dir)
+        self.version = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache_size = cache_size
+        self._cache: OrderedDict[tuple[int, int, str], list[dict[str, Any]]] = (
+            OrderedDict()
+        )
+        self._store_check_seconds = store_check_seconds
+        # (monotonic time read, document count)
+        self._count: tuple[float, int] | None = None
+
+    def _bump_version(self) -> None:
+        self.version += 1
+        self._cache.clear()
+        self._count = None
+
+    def _check_store(self) -> int:
+        """Return the store's document count, bumping the version if it changed."""
+        now = time.monotonic()
+        if self._count is not None and now - self._count[0] < self._store_check_seconds:
+            return self._count[1]
+        count = self.store.count()
+        if self._count is not None and count != self._count[1]:
+            self._bump_version()
+        self._count = (now, count)
+        return count
+
+    def _cache_key(self, query: str, n_results: int) -> tuple[int, int, str]:
+        self._check_store()
+        digest = hashlib.sha256(query.encode("utf-8", errors="replace")).hexdigest()
+        return (self.version, n_results, digest)
+
+    def _cache_get(self, key: tuple[int, int, str]) -> list[dict[str, Any]] | None:
+        results = self._cache.get(key)
+        if results is None:
+            self.cache_misses += 1
+            cache_requests.inc(cache="rag_search", result="miss")
+            record_cache(False)
+            return None
+        self._cache.move_to_end(key)
+        self.cache_hits += 1
+        cache_requests.inc(cache="rag_search", result="hit")
+        record_cache(True)
+        return [dict(r) for r in results]
+
+    def _cache_set(
+        self, key: tuple[int, int, str], results: list[dict[str, Any]]
+    ) -> None:
+        if self._cache_size <= 0:
+            return
+        self._cache[key] = [dict(r) for r in results]
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
 
     async def index_file(self, file_path: str, content: str) -> str:
         """Index a single file."""
@@ -33,6 +110,7 @@ class CodeRetriever:
             documents=[content],
             metadatas=[{"path": file_path}],
         )
+        self._bump_version()
         return doc_id
 
     async def index_files(self, files: dict[str, str]) -> list[str]:
@@ -58,21 +136,50 @@ class CodeRetriever:
             documents=contents,
             metadatas=metadatas,
         )
+        self._bump_version()
         return ids
 
     async def search(self, query: str, n_results: int = 5) -> list[dict[str, Any]]:
         """Search for relevant code given a query."""
+        key = self._cache_key(query, n_results)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
         query_embedding = await self.embeddings.embed_text(query)
         results = self.store.search(query_embedding, n_results=n_results)
+        formatted = [self._to_result(item) for item in results]
+        self._cache_set(key, formatted)
+        return formatted
+
+    async def search_many(
+        self, queries: list[str], n_results: int = 5
+    ) -> list[list[dict[str, Any]]]:
+        """Search for several queries with one embedding call and one vector query.
+
+        Results are grouped per query, in the same order as ``queries``.
+        Cached queries are served without being embedded again.
+        """
+        if not queries:
+            return []
 
-        return [
-            {
-                "path": item["metadata"]["path"],
-                "content": item["document"],
-                "score": 1 - item["distance"],
-            }
-            for item in results
+        keys = [self._cache_key(q, n_results) for q in queries]
+        grouped: list[list[dict[str, Any]] | None] = [
+            self._cache_get(key) for key in keys
         ]
+        misses = [i for i, results in enumerate(grouped) if results is None]
+
+        if misses:
+            query_embeddings = await self.embeddings.embed_texts(
+                [queries[i] for i in misses]
+            )
+            fetched = self.store.search_many(query_embeddings, n_results=n_results)
+            for i, results in zip(misses, fetched):
+                formatted = [self._to_result(item) for item in results]
+                self._cache_set(keys[i], formatted)
+                grouped[i] = formatted
+
+        return grouped
 
     async def search_for_diff(
         self, diff: str, n_results: int = 3
@@ -80,10 +187,27 @@ class CodeRetriever:
         """Search for code relevant to a diff."""
         return await self.search(f"Code related to:\n{diff}", n_results=n_results)
 
+    def _to_result(self, item: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "path": item["metadata"]["path"],
+            "content": item["document"],
+            "score": 1 - item["distance"],
+        }
+
     def count(self) -> int:
-        """Return number of indexed documents."""
-        return self.store.count()
+        """Return number of indexed documents, re-read after writes and store checks."""
+        return self._check_store()
+
+    def delete(self, file_paths: list[str]) -> None:
+        """Remove indexed files by path."""
+        if not file_paths:
+            return
+        self.store.delete(
+            [path.replace("/", "_").replace("\\", "_") for path in file_paths]
+        )
+        self._bump_version()
 
     def clear(self) -> None:
         """Clear all indexed documents."""
         self.store.clear()
+        self._bump_version()
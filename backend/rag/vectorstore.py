@@ -4,6 +4,8 @@ from typing import Any
 import chromadb
 from chromadb.config import Settings
 
+from backend.utils.metrics import vector_search_seconds
+
 from .embeddings import RAGError
 
 
@@ -38,12 +40,13 @@ class VectorStore:
         metadatas: list[dict[str, Any]] | None = None,
     ) -> None:
         try:
-            self.collection.upsert(
-                ids=ids,
-                embeddings=embeddings,
-                documents=documents,
-                metadatas=metadatas or [{} for _ in ids],
-            )
+            with vector_search_seconds.time(op="upsert"):
+                self.collection.upsert(
+                    ids=ids,
+                    embeddings=embeddings,
+                    documents=documents,
+                    metadatas=metadatas or [{} for _ in ids],
+                )
         except Exception as e:
             raise VectorStoreError(f"Failed to add documents: {e}")
 
@@ -53,24 +56,39 @@ class VectorStore:
         n_results: int = 5,
     ) -> list[dict[str, Any]]:
         """Search for similar documents."""
+        return self.search_many([query_embedding], n_results=n_results)[0]
+
+    def search_many(
+        self,
+        query_embeddings: list[list[float]],
+        n_results: int = 5,
+    ) -> list[list[dict[str, Any]]]:
+        """Search for several queries in one call. Results are grouped per query."""
+        if not query_embeddings:
+            return []
+
         try:
-            results = self.collection.query(
-                query_embeddings=[query_embedding],
-                n_results=n_results,
-                include=["documents", "metadatas", "distances"],
-            )
-
-            items = []
-            for i in range(len(results["ids"][0])):
-                items.append(
-                    {
-                        "id": results["ids"][0][i],
-                        "document": results["documents"][0][i],
-                        "metadata": results["metadatas"][0][i],
-                        "distance": results["distances"][0][i],
-                    }
+            with vector_search_seconds.time(op="query"):
+                results = self.collection.query(
+                    query_embeddings=query_embeddings,
+                    n_results=n_results,
+                    include=["documents", "metadatas", "distances"],
                 )
-            return items
+
+            grouped = []
+            for q in range(len(query_embeddings)):
+                items = []
+                for i in range(len(results["ids"][q])):
+                    items.append(
+                        {
+                            "id": results["ids"][q][i],
+                            "document": results["documents"][q][i],
+                            "metadata": results["metadatas"][q][i],
+                            "distance": results["distances"][q][i],
+                        }
+                    )
+                grouped.append(items)
+            return grouped
         except Exception as e:
             raise VectorStoreError(f"Search failed: {e}")
 
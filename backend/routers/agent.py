@@ -4,6 +4,7 @@ from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel, Field
 
 from backend.agents import CommitAgent, ReviewAgent, AgentOrchestrator
+from backend.agents.analysis import analysis_cache, get_diff_analysis
 from backend.core.logging import logger
 from backend.services.llm import LLMProvider, LLMError
 from backend.core.dependencies import get_llm_from_request
@@ -16,17 +17,26 @@ class AgentRequest(BaseModel):
     diff: str = Field(..., min_length=1, max_length=50000)
     repo_path: str = Field(default=".")
     verbose: bool = Field(default=False)
+    analysis_id: str | None = Field(
+        default=None, description="Reuse an analysis from POST /agent/analysis"
+    )
 
 
 class AgentCommitResponse(BaseModel):
     commit_message: str
     reasoning: list[str] = []
     analysis: dict[str, Any] = {}
+    analysis_id: str | None = None
 
 
 class ReviewResponse(BaseModel):
     review: dict[str, Any]
     reasoning: list[str] = []
+    analysis_id: str | None = None
+
+
+class AnalysisRequest(BaseModel):
+    diff: str = Field(..., min_length=1)
 
 
 class OrchestrationRequest(BaseModel):
@@ -42,12 +52,18 @@ async def run_commit_agent(
 ):
     try:
         agent = CommitAgent(llm)
-        result = await agent.run(diff=request.diff, repo_path=request.repo_path)
+        result = await agent.run(
+            diff=request.diff,
+            repo_path=request.repo_path,
+            analysis=analysis_cache.get(request.analysis_id),
+        )
+        analysis = result.get("analysis") or {}
 
         return AgentCommitResponse(
             commit_message=result["commit_message"] or "",
             reasoning=result["reasoning"] if request.verbose else [],
-            analysis=result.get("analysis", {}) if request.verbose else {},
+            analysis=analysis if request.verbose else {},
+            analysis_id=analysis.get("analysis_id"),
         )
     except LLMError as e:
         raise HTTPException(status_code=503, detail="LLM service unavailable")
@@ -63,11 +79,16 @@ async def run_review_agent(
 ):
     try:
         agent = ReviewAgent(llm)
-        result = await agent.run(diff=request.diff, repo_path=request.repo_path)
+        result = await agent.run(
+            diff=request.diff,
+            repo_path=request.repo_path,
+            analysis=analysis_cache.get(request.analysis_id),
+        )
 
         return ReviewResponse(
             review=result.get("review", {}),
             reasoning=result["reasoning"] if request.verbose else [],
+            analysis_id=result.get("analysis_id"),
         )
     except LLMError as e:
         raise HTTPException(status_code=503, detail="LLM service unavailable")
@@ -76,6 +97,29 @@ async def run_review_agent(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@router.post("/analysis")
+async def analyze_diff(
+    request: AnalysisRequest,
+    llm: LLMProvider = Depends(get_llm_from_request),
+):
+    """Analyze a diff once; pass the returned analysis_id to later agent calls."""
+    try:
+        return await get_diff_analysis(request.diff, llm)
+    except LLMError:
+        raise HTTPException(status_code=503, detail="LLM service unavailable")
+    except Exception as e:
+        logger.error("diff analysis failed: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/analysis/{analysis_id}")
+async def get_analysis(analysis_id: str):
+    analysis = analysis_cache.get(analysis_id)
+    if analysis is None:
+        raise HTTPException(status_code=404, detail="Analysis not found or expired")
+    return analysis
+
+
 @router.post("/orchestrate")
 async def orchestrate(
     request: OrchestrationRequest,
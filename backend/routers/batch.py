@@ -0,0 +1,136 @@
+import asyncio
+import hashlib
+import json
+from collections.abc import AsyncIterator
+from typing import Any, Literal
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+
+from backend.core.config import settings
+from backend.core.dependencies import get_llm_from_request
+from backend.models.events import EventType
+from backend.routers.streaming import AGENT_STREAMS, EventsBuilder
+from backend.services.llm import LLMProvider
+
+
+router = APIRouter(tags=["batch"])
+
+
+class BatchTask(BaseModel):
+    agent: Literal["commit", "review", "pr", "split", "resolve", "changelog"]
+    input: dict[str, Any]
+    id: str | None = Field(default=None, description="Echoed back on the result line")
+
+
+class BatchRequest(BaseModel):
+    tasks: list[BatchTask] = Field(..., min_length=1)
+
+
+def _task_key(agent: str, request: BaseModel) -> str:
+    """Tasks with the same agent and validated input share one run."""
+    canonical = json.dumps(request.model_dump(mode="json"), sort_keys=True)
+    return hashlib.sha256(f"{agent}\n{canonical}".encode()).hexdigest()
+
+
+async def _run_task(build: EventsBuilder, request: BaseModel, llm: LLMProvider) -> dict:
+    result = None
+    error = None
+    try:
+        async for event in build(request, llm):
+            if event.event == EventType.RESULT:
+                result = event.data
+            elif event.event == EventType.ERROR:
+                error = event.data.get("error", "Unknown error")
+    except Exception as e:
+        error = str(e)
+    if result is not None:
+        return {"status": "ok", "result": result}
+    return {"status": "error", "error": error or "Agent produced no result"}
+
+
+async def _run_batch(
+    tasks: list[BatchTask], requests: list[BaseModel], llm: LLMProvider
+) -> AsyncIterator[str]:
+    """Run each distinct task once, at most ``batch_concurrency`` at a time,
+    and yield an NDJSON line per task as its run completes."""
+    members: dict[str, list[int]] = {}
+    for index, (task, request) in enumerate(zip(tasks, requests)):
+        members.setdefault(_task_key(task.agent, request), []).append(index)
+
+    semaphore = asyncio.Semaphore(settings.batch_concurrency)
+
+    async def run(key: str) -> tuple[str, dict]:
+        first = members[key][0]
+        build = AGENT_STREAMS[tasks[first].agent][1]
+        async with semaphore:
+            return key, await _run_task(build, requests[first], llm)
+
+    pending = [asyncio.ensure_future(run(key)) for key in members]
+    failed = 0
+    try:
+        for next_done in asyncio.as_completed(pending):
+            key, outcome = await next_done
+            first = members[key][0]
+            for index in members[key]:
+                failed += outcome["status"] == "error"
+                line = {
+                    "type": "result",
+                    "index": index,
+                    "id": tasks[index].id,
+                    "agent": tasks[index].agent,
+                    **outcome,
+                }
+                if index != first:
+                    line["deduplicated_from"] = first
+                yield json.dumps(line) + "\n"
+    finally:
+        # The client went away: stop the runs nobody will read
+        for task in pending:
+            task.cancel()
+
+    yield json.dumps(
+        {
+            "type": "summary",
+            "total": len(tasks),
+            "unique": len(members),
+            "succeeded": len(tasks) - failed,
+            "failed": failed,
+        }
+    ) + "\n"
+
+
+@router.post("/batch")
+async def run_batch(
+    request: BatchRequest,
+    llm: LLMProvider = Depends(get_llm_from_request),
+):
+    """Run many agent tasks in one call, streaming results as NDJSON.
+
+    Each task's ``input`` is the body the matching /agent/stream endpoint
+    takes. Results arrive in completion order; ``index`` ties a line back
+    to its task.
+    """
+    if len(request.tasks) > settings.batch_max_tasks:
+        raise HTTPException(
+            status_code=422,
+            detail=f"At most {settings.batch_max_tasks} tasks per batch",
+        )
+
+    requests = []
+    errors = []
+    for index, task in enumerate(request.tasks):
+        model = AGENT_STREAMS[task.agent][0]
+        try:
+            requests.append(model.model_validate(task.input))
+        except ValidationError as e:
+            for error in e.errors(include_url=False, include_context=False):
+                errors.append({**error, "loc": ["body", "tasks", index, "input", *error["loc"]]})
+    if errors:
+        raise HTTPException(status_code=422, detail=errors)
+
+    return StreamingResponse(
+        _run_batch(request.tasks, requests, llm),
+        media_type="application/x-ndjson",
+    )
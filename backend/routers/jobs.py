@@ -0,0 +1,79 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from backend.core.dependencies import get_llm_from_request
+from backend.routers.streaming import AGENT_STREAMS, SSE_HEADERS, EventsBuilder, sse_generator
+from backend.services.jobs import Job, JobPriority, QueueFullError, job_queue
+from backend.services.llm import LLMProvider
+
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+def _job_or_404(job_id: str) -> Job:
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job
+
+
+def _submit_route(kind: str, model: type[BaseModel], build: EventsBuilder):
+    async def submit(
+        request: model,
+        priority: JobPriority = Query(default=JobPriority.NORMAL),
+        llm: LLMProvider = Depends(get_llm_from_request),
+    ):
+        try:
+            job = job_queue.submit(kind, lambda: build(request, llm), priority)
+        except QueueFullError:
+            raise HTTPException(
+                status_code=503,
+                detail="Job queue is full",
+                headers={"Retry-After": "5"},
+            )
+        return {
+            **job.to_dict(),
+            "status_url": f"/api/v1/jobs/{job.id}",
+            "events_url": f"/api/v1/jobs/{job.id}/events",
+        }
+
+    submit.__name__ = f"submit_{kind}_job"
+    return submit
+
+
+for _kind, (_model, _build) in AGENT_STREAMS.items():
+    router.add_api_route(
+        f"/{_kind}",
+        _submit_route(_kind, _model, _build),
+        methods=["POST"],
+        status_code=202,
+        summary=f"Queue a {_kind} agent run",
+    )
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str, events: bool = False):
+    """Poll a job; the agent's result is included once it finishes."""
+    return _job_or_404(job_id).to_dict(include_events=events)
+
+
+@router.get("/{job_id}/events")
+async def job_events(request: Request, job_id: str, start: int = Query(default=0, ge=0)):
+    """Replay a job's events from ``start`` and follow it until it finishes (SSE).
+
+    Disconnecting stops the following; the job itself keeps running.
+    """
+    job = _job_or_404(job_id)
+    return StreamingResponse(
+        sse_generator(job.follow(start), request),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
+@router.delete("/{job_id}")
+async def cancel_job(job_id: str):
+    _job_or_404(job_id)
+    job = await job_queue.cancel(job_id)
+    return job.to_dict()
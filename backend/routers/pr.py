@@ -3,6 +3,7 @@ from typing import Any
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
 
+from backend.agents.analysis import analysis_cache
 from backend.agents.pr_agent import PRAgent
 from backend.core.logging import logger
 from backend.services.llm import LLMProvider, LLMError
@@ -18,12 +19,14 @@ class PRRequest(BaseModel):
     branch_name: str = Field(default="")
     base_branch: str = Field(default="main")
     repo_path: str = Field(default=".")
+    analysis_id: str | None = None
 
 
 class PRResponse(BaseModel):
     pr_description: dict[str, Any] | None = None
     reasoning: list[str] = Field(default_factory=list)
     error: str | None = None
+    analysis_id: str | None = None
 
 
 @router.post("/agent/pr", response_model=PRResponse)
@@ -39,6 +42,7 @@ async def generate_pr(
             branch_name=request.branch_name,
             base_branch=request.base_branch,
             repo_path=request.repo_path,
+            analysis=analysis_cache.get(request.analysis_id),
         )
         return PRResponse(**result)
     except LLMError:
@@ -1,7 +1,10 @@
+import json
+import zlib
 from collections import OrderedDict
+from collections.abc import AsyncIterator
 
-from fastapi import APIRouter, HTTPException, status
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Request, status
+from pydantic import BaseModel, Field
 
 from backend.rag import CodeRetriever, RAGError
 
@@ -11,6 +14,12 @@ router = APIRouter(tags=["rag"])
 _MAX_RETRIEVERS = 20
 _retrievers: OrderedDict[str, CodeRetriever] = OrderedDict()
 
+# Streaming index: files are embedded and upserted in batches of this size
+_INDEX_BATCH_FILES = 32
+_INDEX_BATCH_BYTES = 1_000_000
+_MAX_NDJSON_LINE = 2_000_000
+_DECOMPRESS_STEP = 64 * 1024
+
 
 def get_retriever(repo_id: str) -> CodeRetriever:
     if repo_id in _retrievers:
@@ -32,6 +41,7 @@ class IndexRequest(BaseModel):
 class IndexResponse(BaseModel):
     indexed: int
     total: int
+    batches: int = 1
 
 
 class SearchRequest(BaseModel):
@@ -50,6 +60,21 @@ class SearchResponse(BaseModel):
     results: list[SearchResult]
 
 
+class BatchSearchRequest(BaseModel):
+    repo_id: str
+    queries: list[str] = Field(..., min_length=1, max_length=100)
+    n_results: int = Field(5, ge=1, le=50)
+
+
+class QueryResults(BaseModel):
+    query: str
+    results: list[SearchResult]
+
+
+class BatchSearchResponse(BaseModel):
+    results: list[QueryResults]
+
+
 class RepoRequest(BaseModel):
     repo_id: str
 
@@ -67,6 +92,127 @@ async def index_files(request: IndexRequest) -> IndexResponse:
         )
 
 
+class IndexBodyError(RAGError):
+    """Raised when a streamed index body is malformed."""
+
+    pass
+
+
+def _decompressor(content_encoding: str):
+    encoding = content_encoding.strip().lower()
+    if encoding in ("", "identity"):
+        return None
+    if encoding == "gzip":
+        return zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+    if encoding == "deflate":
+        return zlib.decompressobj()
+    raise HTTPException(
+        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        detail=f"Unsupported Content-Encoding: {content_encoding}",
+    )
+
+
+async def _iter_ndjson(
+    chunks: AsyncIterator[bytes], decompressor
+) -> AsyncIterator[dict]:
+    """Decode an NDJSON byte stream one record at a time.
+
+    Each decompression step inflates at most ``_DECOMPRESS_STEP`` bytes and is
+    split into records before the next step, so a highly compressible body
+    cannot expand into an unbounded buffer.
+    """
+    buffer = b""
+
+    def _records(data: bytes) -> list[dict]:
+        nonlocal buffer
+        buffer += data
+        *complete, buffer = buffer.split(b"\n")
+        if len(buffer) > _MAX_NDJSON_LINE or any(
+            len(line) > _MAX_NDJSON_LINE for line in complete
+        ):
+            raise IndexBodyError("NDJSON line exceeds size limit")
+        return [json.loads(line) for line in complete if line.strip()]
+
+    async for chunk in chunks:
+        if decompressor is None:
+            for record in _records(chunk):
+                yield record
+            continue
+
+        data = chunk
+        while data:
+            for record in _records(decompressor.decompress(data, _DECOMPRESS_STEP)):
+                yield record
+            data = decompressor.unconsumed_tail
+
+    if decompressor is not None:
+        if not decompressor.eof:
+            raise IndexBodyError("Compressed body is truncated")
+        for record in _records(decompressor.flush()):
+            yield record
+
+    if buffer.strip():
+        yield json.loads(buffer)
+
+
+async def _index_records(
+    ret: CodeRetriever, records: AsyncIterator[dict]
+) -> tuple[int, int]:
+    """Embed and upsert records in bounded batches. Returns (indexed, batches)."""
+    batch: dict[str, str] = {}
+    batch_bytes = 0
+    indexed = 0
+    batches = 0
+
+    async for record in records:
+        path = record.get("path") if isinstance(record, dict) else None
+        content = record.get("content") if isinstance(record, dict) else None
+        if not isinstance(path, str) or not isinstance(content, str):
+            raise IndexBodyError("Each record needs string 'path' and 'content'")
+
+        batch[path] = content
+        batch_bytes += len(content)
+        if len(batch) >= _INDEX_BATCH_FILES or batch_bytes >= _INDEX_BATCH_BYTES:
+            indexed += len(await ret.index_files(batch))
+            batches += 1
+            batch, batch_bytes = {}, 0
+
+    if batch:
+        indexed += len(await ret.index_files(batch))
+        batches += 1
+
+    return indexed, batches
+
+
+@router.post("/index/stream", response_model=IndexResponse)
+async def index_files_stream(repo_id: str, request: Request) -> IndexResponse:
+    """Index files sent as an NDJSON stream of {"path", "content"} records.
+
+    The body may be gzip- or deflate-compressed (Content-Encoding). It is
+    read incrementally and files are embedded and upserted in bounded batches
+    as they arrive, so server memory does not grow with repository size.
+    """
+    decompressor = _decompressor(request.headers.get("content-encoding", ""))
+    ret = get_retriever(repo_id)
+
+    try:
+        indexed, batches = await _index_records(
+            ret, _iter_ndjson(request.stream(), decompressor)
+        )
+    except (IndexBodyError, ValueError, zlib.error) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid index body: {e}",
+        )
+    except RAGError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Indexing failed: {e}",
+        )
+
+    return IndexResponse(indexed=indexed, total=ret.count(), batches=batches)
+
+
 @router.post("/search", response_model=SearchResponse)
 async def search_code(request: SearchRequest) -> SearchResponse:
     try:
@@ -80,6 +226,24 @@ async def search_code(request: SearchRequest) -> SearchResponse:
         )
 
 
+@router.post("/search/batch", response_model=BatchSearchResponse)
+async def search_code_batch(request: BatchSearchRequest) -> BatchSearchResponse:
+    try:
+        ret = get_retriever(request.repo_id)
+        grouped = await ret.search_many(request.queries, request.n_results)
+        return BatchSearchResponse(
+            results=[
+                QueryResults(query=q, results=[SearchResult(**r) for r in results])
+                for q, results in zip(request.queries, grouped)
+            ]
+        )
+    except RAGError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Search failed: {e}",
+        )
+
+
 @router.post("/stats")
 async def rag_stats(request: RepoRequest) -> dict:
     ret = get_retriever(request.repo_id)
@@ -19,10 +19,17 @@ class SplitRequest(BaseModel):
     )
 
 
+class HunkRange(BaseModel):
+    file_path: str
+    source_start: int
+    source_length: int
+
+
 class CommitGroupResponse(BaseModel):
     group_id: str
     files: list[str]
     hunk_count: int
+    hunks: list[HunkRange] = Field(default_factory=list)
     commit_message: str
     commit_type: str | None = None
     scope: str | None = None
@@ -1,19 +1,25 @@
-from collections.abc import AsyncIterator
-from typing import Literal
+import asyncio
+from collections.abc import AsyncIterator, Callable
+from contextlib import aclosing
+from typing import Any, Literal
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
+from backend.agents.analysis import analysis_cache
 from backend.agents.changelog_agent import ChangelogAgent
 from backend.agents.commit_agent import CommitAgent
 from backend.agents.conflict_agent import ConflictAgent
 from backend.agents.pr_agent import PRAgent
 from backend.agents.review_agent import ReviewAgent
 from backend.agents.split_agent import SplitAgent
+from backend.core.config import settings
 from backend.core.dependencies import get_llm_from_request
 from backend.models.events import EventType, StreamEvent
 from backend.services.llm import LLMProvider
+from backend.utils.metrics import sse_disconnects, sse_streams_in_flight
+from backend.utils.usage import with_usage
 
 
 router = APIRouter(prefix="/agent/stream", tags=["streaming"])
@@ -25,16 +31,67 @@ SSE_HEADERS = {
 }
 
 
-async def sse_generator(events: AsyncIterator[StreamEvent]) -> AsyncIterator[str]:
-    """Convert StreamEvent async iterator to SSE wire format."""
+HEARTBEAT = ": ping\n\n"
+
+# Put on the queue when the event stream ends
+_END = object()
+
+
+async def sse_generator(
+    events: AsyncIterator[StreamEvent],
+    request: Request | None = None,
+    heartbeat: float | None = None,
+    max_buffered: int | None = None,
+) -> AsyncIterator[str]:
+    """Convert StreamEvent async iterator to SSE wire format.
+
+    A separate task reads ``events`` into a queue of at most
+    ``max_buffered`` events, so a client that reads slowly pauses the
+    agent instead of letting events pile up. While no event arrives a
+    comment line is sent every ``heartbeat`` seconds so proxies keep the
+    connection open. If ``request`` has disconnected by then, or the
+    response is cancelled, the task is cancelled, and with it the agent's
+    graph run and its in-flight provider requests.
+    """
+    if heartbeat is None:
+        heartbeat = settings.sse_heartbeat_seconds
+    if max_buffered is None:
+        max_buffered = settings.sse_max_buffered_events
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max_buffered)
+
+    async def pump() -> None:
+        async with aclosing(events):
+            try:
+                async for event in events:
+                    await queue.put(event)
+            except Exception as e:
+                await queue.put(
+                    StreamEvent(event=EventType.ERROR, agent="", data={"error": str(e)})
+                )
+        await queue.put(_END)
+
+    sse_streams_in_flight.inc()
+    reader = asyncio.create_task(pump())
     try:
-        async for event in events:
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                if request is not None and await request.is_disconnected():
+                    sse_disconnects.inc()
+                    return
+                yield HEARTBEAT
+                continue
+            if event is _END:
+                return
             yield f"event: {event.event.value}\ndata: {event.model_dump_json()}\n\n"
-    except Exception as e:
-        error = StreamEvent(
-            event=EventType.ERROR, agent="", data={"error": str(e)}
-        )
-        yield f"event: error\ndata: {error.model_dump_json()}\n\n"
+    except asyncio.CancelledError:
+        # The server cancels the response when it sees the client go away
+        sse_disconnects.inc()
+        raise
+    finally:
+        reader.cancel()
+        sse_streams_in_flight.dec()
 
 
 async def _error_stream(error: str) -> AsyncIterator[StreamEvent]:
@@ -43,9 +100,11 @@ async def _error_stream(error: str) -> AsyncIterator[StreamEvent]:
     yield StreamEvent(event=EventType.DONE)
 
 
-def _sse_response(events: AsyncIterator[StreamEvent]) -> StreamingResponse:
+def _sse_response(
+    events: AsyncIterator[StreamEvent], request: Request | None = None
+) -> StreamingResponse:
     return StreamingResponse(
-        sse_generator(events),
+        sse_generator(events, request),
         media_type="text/event-stream",
         headers=SSE_HEADERS,
     )
@@ -55,11 +114,13 @@ class StreamCommitRequest(BaseModel):
     diff: str = Field(..., min_length=1, max_length=50000)
     repo_path: str = Field(default=".")
     issue_ref: str | None = None
+    analysis_id: str | None = None
 
 
 class StreamReviewRequest(BaseModel):
     diff: str = Field(..., min_length=1, max_length=50000)
     repo_path: str = Field(default=".")
+    analysis_id: str | None = None
 
 
 class StreamPRRequest(BaseModel):
@@ -68,6 +129,7 @@ class StreamPRRequest(BaseModel):
     branch_name: str = Field(default="")
     base_branch: str = Field(default="main")
     repo_path: str = Field(default=".")
+    analysis_id: str | None = None
 
 
 class StreamSplitRequest(BaseModel):
@@ -97,100 +159,163 @@ class StreamChangelogRequest(BaseModel):
     repo_path: str = Field(default=".")
 
 
-@router.post("/commit")
-async def stream_commit(
-    request: StreamCommitRequest,
-    llm: LLMProvider = Depends(get_llm_from_request),
-):
+def commit_events(
+    request: StreamCommitRequest, llm: LLMProvider
+) -> AsyncIterator[StreamEvent]:
     diff = request.diff
     if request.issue_ref:
         diff = f"{diff}\n\nReference issue: {request.issue_ref}"
+    agent = CommitAgent(llm=llm, retriever=None)
+    return with_usage(
+        agent.run_stream(
+            diff=diff,
+            repo_path=request.repo_path,
+            analysis=analysis_cache.get(request.analysis_id),
+        ),
+        agent.name,
+    )
+
+
+def review_events(
+    request: StreamReviewRequest, llm: LLMProvider
+) -> AsyncIterator[StreamEvent]:
+    agent = ReviewAgent(llm=llm, retriever=None)
+    return with_usage(
+        agent.run_stream(
+            diff=request.diff,
+            repo_path=request.repo_path,
+            analysis=analysis_cache.get(request.analysis_id),
+        ),
+        agent.name,
+    )
+
+
+def pr_events(request: StreamPRRequest, llm: LLMProvider) -> AsyncIterator[StreamEvent]:
+    agent = PRAgent(llm=llm, retriever=None)
+    return with_usage(
+        agent.run_stream(
+            diff=request.diff,
+            commits=request.commits,
+            branch_name=request.branch_name,
+            base_branch=request.base_branch,
+            repo_path=request.repo_path,
+            analysis=analysis_cache.get(request.analysis_id),
+        ),
+        agent.name,
+    )
+
+
+def split_events(
+    request: StreamSplitRequest, llm: LLMProvider
+) -> AsyncIterator[StreamEvent]:
+    agent = SplitAgent(llm=llm, retriever=None)
+    return with_usage(
+        agent.run_stream(
+            diff=request.diff,
+            repo_path=request.repo_path,
+            strategy=request.strategy,
+        ),
+        agent.name,
+    )
+
+
+def resolve_events(
+    request: StreamConflictRequest, llm: LLMProvider
+) -> AsyncIterator[StreamEvent]:
+    agent = ConflictAgent(llm=llm, retriever=None)
+    conflicts = [c.model_dump() for c in request.conflicts]
+    return with_usage(
+        agent.run_stream(conflicts=conflicts, repo_path=request.repo_path),
+        agent.name,
+    )
+
+
+def changelog_events(
+    request: StreamChangelogRequest, llm: LLMProvider
+) -> AsyncIterator[StreamEvent]:
+    agent = ChangelogAgent(llm=llm, retriever=None)
+    return with_usage(
+        agent.run_stream(
+            commits=request.commits,
+            from_ref=request.from_ref,
+            to_ref=request.to_ref,
+            repo_path=request.repo_path,
+        ),
+        agent.name,
+    )
+
+
+EventsBuilder = Callable[[Any, LLMProvider], AsyncIterator[StreamEvent]]
+
+# Agent name -> (request model, event stream builder), shared with the jobs router
+AGENT_STREAMS: dict[str, tuple[type[BaseModel], EventsBuilder]] = {
+    "commit": (StreamCommitRequest, commit_events),
+    "review": (StreamReviewRequest, review_events),
+    "pr": (StreamPRRequest, pr_events),
+    "split": (StreamSplitRequest, split_events),
+    "resolve": (StreamConflictRequest, resolve_events),
+    "changelog": (StreamChangelogRequest, changelog_events),
+}
+
+
+def _stream(
+    build: EventsBuilder, request: BaseModel, llm: LLMProvider, http_request: Request
+) -> StreamingResponse:
     try:
-        agent = CommitAgent(llm=llm, retriever=None)
-        return _sse_response(agent.run_stream(diff=diff, repo_path=request.repo_path))
+        return _sse_response(build(request, llm), http_request)
     except Exception as e:
         return _sse_response(_error_stream(str(e)))
 
 
+@router.post("/commit")
+async def stream_commit(
+    request: StreamCommitRequest,
+    http_request: Request,
+    llm: LLMProvider = Depends(get_llm_from_request),
+):
+    return _stream(commit_events, request, llm, http_request)
+
+
 @router.post("/review")
 async def stream_review(
     request: StreamReviewRequest,
+    http_request: Request,
     llm: LLMProvider = Depends(get_llm_from_request),
 ):
-    try:
-        agent = ReviewAgent(llm=llm, retriever=None)
-        return _sse_response(agent.run_stream(diff=request.diff, repo_path=request.repo_path))
-    except Exception as e:
-        return _sse_response(_error_stream(str(e)))
+    return _stream(review_events, request, llm, http_request)
 
 
 @router.post("/pr")
 async def stream_pr(
     request: StreamPRRequest,
+    http_request: Request,
     llm: LLMProvider = Depends(get_llm_from_request),
 ):
-    try:
-        agent = PRAgent(llm=llm, retriever=None)
-        return _sse_response(
-            agent.run_stream(
-                diff=request.diff,
-                commits=request.commits,
-                branch_name=request.branch_name,
-                base_branch=request.base_branch,
-                repo_path=request.repo_path,
-            )
-        )
-    except Exception as e:
-        return _sse_response(_error_stream(str(e)))
+    return _stream(pr_events, request, llm, http_request)
 
 
 @router.post("/split")
 async def stream_split(
     request: StreamSplitRequest,
+    http_request: Request,
     llm: LLMProvider = Depends(get_llm_from_request),
 ):
-    try:
-        agent = SplitAgent(llm=llm, retriever=None)
-        return _sse_response(
-            agent.run_stream(
-                diff=request.diff,
-                repo_path=request.repo_path,
-                strategy=request.strategy,
-            )
-        )
-    except Exception as e:
-        return _sse_response(_error_stream(str(e)))
+    return _stream(split_events, request, llm, http_request)
 
 
 @router.post("/resolve")
 async def stream_resolve(
     request: StreamConflictRequest,
+    http_request: Request,
     llm: LLMProvider = Depends(get_llm_from_request),
 ):
-    try:
-        agent = ConflictAgent(llm=llm, retriever=None)
-        conflicts = [c.model_dump() for c in request.conflicts]
-        return _sse_response(
-            agent.run_stream(conflicts=conflicts, repo_path=request.repo_path)
-        )
-    except Exception as e:
-        return _sse_response(_error_stream(str(e)))
+    return _stream(resolve_events, request, llm, http_request)
 
 
 @router.post("/changelog")
 async def stream_changelog(
     request: StreamChangelogRequest,
+    http_request: Request,
     llm: LLMProvider = Depends(get_llm_from_request),
 ):
-    try:
-        agent = ChangelogAgent(llm=llm, retriever=None)
-        return _sse_response(
-            agent.run_stream(
-                commits=request.commits,
-                from_ref=request.from_ref,
-                to_ref=request.to_ref,
-                repo_path=request.repo_path,
-            )
-        )
-    except Exception as e:
-        return _sse_response(_error_stream(str(e)))
+    return _stream(changelog_events, request, llm, http_request)
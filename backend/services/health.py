@@ -0,0 +1,136 @@
+"""
+Background health probes for the configured LLM providers.
+
+Every ``interval`` seconds each provider runs its ``is_healthy`` check,
+which uses a free metadata endpoint (model list/lookup, Ollama's
+``/api/tags``) rather than a generation. Results are cached with the time
+they were taken, so ``/health`` answers from memory and load balancer
+probes never reach a provider.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+
+from backend.core.config import settings
+from backend.core.dependencies import available_providers, get_llm_provider
+from backend.core.logging import logger
+
+
+@dataclass
+class ProviderHealth:
+    provider: str
+    model: str | None
+    connected: bool
+    checked_at: float
+    latency_ms: float
+    error: str | None = None
+
+    @property
+    def age_seconds(self) -> float:
+        return max(0.0, time.time() - self.checked_at)
+
+    def to_dict(self) -> dict:
+        return {
+            "provider": self.provider,
+            "model": self.model,
+            "connected": self.connected,
+            "checked_at": self.checked_at,
+            "age_seconds": round(self.age_seconds, 3),
+            "latency_ms": round(self.latency_ms, 1),
+            "error": self.error,
+        }
+
+
+class HealthProber:
+    """Probes each configured provider on an interval and caches the result.
+
+    The loop starts with the app on the running loop. A result older than
+    ``max_age`` (three intervals) means the loop has stopped probing and
+    is reported as stale.
+    """
+
+    def __init__(
+        self,
+        interval: float = settings.health_check_interval,
+        timeout: float = settings.health_check_timeout,
+    ):
+        self.interval = interval
+        self.timeout = timeout
+        self.max_age = interval * 3
+        self._status: dict[str, ProviderHealth] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Start probing on the running loop if not already."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._task = loop.create_task(self._run(), name="health-prober")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self._loop = None
+
+    async def _run(self) -> None:
+        while True:
+            await self.probe_all()
+            await asyncio.sleep(self.interval)
+
+    async def probe_all(self) -> None:
+        names = dict.fromkeys([settings.llm_provider, *available_providers()])
+        await asyncio.gather(*(self.probe(name) for name in names))
+
+    async def probe(self, name: str) -> ProviderHealth:
+        """Check one provider now and cache the result."""
+        started = time.perf_counter()
+        error = None
+        try:
+            connected = await asyncio.wait_for(
+                get_llm_provider(name).is_healthy(), self.timeout
+            )
+        except asyncio.TimeoutError:
+            connected, error = False, f"No response within {self.timeout}s"
+        except Exception as e:
+            connected, error = False, str(e)
+
+        result = ProviderHealth(
+            provider=name,
+            model=available_providers().get(name),
+            connected=connected,
+            checked_at=time.time(),
+            latency_ms=(time.perf_counter() - started) * 1000,
+            error=error,
+        )
+        previous = self._status.get(name)
+        if previous is None or previous.connected != connected:
+            if connected:
+                logger.info(f"LLM provider reachable: {name}")
+            else:
+                logger.warning(f"LLM provider not reachable: {name}" + (f" ({error})" if error else ""))
+        self._status[name] = result
+        return result
+
+    async def get(self, name: str) -> ProviderHealth:
+        """Cached status for ``name``, probing once if there is none yet."""
+        cached = self._status.get(name)
+        if cached is not None:
+            return cached
+        return await self.probe(name)
+
+    def is_stale(self, status: ProviderHealth) -> bool:
+        return status.age_seconds > self.max_age
+
+    def snapshot(self) -> dict[str, dict]:
+        return {name: status.to_dict() for name, status in self._status.items()}
+
+    def clear(self) -> None:
+        self._status.clear()
+
+
+health_prober = HealthProber()
@@ -0,0 +1,293 @@
+"""
+Background jobs for long agent runs.
+
+Submitting a job queues an agent's event stream and returns at once, so
+no HTTP connection is held for the LLM's duration. A fixed pool of
+workers drains the queue highest priority first. Every job keeps the
+events its agent emits, so clients can poll it or follow it over SSE,
+and finished jobs are retained for a TTL.
+"""
+
+import asyncio
+import itertools
+import time
+import uuid
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any
+
+from backend.core.config import settings
+from backend.core.logging import logger
+from backend.models.events import EventType, StreamEvent
+from backend.utils.metrics import job_wait_seconds
+
+EventsFactory = Callable[[], AsyncIterator[StreamEvent]]
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class JobPriority(str, Enum):
+    HIGH = "high"
+    NORMAL = "normal"
+    LOW = "low"
+
+
+_PRIORITY_RANK = {JobPriority.HIGH: 0, JobPriority.NORMAL: 1, JobPriority.LOW: 2}
+_FINISHED = {JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED}
+
+
+class QueueFullError(Exception):
+    """Raised when the queue already holds its maximum of waiting jobs."""
+
+
+@dataclass
+class Job:
+    """One queued agent run and everything it has emitted so far."""
+
+    kind: str
+    events_factory: EventsFactory = field(repr=False)
+    priority: JobPriority = JobPriority.NORMAL
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: JobStatus = JobStatus.QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    events: list[StreamEvent] = field(default_factory=list)
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    _changed: asyncio.Condition = field(default_factory=asyncio.Condition, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in _FINISHED
+
+    @property
+    def wait_seconds(self) -> float | None:
+        """Time spent queued before a worker picked the job up."""
+        if self.started_at is None:
+            return None
+        return self.started_at - self.created_at
+
+    async def _notify(self) -> None:
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def add_event(self, event: StreamEvent) -> None:
+        self.events.append(event)
+        if event.event == EventType.RESULT:
+            self.result = event.data
+        elif event.event == EventType.ERROR:
+            self.error = event.data.get("error", "Unknown error")
+        await self._notify()
+
+    async def finish(self, status: JobStatus) -> None:
+        self.status = status
+        self.finished_at = time.time()
+        # Retained jobs keep their events, not the request they were built from
+        self.events_factory = None
+        await self._notify()
+
+    async def follow(self, start: int = 0) -> AsyncIterator[StreamEvent]:
+        """Yield events from index ``start`` on, waiting for new ones until
+        the job finishes."""
+        index = start
+        while True:
+            async with self._changed:
+                while index >= len(self.events) and not self.finished:
+                    await self._changed.wait()
+            while index < len(self.events):
+                yield self.events[index]
+                index += 1
+            if self.finished:
+                return
+
+    def to_dict(self, include_events: bool = False) -> dict[str, Any]:
+        data = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status.value,
+            "priority": self.priority.value,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "wait_seconds": self.wait_seconds,
+            "event_count": len(self.events),
+            "result": self.result,
+            "error": self.error,
+        }
+        if include_events:
+            data["events"] = [e.model_dump(mode="json") for e in self.events]
+        return data
+
+
+class JobQueue:
+    """Priority queue of jobs drained by a fixed pool of asyncio workers.
+
+    Workers start with the app (or on the first submit) on the running
+    loop. At most ``max_queued`` jobs wait at once; finished jobs are
+    dropped ``ttl`` seconds after they finish.
+    """
+
+    def __init__(
+        self,
+        workers: int = settings.job_workers,
+        max_queued: int = settings.job_queue_size,
+        ttl: float = settings.job_ttl_seconds,
+    ):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.ttl = ttl
+        self._jobs: dict[str, Job] = {}
+        self._queue: asyncio.PriorityQueue | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._worker_tasks: list[asyncio.Task] = []
+        self._running: dict[str, asyncio.Task] = {}
+        self._seq = itertools.count()
+        self._waited = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def start(self) -> None:
+        """Start the workers on the running loop if they are not already."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.PriorityQueue()
+        # Jobs queued on a previous loop (test clients) are queued again
+        for job in self._jobs.values():
+            if job.status == JobStatus.QUEUED:
+                self._enqueue(job)
+        self._worker_tasks = [
+            loop.create_task(self._worker(), name=f"job-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Cancel the workers and any job they are running."""
+        tasks = self._worker_tasks + list(self._running.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._worker_tasks = []
+        self._loop = None
+
+    def _enqueue(self, job: Job) -> None:
+        self._queue.put_nowait((_PRIORITY_RANK[job.priority], next(self._seq), job.id))
+
+    def submit(
+        self,
+        kind: str,
+        events_factory: EventsFactory,
+        priority: JobPriority = JobPriority.NORMAL,
+    ) -> Job:
+        """Queue a job; raises ``QueueFullError`` when too many are waiting."""
+        self.start()
+        self.prune()
+        if self.queued >= self.max_queued:
+            raise QueueFullError(f"{self.queued} jobs already queued")
+        job = Job(kind=kind, events_factory=events_factory, priority=priority)
+        self._jobs[job.id] = job
+        self._enqueue(job)
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        self.prune()
+        return self._jobs.get(job_id)
+
+    async def cancel(self, job_id: str) -> Job | None:
+        """Cancel a queued or running job; finished jobs are left as they are."""
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return job
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+            await asyncio.wait({task})
+        if not job.finished:
+            await job.finish(JobStatus.CANCELLED)
+        return job
+
+    def prune(self) -> None:
+        """Forget jobs that finished more than ``ttl`` seconds ago."""
+        cutoff = time.time() - self.ttl
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for job in self._jobs.values() if job.status == JobStatus.QUEUED)
+
+    async def _worker(self) -> None:
+        while True:
+            _, _, job_id = await self._queue.get()
+            job = self._jobs.get(job_id)
+            if job is None or job.status != JobStatus.QUEUED:
+                continue
+            task = asyncio.ensure_future(self._run(job))
+            self._running[job.id] = task
+            try:
+                # wait() keeps a cancelled job from cancelling the worker
+                await asyncio.wait({task})
+            finally:
+                self._running.pop(job.id, None)
+
+    async def _run(self, job: Job) -> None:
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        self._waited += 1
+        self._wait_total += job.wait_seconds
+        self._wait_max = max(self._wait_max, job.wait_seconds)
+        job_wait_seconds.observe(job.wait_seconds, kind=job.kind)
+        try:
+            async for event in job.events_factory():
+                await job.add_event(event)
+        except asyncio.CancelledError:
+            await job.finish(JobStatus.CANCELLED)
+            raise
+        except Exception as e:
+            logger.error("job %s (%s) failed: %s", job.id, job.kind, e)
+            await job.add_event(
+                StreamEvent(event=EventType.ERROR, agent=job.kind, data={"error": str(e)})
+            )
+        failed = job.result is None and job.error is not None
+        await job.finish(JobStatus.FAILED if failed else JobStatus.SUCCEEDED)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Queue depth, worker use and queue wait times for ``/metrics``."""
+        self.prune()
+        now = time.time()
+        by_status = {status.value: 0 for status in JobStatus}
+        oldest = 0.0
+        for job in self._jobs.values():
+            by_status[job.status.value] += 1
+            if job.status == JobStatus.QUEUED:
+                oldest = max(oldest, now - job.created_at)
+        return {
+            "workers": self.workers,
+            "queue_depth": by_status[JobStatus.QUEUED.value],
+            "max_queued": self.max_queued,
+            "running": by_status[JobStatus.RUNNING.value],
+            "by_status": by_status,
+            "wait_seconds": {
+                "count": self._waited,
+                "avg": self._wait_total / self._waited if self._waited else 0.0,
+                "max": self._wait_max,
+                "oldest_queued": oldest,
+            },
+        }
+
+
+job_queue = JobQueue()
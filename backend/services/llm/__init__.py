@@ -3,6 +3,7 @@ LLM Provider Package
 """
 
 from .base import LLMProvider, LLMError
+from .json_stream import JSONStreamParser, parse_json
 from .ollama import OllamaProvider, OllamaError
 from .gemini import GeminiProvider, GeminiError
 from .openai import OpenAIProvider, OpenAIError
@@ -11,6 +12,8 @@ from .factory import create_llm_provider, ProviderType, ProviderConfigError
 __all__ = [
     "LLMProvider",
     "LLMError",
+    "JSONStreamParser",
+    "parse_json",
     "OllamaProvider",
     "OllamaError",
     "GeminiProvider",
@@ -1,9 +1,17 @@
+import asyncio
+import functools
+import inspect
+import time
 from abc import ABC, abstractmethod
 from collections.abc import AsyncIterator
 from typing import Any
 
 import json
 
+from backend.utils.metrics import llm_call_seconds, llm_retries
+from backend.utils.profiling import record_llm_call
+from backend.utils.usage import record_usage
+
 
 class LLMError(Exception):
     """Base exception for all LLM provider errors."""
@@ -11,9 +19,89 @@ class LLMError(Exception):
     pass
 
 
+def observed(method: str):
+    """Time every call of a provider method into ``llm_call_seconds`` and
+    the calling node's profile.
+
+    Works for coroutines and for async generators (timed until the stream
+    ends); the status label is ok, error or cancelled.
+    """
+
+    def decorate(func):
+        def observe(provider: "LLMProvider", started: float, status: str) -> None:
+            elapsed = time.perf_counter() - started
+            llm_call_seconds.observe(
+                elapsed, provider=provider.name, method=method, status=status
+            )
+            record_llm_call(elapsed)
+
+        if inspect.isasyncgenfunction(func):
+            @functools.wraps(func)
+            async def stream(self, *args, **kwargs):
+                started, status = time.perf_counter(), "error"
+                try:
+                    async for chunk in func(self, *args, **kwargs):
+                        yield chunk
+                    status = "ok"
+                except (GeneratorExit, asyncio.CancelledError):
+                    status = "cancelled"
+                    raise
+                finally:
+                    observe(self, started, status)
+
+            return stream
+
+        @functools.wraps(func)
+        async def call(self, *args, **kwargs):
+            started, status = time.perf_counter(), "error"
+            try:
+                result = await func(self, *args, **kwargs)
+                status = "ok"
+                return result
+            except asyncio.CancelledError:
+                status = "cancelled"
+                raise
+            finally:
+                observe(self, started, status)
+
+        return call
+
+    return decorate
+
+
 class LLMProvider(ABC):
     """Abstract base class for LLM providers."""
 
+    # Provider family, used to look up per-provider budgets and tokenizers
+    name: str = ""
+    # True when generate_stream yields tokens as the model produces them
+    streams_tokens: bool = False
+
+    @property
+    def model_id(self) -> str:
+        return getattr(self, "model", None) or getattr(self, "model_name", "")
+
+    @staticmethod
+    def _messages_text(messages: list[dict]) -> str:
+        """Message contents joined, for estimating the prompt size of chat calls."""
+        return "\n".join(str(m.get("content") or "") for m in messages)
+
+    def _record_usage(
+        self,
+        prompt_tokens: int | None,
+        completion_tokens: int | None,
+        prompt: str = "",
+        completion: str = "",
+    ) -> None:
+        """Report a call's token usage; counts missing from the response are estimated."""
+        record_usage(
+            self.name, self.model_id, prompt_tokens, completion_tokens, prompt, completion
+        )
+
+    def _record_retry(self, status: int | str) -> None:
+        """Count a call about to be retried after a ``status`` response."""
+        llm_retries.inc(provider=self.name, status=status)
+
     @abstractmethod
     async def generate(
         self,
@@ -52,3 +140,6 @@ class LLMProvider(ABC):
     async def is_healthy(self) -> bool:
         """Check if the LLM provider is available."""
         pass
+
+    async def aclose(self) -> None:
+        """Close pooled connections; call on the loop that used them."""
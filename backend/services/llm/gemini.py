@@ -1,5 +1,4 @@
 import asyncio
-import json
 import re
 from collections.abc import AsyncIterator
 from typing import Any
@@ -7,7 +6,8 @@ from typing import Any
 from google import genai
 from google.genai import types
 
-from .base import LLMProvider, LLMError
+from .base import LLMProvider, LLMError, observed
+from .json_stream import parse_json
 
 _RETRY_DELAY_RE = re.compile(r"retryDelay['\"]:\s*['\"](\d+)")
 _MAX_RETRIES = 3
@@ -31,6 +31,9 @@ def _extract_retry_delay(exc: Exception) -> float:
 
 class GeminiProvider(LLMProvider):
 
+    name = "gemini"
+    streams_tokens = True
+
     def __init__(
         self,
         api_key: str,
@@ -44,6 +47,7 @@ class GeminiProvider(LLMProvider):
             http_options={"timeout": timeout * 1000},
         )
 
+    @observed("generate")
     async def generate(
         self,
         prompt: str,
@@ -67,14 +71,16 @@ class GeminiProvider(LLMProvider):
                 text = response.text if response and response.text else None
                 if text is None:
                     raise GeminiError("Gemini returned an empty response (possibly blocked by safety filters)")
+                self._record_usage_metadata(response, prompt, text)
 
                 if json_mode:
-                    return json.loads(text)
+                    return parse_json(text)
                 return {"text": text}
             except GeminiError:
                 raise
             except Exception as e:
                 if _is_rate_limit_error(e) and attempt < _MAX_RETRIES - 1:
+                    self._record_retry(429)
                     delay = _extract_retry_delay(e)
                     await asyncio.sleep(delay)
                     last_exc = e
@@ -83,6 +89,7 @@ class GeminiProvider(LLMProvider):
 
         raise GeminiError(f"Gemini request failed after {_MAX_RETRIES} retries: {last_exc}")
 
+    @observed("generate_stream")
     async def generate_stream(
         self,
         prompt: str,
@@ -95,13 +102,19 @@ class GeminiProvider(LLMProvider):
         )
 
         try:
+            parts: list[str] = []
+            last = None
             async for chunk in await self.client.aio.models.generate_content_stream(
                 model=self.model_name,
                 contents=prompt,
                 config=config,
             ):
+                last = chunk
                 if chunk.text:
+                    parts.append(chunk.text)
                     yield chunk.text
+            # Usage metadata on the last chunk covers the whole stream
+            self._record_usage_metadata(last, prompt, "".join(parts))
         except GeminiError:
             raise
         except Exception as e:
@@ -109,6 +122,7 @@ class GeminiProvider(LLMProvider):
                 raise GeminiError(f"Rate limited during streaming: {e}")
             raise GeminiError(f"Gemini streaming failed: {e}")
 
+    @observed("generate_with_tools")
     async def generate_with_tools(
         self,
         messages: list[dict],
@@ -135,6 +149,11 @@ class GeminiProvider(LLMProvider):
                 except Exception:
                     text = ""
 
+                self._record_usage_metadata(
+                    response,
+                    self._messages_text(messages),
+                    text,
+                )
                 result = {"content": text, "tool_calls": []}
                 if response.candidates and response.candidates[0].content.parts:
                     for part in response.candidates[0].content.parts:
@@ -152,6 +171,7 @@ class GeminiProvider(LLMProvider):
                 raise
             except Exception as e:
                 if _is_rate_limit_error(e) and attempt < _MAX_RETRIES - 1:
+                    self._record_retry(429)
                     delay = _extract_retry_delay(e)
                     await asyncio.sleep(delay)
                     last_exc = e
@@ -160,13 +180,20 @@ class GeminiProvider(LLMProvider):
 
         raise GeminiError(f"Gemini request failed after {_MAX_RETRIES} retries: {last_exc}")
 
+    def _record_usage_metadata(self, response: Any, prompt: str, text: str) -> None:
+        metadata = getattr(response, "usage_metadata", None)
+        self._record_usage(
+            getattr(metadata, "prompt_token_count", None),
+            getattr(metadata, "candidates_token_count", None),
+            prompt,
+            text,
+        )
+
     async def is_healthy(self) -> bool:
         try:
-            response = await self.client.aio.models.generate_content(
-                model=self.model_name,
-                contents="ping",
-            )
-            return response is not None
+            # Model metadata, not a generation: free and fast
+            await self.client.aio.models.get(model=self.model_name)
+            return True
         except Exception:
             return False
 
@@ -0,0 +1,267 @@
+"""
+Incremental parsing of JSON objects streamed by ``generate_stream``.
+
+``JSONStreamParser`` is fed the token chunks of a ``json_mode`` response
+as they arrive. It keeps the top-level string fields decoded so far, so
+a caller can show ``message`` or ``summary`` while the model is still
+writing it, and parses the whole object once the stream ends.
+
+``parse_json`` is the tolerant parse used for every ``json_mode``
+response. Valid JSON goes straight to ``json.loads``; otherwise the
+object is repaired for the quirks models produce: text or markdown
+fences around it, trailing commas, raw newlines in strings, and output
+cut off mid-object, which is closed after the last complete value.
+"""
+
+import json
+import re
+from typing import Any
+
+_ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+
+# A run of string characters that need no decoding
+_PLAIN = re.compile(r'[^"\\]+')
+# A complete string token, quotes included
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+# An unfinished escape at the end of a cut-off string
+_OPEN_ESCAPE = re.compile(r'(\\+)(u[0-9a-fA-F]{0,3})?$')
+_DELIMITERS = frozenset(' \t\r\n{}[]:,"')
+
+
+def _is_key(tokens: list[tuple[str, str]], index: int, closers: list[str]) -> bool:
+    # Only valid for the innermost open container, i.e. at the end of the tokens
+    return closers[-1] == "}" and tokens[index - 1][0] in "{,"
+
+
+def _close_string(raw: str) -> str:
+    match = _OPEN_ESCAPE.search(raw)
+    if match and len(match.group(1)) % 2:
+        raw = raw[: match.start()] + match.group(1)[:-1]
+    return raw + '"'
+
+
+def _is_literal(raw: str) -> bool:
+    try:
+        json.loads(raw)
+    except ValueError:
+        return False
+    return True
+
+
+def _repair(text: str) -> str | None:
+    """The first JSON object in ``text``, rewritten to parse, or None if there is none."""
+    start = text.find("{")
+    if start == -1:
+        return None
+    tokens: list[tuple[str, str]] = []
+    closers: list[str] = []
+    i, n = start, len(text)
+    while i < n:
+        char = text[i]
+        if char in " \t\r\n":
+            i += 1
+        elif char == '"':
+            match = _STRING.match(text, i)
+            if match is None:
+                tokens.append(("partial", text[i:]))
+                break
+            tokens.append(("string", match.group()))
+            i = match.end()
+        elif char in "{[":
+            closers.append("}" if char == "{" else "]")
+            tokens.append((char, char))
+            i += 1
+        elif char in "}]":
+            if not closers or char != closers[-1]:
+                break
+            while tokens[-1][0] == ",":
+                tokens.pop()
+            closers.pop()
+            tokens.append((char, char))
+            i += 1
+            if not closers:
+                # Anything after the object, such as a closing fence, is dropped
+                break
+        elif char in ":,":
+            tokens.append((char, char))
+            i += 1
+        else:
+            end = i
+            while end < n and text[end] not in _DELIMITERS:
+                end += 1
+            tokens.append(("literal", text[i:end]))
+            i = end
+
+    # Cut off: drop what cannot be completed, then close the open containers
+    while closers and tokens:
+        kind, raw = tokens[-1]
+        if kind in ",:":
+            tokens.pop()
+        elif kind in ("partial", "string") and _is_key(tokens, len(tokens) - 1, closers):
+            tokens.pop()
+        elif kind == "partial":
+            tokens[-1] = ("string", _close_string(raw))
+            break
+        elif kind == "literal" and not _is_literal(raw):
+            tokens.pop()
+        else:
+            break
+    return "".join(raw for _, raw in tokens) + "".join(reversed(closers))
+
+
+def parse_json(text: str) -> Any:
+    """``json.loads`` that recovers the object from common model output quirks.
+
+    Raises the original ``json.JSONDecodeError`` if no object can be recovered.
+    """
+    try:
+        return json.loads(text, strict=False)
+    except json.JSONDecodeError as e:
+        error = e
+    repaired = _repair(text)
+    if repaired is None:
+        raise error
+    try:
+        return json.loads(repaired, strict=False)
+    except json.JSONDecodeError:
+        raise error from None
+
+
+class JSONStreamParser:
+    """Tracks the top-level string fields of a JSON object fed in chunks.
+
+    Only strings directly inside the outermost object are decoded; nested
+    objects and arrays are skipped over (but kept for ``result()``).
+    Anything before the opening brace or after the closing one, such as
+    a markdown fence, is ignored while streaming. ``partial()`` parses
+    the object received so far, nested values included.
+    """
+
+    def __init__(self):
+        self.fields: dict[str, str] = {}
+        self._parts: list[str] = []
+        self._depth = 0
+        # Set once the outermost object has closed
+        self.complete = False
+        self._in_string = False
+        # The escape sequence being read, e.g. "\\u00", or "" outside one
+        self._escape = ""
+        self._high_surrogate = ""
+        self._expect_key = False
+        self._key: str | None = None
+        # Where the current top-level string goes: "key", "value" or None
+        self._target: str | None = None
+        self._buffer: list[str] = []
+
+    def feed(self, chunk: str) -> dict[str, str]:
+        """Add a chunk; returns the text it appended to each top-level string field."""
+        self._parts.append(chunk)
+        deltas: dict[str, str] = {}
+        i, n = 0, len(chunk)
+        while i < n:
+            if self._in_string:
+                if self._escape:
+                    self._escape += chunk[i]
+                    i += 1
+                    self._decode_escape(deltas)
+                    continue
+                match = _PLAIN.match(chunk, i)
+                if match:
+                    self._emit(match.group(), deltas)
+                    i = match.end()
+                    continue
+                char = chunk[i]
+                i += 1
+                if char == "\\":
+                    self._escape = char
+                else:
+                    self._close_string()
+                continue
+
+            char = chunk[i]
+            i += 1
+            if self.complete:
+                break
+            if self._depth == 0:
+                if char == "{":
+                    self._depth = 1
+                    self._expect_key = True
+            elif char == '"':
+                self._in_string = True
+                if self._depth == 1:
+                    self._target = "key" if self._expect_key else "value"
+                    if self._target == "value" and self._key is not None:
+                        self.fields.setdefault(self._key, "")
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                self.complete = self._depth == 0
+            elif self._depth == 1 and char == ":":
+                self._expect_key = False
+            elif self._depth == 1 and char == ",":
+                self._expect_key = True
+        return deltas
+
+    def _emit(self, text: str, deltas: dict[str, str]) -> None:
+        if self._target == "key":
+            self._buffer.append(text)
+        elif self._target == "value" and self._key is not None:
+            self.fields[self._key] += text
+            deltas[self._key] = deltas.get(self._key, "") + text
+
+    def _decode_escape(self, deltas: dict[str, str]) -> None:
+        escape = self._escape
+        if escape[1] != "u":
+            self._escape = ""
+            self._emit(_ESCAPES.get(escape[1], escape[1]), deltas)
+            return
+        if len(escape) < 6:
+            return
+        self._escape = ""
+        try:
+            char = chr(int(escape[2:], 16))
+        except ValueError:
+            # Not valid JSON; result() will report it
+            return
+        if "\ud800" <= char <= "\udbff":
+            # Wait for the low half of a surrogate pair
+            self._high_surrogate = char
+            return
+        if self._high_surrogate:
+            char = (self._high_surrogate + char).encode("utf-16", "surrogatepass").decode("utf-16")
+            self._high_surrogate = ""
+        self._emit(char, deltas)
+
+    def _close_string(self) -> None:
+        self._in_string = False
+        if self._target == "key":
+            self._key = "".join(self._buffer)
+            self._buffer = []
+        self._target = None
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far."""
+        return "".join(self._parts)
+
+    def partial(self) -> dict[str, Any]:
+        """The object as far as it has arrived, cut-off values closed; {} before it starts."""
+        try:
+            value = parse_json(self.text)
+        except json.JSONDecodeError:
+            return {}
+        return value if isinstance(value, dict) else {}
+
+    def result(self) -> dict[str, Any]:
+        """Parse the complete response; raises ``json.JSONDecodeError`` if unrecoverable."""
+        return parse_json(self.text)
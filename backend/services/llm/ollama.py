@@ -5,7 +5,8 @@ from typing import Any
 
 import httpx
 
-from .base import LLMProvider, LLMError
+from .base import LLMProvider, LLMError, observed
+from .json_stream import parse_json
 
 _MAX_RETRIES = 3
 _RETRYABLE_STATUS = {429, 503}
@@ -17,6 +18,9 @@ class OllamaError(LLMError):
 
 class OllamaProvider(LLMProvider):
 
+    name = "ollama"
+    streams_tokens = True
+
     def __init__(
         self,
         base_url: str,
@@ -28,6 +32,7 @@ class OllamaProvider(LLMProvider):
         self.timeout = timeout
         self._client = httpx.AsyncClient(base_url=base_url, timeout=timeout)
 
+    @observed("generate")
     async def generate(
         self,
         prompt: str,
@@ -52,15 +57,22 @@ class OllamaProvider(LLMProvider):
                 response = await self._client.post("/api/generate", json=payload)
                 response.raise_for_status()
                 result = response.json()
+                self._record_usage(
+                    result.get("prompt_eval_count"),
+                    result.get("eval_count"),
+                    prompt,
+                    result.get("response", ""),
+                )
 
                 if json_mode:
-                    return json.loads(result["response"])
+                    return parse_json(result["response"])
                 return {"text": result["response"]}
 
             except httpx.TimeoutException:
                 raise OllamaError(f"Request timed out after {self.timeout}s")
             except httpx.HTTPStatusError as e:
                 if e.response.status_code in _RETRYABLE_STATUS and attempt < _MAX_RETRIES - 1:
+                    self._record_retry(e.response.status_code)
                     await asyncio.sleep(2 ** (attempt + 1))
                     last_exc = e
                     continue
@@ -74,6 +86,7 @@ class OllamaProvider(LLMProvider):
 
         raise OllamaError(f"Ollama request failed after {_MAX_RETRIES} retries: {last_exc}")
 
+    @observed("generate_stream")
     async def generate_stream(
         self,
         prompt: str,
@@ -96,15 +109,25 @@ class OllamaProvider(LLMProvider):
                 "POST", "/api/generate", json=payload
             ) as response:
                 response.raise_for_status()
+                parts: list[str] = []
+                final: dict[str, Any] = {}
                 async for line in response.aiter_lines():
                     if not line:
                         continue
                     chunk = json.loads(line)
                     token = chunk.get("response", "")
                     if token:
+                        parts.append(token)
                         yield token
                     if chunk.get("done", False):
+                        final = chunk
                         break
+                self._record_usage(
+                    final.get("prompt_eval_count"),
+                    final.get("eval_count"),
+                    prompt,
+                    "".join(parts),
+                )
         except httpx.TimeoutException:
             raise OllamaError(f"Request timed out after {self.timeout}s")
         except httpx.HTTPStatusError as e:
@@ -114,6 +137,7 @@ class OllamaProvider(LLMProvider):
         except Exception as e:
             raise OllamaError(f"Ollama streaming failed: {e}")
 
+    @observed("generate_with_tools")
     async def generate_with_tools(
         self,
         messages: list[dict],
@@ -131,12 +155,20 @@ class OllamaProvider(LLMProvider):
             try:
                 response = await self._client.post("/api/chat", json=payload)
                 response.raise_for_status()
-                return response.json()
+                result = response.json()
+                self._record_usage(
+                    result.get("prompt_eval_count"),
+                    result.get("eval_count"),
+                    self._messages_text(messages),
+                    str(result.get("message", {}).get("content") or ""),
+                )
+                return result
 
             except httpx.TimeoutException:
                 raise OllamaError(f"Request timed out after {self.timeout}s")
             except httpx.HTTPStatusError as e:
                 if e.response.status_code in _RETRYABLE_STATUS and attempt < _MAX_RETRIES - 1:
+                    self._record_retry(e.response.status_code)
                     await asyncio.sleep(2 ** (attempt + 1))
                     last_exc = e
                     continue
@@ -154,3 +186,6 @@ class OllamaProvider(LLMProvider):
             return response.status_code == 200
         except Exception:
             return False
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
@@ -5,7 +5,8 @@ from typing import Any
 
 from openai import AsyncOpenAI, APIStatusError, APITimeoutError
 
-from .base import LLMProvider, LLMError
+from .base import LLMProvider, LLMError, observed
+from .json_stream import parse_json
 
 _MAX_RETRIES = 3
 
@@ -26,6 +27,9 @@ def _extract_retry_delay(exc: APIStatusError, attempt: int) -> float:
 
 class OpenAIProvider(LLMProvider):
 
+    name = "openai"
+    streams_tokens = True
+
     def __init__(
         self,
         api_key: str,
@@ -36,6 +40,7 @@ class OpenAIProvider(LLMProvider):
         self.timeout = timeout
         self.client = AsyncOpenAI(api_key=api_key, timeout=timeout, max_retries=0)
 
+    @observed("generate")
     async def generate(
         self,
         prompt: str,
@@ -57,13 +62,21 @@ class OpenAIProvider(LLMProvider):
                 text = response.choices[0].message.content
                 if text is None:
                     raise OpenAIError("OpenAI returned an empty response")
+                usage = getattr(response, "usage", None)
+                self._record_usage(
+                    getattr(usage, "prompt_tokens", None),
+                    getattr(usage, "completion_tokens", None),
+                    prompt,
+                    text,
+                )
                 if json_mode:
-                    return json.loads(text)
+                    return parse_json(text)
                 return {"text": text}
             except OpenAIError:
                 raise
             except APIStatusError as e:
                 if e.status_code == 429 and attempt < _MAX_RETRIES - 1:
+                    self._record_retry(e.status_code)
                     delay = _extract_retry_delay(e, attempt)
                     await asyncio.sleep(delay)
                     last_exc = e
@@ -78,6 +91,7 @@ class OpenAIProvider(LLMProvider):
 
         raise OpenAIError(f"OpenAI request failed after {_MAX_RETRIES} retries: {last_exc}")
 
+    @observed("generate_stream")
     async def generate_stream(
         self,
         prompt: str,
@@ -89,16 +103,28 @@ class OpenAIProvider(LLMProvider):
             "messages": [{"role": "user", "content": prompt}],
             "temperature": temperature,
             "stream": True,
+            # The final chunk then carries the token usage
+            "stream_options": {"include_usage": True},
         }
         if json_mode:
             kwargs["response_format"] = {"type": "json_object"}
 
         try:
             stream = await self.client.chat.completions.create(**kwargs)
+            parts: list[str] = []
+            usage = None
             async for chunk in stream:
+                usage = getattr(chunk, "usage", None) or usage
                 delta = chunk.choices[0].delta if chunk.choices else None
                 if delta and delta.content:
+                    parts.append(delta.content)
                     yield delta.content
+            self._record_usage(
+                getattr(usage, "prompt_tokens", None),
+                getattr(usage, "completion_tokens", None),
+                prompt,
+                "".join(parts),
+            )
         except APITimeoutError:
             raise OpenAIError(f"Request timed out after {self.timeout}s")
         except APIStatusError as e:
@@ -108,6 +134,7 @@ class OpenAIProvider(LLMProvider):
         except Exception as e:
             raise OpenAIError(f"OpenAI streaming failed: {e}")
 
+    @observed("generate_with_tools")
     async def generate_with_tools(
         self,
         messages: list[dict],
@@ -122,6 +149,13 @@ class OpenAIProvider(LLMProvider):
                     tools=tools if tools else None,
                 )
                 message = response.choices[0].message
+                usage = getattr(response, "usage", None)
+                self._record_usage(
+                    getattr(usage, "prompt_tokens", None),
+                    getattr(usage, "completion_tokens", None),
+                    self._messages_text(messages),
+                    message.content or "",
+                )
                 result: dict[str, Any] = {
                     "content": message.content or "",
                     "tool_calls": [],
@@ -141,6 +175,7 @@ class OpenAIProvider(LLMProvider):
                 raise
             except APIStatusError as e:
                 if e.status_code == 429 and attempt < _MAX_RETRIES - 1:
+                    self._record_retry(e.status_code)
                     delay = _extract_retry_delay(e, attempt)
                     await asyncio.sleep(delay)
                     last_exc = e
@@ -159,3 +194,6 @@ class OpenAIProvider(LLMProvider):
             return True
         except Exception:
             return False
+
+    async def aclose(self) -> None:
+        await self.client.close()
@@ -2,40 +2,58 @@ import hashlib
 import time
 from typing import Any
 
+from backend.core.config import settings
+from backend.diff.packer import pack_diff
+from backend.utils.usage import count_tokens
+
 
 DEFAULT_MAX_DIFF_CHARS = 30000
 _CACHE_MAX_SIZE = 100
 _CACHE_TTL_SECONDS = 300
 
 
-def truncate_diff(diff: str, max_chars: int = DEFAULT_MAX_DIFF_CHARS) -> str:
-    if len(diff) <= max_chars:
-        return diff
+# Diff share of the prompt, in tokens. Local models run with small context
+# windows; hosted models get more room. Exact model names override the
+# provider default.
+_PROVIDER_DIFF_TOKEN_BUDGETS = {
+    "ollama": 6_000,
+    "openai": 20_000,
+    "gemini": 30_000,
+}
+_MODEL_DIFF_TOKEN_BUDGETS = {
+    "gpt-4.1": 30_000,
+    "gemini-2.5-pro": 60_000,
+}
 
-    sections = diff.split("diff --git ")
-    parts: list[str] = []
-    remaining = max_chars
 
-    for section in sections:
-        if not section.strip():
-            continue
+def diff_token_budget(provider: str | None = None, model: str | None = None) -> int:
+    """Token budget for the diff in a prompt sent to ``provider``/``model``."""
+    if settings.diff_token_budget is not None:
+        return settings.diff_token_budget
+    if model in _MODEL_DIFF_TOKEN_BUDGETS:
+        return _MODEL_DIFF_TOKEN_BUDGETS[model]
+    return _PROVIDER_DIFF_TOKEN_BUDGETS.get(
+        provider or "", settings.max_diff_chars // 4
+    )
 
-        full = "diff --git " + section
 
-        if len(full) <= remaining:
-            parts.append(full)
-            remaining -= len(full)
-        else:
-            lines = full.split("\n")
-            header = "\n".join(lines[:4]) + "\n"
-            if len(header) <= remaining:
-                parts.append(header)
-                remaining -= len(header)
+def llm_diff_token_budget(llm: Any) -> int:
+    """``diff_token_budget`` for an LLMProvider instance."""
+    model = getattr(llm, "model", None) or getattr(llm, "model_name", None)
+    return diff_token_budget(getattr(llm, "name", None), model)
 
-    return "".join(parts)
+
+def truncate_diff(diff: str, max_chars: int = DEFAULT_MAX_DIFF_CHARS) -> str:
+    """Fit ``diff`` into ``max_chars`` with the token-budgeted packer."""
+    if len(diff) <= max_chars:
+        return diff
+    return pack_diff(diff, max_tokens=max_chars // 4).text
 
 
-def estimate_tokens(text: str) -> int:
+def estimate_tokens(text: str, provider: str | None = None) -> int:
+    """chars / 4, or the tokenizer registered for ``provider`` when given."""
+    if provider:
+        return count_tokens(text, provider)
     return len(text) // 4
 
 
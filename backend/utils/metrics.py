@@ -0,0 +1,246 @@
+"""
+In-process metrics exported in the Prometheus text format.
+
+Counters, gauges and histograms keep their values in a dict keyed by the
+label values, behind one lock per metric; recording is a dict lookup and
+a few additions, so it is cheap enough for every request, node and LLM
+call. ``metrics_registry.render()`` produces the ``/metrics`` page.
+
+The metrics the backend records are declared at the bottom of this
+module so the full list is in one place.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+# Seconds; wide enough for LLM calls and whole agent runs
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    type = ""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        registry: "MetricsRegistry | None" = None,
+    ):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._lock = threading.Lock()
+        self._values: dict[tuple[Any, ...], Any] = {}
+        self.reset()
+        (registry if registry is not None else metrics_registry).register(self)
+
+    def _key(self, labels: dict[str, Any]) -> tuple[Any, ...]:
+        # Values are stringified when rendered, not on the hot path
+        return tuple([labels[name] for name in self.labels])
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+            if not self.labels and self.type != "histogram":
+                # Unlabelled counters and gauges are exported as 0 before first use
+                self._values[()] = 0
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        with self._lock:
+            items = sorted(self._values.items(), key=lambda item: tuple(map(str, item[0])))
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}")
+        return lines
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {",".join(map(str, key)): value for key, value in self._values.items()}
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """Bucketed observations; each label set keeps per-bucket counts, sum and count."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+        registry: "MetricsRegistry | None" = None,
+    ):
+        super().__init__(name, help, labels, registry)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                # One slot per bucket plus +Inf, then sum
+                series = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Observe how long the block takes, whether or not it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        with self._lock:
+            items = sorted(
+                ((key, list(series)) for key, series in self._values.items()),
+                key=lambda item: tuple(map(str, item[0])),
+            )
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), series):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}"
+                )
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._values.items()]
+        result = {}
+        for key, series in items:
+            count = sum(series[:-1])
+            result[",".join(map(str, key))] = {
+                "count": count,
+                "sum": series[-1],
+                "avg": series[-1] / count if count else 0.0,
+            }
+        return result
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def reset(self) -> None:
+        for metric in self._metrics.values():
+            metric.reset()
+
+
+metrics_registry = MetricsRegistry()
+
+
+http_request_seconds = Histogram(
+    "inyeon_http_request_duration_seconds",
+    "Time from request to the end of the response body, by route template.",
+    ("method", "route", "status"),
+)
+sse_streams_in_flight = Gauge(
+    "inyeon_sse_streams_in_flight", "SSE responses currently streaming."
+)
+sse_disconnects = Counter(
+    "inyeon_sse_disconnects_total", "SSE responses stopped because the client went away."
+)
+agent_run_seconds = Histogram(
+    "inyeon_agent_duration_seconds", "Agent graph runs.", ("agent", "status")
+)
+node_run_seconds = Histogram(
+    "inyeon_node_duration_seconds", "LangGraph node runs.", ("agent", "node", "status")
+)
+llm_call_seconds = Histogram(
+    "inyeon_llm_call_duration_seconds",
+    "Provider calls, including retries and backoff.",
+    ("provider", "method", "status"),
+)
+llm_retries = Counter(
+    "inyeon_llm_retries_total", "Provider calls retried, by response status.", ("provider", "status")
+)
+llm_tokens = Counter(
+    "inyeon_llm_tokens_total", "Tokens used, by model and direction.", ("model", "type")
+)
+cache_requests = Counter(
+    "inyeon_cache_requests_total", "Cache lookups by cache and result.", ("cache", "result")
+)
+job_wait_seconds = Histogram(
+    "inyeon_job_wait_seconds", "Time jobs spent queued before a worker took them.", ("kind",)
+)
+job_queue_depth = Gauge("inyeon_job_queue_depth", "Jobs waiting for a worker.")
+jobs_running = Gauge("inyeon_jobs_running", "Jobs being run by a worker.")
+embedding_seconds = Histogram(
+    "inyeon_embedding_duration_seconds", "Embedding calls.", ("op",)
+)
+vector_search_seconds = Histogram(
+    "inyeon_vector_store_duration_seconds", "Vector store queries and writes.", ("op",)
+)
@@ -0,0 +1,103 @@
+"""
+Per-node profiles for agent event streams.
+
+While a stream runs inside ``profile_nodes()``, every LangGraph node gets
+a ``NodeProfile``: its wall-clock time (from ``GraphTimer``), the time
+and number of LLM calls made in it, their tokens and its cache lookups.
+The node is read from the LangGraph run config, as for usage labels, so
+providers and caches record without knowing which node called them.
+Outside a profiled stream recording is one ContextVar lookup.
+"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from langgraph.config import get_config
+
+
+@dataclass
+class NodeProfile:
+    duration_ms: float = 0.0
+    llm_ms: float = 0.0
+    llm_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "duration_ms": round(self.duration_ms, 1),
+            "llm_ms": round(self.llm_ms, 1),
+            "llm_calls": self.llm_calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+        }
+
+
+_profiles: ContextVar[dict[str, NodeProfile] | None] = ContextVar("node_profiles", default=None)
+
+
+def node_profile(node: str, profiles: dict[str, NodeProfile] | None = None) -> NodeProfile | None:
+    """The profile for ``node`` in the given (or the active) run, created on first use."""
+    if profiles is None:
+        profiles = _profiles.get()
+        if profiles is None:
+            return None
+    profile = profiles.get(node)
+    if profile is None:
+        profile = profiles[node] = NodeProfile()
+    return profile
+
+
+def _current() -> NodeProfile | None:
+    if _profiles.get() is None:
+        return None
+    try:
+        node = get_config().get("metadata", {}).get("langgraph_node")
+    except RuntimeError:
+        return None
+    return node_profile(node) if node else None
+
+
+def record_llm_call(seconds: float) -> None:
+    profile = _current()
+    if profile is not None:
+        profile.llm_ms += seconds * 1000
+        profile.llm_calls += 1
+
+
+def record_tokens(prompt_tokens: int, completion_tokens: int) -> None:
+    profile = _current()
+    if profile is not None:
+        profile.prompt_tokens += prompt_tokens
+        profile.completion_tokens += completion_tokens
+
+
+def record_cache(hit: bool) -> None:
+    profile = _current()
+    if profile is not None:
+        if hit:
+            profile.cache_hits += 1
+        else:
+            profile.cache_misses += 1
+
+
+@contextmanager
+def profile_nodes() -> Iterator[dict[str, NodeProfile]]:
+    """Profile the nodes run inside the block; yields profiles by node name."""
+    profiles: dict[str, NodeProfile] = {}
+    token = _profiles.set(profiles)
+    try:
+        yield profiles
+    finally:
+        try:
+            _profiles.reset(token)
+        except ValueError:
+            # Async generators can be closed from another context
+            pass
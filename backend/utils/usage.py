@@ -0,0 +1,252 @@
+"""
+Token counting and LLM usage accounting.
+
+- Offline token estimates per provider family, with a registry so a real
+  tokenizer can be plugged in (``register_tokenizer``). OpenAI uses
+  tiktoken when it is installed and its encoding can be loaded.
+- Providers report what each call used with ``record_usage``, taken from
+  the response (``usage``, ``usage_metadata``, ``eval_count``) or estimated
+  when the response has no counts.
+- Usage is aggregated per request (``track_usage``), per agent and per
+  LangGraph node, and process-wide in ``usage_metrics`` for ``/metrics``.
+"""
+
+import math
+import threading
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from langgraph.config import get_config
+
+from backend.models.events import EventType, StreamEvent
+from backend.utils.metrics import llm_tokens
+from backend.utils.profiling import record_tokens
+
+Tokenizer = Callable[[str], int]
+
+# Rough characters per token for code-heavy prompts
+_CHARS_PER_TOKEN = {
+    "openai": 4.0,
+    "gemini": 4.0,
+    "ollama": 3.5,
+}
+_DEFAULT_CHARS_PER_TOKEN = 4.0
+
+_tokenizers: dict[str, Tokenizer] = {}
+
+
+def _ratio_tokenizer(chars_per_token: float) -> Tokenizer:
+    def count(text: str) -> int:
+        return math.ceil(len(text) / chars_per_token)
+
+    return count
+
+
+def _tiktoken_tokenizer() -> Tokenizer | None:
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        encoding = tiktoken.get_encoding("o200k_base")
+    except Exception:
+        # The BPE file is downloaded on first use, which fails offline
+        return None
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+def register_tokenizer(family: str, tokenizer: Tokenizer) -> None:
+    """Use ``tokenizer`` for every count in ``family`` (e.g. "openai")."""
+    _tokenizers[family] = tokenizer
+
+
+def get_tokenizer(family: str | None = None) -> Tokenizer:
+    """Token counter for a provider family; unknown families get chars / 4."""
+    family = family or ""
+    tokenizer = _tokenizers.get(family)
+    if tokenizer is None:
+        tokenizer = (family == "openai" and _tiktoken_tokenizer()) or _ratio_tokenizer(
+            _CHARS_PER_TOKEN.get(family, _DEFAULT_CHARS_PER_TOKEN)
+        )
+        _tokenizers[family] = tokenizer
+    return tokenizer
+
+
+def count_tokens(text: str, family: str | None = None) -> int:
+    return get_tokenizer(family)(text)
+
+
+@dataclass
+class TokenUsage:
+    """Token counts for one or more LLM calls."""
+
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    calls: int = 0
+    # Calls whose counts were estimated because the response had none
+    estimated_calls: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def add(self, other: "TokenUsage") -> None:
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.calls += other.calls
+        self.estimated_calls += other.estimated_calls
+
+    def to_dict(self) -> dict[str, int]:
+        return {**asdict(self), "total_tokens": self.total_tokens}
+
+
+def _add(table: dict[str, TokenUsage], key: str, usage: TokenUsage) -> None:
+    if key not in table:
+        table[key] = TokenUsage()
+    table[key].add(usage)
+
+
+class UsageTracker:
+    """Usage of one request, broken down by agent and by node."""
+
+    def __init__(self):
+        self.total = TokenUsage()
+        self.by_agent: dict[str, TokenUsage] = {}
+        self.by_node: dict[str, TokenUsage] = {}
+
+    def add(self, usage: TokenUsage, agent: str, node: str) -> None:
+        self.total.add(usage)
+        _add(self.by_agent, agent, usage)
+        _add(self.by_node, f"{agent}.{node}", usage)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            **self.total.to_dict(),
+            "by_agent": {k: v.to_dict() for k, v in self.by_agent.items()},
+            "by_node": {k: v.to_dict() for k, v in self.by_node.items()},
+        }
+
+
+class UsageMetrics:
+    """Process-wide usage totals, safe to update from any thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests = 0
+            self.total = TokenUsage()
+            self.by_model: dict[str, TokenUsage] = {}
+            self.by_agent: dict[str, TokenUsage] = {}
+            self.by_node: dict[str, TokenUsage] = {}
+
+    def add(self, usage: TokenUsage, model: str, agent: str, node: str) -> None:
+        with self._lock:
+            self.total.add(usage)
+            _add(self.by_model, model, usage)
+            _add(self.by_agent, agent, usage)
+            _add(self.by_node, f"{agent}.{node}", usage)
+
+    def request_finished(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                **self.total.to_dict(),
+                "by_model": {k: v.to_dict() for k, v in self.by_model.items()},
+                "by_agent": {k: v.to_dict() for k, v in self.by_agent.items()},
+                "by_node": {k: v.to_dict() for k, v in self.by_node.items()},
+            }
+
+
+usage_metrics = UsageMetrics()
+
+_tracker: ContextVar[UsageTracker | None] = ContextVar("usage_tracker", default=None)
+_agent: ContextVar[str | None] = ContextVar("usage_agent", default=None)
+
+
+def _labels() -> tuple[str, str]:
+    """(agent, node) for the current call, from the LangGraph run config."""
+    try:
+        metadata = get_config().get("metadata", {})
+    except RuntimeError:
+        metadata = {}
+    agent = metadata.get("agent") or _agent.get() or "unknown"
+    return agent, metadata.get("langgraph_node") or "-"
+
+
+def record_usage(
+    provider: str,
+    model: str,
+    prompt_tokens: int | None,
+    completion_tokens: int | None,
+    prompt: str = "",
+    completion: str = "",
+) -> TokenUsage:
+    """Record one LLM call; missing counts are estimated from the texts."""
+    estimated = not isinstance(prompt_tokens, int) or not isinstance(completion_tokens, int)
+    if not isinstance(prompt_tokens, int):
+        prompt_tokens = count_tokens(prompt, provider)
+    if not isinstance(completion_tokens, int):
+        completion_tokens = count_tokens(completion, provider)
+
+    usage = TokenUsage(
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        calls=1,
+        estimated_calls=int(estimated),
+    )
+    agent, node = _labels()
+    tracker = _tracker.get()
+    if tracker is not None:
+        tracker.add(usage, agent, node)
+    usage_metrics.add(usage, f"{provider}/{model}", agent, node)
+    llm_tokens.inc(prompt_tokens, model=f"{provider}/{model}", type="prompt")
+    llm_tokens.inc(completion_tokens, model=f"{provider}/{model}", type="completion")
+    record_tokens(prompt_tokens, completion_tokens)
+    return usage
+
+
+@contextmanager
+def track_usage(agent: str | None = None) -> Iterator[UsageTracker]:
+    """Collect the usage of every LLM call made inside the block.
+
+    Nested blocks share the outermost tracker, so a request that runs
+    several agents reports one total; ``agent`` labels calls made outside
+    a LangGraph run.
+    """
+    outer = _tracker.get()
+    tracker = outer if outer is not None else UsageTracker()
+    tracker_token = _tracker.set(tracker)
+    agent_token = _agent.set(agent) if agent else None
+    try:
+        yield tracker
+    finally:
+        if outer is None:
+            usage_metrics.request_finished()
+        try:
+            _tracker.reset(tracker_token)
+            if agent_token is not None:
+                _agent.reset(agent_token)
+        except ValueError:
+            # Async generators can be closed from another context
+            pass
+
+
+async def with_usage(
+    events: AsyncIterator[StreamEvent], agent: str | None = None
+) -> AsyncIterator[StreamEvent]:
+    """Track usage over an event stream and add it to the RESULT event."""
+    with track_usage(agent) as tracker:
+        async for event in events:
+            if event.event == EventType.RESULT:
+                event.data = {**event.data, "usage": tracker.to_dict()}
+            yield event
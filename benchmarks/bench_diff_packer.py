@@ -0,0 +1,95 @@
+"""
+Time the token-budgeted diff packer on large diffs.
+
+Builds a synthetic diff that mixes source files, a lockfile bump and
+generated code (the shape that used to push source changes out of the
+prompt), packs it into typical provider budgets and reports the time per
+pack and how much of the source changes made it in.
+
+Usage:
+    python benchmarks/bench_diff_packer.py [--lines 100000] [--repeat 5]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.diff import DiffParser, pack_diff  # noqa: E402
+from backend.diff.packer import file_priority  # noqa: E402
+
+BUDGETS = (6_000, 20_000, 60_000)
+
+
+def _file(path: str, hunks: int, hunk_lines: int) -> list[str]:
+    parts = [
+        f"diff --git a/{path} b/{path}\n"
+        f"index 1234567..89abcde 100644\n--- a/{path}\n+++ b/{path}\n"
+    ]
+    for h in range(hunks):
+        start = 1 + h * 100
+        context = hunk_lines // 2
+        changed = (hunk_lines - context) // 2
+        parts.append(
+            f"@@ -{start},{context + changed} +{start},{context + changed} @@ def f_{h}():\n"
+        )
+        parts.extend(f"     value_{i} = compute({i}, {h})\n" for i in range(context))
+        parts.extend(f"-    old_{i} = legacy({i})\n" for i in range(changed))
+        parts.extend(f"+    new_{i} = modern({i})\n" for i in range(changed))
+    return parts
+
+
+def synthetic_diff(total_lines: int) -> str:
+    # A fifth lockfile, a fifth generated code, the rest source
+    parts = _file("package-lock.json", max(1, total_lines // 5 // 40), 40)
+    lines = total_lines // 5
+    file_no = 0
+    while lines < total_lines:
+        if file_no % 4 == 0:
+            path = f"dist/bundle_{file_no}.min.js"
+        else:
+            path = f"src/pkg{file_no // 20}/module_{file_no}.py"
+        hunks = 1 + file_no % 6
+        parts.extend(_file(path, hunks, 40))
+        lines += hunks * 40
+        file_no += 1
+    return "".join(parts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    text = synthetic_diff(args.lines)
+    source_files = [
+        f.path
+        for f in DiffParser().scan_stats(text).files
+        if file_priority(f.path) == 2
+    ]
+    print(
+        f"diff: {len(text) / 1_048_576:.1f} MiB, {text.count(chr(10))} lines, "
+        f"{len(source_files)} source files\n"
+    )
+    print(f"{'budget':>8} {'best':>10} {'tokens':>8} {'files in':>9} {'source in':>10}")
+
+    for budget in BUDGETS:
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            packed = pack_diff(text, budget)
+            timings.append(time.perf_counter() - started)
+
+        omitted = set(packed.files_omitted)
+        source_in = sum(1 for path in source_files if path not in omitted)
+        print(
+            f"{budget:>8} {min(timings) * 1000:>7.1f} ms {packed.tokens:>8} "
+            f"{packed.files_total - len(omitted):>9} {source_in:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Compare the compact diff model with the Pydantic ParsedDiff.
+
+Builds a synthetic diff (default ~100k lines, similar to a vendored
+dependency bump) and reports parse time, time to read every hunk's content
+the way SemanticStrategy does, and peak memory for each representation.
+When unidiff is installed it is measured too, as the previous parser.
+
+Usage:
+    python benchmarks/bench_diff_parser.py [--lines 100000]
+"""
+
+import argparse
+import io
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.diff import DiffParser  # noqa: E402
+
+
+def synthetic_diff(total_lines: int, hunk_lines: int = 40, hunks_per_file: int = 5) -> str:
+    parts = []
+    lines = 0
+    file_no = 0
+    while lines < total_lines:
+        path = f"vendor/pkg{file_no // 50}/module_{file_no}.py"
+        parts.append(
+            f"diff --git a/{path} b/{path}\n"
+            f"index 1234567..89abcde 100644\n--- a/{path}\n+++ b/{path}\n"
+        )
+        for h in range(hunks_per_file):
+            start = 1 + h * 100
+            context = hunk_lines // 2
+            changed = hunk_lines - context
+            parts.append(
+                f"@@ -{start},{context + changed // 2} +{start},{context + changed // 2} "
+                f"@@ def func_{h}():\n"
+            )
+            for i in range(context):
+                parts.append(f"     value_{i} = compute({i}, {h})\n")
+            for i in range(changed // 2):
+                parts.append(f"-    old_{i} = legacy({i})\n")
+            for i in range(changed // 2):
+                parts.append(f"+    new_{i} = modern({i})\n")
+            lines += hunk_lines
+        file_no += 1
+    return "".join(parts)
+
+
+def measure(label: str, fn, repeat: int = 3) -> None:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+
+    # Memory is traced in a separate run so tracing does not skew timings.
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    print(f"{label:<32} {min(timings) * 1000:>9.1f} ms {peak / 1_048_576:>9.1f} MiB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, default=100_000)
+    args = parser.parse_args()
+
+    text = synthetic_diff(args.lines)
+    diff_parser = DiffParser()
+    print(f"diff: {len(text) / 1_048_576:.1f} MiB, {text.count(chr(10))} lines\n")
+
+    def model_with_content():
+        parsed = diff_parser.parse(text)
+        for _, hunk in parsed.get_all_hunks():
+            hunk.content
+        return parsed
+
+    def compact_with_content():
+        parsed = diff_parser.parse_compact(text)
+        for _, hunk in parsed.get_all_hunks():
+            hunk.content
+        return parsed
+
+    try:
+        from unidiff import PatchSet
+    except ImportError:
+        pass
+    else:
+        measure("unidiff PatchSet", lambda: PatchSet.from_string(text))
+
+    measure("pydantic parse", lambda: diff_parser.parse(text))
+    measure("compact parse", lambda: diff_parser.parse_compact(text))
+    measure("pydantic parse + content", model_with_content)
+    measure("compact parse + content", compact_with_content)
+    measure(
+        "compact streaming",
+        lambda: sum(1 for _ in diff_parser.iter_compact(io.StringIO(text))),
+    )
+
+
+if __name__ == "__main__":
+    main()
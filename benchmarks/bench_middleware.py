@@ -0,0 +1,196 @@
+"""
+Load-test the API middleware: BaseHTTPMiddleware vs. plain ASGI.
+
+Serves two otherwise identical apps with uvicorn on localhost, each
+behind API-key and rate-limit middleware: one with the BaseHTTPMiddleware
+versions the API used to ship (reproduced below), one with the current
+ASGI middleware from backend.main. Both get --requests JSON requests at
+--concurrency in flight and --streams concurrent SSE streams. Reports the
+request latency (p50/p95) and throughput, and the SSE time to first event
+and to the last event.
+
+Usage:
+    python benchmarks/bench_middleware.py [--requests 2000] [--concurrency 50] [--streams 50]
+"""
+
+import argparse
+import asyncio
+import hmac
+import socket
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+from fastapi import FastAPI, Request  # noqa: E402
+from fastapi.responses import StreamingResponse  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+from starlette.responses import JSONResponse  # noqa: E402
+
+from backend.core.config import settings  # noqa: E402
+from backend.core.rate_limit import MemoryBackend, RateLimiter  # noqa: E402
+from backend.main import APIKeyMiddleware, RateLimitMiddleware  # noqa: E402
+
+API_KEY = "bench-key"
+HEADERS = {"X-API-Key": API_KEY}
+SSE_EVENTS = 5
+SSE_INTERVAL = 0.02
+
+
+class LegacyAPIKeyMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        if request.method == "OPTIONS" or request.url.path in APIKeyMiddleware.OPEN_PATHS:
+            return await call_next(request)
+        key = request.headers.get("X-API-Key", "")
+        if not hmac.compare_digest(key, settings.api_key):
+            return JSONResponse(status_code=401, content={"detail": "Invalid or missing API key"})
+        return await call_next(request)
+
+
+class LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+    def __init__(self, app, limiter: RateLimiter):
+        super().__init__(app)
+        self.limiter = limiter
+
+    async def dispatch(self, request: Request, call_next):
+        if request.method == "OPTIONS" or not request.url.path.startswith("/api/"):
+            return await call_next(request)
+        decision = await self.limiter.check(
+            request.url.path, request.client.host, request.headers.get("X-API-Key")
+        )
+        if not decision.allowed:
+            return JSONResponse(
+                status_code=429,
+                content={"detail": "Rate limit exceeded"},
+                headers={"Retry-After": str(decision.retry_after)},
+            )
+        response = await call_next(request)
+        response.headers["X-RateLimit-Remaining"] = str(decision.remaining)
+        return response
+
+
+def build_app(api_key_middleware, rate_limit_middleware) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(api_key_middleware)
+    # High enough that the benchmark measures overhead, not 429s
+    app.add_middleware(
+        rate_limit_middleware, limiter=RateLimiter(MemoryBackend(), rpm=10_000_000)
+    )
+
+    @app.get("/api/v1/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.get("/api/v1/stream")
+    async def stream():
+        async def events():
+            for i in range(SSE_EVENTS):
+                if i:
+                    await asyncio.sleep(SSE_INTERVAL)
+                yield f"event: progress\ndata: {i}\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def serve(app: FastAPI) -> tuple[uvicorn.Server, threading.Thread, str]:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="off")
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, thread, f"http://127.0.0.1:{port}"
+
+
+async def load_json(base_url: str, requests: int, concurrency: int) -> tuple[list[float], float]:
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, headers=HEADERS, limits=limits) as client:
+        async def one() -> None:
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get("/api/v1/ping")
+                latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+
+        await client.get("/api/v1/ping")
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+    return latencies, elapsed
+
+
+async def load_sse(base_url: str, streams: int) -> tuple[list[float], list[float]]:
+    first, last = [], []
+    limits = httpx.Limits(max_connections=streams)
+
+    async with httpx.AsyncClient(
+        base_url=base_url, headers=HEADERS, limits=limits, timeout=30
+    ) as client:
+        async def one() -> None:
+            started = time.perf_counter()
+            seen = 0
+            async with client.stream("GET", "/api/v1/stream") as response:
+                async for chunk in response.aiter_text():
+                    if seen == 0:
+                        first.append(time.perf_counter() - started)
+                    seen += chunk.count("event: ")
+            last.append(time.perf_counter() - started)
+            assert seen == SSE_EVENTS, seen
+
+        await asyncio.gather(*(one() for _ in range(streams)))
+    return first, last
+
+
+def percentile(values: list[float], q: int) -> float:
+    return statistics.quantiles(values, n=100)[q - 1] * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--streams", type=int, default=50)
+    args = parser.parse_args()
+
+    settings.api_key = API_KEY
+    print(
+        f"{'middleware':<18} {'p50':>8} {'p95':>8} {'req/s':>8}"
+        f" {'SSE first p50':>14} {'p95':>8} {'SSE last p50':>13}"
+    )
+    for label, key_mw, limit_mw in (
+        ("BaseHTTPMiddleware", LegacyAPIKeyMiddleware, LegacyRateLimitMiddleware),
+        ("pure ASGI", APIKeyMiddleware, RateLimitMiddleware),
+    ):
+        server, thread, base_url = serve(build_app(key_mw, limit_mw))
+        try:
+            latencies, elapsed = asyncio.run(
+                load_json(base_url, args.requests, args.concurrency)
+            )
+            first, last = asyncio.run(load_sse(base_url, args.streams))
+        finally:
+            server.should_exit = True
+            thread.join()
+        print(
+            f"{label:<18} {percentile(latencies, 50):>5.2f} ms {percentile(latencies, 95):>5.2f} ms"
+            f" {args.requests / elapsed:>8.0f}"
+            f" {percentile(first, 50):>11.2f} ms {percentile(first, 95):>5.2f} ms"
+            f" {percentile(last, 50):>10.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Compare SemanticStrategy's agglomerative and kNN-graph modes.
+
+Uses synthetic embeddings (noisy copies of a few hundred topic vectors)
+so no embedding API is called, and reports time, peak traced memory,
+number of groups and the adjusted Rand index against the true topics.
+Agglomerative clustering is skipped above --max-agglomerative hunks, where
+its O(n^2) distance matrix gets too large.
+
+Usage:
+    python benchmarks/bench_semantic_clustering.py [--sizes 1000 5000 20000]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+from sklearn.metrics import adjusted_rand_score
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.clustering.semantic import SemanticStrategy  # noqa: E402
+from backend.diff import CompactDiff, CompactFile, CompactHunk, FileChangeType  # noqa: E402
+
+
+class StaticEmbeddings:
+    """Embedding service stand-in that returns precomputed vectors."""
+
+    def __init__(self, vectors: np.ndarray):
+        self.vectors = vectors
+
+    async def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        return self.vectors[: len(texts)]
+
+
+def synthetic(n: int, dims: int = 256, topics: int | None = None, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    topics = topics or max(2, n // 50)
+    centers = rng.normal(size=(topics, dims))
+    truth = rng.integers(0, topics, size=n)
+    vectors = centers[truth] + rng.normal(scale=0.35, size=(n, dims))
+
+    files = []
+    for i in range(n):
+        body = f"+change {i}\n"
+        hunk = CompactHunk(
+            id=f"src/f{i}.py:0",
+            source_start=1,
+            source_length=0,
+            target_start=1,
+            target_length=1,
+            section_header="",
+            added_count=1,
+            removed_count=0,
+            buffer=body,
+            start=0,
+            end=len(body),
+        )
+        files.append(CompactFile(f"src/f{i}.py", FileChangeType.MODIFIED, [hunk]))
+    return CompactDiff(files=files, total_added=n), vectors, truth
+
+
+def labels_of(groups, n: int) -> np.ndarray:
+    labels = np.empty(n, dtype=int)
+    for g, group in enumerate(groups):
+        for ref in group.hunks:
+            labels[int(ref.file_path[5:-3])] = g
+    return labels
+
+
+def run(label: str, strategy: SemanticStrategy, diff: CompactDiff, truth: np.ndarray) -> None:
+    started = time.perf_counter()
+    groups = asyncio.run(strategy.cluster(diff))
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    asyncio.run(strategy.cluster(diff))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    ari = adjusted_rand_score(truth, labels_of(groups, len(truth)))
+    print(
+        f"{label:<24} {elapsed * 1000:>9.0f} ms {peak / 1_048_576:>8.1f} MiB "
+        f"{len(groups):>7} {ari:>6.3f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 5_000, 20_000])
+    parser.add_argument("--max-agglomerative", type=int, default=5_000)
+    args = parser.parse_args()
+
+    print(f"{'mode':<24} {'time':>12} {'peak':>12} {'groups':>7} {'ARI':>6}")
+    for n in args.sizes:
+        diff, vectors, truth = synthetic(n)
+        service = StaticEmbeddings(vectors)
+        if n <= args.max_agglomerative:
+            run(
+                f"agglomerative n={n}",
+                SemanticStrategy(service, graph_threshold=n),
+                diff,
+                truth,
+            )
+        run(f"knn graph n={n}", SemanticStrategy(service, graph_threshold=0), diff, truth)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Time split execution: hunk patches vs. file-level staging.
+
+Builds a throwaway repository where every group owns a few files and one
+hunk of a file shared by all groups, stages the changes and commits them
+as --groups commits twice: once the old way (reset the index, `git add`
+the group's files, commit) and once with IndexPatcher (one
+`git apply --cached` per group on a single index snapshot). Reports the
+total time, the time per group and whether the shared file's hunks ended
+up in the commits that own them.
+
+Usage:
+    python benchmarks/bench_split_apply.py [--groups 50] [--files-per-group 4]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cli.git_utils import (  # noqa: E402
+    IndexPatcher,
+    create_commit,
+    run_git,
+    stage_files,
+    unstage_all,
+)
+
+FILE_LINES = 200
+SHARED_STRIDE = 10
+
+
+def _write(path: Path, lines: list[str]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("".join(lines))
+
+
+def build_repo(root: Path, groups: int, files_per_group: int) -> list[dict]:
+    def git(*args: str) -> None:
+        subprocess.run(["git", *args], cwd=root, check=True, capture_output=True)
+
+    git("init", "-q")
+    git("config", "user.email", "bench@example.com")
+    git("config", "user.name", "bench")
+    git("config", "commit.gpgsign", "false")
+
+    base = [f"value_{i} = {i}\n" for i in range(FILE_LINES)]
+    shared = [f"shared_{i} = {i}\n" for i in range(groups * SHARED_STRIDE)]
+    for g in range(groups):
+        for f in range(files_per_group):
+            _write(root / f"pkg_{g}" / f"mod_{f}.py", base)
+    _write(root / "shared.py", shared)
+    git("add", ".")
+    git("commit", "-q", "-m", "base")
+
+    changed = [
+        f"value_{i} = {i} + 1\n" if i % 25 == 0 else line for i, line in enumerate(base)
+    ]
+    for g in range(groups):
+        for f in range(files_per_group):
+            _write(root / f"pkg_{g}" / f"mod_{f}.py", changed)
+    _write(
+        root / "shared.py",
+        [
+            f"shared_{i} = {i} * 2\n" if i % SHARED_STRIDE == 0 else line
+            for i, line in enumerate(shared)
+        ],
+    )
+    git("add", ".")
+
+    return [
+        {
+            "commit_message": f"feat: group {g}",
+            "files": [f"pkg_{g}/mod_{f}.py" for f in range(files_per_group)] + ["shared.py"],
+            "hunks": [
+                {
+                    "file_path": "shared.py",
+                    "source_start": g * SHARED_STRIDE + 1,
+                    "source_length": 1,
+                }
+            ],
+        }
+        for g in range(groups)
+    ]
+
+
+def run_file_level(splits: list[dict], diff: str) -> None:
+    for split in splits:
+        unstage_all()
+        stage_files(split["files"])
+        create_commit(split["commit_message"])
+
+
+def run_hunk_level(splits: list[dict], diff: str) -> None:
+    patcher = IndexPatcher(diff)
+    patcher.reset_index()
+    for split in splits:
+        patcher.commit(split["commit_message"], split["files"], split["hunks"])
+
+
+def shared_hunks_in_owner(groups: int) -> int:
+    """Commits whose shared.py change is exactly their own hunk."""
+    stdout, _, _ = run_git(["log", "--format=%s", "-p", f"-{groups}", "--", "shared.py"])
+    return sum(
+        1 for chunk in stdout.split("feat: group ")[1:] if chunk.count("\n+shared_") == 1
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--groups", type=int, default=50)
+    parser.add_argument("--files-per-group", type=int, default=4)
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    print(f"{'mode':<12} {'total':>10} {'per group':>11} {'shared hunks in owner':>22}")
+    for label, run in (("file-level", run_file_level), ("hunk-level", run_hunk_level)):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            splits = build_repo(root, args.groups, args.files_per_group)
+            os.chdir(root)
+            try:
+                diff, _, _ = run_git(["diff", "--cached"])
+                started = time.perf_counter()
+                run(splits, diff)
+                elapsed = time.perf_counter() - started
+                owned = shared_hunks_in_owner(args.groups)
+            finally:
+                os.chdir(cwd)
+        print(
+            f"{label:<12} {elapsed * 1000:>7.0f} ms {elapsed * 1000 / args.groups:>8.1f} ms "
+            f"{owned:>15}/{args.groups}"
+        )
+
+
+if __name__ == "__main__":
+    main()
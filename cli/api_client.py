@@ -1,5 +1,6 @@
 import json
-from collections.abc import Iterator
+import zlib
+from collections.abc import Iterable, Iterator
 
 import httpx
 
@@ -26,9 +27,19 @@ class APIClient:
         self._max_diff = settings.max_diff_chars
 
     def _truncate_diff(self, diff: str) -> str:
+        """Pack the diff into the provider's token budget.
+
+        The budget never exceeds ``max_diff_chars`` so the request stays under
+        the server's size limit.
+        """
         if len(diff) <= self._max_diff:
             return diff
-        return diff[: self._max_diff]
+
+        from backend.diff.packer import pack_diff
+        from backend.utils.cost import diff_token_budget
+
+        budget = min(diff_token_budget(self._provider), self._max_diff // 4)
+        return pack_diff(diff, budget).text
 
     def _request(self, method: str, endpoint: str, **kwargs) -> dict:
         url = f"{self.base_url}{endpoint}"
@@ -99,6 +110,56 @@ class APIClient:
         except Exception as e:
             raise APIError(f"Streaming request failed: {e}")
 
+    def _stream_ndjson(self, endpoint: str, **kwargs) -> Iterator[dict]:
+        """POST and yield each line of an NDJSON response as it arrives."""
+        url = f"{self.base_url}{endpoint}"
+        headers = kwargs.pop("headers", {})
+        if self._api_key:
+            headers["X-API-Key"] = self._api_key
+        if self._provider:
+            headers["X-LLM-Provider"] = self._provider
+
+        try:
+            with httpx.Client(timeout=self.timeout, follow_redirects=True) as client:
+                with client.stream("POST", url, headers=headers, **kwargs) as response:
+                    if response.is_error:
+                        response.read()
+                    response.raise_for_status()
+                    for line in response.iter_lines():
+                        if line.strip():
+                            yield json.loads(line)
+        except httpx.TimeoutException:
+            raise APIError(f"Request timed out after {self.timeout}s")
+        except httpx.HTTPStatusError as e:
+            try:
+                detail = e.response.json().get("detail", e.response.text)
+            except Exception:
+                detail = e.response.text
+            raise APIError(f"API error ({e.response.status_code}): {detail}")
+        except httpx.ConnectError:
+            raise APIError(f"Cannot connect to backend at {self.base_url}")
+        except APIError:
+            raise
+        except Exception as e:
+            raise APIError(f"Streaming request failed: {e}")
+
+    def _encode_ndjson_gzip(
+        self, records: Iterable[dict], chunk_size: int = 64 * 1024
+    ) -> Iterator[bytes]:
+        """Gzip-compress records as NDJSON, yielding bounded-size chunks."""
+        compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+        pending = b""
+        for record in records:
+            pending += compressor.compress(
+                json.dumps(record).encode("utf-8") + b"\n"
+            )
+            if len(pending) >= chunk_size:
+                yield pending
+                pending = b""
+        pending += compressor.flush()
+        if pending:
+            yield pending
+
     def generate_commit_stream(
         self, diff: str, repo_path: str = ".", issue_ref: str | None = None
     ) -> Iterator[dict]:
@@ -176,18 +237,50 @@ class APIClient:
         payload = {"diff": self._truncate_diff(diff), "repo_path": repo_path, "verbose": verbose}
         return self._request("POST", "/api/v1/agent/run", json=payload)
 
-    def review(self, diff: str) -> dict:
-        payload = {"diff": self._truncate_diff(diff)}
+    def review(self, diff: str, analysis_id: str | None = None) -> dict:
+        payload: dict = {"diff": self._truncate_diff(diff)}
+        if analysis_id:
+            payload["analysis_id"] = analysis_id
         return self._request("POST", "/api/v1/agent/review", json=payload)
 
+    def diff_analysis(self, diff: str) -> dict:
+        payload = {"diff": self._truncate_diff(diff)}
+        return self._request("POST", "/api/v1/agent/analysis", json=payload)
+
     def rag_index(self, repo_id: str, files: dict[str, str]) -> dict:
         payload = {"repo_id": repo_id, "files": files}
         return self._request("POST", "/api/v1/rag/index", json=payload)
 
+    def rag_index_stream(
+        self, repo_id: str, files: Iterable[tuple[str, str]]
+    ) -> dict:
+        """Upload files as a gzip-compressed NDJSON stream.
+
+        ``files`` is consumed lazily while the body is sent, so only one
+        compressed chunk is held in memory at a time regardless of repo size.
+        """
+        records = ({"path": path, "content": content} for path, content in files)
+        return self._request(
+            "POST",
+            "/api/v1/rag/index/stream",
+            params={"repo_id": repo_id},
+            headers={
+                "Content-Type": "application/x-ndjson",
+                "Content-Encoding": "gzip",
+            },
+            content=self._encode_ndjson_gzip(records),
+        )
+
     def rag_search(self, repo_id: str, query: str, n_results: int = 5) -> dict:
         payload = {"repo_id": repo_id, "query": query, "n_results": n_results}
         return self._request("POST", "/api/v1/rag/search", json=payload)
 
+    def rag_search_batch(
+        self, repo_id: str, queries: list[str], n_results: int = 5
+    ) -> dict:
+        payload = {"repo_id": repo_id, "queries": queries, "n_results": n_results}
+        return self._request("POST", "/api/v1/rag/search/batch", json=payload)
+
     def rag_stats(self, repo_id: str) -> dict:
         payload = {"repo_id": repo_id}
         return self._request("POST", "/api/v1/rag/stats", json=payload)
@@ -202,6 +295,7 @@ class APIClient:
         commits: list[dict[str, str]] | None = None,
         branch_name: str = "",
         base_branch: str = "main",
+        analysis_id: str | None = None,
     ) -> dict:
         payload = {
             "diff": self._truncate_diff(diff),
@@ -209,6 +303,8 @@ class APIClient:
             "branch_name": branch_name,
             "base_branch": base_branch,
         }
+        if analysis_id:
+            payload["analysis_id"] = analysis_id
         return self._request("POST", "/api/v1/agent/pr", json=payload)
 
     def split_diff(
@@ -224,6 +320,20 @@ class APIClient:
         }
         return self._request("POST", "/api/v1/agent/split", json=payload)
 
+    def batch(self, tasks: list[dict]) -> Iterator[dict]:
+        """Run many agent tasks in one request; yields result lines as they finish.
+
+        Each task is ``{"agent": ..., "input": {...}, "id": optional}``.
+        The last line has ``"type": "summary"``.
+        """
+        packed = []
+        for task in tasks:
+            task_input = dict(task.get("input", {}))
+            if "diff" in task_input:
+                task_input["diff"] = self._truncate_diff(task_input["diff"])
+            packed.append({**task, "input": task_input})
+        return self._stream_ndjson("/api/v1/batch", json={"tasks": packed})
+
     def resolve_conflicts(self, conflicts: list[dict[str, str]]) -> dict:
         payload = {"conflicts": conflicts}
         return self._request("POST", "/api/v1/agent/resolve", json=payload)
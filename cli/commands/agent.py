@@ -5,6 +5,7 @@ from rich.panel import Panel
 from rich.prompt import Confirm
 
 from cli.api_client import APIClient, APIError
+from cli.config import settings
 from cli.display import render_stream
 from cli.git_utils import (
     is_git_repo,
@@ -87,12 +88,12 @@ def agent(
         raise typer.Exit(1)
 
     if staged:
-        diff = get_staged_diff()
+        diff = get_staged_diff(max_chars=settings.max_read_chars)
         if not diff.strip():
             console.print("[yellow]No staged changes[/yellow]")
             raise typer.Exit(0)
     elif all_changes:
-        diff = get_all_diff()
+        diff = get_all_diff(max_chars=settings.max_read_chars)
         if not diff.strip():
             console.print("[yellow]No uncommitted changes[/yellow]")
             raise typer.Exit(0)
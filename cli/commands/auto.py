@@ -10,7 +10,9 @@ from cli.api_client import APIClient
 from cli.git_utils import (
     is_git_repo,
     get_staged_diff,
+    get_staged_stats,
     get_all_diff,
+    get_all_stats,
     get_current_branch,
     get_branch_commits,
     stage_files,
@@ -56,6 +58,8 @@ def auto(
         console.print("[yellow]No changes to process[/yellow]")
         raise typer.Exit(0)
 
+    stats = get_staged_stats() if staged else get_all_stats()
+
     branch_name = get_current_branch()
     commits = get_branch_commits(base_branch)
 
@@ -70,24 +74,33 @@ def auto(
     pipeline = Pipeline(backend)
 
     with console.status("[bold blue]Running pipeline..."):
-        result = pipeline.run(
-            diff=diff,
-            commits=commits,
-            branch_name=branch_name,
-            base_branch=base_branch,
-            skip_review=no_review,
-            skip_pr=no_pr,
-        )
+        try:
+            result = pipeline.run(
+                diff=diff,
+                commits=commits,
+                branch_name=branch_name,
+                base_branch=base_branch,
+                skip_review=no_review,
+                skip_pr=no_pr,
+                stats=stats,
+            )
+        finally:
+            if local:
+                backend.close()
 
     if json_output:
         console.print(json.dumps({
             "steps_completed": result.steps_completed,
             "steps_skipped": result.steps_skipped,
+            "steps_cancelled": result.steps_cancelled,
             "splits": result.splits,
             "commit_message": result.commit_message,
             "review": result.review,
             "pr_description": result.pr_description,
+            "analysis_id": result.analysis_id,
             "error": result.error,
+            "timings": result.timings,
+            "elapsed": result.elapsed,
         }, indent=2))
         raise typer.Exit(0 if not result.error else 1)
 
@@ -116,8 +129,14 @@ def auto(
 def _display_result(result: PipelineResult) -> None:
     completed = ", ".join(result.steps_completed) or "none"
     skipped = ", ".join(result.steps_skipped) or "none"
+    timings = ", ".join(
+        f"{step} {result.timings[step]:.1f}s"
+        for step in result.steps_completed
+        if step in result.timings
+    )
     console.print(Panel(
-        f"[green]Completed:[/green] {completed}\n[dim]Skipped:[/dim] {skipped}",
+        f"[green]Completed:[/green] {completed}\n[dim]Skipped:[/dim] {skipped}\n"
+        f"[dim]Time:[/dim] {result.elapsed:.1f}s" + (f" ({timings})" if timings else ""),
         title="Pipeline Result",
         border_style="green",
     ))
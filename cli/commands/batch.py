@@ -0,0 +1,124 @@
+import json
+import sys
+
+import typer
+from rich.console import Console
+from rich.markup import escape
+
+from cli.api_client import APIClient, APIError
+from cli.config import settings
+from cli.git_utils import get_commit_diff, get_commits_between, is_git_repo
+
+
+app = typer.Typer(help="Run many agent tasks in one request")
+console = Console()
+
+
+def _load_tasks(path: str) -> list[dict]:
+    """Tasks from a JSON array or a JSONL file ('-' reads stdin)."""
+    if path == "-":
+        text = sys.stdin.read()
+    else:
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+    text = text.strip()
+    if text.startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def _commit_tasks(revision_range: str, agent: str) -> list[dict]:
+    """One task per commit in ``from..to``, keyed by the commit hash."""
+    from_ref, _, to_ref = revision_range.partition("..")
+    tasks = []
+    for commit in get_commits_between(from_ref, to_ref or "HEAD"):
+        diff = get_commit_diff(commit["hash"], max_chars=settings.max_read_chars)
+        if diff.strip():
+            tasks.append({"agent": agent, "id": commit["hash"], "input": {"diff": diff}})
+    return tasks
+
+
+def _describe(line: dict) -> str:
+    result = line.get("result") or {}
+    if line["agent"] == "commit":
+        return (result.get("commit_message") or "").split("\n", 1)[0]
+    if line["agent"] == "review":
+        review = result.get("review") or {}
+        return f"{review.get('quality_score', '?')}/10 {review.get('summary', '')}"
+    if line["agent"] == "pr":
+        return (result.get("pr_description") or {}).get("title", "")
+    if line["agent"] == "split":
+        return f"{len(result.get('splits') or [])} groups"
+    return "done"
+
+
+@app.callback(invoke_without_command=True)
+def batch(
+    ctx: typer.Context,
+    tasks_file: str = typer.Option(
+        None, "--file", "-f", help="JSON array or JSONL of {agent, input, id} tasks ('-' for stdin)"
+    ),
+    commits: str = typer.Option(
+        None, "--commits", "-c", help="One task per commit in a range, e.g. HEAD~20..HEAD"
+    ),
+    agent: str = typer.Option(
+        "review", "--agent", "-a", help="Agent for --commits tasks (commit or review)"
+    ),
+    json_output: bool = typer.Option(False, "--json", "-j", help="Print result lines as NDJSON"),
+    api_url: str = typer.Option(None, "--api", envvar="INYEON_API_URL"),
+    provider: str = typer.Option(None, "--provider", "-p", help="LLM provider (openai, gemini, ollama)"),
+):
+    """Run many commit/review/split/... tasks in one request, printing results as they finish."""
+    if commits:
+        if agent not in ("commit", "review"):
+            console.print("[red]Error:[/red] --agent must be commit or review")
+            raise typer.Exit(1)
+        if not is_git_repo():
+            console.print("[red]Error:[/red] Not a git repository")
+            raise typer.Exit(1)
+        tasks = _commit_tasks(commits, agent)
+    elif tasks_file:
+        try:
+            tasks = _load_tasks(tasks_file)
+        except (OSError, ValueError) as e:
+            console.print(f"[red]Error:[/red] Cannot read tasks: {escape(str(e))}")
+            raise typer.Exit(1)
+    else:
+        console.print("[red]Error:[/red] Specify --file or --commits")
+        raise typer.Exit(1)
+
+    if not tasks:
+        console.print("[yellow]No tasks to run[/yellow]")
+        raise typer.Exit(0)
+
+    failed = 0
+    try:
+        client = APIClient(base_url=api_url, provider=provider)
+        for line in client.batch(tasks):
+            is_summary = line.get("type") == "summary"
+            if is_summary:
+                failed = line["failed"]
+            if json_output:
+                typer.echo(json.dumps(line))
+                continue
+            if is_summary:
+                console.print(
+                    f"\n[bold]{line['succeeded']}/{line['total']} succeeded[/bold]"
+                    f" [dim]({line['unique']} unique)[/dim]"
+                )
+                continue
+            label = escape(line.get("id") or f"#{line['index']}")
+            if line["status"] == "ok":
+                console.print(
+                    f"[green]✓[/green] {label} [dim]{line['agent']}[/dim] {escape(_describe(line))}"
+                )
+            else:
+                console.print(
+                    f"[red]✗[/red] {label} [dim]{line['agent']}[/dim] {escape(line.get('error') or '')}"
+                )
+    except APIError as e:
+        console.print(f"[red]Error:[/red] {escape(str(e))}")
+        raise typer.Exit(1)
+
+    if failed:
+        raise typer.Exit(1)
@@ -1,11 +1,16 @@
-from pathlib import Path
+import itertools
+import mmap
+import os
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 
 import typer
 from rich.console import Console
 from rich.markup import escape
 
 from cli.api_client import APIClient, APIError
-from cli.git_utils import is_git_repo, get_repo_id, get_tracked_files
+from cli.git_utils import is_git_repo, get_repo_id, get_tracked_files_with_sizes
 
 app = typer.Typer(help="Index codebase for RAG search")
 console = Console()
@@ -72,33 +77,79 @@ INDEXABLE_EXTENSIONS = {
     ".jl",
 }
 MAX_FILE_SIZE = 50_000
+_MMAP_THRESHOLD = 16_384
+_BINARY_SNIFF_BYTES = 8_192
+_READ_WORKERS = min(32, (os.cpu_count() or 1) * 4)
 
 
 def _should_index(path: str) -> bool:
     """Check if file should be indexed."""
-    p = Path(path)
-    if p.suffix not in INDEXABLE_EXTENSIONS:
+    if os.path.splitext(path)[1] not in INDEXABLE_EXTENSIONS:
         return False
-    if any(part.startswith(".") for part in p.parts):
+    if path.startswith(".") or "/." in path:
         return False
-    if "test" in path.lower() or "spec" in path.lower():
+    lowered = path.lower()
+    if "test" in lowered or "spec" in lowered:
         return False
-    if "node_modules" in path or "venv" in path or ".venv" in path:
+    if "node_modules" in path or "venv" in path:
         return False
     return True
 
 
-def _read_file(path: str) -> str | None:
-    """Read file content if within size limit."""
+def _read_file(path: str, size: int | None = None) -> str | None:
+    """Read file content if within size limit and not binary.
+
+    Larger files are memory-mapped, and only the first few KB are scanned
+    for NUL bytes to detect binaries before anything is decoded.
+    """
+    if size is not None and size > MAX_FILE_SIZE:
+        return None
     try:
-        p = Path(path)
-        if p.stat().st_size > MAX_FILE_SIZE:
-            return None
-        return p.read_text(encoding="utf-8", errors="replace")
+        with open(path, "rb") as f:
+            actual_size = os.fstat(f.fileno()).st_size
+            if actual_size == 0 or actual_size > MAX_FILE_SIZE:
+                return None
+            if actual_size >= _MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if mm.find(b"\0", 0, _BINARY_SNIFF_BYTES) != -1:
+                        return None
+                    data = mm[:]
+            else:
+                data = f.read()
+                if b"\0" in data[:_BINARY_SNIFF_BYTES]:
+                    return None
+        return data.decode("utf-8", errors="replace")
     except Exception:
         return None
 
 
+def _read_files(
+    entries: list[tuple[str, int | None]],
+) -> Iterator[tuple[str, str]]:
+    """Read files on a thread pool, yielding (path, content) in input order.
+
+    Only a small window of reads is in flight at once, so memory stays
+    bounded while the upload consumes results.
+    """
+    window = _READ_WORKERS * 4
+    pending: deque = deque()
+
+    with ThreadPoolExecutor(max_workers=_READ_WORKERS) as pool:
+        for path, size in entries:
+            pending.append((path, pool.submit(_read_file, path, size)))
+            if len(pending) >= window:
+                done_path, future = pending.popleft()
+                content = future.result()
+                if content:
+                    yield done_path, content
+
+        while pending:
+            done_path, future = pending.popleft()
+            content = future.result()
+            if content:
+                yield done_path, content
+
+
 @app.callback(invoke_without_command=True)
 def index(
     ctx: typer.Context,
@@ -142,8 +193,11 @@ def index(
             raise typer.Exit(1)
         return
 
-    tracked_files = get_tracked_files()
-    files_to_index = [f for f in tracked_files if _should_index(f)]
+    files_to_index = [
+        (path, size)
+        for path, size in get_tracked_files_with_sizes()
+        if _should_index(path) and (size is None or size <= MAX_FILE_SIZE)
+    ]
 
     if not files_to_index:
         console.print("[yellow]No indexable files found[/yellow]")
@@ -152,22 +206,25 @@ def index(
     console.print(f"[bold]Repo:[/bold] {repo_id}")
     console.print(f"[bold]Files to index:[/bold] {len(files_to_index)}")
 
-    files_content = {}
-    console.print("[dim]Reading files...[/dim]")
-
-    for path in files_to_index:
-        content = _read_file(path)
-        if content:
-            files_content[path] = content
-
-    if not files_content:
-        console.print("[yellow]No readable files found[/yellow]")
-        raise typer.Exit(0)
-
-    console.print(f"[dim]Read {len(files_content)} files. Uploading...[/dim]")
+    def _iter_contents(status):
+        sent = 0
+        for path, content in _read_files(files_to_index):
+            sent += 1
+            status.update(
+                f"[bold blue]Uploading {sent}/{len(files_to_index)} files..."
+            )
+            yield path, content
 
     try:
-        result = client.rag_index(repo_id, files_content)
+        with console.status("[bold blue]Reading files...") as status:
+            contents = _iter_contents(status)
+            first = next(contents, None)
+            if first is None:
+                console.print("[yellow]No readable files found[/yellow]")
+                raise typer.Exit(0)
+            result = client.rag_index_stream(
+                repo_id, itertools.chain([first], contents)
+            )
     except APIError as e:
         console.print(f"[red]Error:[/red] {escape(str(e))}")
         raise typer.Exit(1)
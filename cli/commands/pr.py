@@ -7,6 +7,7 @@ from rich.panel import Panel
 from rich.markup import escape
 
 from cli.api_client import APIClient, APIError
+from cli.config import settings
 from cli.display import render_stream
 from cli.git_utils import (
     is_git_repo,
@@ -69,7 +70,7 @@ def pr(
     current = get_current_branch()
 
     if staged:
-        diff = get_staged_diff()
+        diff = get_staged_diff(max_chars=settings.max_read_chars)
         commits = []
     else:
         diff = get_branch_diff(base_branch)
@@ -6,6 +6,7 @@ from rich.markup import escape
 from rich.panel import Panel
 
 from cli.api_client import APIClient, APIError
+from cli.config import settings
 from cli.display import render_stream
 from cli.git_utils import is_git_repo, get_staged_diff, get_all_diff
 
@@ -81,12 +82,12 @@ def review(
         raise typer.Exit(1)
 
     if staged:
-        diff = get_staged_diff()
+        diff = get_staged_diff(max_chars=settings.max_read_chars)
         if not diff.strip():
             console.print("[yellow]No staged changes[/yellow]")
             raise typer.Exit(0)
     elif all_changes:
-        diff = get_all_diff()
+        diff = get_all_diff(max_chars=settings.max_read_chars)
         if not diff.strip():
             console.print("[yellow]No uncommitted changes[/yellow]")
             raise typer.Exit(0)
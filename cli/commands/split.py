@@ -12,6 +12,7 @@ from cli.git_utils import (
     get_staged_diff,
     get_all_diff,
     GitError,
+    IndexPatcher,
 )
 
 app = typer.Typer(help="Split changes into atomic commits")
@@ -117,17 +118,17 @@ def split(
         raise typer.Exit(0)
 
     if execute:
-        _execute_all(splits)
+        _execute_all(splits, diff)
     elif interactive:
-        _interactive_mode(splits)
+        _interactive_mode(splits, diff)
     else:
         choice = Prompt.ask(
             "\nWhat would you like to do?", choices=["e", "i", "p", "c"], default="i"
         )
         if choice == "e":
-            _execute_all(splits)
+            _execute_all(splits, diff)
         elif choice == "i":
-            _interactive_mode(splits)
+            _interactive_mode(splits, diff)
         elif choice == "p":
             console.print("[dim]Preview only - no commits created[/dim]")
         else:
@@ -166,25 +167,53 @@ def _get_type_color(commit_type: str | None) -> str:
     return colors.get(commit_type or "", "white")
 
 
-def _execute_all(splits: list) -> None:
-    from cli.git_utils import stage_files, unstage_all, create_commit
+def _start_patcher(diff: str, splits: list) -> IndexPatcher | None:
+    patcher = IndexPatcher(diff)
+    patcher.plan(split.get("hunks") or None for split in splits)
+    try:
+        patcher.reset_index()
+    except GitError as e:
+        console.print(f"[red]Error:[/red] {escape(str(e))}")
+        return None
+    return patcher
+
+
+def _report_remaining(patcher: IndexPatcher) -> None:
+    """Warn about changes no created commit includes; they stay in the working tree."""
+    left = patcher.remaining()
+    if not left:
+        return
+    console.print(
+        f"\n[yellow]{sum(left.values())} hunk(s) in {len(left)} file(s) were not committed:[/yellow]"
+    )
+    for path, count in list(left.items())[:10]:
+        console.print(f"  [dim]-[/dim] {escape(path)} [dim]({count})[/dim]")
+    if len(left) > 10:
+        console.print(f"  [dim]... and {len(left) - 10} more[/dim]")
+
+
+def _execute_all(splits: list, diff: str) -> None:
+    patcher = _start_patcher(diff, splits)
+    if patcher is None:
+        return
 
     created = 0
     for idx, split in enumerate(splits, 1):
         try:
-            unstage_all()
-            stage_files(split["files"])
-            create_commit(split["commit_message"])
+            patcher.commit(split["commit_message"], split["files"], split.get("hunks") or None)
             console.print(f"[green]✓[/green] [{idx}] {split['commit_message'][:50]}")
             created += 1
         except GitError as e:
             console.print(f"[red]✗[/red] [{idx}] Failed: {e}")
 
     console.print(f"\n[bold]Done! Created {created}/{len(splits)} commits.[/bold]")
+    _report_remaining(patcher)
 
 
-def _interactive_mode(splits: list) -> None:
-    from cli.git_utils import stage_files, unstage_all, create_commit
+def _interactive_mode(splits: list, diff: str) -> None:
+    patcher = _start_patcher(diff, splits)
+    if patcher is None:
+        return
 
     created = 0
     for idx, split in enumerate(splits, 1):
@@ -205,12 +234,11 @@ def _interactive_mode(splits: list) -> None:
             message = Prompt.ask("Enter new message", default=message)
 
         try:
-            unstage_all()
-            stage_files(split["files"])
-            create_commit(message)
+            patcher.commit(message, split["files"], split.get("hunks") or None)
             console.print("[green]✓ Commit created[/green]")
             created += 1
         except GitError as e:
             console.print(f"[red]✗ Failed: {e}[/red]")
 
     console.print(f"\n[bold]Done! Created {created}/{len(splits)} commits.[/bold]")
+    _report_remaining(patcher)
@@ -26,6 +26,9 @@ class Settings(BaseSettings):
     openai_model: str = "gpt-4.1-mini"
     ollama_timeout: int = 120
     max_diff_chars: int = 30000
+    # Upper bound on diff text read from git; the packer then fits it to
+    # max_diff_chars, so it needs more than that to choose from.
+    max_read_chars: int = 1_000_000
 
 
 def get_config_file() -> Path | None:
@@ -11,23 +11,74 @@ from rich.live import Live
 from rich.panel import Panel
 from rich.text import Text
 
+# Lines of streamed text kept on screen while a node generates
+_DRAFT_LINES = 8
+
+
+def _node_line(node: str, profile: dict, total_ms: float) -> Text:
+    """One finished node with its share of the run: time, LLM time, tokens, cache."""
+    line = Text("  ")
+    line.append("\u2713 ", style="green")
+    line.append(node)
+    duration = profile.get("duration_ms")
+    if duration is None:
+        return line
+    line.append(f"  {duration / 1000:.2f}s", style="bold")
+    if total_ms:
+        line.append(f" {duration / total_ms:>4.0%}", style="cyan")
+    details = []
+    if profile.get("llm_calls"):
+        details.append(f"LLM {profile['llm_ms'] / 1000:.2f}s x{profile['llm_calls']}")
+    tokens = profile.get("prompt_tokens", 0) + profile.get("completion_tokens", 0)
+    if tokens:
+        details.append(f"{tokens} tok")
+    lookups = profile.get("cache_hits", 0) + profile.get("cache_misses", 0)
+    if lookups:
+        details.append(f"cache {profile['cache_hits']}/{lookups}")
+    if details:
+        line.append("  " + " \u00b7 ".join(details), style="dim")
+    return line
+
 
 def render_stream(events: Iterator[dict], console: Console) -> dict | None:
     """Consume SSE events, render live progress, return final result data.
 
+    Finished nodes show their time, share of the run, LLM time, tokens and
+    cache hits when the server reports them, so the slow node stands out.
+    Text streamed by the running node (PROGRESS events with ``delta``) is
+    shown as it arrives, one field at a time, until the node completes.
     Returns the RESULT event's data dict, or None if an error occurred.
     """
-    steps: list[str] = []
+    # Reasoning/progress text, or ("node", name) for a finished node
+    steps: list[str | tuple[str, str]] = []
+    profiles: dict[str, dict] = {}
     current_node = ""
+    # The field being streamed by current_node and its text so far
+    draft_field = ""
+    draft = ""
     result_data: dict | None = None
     agent_name = ""
 
     def _build_display() -> Panel:
+        total_ms = sum(p.get("duration_ms", 0) for p in profiles.values())
         content = Text()
         for step in steps:
-            content.append(f"  {step}\n", style="dim")
+            if isinstance(step, tuple):
+                content.append_text(_node_line(step[1], profiles[step[1]], total_ms))
+                content.append("\n")
+            else:
+                content.append(f"  {step}\n", style="dim")
         if current_node:
             content.append(f"  > {current_node}...\n", style="bold cyan")
+        if draft:
+            content.append(f"    {draft_field}: ", style="cyan")
+            lines = draft.splitlines()[-_DRAFT_LINES:]
+            content.append("\n    ".join(lines) + "\n")
+        if total_ms:
+            llm_ms = sum(p.get("llm_ms", 0) for p in profiles.values())
+            content.append(
+                f"  total {total_ms / 1000:.2f}s (LLM {llm_ms / 1000:.2f}s)\n", style="bold"
+            )
         title = f"[bold]{agent_name}[/bold]" if agent_name else "Agent"
         return Panel(content, title=title, border_style="blue", expand=False)
 
@@ -41,10 +92,16 @@ def render_stream(events: Iterator[dict], console: Console) -> dict | None:
 
             elif event_type == "node_complete":
                 node = event.get("node", "")
-                if current_node:
-                    steps.append(current_node)
                 current_node = ""
-                steps.append(f"[green]\u2713[/green] {node}")
+                draft_field = draft = ""
+                if node in profiles:
+                    # A node run again (a retry loop) adds to its line
+                    previous = profiles[node]
+                    for key, value in (event.get("data") or {}).items():
+                        previous[key] = previous.get(key, 0) + value
+                else:
+                    profiles[node] = dict(event.get("data") or {})
+                    steps.append(("node", node))
                 live.update(_build_display())
 
             elif event_type == "node_start":
@@ -58,7 +115,14 @@ def render_stream(events: Iterator[dict], console: Console) -> dict | None:
                     live.update(_build_display())
 
             elif event_type == "progress":
-                msg = event.get("data", {}).get("message", "")
+                data = event.get("data", {})
+                if "delta" in data:
+                    if data.get("field", "") != draft_field:
+                        draft_field, draft = data.get("field", ""), ""
+                    draft += data["delta"]
+                    live.update(_build_display())
+                    continue
+                msg = data.get("message", "")
                 if msg:
                     steps.append(msg)
                     live.update(_build_display())
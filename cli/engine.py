@@ -3,6 +3,8 @@
 from __future__ import annotations
 
 import asyncio
+import threading
+from collections.abc import Coroutine
 from typing import Any, Protocol
 
 
@@ -11,13 +13,15 @@ class PipelineBackend(Protocol):
 
     def split_diff(self, diff: str, strategy: str = "hybrid", repo_path: str = ".") -> dict: ...
     def generate_commit(self, diff: str, issue_ref: str | None = None) -> dict: ...
-    def review(self, diff: str) -> dict: ...
+    def diff_analysis(self, diff: str) -> dict: ...
+    def review(self, diff: str, analysis_id: str | None = None) -> dict: ...
     def generate_pr(
         self,
         diff: str,
         commits: list[dict[str, str]] | None = None,
         branch_name: str = "",
         base_branch: str = "main",
+        analysis_id: str | None = None,
     ) -> dict: ...
 
 
@@ -54,21 +58,58 @@ def create_engine(
 
 
 class SyncLocalBackend:
-    """Sync wrapper around LocalEngine for Pipeline compatibility."""
+    """Sync wrapper around LocalEngine for Pipeline compatibility.
+
+    Every call runs on one event loop owned by a background thread, so
+    the provider's async HTTP client and its connection pool are reused
+    across pipeline steps. Calls may come from any thread and overlap.
+    Use it as a context manager or call ``close()`` when done.
+    """
 
     def __init__(self, engine):
         self._engine = engine
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="local-backend", daemon=True
+        )
+        self._thread.start()
+
+    def _call(self, coro: Coroutine[Any, Any, Any]) -> Any:
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def close(self) -> None:
+        """Close the engine's connections, then stop and close the loop."""
+        if self._loop.is_closed():
+            return
+        try:
+            aclose = getattr(self._engine, "aclose", None)
+            if aclose is not None:
+                self._call(aclose())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+
+    def __enter__(self) -> SyncLocalBackend:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
 
     def split_diff(self, diff: str, strategy: str = "hybrid", repo_path: str = ".") -> dict:
-        result = asyncio.run(self._engine.split_diff(diff, strategy, repo_path))
+        result = self._call(self._engine.split_diff(diff, strategy, repo_path))
         return result.data if not result.error else {"error": result.error, "splits": []}
 
     def generate_commit(self, diff: str, issue_ref: str | None = None) -> dict:
-        result = asyncio.run(self._engine.generate_commit(diff, issue_ref=issue_ref))
+        result = self._call(self._engine.generate_commit(diff, issue_ref=issue_ref))
+        return result.data if not result.error else {"error": result.error}
+
+    def diff_analysis(self, diff: str) -> dict:
+        result = self._call(self._engine.analyze_diff(diff))
         return result.data if not result.error else {"error": result.error}
 
-    def review(self, diff: str) -> dict:
-        result = asyncio.run(self._engine.review(diff))
+    def review(self, diff: str, analysis_id: str | None = None) -> dict:
+        result = self._call(self._engine.review(diff, analysis_id=analysis_id))
         return result.data if not result.error else {"error": result.error}
 
     def generate_pr(
@@ -77,8 +118,11 @@ class SyncLocalBackend:
         commits: list[dict[str, str]] | None = None,
         branch_name: str = "",
         base_branch: str = "main",
+        analysis_id: str | None = None,
     ) -> dict:
-        result = asyncio.run(
-            self._engine.generate_pr(diff, commits, branch_name, base_branch)
+        result = self._call(
+            self._engine.generate_pr(
+                diff, commits, branch_name, base_branch, analysis_id=analysis_id
+            )
         )
         return result.data if not result.error else {"error": result.error}
@@ -1,13 +1,27 @@
+import bisect
+import codecs
+import re
 import subprocess
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from functools import cached_property
 
 
 class GitError(Exception):
     pass
 
 
-def run_git(args: list[str], check: bool = False) -> tuple[str, str, int]:
+_STREAM_CHUNK_BYTES = 64 * 1024
+# Header lines kept for a file whose full section does not fit the budget
+_HEADER_LINES = 4
+
+
+def run_git(
+    args: list[str], check: bool = False, input: str | None = None
+) -> tuple[str, str, int]:
     result = subprocess.run(
         ["git"] + args,
+        input=input,
         capture_output=True,
         text=True,
         encoding="utf-8",
@@ -20,6 +34,91 @@ def run_git(args: list[str], check: bool = False) -> tuple[str, str, int]:
     return result.stdout, result.stderr, result.returncode
 
 
+def iter_git_lines(
+    args: list[str], chunk_size: int = _STREAM_CHUNK_BYTES
+) -> Iterator[str]:
+    """Yield a git command's stdout line by line as it is produced.
+
+    Output is read in fixed-size chunks and decoded incrementally, so only
+    the current line is held in memory. Closing the generator early stops
+    the git process.
+    """
+    proc = subprocess.Popen(
+        ["git"] + args, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+    )
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = ""
+    try:
+        while chunk := proc.stdout.read1(chunk_size):
+            lines = (pending + decoder.decode(chunk)).split("\n")
+            pending = lines.pop()
+            for line in lines:
+                yield line + "\n"
+        pending += decoder.decode(b"", final=True)
+        if pending:
+            yield pending
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        proc.stdout.close()
+        proc.wait()
+
+
+def read_diff_within_budget(lines: Iterable[str], max_chars: int) -> str:
+    """Join diff lines, keeping whole file sections while they fit in max_chars.
+
+    A file that does not fit is reduced to its header lines so it is still
+    listed, as ``truncate_diff`` does. Lines that cannot fit are dropped as
+    they are read, so memory stays bounded by the budget. Reading stops at
+    the first file whose header no longer fits.
+    """
+    parts: list[str] = []
+    remaining = max_chars
+    section: list[str] = []
+    section_chars = 0
+
+    def flush() -> bool:
+        nonlocal remaining
+        if section_chars <= remaining:
+            parts.extend(section)
+            remaining -= section_chars
+            return True
+        header = "".join(section[:_HEADER_LINES])
+        if not header.endswith("\n"):
+            header += "\n"
+        if len(header) <= remaining:
+            parts.append(header)
+            remaining -= len(header)
+            return True
+        return False
+
+    for line in lines:
+        if line.startswith("diff --git ") and section:
+            if not flush():
+                return "".join(parts)
+            section = []
+            section_chars = 0
+        section_chars += len(line)
+        if section_chars <= remaining or len(section) < _HEADER_LINES:
+            section.append(line)
+
+    if section:
+        flush()
+    return "".join(parts)
+
+
+def read_git_diff(args: list[str], max_chars: int | None = None) -> str:
+    """Read ``git <args>`` output, streamed and bounded by max_chars if given."""
+    if max_chars is None:
+        stdout, _, _ = run_git(args)
+        return stdout
+    lines = iter_git_lines(args)
+    try:
+        return read_diff_within_budget(lines, max_chars)
+    finally:
+        lines.close()
+
+
 def is_git_repo() -> bool:
     _, _, code = run_git(["rev-parse", "--git-dir"])
     return code == 0
@@ -40,19 +139,84 @@ def get_repo_id() -> str:
     return "unknown-repo"
 
 
-def get_staged_diff() -> str:
-    stdout, _, _ = run_git(["diff", "--cached"])
-    return stdout
+def get_staged_diff(max_chars: int | None = None) -> str:
+    return read_git_diff(["diff", "--cached"], max_chars)
 
 
-def get_unstaged_diff() -> str:
-    stdout, _, _ = run_git(["diff"])
-    return stdout
+def get_unstaged_diff(max_chars: int | None = None) -> str:
+    return read_git_diff(["diff"], max_chars)
 
 
-def get_all_diff() -> str:
-    stdout, _, _ = run_git(["diff", "HEAD"])
-    return stdout
+def get_all_diff(max_chars: int | None = None) -> str:
+    return read_git_diff(["diff", "HEAD"], max_chars)
+
+
+def get_commit_diff(ref: str, max_chars: int | None = None) -> str:
+    """The patch a single commit introduced."""
+    return read_git_diff(["show", "--format=", ref], max_chars)
+
+
+@dataclass
+class DiffFileStat:
+    """One file from `git diff --numstat` joined with `--name-status`."""
+
+    path: str
+    status: str  # A, M, D, R, C, T (similarity score dropped)
+    added: int | None  # None for binary files
+    removed: int | None
+    old_path: str | None = None
+
+    @property
+    def is_binary(self) -> bool:
+        return self.added is None
+
+
+def get_diff_stats(args: list[str]) -> list[DiffFileStat]:
+    """File inventory for ``git diff <args>`` without producing the patch.
+
+    Uses ``--numstat -z`` for line counts and ``--name-status -z`` for
+    change types; both are cheap because git never renders hunks.
+    """
+    stdout, _, code = run_git(["diff", *args, "--numstat", "-z"])
+    if code != 0:
+        return []
+
+    counts: dict[str, tuple[int | None, int | None]] = {}
+    tokens = iter(stdout.split("\0"))
+    for token in tokens:
+        if not token:
+            continue
+        added, removed, path = token.split("\t", 2)
+        if not path:
+            # Renames and copies: "<added>\t<removed>\t\0<old>\0<new>"
+            next(tokens, "")
+            path = next(tokens, "")
+        counts[path] = (
+            int(added) if added.isdigit() else None,
+            int(removed) if removed.isdigit() else None,
+        )
+
+    stdout, _, _ = run_git(["diff", *args, "--name-status", "-z"])
+    stats = []
+    tokens = iter(stdout.split("\0"))
+    for status in tokens:
+        if not status:
+            continue
+        old_path = None
+        path = next(tokens, "")
+        if status[0] in "RC":
+            old_path, path = path, next(tokens, "")
+        added, removed = counts.get(path, (0, 0))
+        stats.append(DiffFileStat(path, status[0], added, removed, old_path))
+    return stats
+
+
+def get_staged_stats() -> list[DiffFileStat]:
+    return get_diff_stats(["--cached"])
+
+
+def get_all_stats() -> list[DiffFileStat]:
+    return get_diff_stats(["HEAD"])
 
 
 def create_commit(message: str) -> bool:
@@ -70,6 +234,48 @@ def get_tracked_files() -> list[str]:
     return [f for f in stdout.strip().split("\n") if f]
 
 
+def get_tracked_files_with_sizes() -> list[tuple[str, int | None]]:
+    """List tracked files with their blob sizes from the index.
+
+    Sizes come from one or two git processes rather than a stat per file.
+    A size is None when git cannot report one (e.g. submodules).
+    """
+    stdout, _, code = run_git(["ls-files", "-z", "--format=%(objectsize)%x09%(path)"])
+    if code == 0:
+        entries = []
+        for record in stdout.split("\0"):
+            if record:
+                size, _, path = record.partition("\t")
+                entries.append((path, int(size) if size.isdigit() else None))
+        return entries
+
+    # git < 2.41 has no %(objectsize) in ls-files; resolve blob sizes in one batch
+    stdout, _, _ = run_git(["ls-files", "-z", "-s"])
+    paths: list[str] = []
+    object_ids: list[str] = []
+    seen: set[str] = set()
+    for record in stdout.split("\0"):
+        meta, _, path = record.partition("\t")
+        if not path or path in seen:
+            continue
+        seen.add(path)
+        paths.append(path)
+        object_ids.append(meta.split()[1])
+
+    if not paths:
+        return []
+
+    stdout, _, code = run_git(
+        ["cat-file", "--batch-check=%(objectsize)"],
+        input="\n".join(object_ids) + "\n",
+    )
+    sizes = stdout.split("\n") if code == 0 else []
+    return [
+        (path, int(sizes[i]) if i < len(sizes) and sizes[i].isdigit() else None)
+        for i, path in enumerate(paths)
+    ]
+
+
 def stage_files(files: list[str]) -> bool:
     if not files:
         return True
@@ -127,6 +333,303 @@ def unstage_all() -> bool:
     return result.returncode == 0
 
 
+_HUNK_RANGE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+@dataclass
+class PatchHunk:
+    """One hunk of a unified diff, kept as text so it can be re-applied."""
+
+    source_start: int
+    source_length: int
+    target_start: int
+    target_length: int
+    section: str  # the rest of the "@@" line, newline included
+    body: str
+
+    @property
+    def delta(self) -> int:
+        return self.target_length - self.source_length
+
+    @property
+    def anchor(self) -> int:
+        # "-5,0" inserts after line 5, i.e. before line 6
+        return self.source_start + (self.source_length == 0)
+
+
+@dataclass
+class FilePatch:
+    """One file section of a unified diff: its header and its hunks."""
+
+    path: str
+    header: str
+    hunks: list[PatchHunk]
+
+    @property
+    def is_binary(self) -> bool:
+        # "Binary files a/x and b/x differ" carries no data git apply could use
+        return "\nBinary files " in "\n" + self.header
+
+    @property
+    def is_lossy(self) -> bool:
+        """Not valid UTF-8: ``run_git`` replaced bytes, so the text no longer applies."""
+        return "\ufffd" in self.header or any("\ufffd" in h.body for h in self.hunks)
+
+    @property
+    def staged_whole(self) -> bool:
+        return self.is_binary or self.is_lossy
+
+    def locate(self, source_start: int, source_length: int) -> int | None:
+        """Index of the hunk covering a range reported for this file.
+
+        The range may come from a packed copy of the diff, where a hunk
+        can be cut into several smaller ones with the original line
+        numbers; each of them maps back to the hunk it was cut from.
+        """
+        anchor = source_start + (source_length == 0)
+        idx = bisect.bisect_right(self._anchors, anchor) - 1
+        return idx if idx >= 0 else None
+
+    @cached_property
+    def _anchors(self) -> list[int]:
+        return [h.anchor for h in self.hunks]
+
+
+def _strip_path(path: str) -> str:
+    path = path.rstrip("\n")
+    quoted = path.startswith('"') and path.endswith('"')
+    if quoted:
+        path = path[1:-1]
+    if path[:2] in ("a/", "b/"):
+        path = path[2:]
+    return f'"{path}"' if quoted else path
+
+
+def _patch_path(header: list[str]) -> str:
+    """File path as the backend's DiffParser names it."""
+    source = target = renamed = None
+    for line in header[1:]:
+        if line.startswith(("rename to ", "copy to ")):
+            renamed = line.split(" to ", 1)[1]
+        elif line.startswith("--- "):
+            source = line[4:]
+        elif line.startswith("+++ "):
+            target = line[4:]
+    if renamed is not None:
+        return _strip_path(renamed)
+    if source is not None and source.rstrip("\n") != "/dev/null":
+        return _strip_path(source)
+    if target is not None:
+        return _strip_path(target)
+    # Header-only section ("diff --git a/x b/x" plus mode or binary lines)
+    names = header[0][len("diff --git "):].rstrip("\n")
+    return _strip_path(names[: (len(names) - 1) // 2])
+
+
+def parse_file_patches(diff: str) -> list[FilePatch]:
+    """Split ``git diff`` output into file sections and hunks."""
+    files: list[FilePatch] = []
+    header: list[str] = []
+    hunks: list[tuple[re.Match, list[str]]] = []
+
+    def flush() -> None:
+        if not header:
+            return
+        files.append(
+            FilePatch(
+                path=_patch_path(header),
+                header="".join(header),
+                hunks=[
+                    PatchHunk(
+                        source_start=int(match.group(1)),
+                        source_length=1 if match.group(2) is None else int(match.group(2)),
+                        target_start=int(match.group(3)),
+                        target_length=1 if match.group(4) is None else int(match.group(4)),
+                        section=match.string[match.end():],
+                        body="".join(body),
+                    )
+                    for match, body in hunks
+                ],
+            )
+        )
+
+    for line in diff.splitlines(keepends=True):
+        if line.startswith("diff --git "):
+            flush()
+            header = [line]
+            hunks = []
+        elif not header:
+            continue
+        elif line.startswith("@@ ") and (match := _HUNK_RANGE.match(line)):
+            hunks.append((match, []))
+        elif hunks:
+            hunks[-1][1].append(line)
+        else:
+            header.append(line)
+    flush()
+    return files
+
+
+class IndexPatcher:
+    """Commit groups of hunks from one diff, one ``git apply --cached`` each.
+
+    The index is reset to HEAD once. Each group's hunks are applied to it
+    and committed, so the index matches HEAD again before the next group;
+    line numbers of later hunks are shifted by the hunks already committed
+    instead of re-reading or re-staging anything.
+
+    The agent's ranges come from a packed copy of the diff, which can
+    leave hunks out. ``plan`` finds the hunks no group names; each goes
+    to the first committed group that lists its file, and ``remaining``
+    reports whatever is still not committed at the end.
+    """
+
+    def __init__(self, diff: str):
+        self.files = parse_file_patches(diff)
+        self._by_path = {file.path: file for file in self.files}
+        # Per path, indices of the hunks already in HEAD
+        self._committed: dict[str, set[int]] = {}
+        # Per path, indices of the hunks no group's ranges name
+        self._unclaimed: dict[str, set[int]] = {}
+
+    def reset_index(self) -> None:
+        if not unstage_all():
+            raise GitError("Failed to reset the index")
+
+    def _resolve(self, hunks: list[dict]) -> Iterator[tuple[str, int]]:
+        """(path, hunk index) for each range that maps to a hunk of this diff."""
+        for ref in hunks:
+            file = self._by_path.get(ref["file_path"])
+            if file is None:
+                continue
+            idx = file.locate(ref["source_start"], ref["source_length"])
+            if idx is not None:
+                yield file.path, idx
+
+    def plan(self, groups: Iterable[list[dict] | None]) -> None:
+        """Record which hunks the groups' ranges name, given every group's ranges.
+
+        Hunks none of them name are then added to the first group
+        committed that lists their file.
+        """
+        named: dict[str, set[int]] = {}
+        for hunks in groups:
+            for path, idx in self._resolve(hunks or []):
+                named.setdefault(path, set()).add(idx)
+        self._unclaimed = {
+            file.path: set(range(len(file.hunks))) - named.get(file.path, set())
+            for file in self.files
+            if file.hunks
+        }
+
+    def remaining(self) -> dict[str, int]:
+        """Number of hunks not committed, per path; hunk-less files count as one."""
+        left = {}
+        for file in self.files:
+            committed = self._committed.get(file.path)
+            if committed is None:
+                left[file.path] = len(file.hunks) or 1
+            elif len(committed) < len(file.hunks):
+                left[file.path] = len(file.hunks) - len(committed)
+        return left
+
+    def _select(
+        self, files: list[str], hunks: list[dict] | None
+    ) -> dict[str, list[int]]:
+        """Hunk indices per path for a group, skipping committed ones."""
+        wanted: dict[str, set[int]] = {}
+        for path in files:
+            file = self._by_path.get(path)
+            if file is None:
+                continue
+            if hunks is None or not file.hunks:
+                wanted.setdefault(path, set()).update(range(len(file.hunks)))
+            elif self._unclaimed.get(path):
+                wanted.setdefault(path, set()).update(self._unclaimed[path])
+        for path, idx in self._resolve(hunks or []):
+            wanted.setdefault(path, set()).add(idx)
+
+        for path in wanted:
+            if self._by_path[path].is_lossy:
+                wanted[path] = set(range(len(self._by_path[path].hunks)))
+
+        selected = {}
+        for path, indices in wanted.items():
+            committed = self._committed.get(path)
+            if committed is None:
+                selected[path] = sorted(indices)
+            elif indices - committed:
+                selected[path] = sorted(indices - committed)
+        return selected
+
+    def _file_patch(self, file: FilePatch, indices: list[int]) -> str:
+        committed = self._committed.get(file.path)
+        if committed is None:
+            parts = [file.header]
+        else:
+            # Renames, mode changes and creations are already in HEAD
+            path = file.path
+            parts = [f"diff --git a/{path} b/{path}\n--- a/{path}\n+++ b/{path}\n"]
+
+        shift = 0
+        before = 0
+        chosen = set(indices)
+        for idx, hunk in enumerate(file.hunks):
+            if idx in chosen:
+                start = hunk.source_start + sum(
+                    file.hunks[i].delta for i in committed or () if i < idx
+                )
+                # Keeps git's numbering for empty sides ("-0,0", "+4,0")
+                target = start + shift + hunk.target_start - hunk.source_start - before
+                parts.append(
+                    f"@@ -{start},{hunk.source_length} +{target},{hunk.target_length} @@"
+                    f"{hunk.section}{hunk.body}"
+                )
+                shift += hunk.delta
+            before += hunk.delta
+        return "".join(parts)
+
+    def stage(
+        self, files: list[str], hunks: list[dict] | None = None
+    ) -> dict[str, list[int]]:
+        """Add a group's hunks to the index.
+
+        ``hunks`` are ``{"file_path", "source_start", "source_length"}``
+        ranges as reported by the split agent; without them every hunk of
+        ``files`` is staged. Binary files without patch data, and files
+        that are not UTF-8, are staged whole from the working tree.
+        """
+        selected = self._select(files, hunks)
+        patch = "".join(
+            self._file_patch(self._by_path[path], indices)
+            for path, indices in selected.items()
+            if not self._by_path[path].staged_whole
+        )
+        if patch:
+            _, stderr, code = run_git(
+                ["apply", "--cached", "--whitespace=nowarn", "-"], input=patch
+            )
+            if code != 0:
+                raise GitError(f"Failed to apply patch: {stderr.strip()}")
+        stage_files([path for path in selected if self._by_path[path].staged_whole])
+        return selected
+
+    def commit(
+        self, message: str, files: list[str], hunks: list[dict] | None = None
+    ) -> None:
+        """Stage a group and commit it; on failure the index is reset to HEAD."""
+        try:
+            selected = self.stage(files, hunks)
+            if not create_commit(message):
+                raise GitError("Failed to create commit")
+        except GitError:
+            unstage_all()
+            raise
+
+        for path, indices in selected.items():
+            self._committed.setdefault(path, set()).update(indices)
+
+
 def get_merge_conflicts() -> list[str]:
     stdout, _, code = run_git(["diff", "--name-only", "--diff-filter=U"])
     if code != 0 or not stdout.strip():
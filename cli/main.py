@@ -2,7 +2,9 @@ from importlib.metadata import version, PackageNotFoundError
 
 import typer
 
-from cli.commands import analyze, auto, changelog, commit, agent, hook, index, pr, resolve, review, split
+from cli.commands import (
+    analyze, auto, batch, changelog, commit, agent, hook, index, pr, resolve, review, split,
+)
 
 try:
     _pkg_version = version("inyeon")
@@ -19,6 +21,7 @@ app = typer.Typer(
 
 app.add_typer(analyze.app, name="analyze")
 app.add_typer(auto.app, name="auto")
+app.add_typer(batch.app, name="batch")
 app.add_typer(changelog.app, name="changelog")
 app.add_typer(commit.app, name="commit")
 app.add_typer(agent.app, name="agent")
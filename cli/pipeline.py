@@ -1,23 +1,102 @@
+import asyncio
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from typing import Any
 
 from cli.api_client import APIError
+from cli.git_utils import DiffFileStat
 
 
 @dataclass
 class PipelineResult:
     steps_completed: list[str] = field(default_factory=list)
     steps_skipped: list[str] = field(default_factory=list)
+    # Steps never started because a step they run after failed
+    steps_cancelled: list[str] = field(default_factory=list)
     splits: list[dict] | None = None
     commit_message: str | None = None
     review: dict | None = None
     pr_description: dict | None = None
+    # Shared diff analysis that review and PR reuse
+    analysis_id: str | None = None
     error: str | None = None
+    # Wall time in seconds per step that ran, and for the whole pipeline
+    timings: dict[str, float] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+
+@dataclass
+class PipelineStep:
+    """A blocking step and the steps whose results it reads.
+
+    ``run`` returns an error message when the step fails, else None.
+    """
+
+    name: str
+    run: Callable[[], str | None]
+    after: tuple[str, ...] = ()
+
+
+async def run_steps(steps: list[PipelineStep], result: PipelineResult) -> None:
+    """Run ``steps`` concurrently, each once the steps it is ``after`` finish.
+
+    Steps run in worker threads since backend calls block. Dependencies
+    must be declared before the steps that use them. When a step fails,
+    the first error goes to ``result.error`` and the steps that run after
+    it, directly or through other steps, are cancelled; independent steps
+    still run. If a step raises, steps not yet started are cancelled and
+    the running ones are waited for before the exception propagates, so
+    no backend call outlives the pipeline. Step lists in ``result`` keep
+    the declaration order.
+    """
+    names = [step.name for step in steps]
+    for idx, step in enumerate(steps):
+        unknown = set(step.after) - set(names[:idx])
+        if unknown:
+            raise ValueError(f"Step {step.name!r} runs after undeclared {sorted(unknown)}")
+
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=len(steps), thread_name_prefix="pipeline")
+    tasks: dict[str, asyncio.Future] = {}
+    # Steps that failed or were cancelled
+    stopped: set[str] = set()
+
+    async def run_step(step: PipelineStep) -> None:
+        for name in step.after:
+            await tasks[name]
+        if stopped.intersection(step.after):
+            stopped.add(step.name)
+            result.steps_cancelled.append(step.name)
+            return
+        started = time.perf_counter()
+        try:
+            error = await loop.run_in_executor(executor, step.run)
+        finally:
+            result.timings[step.name] = time.perf_counter() - started
+        if error:
+            stopped.add(step.name)
+            result.error = result.error or error
+
+    started = time.perf_counter()
+    try:
+        for step in steps:
+            tasks[step.name] = asyncio.ensure_future(run_step(step))
+        await asyncio.gather(*tasks.values())
+    finally:
+        for task in tasks.values():
+            task.cancel()
+        executor.shutdown(wait=True, cancel_futures=True)
+        result.elapsed = time.perf_counter() - started
+        for attr in ("steps_completed", "steps_skipped", "steps_cancelled"):
+            getattr(result, attr).sort(key=names.index)
 
 
 class Pipeline:
     def __init__(self, client: Any):
-        """Accept any backend that has split_diff, generate_commit, review, generate_pr."""
+        """Accept any backend that has split_diff, generate_commit, diff_analysis,
+        review and generate_pr."""
         self.client = client
 
     def run(
@@ -29,66 +108,140 @@ class Pipeline:
         skip_review: bool = False,
         skip_pr: bool = False,
         split_threshold: int = 2,
+        stats: list[DiffFileStat] | None = None,
     ) -> PipelineResult:
-        result = PipelineResult()
-
-        self._step_split(result, diff, split_threshold)
-        if result.error:
-            return result
-
-        self._step_commit(result, diff)
-        if result.error:
-            return result
+        """Run split, commit, review and PR on ``diff``.
 
-        self._step_review(result, diff, skip_review)
-        self._step_pr(result, diff, commits, branch_name, base_branch, skip_pr)
+        ``stats`` is the file inventory from ``get_diff_stats``. When given,
+        step decisions use it instead of scanning the diff text.
+        """
+        return asyncio.run(
+            self.arun(
+                diff, commits, branch_name, base_branch,
+                skip_review, skip_pr, split_threshold, stats,
+            )
+        )
 
+    async def arun(
+        self,
+        diff: str,
+        commits: list[dict[str, str]] | None = None,
+        branch_name: str = "",
+        base_branch: str = "main",
+        skip_review: bool = False,
+        skip_pr: bool = False,
+        split_threshold: int = 2,
+        stats: list[DiffFileStat] | None = None,
+    ) -> PipelineResult:
+        """Async ``run``: review and PR only need the diff, so they run
+        alongside split and commit; commit waits for split, review and PR
+        wait for the shared diff analysis. A split or commit failure does
+        not stop review and PR."""
+        result = PipelineResult()
+        skip_analysis = skip_pr and self._review_skipped(diff, skip_review, stats)
+        await run_steps(
+            [
+                PipelineStep(
+                    "split", lambda: self._step_split(result, diff, split_threshold, stats)
+                ),
+                PipelineStep("commit", lambda: self._step_commit(result, diff), after=("split",)),
+                PipelineStep("analyze", lambda: self._step_analyze(result, diff, skip_analysis)),
+                PipelineStep(
+                    "review",
+                    lambda: self._step_review(result, diff, skip_review, stats),
+                    after=("analyze",),
+                ),
+                PipelineStep(
+                    "pr",
+                    lambda: self._step_pr(
+                        result, diff, commits, branch_name, base_branch, skip_pr
+                    ),
+                    after=("analyze",),
+                ),
+            ],
+            result,
+        )
         return result
 
     def _step_split(
-        self, result: PipelineResult, diff: str, threshold: int,
-    ) -> None:
-        file_count = diff.count("diff --git ")
+        self,
+        result: PipelineResult,
+        diff: str,
+        threshold: int,
+        stats: list[DiffFileStat] | None = None,
+    ) -> str | None:
+        if stats is not None:
+            file_count = len(stats)
+        else:
+            file_count = diff.count("\ndiff --git ") + diff.startswith("diff --git ")
         if file_count < threshold:
             result.steps_skipped.append("split")
-            return
+            return None
 
         try:
             resp = self.client.split_diff(diff)
         except APIError as e:
-            result.error = f"Split failed: {e}"
-            return
+            return f"Split failed: {e}"
 
         if resp.get("error"):
-            result.error = f"Split failed: {resp['error']}"
-            return
+            return f"Split failed: {resp['error']}"
 
         result.splits = resp.get("splits", [])
         result.steps_completed.append("split")
+        return None
 
-    def _step_commit(self, result: PipelineResult, diff: str) -> None:
+    def _step_commit(self, result: PipelineResult, diff: str) -> str | None:
         if result.splits:
             result.steps_skipped.append("commit")
-            return
+            return None
 
         try:
             resp = self.client.generate_commit(diff)
         except APIError as e:
-            result.error = f"Commit generation failed: {e}"
-            return
+            return f"Commit generation failed: {e}"
 
         result.commit_message = resp.get("message")
         result.steps_completed.append("commit")
+        return None
+
+    def _step_analyze(self, result: PipelineResult, diff: str, skip: bool) -> None:
+        """Analyze the diff once for review and PR; they analyze it
+        themselves if this fails."""
+        if skip:
+            result.steps_skipped.append("analyze")
+            return
+
+        try:
+            resp = self.client.diff_analysis(diff)
+        except APIError:
+            resp = {}
+        if resp.get("error") or not resp.get("analysis_id"):
+            result.steps_skipped.append("analyze")
+            return
+
+        result.analysis_id = resp["analysis_id"]
+        result.steps_completed.append("analyze")
+
+    @staticmethod
+    def _review_skipped(
+        diff: str, skip: bool, stats: list[DiffFileStat] | None = None
+    ) -> bool:
+        binary_only = bool(stats) and all(s.is_binary for s in stats)
+        return skip or binary_only or len(diff) < 500
 
     def _step_review(
-        self, result: PipelineResult, diff: str, skip: bool,
+        self,
+        result: PipelineResult,
+        diff: str,
+        skip: bool,
+        stats: list[DiffFileStat] | None = None,
     ) -> None:
-        if skip or len(diff) < 500:
+        if self._review_skipped(diff, skip, stats):
             result.steps_skipped.append("review")
             return
 
         try:
-            resp = self.client.review(diff)
+            resp = self.client.review(diff, analysis_id=result.analysis_id)
             result.review = resp.get("review")
             result.steps_completed.append("review")
         except APIError:
@@ -113,6 +266,7 @@ class Pipeline:
                 commits=commits or [],
                 branch_name=branch_name,
                 base_branch=base_branch,
+                analysis_id=result.analysis_id,
             )
             if resp.get("error"):
                 result.steps_skipped.append("pr")
@@ -0,0 +1,181 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from backend.agents.analysis import (
+    AnalysisCache,
+    analysis_cache,
+    diff_analysis_id,
+    get_diff_analysis,
+    lookup_analysis,
+)
+from backend.agents.commit_agent import CommitAgent
+from backend.agents.pr_agent import PRAgent
+from backend.agents.review_agent import ReviewAgent
+from backend.core.dependencies import get_llm_from_request
+from backend.main import app
+
+ANALYSIS = {
+    "summary": "Greet by name",
+    "change_type": "feat",
+    "change_types": ["feat"],
+    "affected_areas": ["hello"],
+    "risk": "low",
+    "needs_context": False,
+    "files_to_read": [],
+}
+
+
+def _llm(*responses):
+    llm = AsyncMock()
+    llm.generate = AsyncMock(side_effect=list(responses))
+    return llm
+
+
+class TestAnalysisCache:
+
+    def test_entries_expire(self):
+        cache = AnalysisCache(ttl=10)
+        cache.put({"analysis_id": "a"})
+
+        with patch("backend.agents.analysis.time.monotonic", return_value=1e12):
+            assert cache.get("a") is None
+
+    def test_oldest_evicted(self):
+        cache = AnalysisCache(max_entries=2)
+        for key in ("a", "b", "c"):
+            cache.put({"analysis_id": key})
+
+        assert cache.get("a") is None
+        assert cache.get("c") == {"analysis_id": "c"}
+
+    def test_lookup_prefers_explicit_id(self, sample_diff):
+        analysis_cache.put({"analysis_id": "other", "summary": "x"})
+
+        assert lookup_analysis(sample_diff, "other")["summary"] == "x"
+        assert lookup_analysis(sample_diff) is None
+
+
+class TestGetDiffAnalysis:
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_call(self, sample_diff):
+        llm = AsyncMock()
+
+        async def generate(prompt, **kwargs):
+            await asyncio.sleep(0.01)
+            return dict(ANALYSIS)
+
+        llm.generate = AsyncMock(side_effect=generate)
+
+        results = await asyncio.gather(
+            *(get_diff_analysis(sample_diff, llm) for _ in range(3))
+        )
+
+        assert llm.generate.await_count == 1
+        assert {r["analysis_id"] for r in results} == {diff_analysis_id(sample_diff)}
+        assert lookup_analysis(sample_diff)["summary"] == "Greet by name"
+
+    @pytest.mark.asyncio
+    async def test_failure_not_cached(self, sample_diff):
+        llm = _llm(RuntimeError("down"), dict(ANALYSIS))
+
+        with pytest.raises(RuntimeError):
+            await get_diff_analysis(sample_diff, llm)
+        analysis = await get_diff_analysis(sample_diff, llm)
+
+        assert analysis["risk"] == "low"
+
+    @pytest.mark.asyncio
+    async def test_call_cancelled_only_when_every_caller_is(self, sample_diff):
+        started, cancelled = asyncio.Event(), asyncio.Event()
+
+        async def generate(prompt, **kwargs):
+            started.set()
+            try:
+                await asyncio.sleep(0.05)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return dict(ANALYSIS)
+
+        llm = AsyncMock()
+        llm.generate = AsyncMock(side_effect=generate)
+        first = asyncio.create_task(get_diff_analysis(sample_diff, llm))
+        second = asyncio.create_task(get_diff_analysis(sample_diff, llm))
+        await started.wait()
+
+        first.cancel()
+        assert (await second)["risk"] == "low"
+        assert not cancelled.is_set()
+
+        analysis_cache.clear()
+        third = asyncio.create_task(get_diff_analysis(sample_diff, llm))
+        started.clear()
+        await started.wait()
+        third.cancel()
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+
+class TestAgentsShareAnalysis:
+
+    @pytest.mark.asyncio
+    async def test_commit_then_review_and_pr_analyze_once(self, sample_diff):
+        llm = _llm(
+            dict(ANALYSIS),
+            {"message": "feat: greet by name"},
+            {"summary": "ok", "quality_score": 8, "issues": []},
+            {"title": "feat: greet", "summary": "s", "changes": [], "testing": ""},
+        )
+
+        commit = await CommitAgent(llm).run(sample_diff)
+        review = await ReviewAgent(llm).run(sample_diff)
+        pr = await PRAgent(llm).run(diff=sample_diff, branch_name="feature/greet")
+
+        assert llm.generate.await_count == 4
+        analysis_id = diff_analysis_id(sample_diff)
+        assert commit["analysis"]["analysis_id"] == analysis_id
+        assert review["analysis_id"] == pr["analysis_id"] == analysis_id
+        review_prompt = llm.generate.await_args_list[2].args[0]
+        assert "CHANGE ANALYSIS" in review_prompt
+        assert "Greet by name" in review_prompt
+
+    @pytest.mark.asyncio
+    async def test_review_alone_makes_one_call(self, sample_diff):
+        llm = _llm({"summary": "ok", "quality_score": 8, "issues": []})
+
+        result = await ReviewAgent(llm).run(sample_diff)
+
+        assert llm.generate.await_count == 1
+        assert result["analysis_id"] is None
+
+
+class TestAnalysisEndpoints:
+
+    def setup_method(self):
+        app.dependency_overrides.clear()
+
+    def teardown_method(self):
+        app.dependency_overrides.clear()
+
+    def test_analysis_id_passed_back(self, client, sample_diff):
+        llm = _llm(dict(ANALYSIS), {"summary": "ok", "quality_score": 8, "issues": []})
+        app.dependency_overrides[get_llm_from_request] = lambda: llm
+
+        created = client.post("/api/v1/agent/analysis", json={"diff": sample_diff}).json()
+        fetched = client.get(f"/api/v1/agent/analysis/{created['analysis_id']}")
+        review = client.post(
+            "/api/v1/agent/review",
+            json={"diff": sample_diff + "\n", "analysis_id": created["analysis_id"]},
+        )
+
+        assert fetched.json() == created
+        assert review.status_code == 200
+        assert review.json()["analysis_id"] == created["analysis_id"]
+        assert llm.generate.await_count == 2
+
+    def test_unknown_analysis_404(self, client):
+        response = client.get("/api/v1/agent/analysis/missing")
+
+        assert response.status_code == 404
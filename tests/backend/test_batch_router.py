@@ -0,0 +1,132 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock, patch
+
+from backend.core.dependencies import get_llm_from_request
+from backend.main import app
+
+
+def _lines(response) -> list[dict]:
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+class TestBatchRouter:
+
+    def setup_method(self):
+        app.dependency_overrides.clear()
+
+    def teardown_method(self):
+        app.dependency_overrides.clear()
+
+    def _override(self, llm):
+        app.dependency_overrides[get_llm_from_request] = lambda: llm
+
+    def test_mixed_tasks_streamed_as_ndjson(self, client, sample_diff):
+        llm = AsyncMock()
+
+        async def generate(prompt, **kwargs):
+            if "senior code reviewer" in prompt:
+                return {"summary": "ok", "quality_score": 8, "issues": []}
+            if "Generate a git commit message" in prompt:
+                return {"message": "feat: greet by name"}
+            return {"summary": "greet", "needs_context": False, "files_to_read": []}
+
+        llm.generate = AsyncMock(side_effect=generate)
+        self._override(llm)
+
+        response = client.post(
+            "/api/v1/batch",
+            json={
+                "tasks": [
+                    {"agent": "review", "id": "r1", "input": {"diff": sample_diff}},
+                    {"agent": "commit", "id": "c1", "input": {"diff": sample_diff}},
+                ]
+            },
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = _lines(response)
+        results = {line["id"]: line for line in lines if line["type"] == "result"}
+        assert results["r1"]["result"]["review"]["quality_score"] == 8
+        assert results["c1"]["result"]["commit_message"] == "feat: greet by name"
+        assert lines[-1] == {
+            "type": "summary", "total": 2, "unique": 2, "succeeded": 2, "failed": 0,
+        }
+
+    def test_identical_tasks_run_once(self, client, sample_diff):
+        llm = AsyncMock()
+        llm.generate = AsyncMock(return_value={"summary": "ok", "quality_score": 7})
+        self._override(llm)
+        task = {"agent": "review", "input": {"diff": sample_diff}}
+
+        lines = _lines(client.post("/api/v1/batch", json={"tasks": [task, task, task]}))
+
+        assert llm.generate.await_count == 1
+        results = [line for line in lines if line["type"] == "result"]
+        assert sorted(line["index"] for line in results) == [0, 1, 2]
+        assert sum("deduplicated_from" in line for line in results) == 2
+        assert lines[-1]["unique"] == 1
+
+    def test_failed_task_reported_inline(self, client, sample_diff):
+        llm = AsyncMock()
+        llm.generate = AsyncMock(side_effect=RuntimeError("provider down"))
+        self._override(llm)
+
+        lines = _lines(
+            client.post(
+                "/api/v1/batch",
+                json={"tasks": [{"agent": "review", "input": {"diff": sample_diff}}]},
+            )
+        )
+
+        assert lines[0]["status"] == "error"
+        assert "provider down" in lines[0]["error"]
+        assert lines[-1]["failed"] == 1
+
+    def test_runs_concurrently_within_limit(self, client):
+        active = 0
+        peak = 0
+        llm = AsyncMock()
+
+        async def generate(prompt, **kwargs):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.02)
+            active -= 1
+            return {"summary": "ok"}
+
+        llm.generate = AsyncMock(side_effect=generate)
+        self._override(llm)
+        tasks = [{"agent": "review", "input": {"diff": f"diff {i}"}} for i in range(6)]
+
+        with patch("backend.routers.batch.settings.batch_concurrency", 2):
+            lines = _lines(client.post("/api/v1/batch", json={"tasks": tasks}))
+
+        assert lines[-1]["succeeded"] == 6
+        assert peak == 2
+
+    def test_invalid_task_input_rejected(self, client):
+        response = client.post(
+            "/api/v1/batch",
+            json={"tasks": [{"agent": "commit", "input": {"diff": ""}}]},
+        )
+
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"][:4] == ["body", "tasks", 0, "input"]
+
+    def test_unknown_agent_rejected(self, client):
+        response = client.post(
+            "/api/v1/batch", json={"tasks": [{"agent": "deploy", "input": {}}]}
+        )
+
+        assert response.status_code == 422
+
+    def test_too_many_tasks_rejected(self, client):
+        tasks = [{"agent": "review", "input": {"diff": "d"}}] * 3
+
+        with patch("backend.routers.batch.settings.batch_max_tasks", 2):
+            response = client.post("/api/v1/batch", json={"tasks": tasks})
+
+        assert response.status_code == 422
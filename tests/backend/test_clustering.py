@@ -1,6 +1,8 @@
+import numpy as np
 import pytest
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
+from backend.clustering.semantic import SemanticStrategy
 from backend.diff import ParsedDiff, ParsedFile, ParsedHunk, FileChangeType
 from backend.clustering import (
     DirectoryStrategy,
@@ -260,6 +262,86 @@ class TestHybridStrategy:
             assert group.suggested_type is not None
 
 
+def _topic_diff(n: int, topics: int, seed: int = 0):
+    """n one-hunk files with embeddings drawn around ``topics`` directions."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(topics, 32))
+    truth = rng.integers(0, topics, size=n)
+    vectors = centers[truth] + rng.normal(scale=0.2, size=(n, 32))
+    diff = ParsedDiff(
+        files=[
+            ParsedFile(
+                path=f"f{i}.py",
+                change_type=FileChangeType.MODIFIED,
+                hunks=[
+                    ParsedHunk(
+                        id=f"f{i}.py:0",
+                        source_start=1,
+                        source_length=1,
+                        target_start=1,
+                        target_length=1,
+                        lines=[],
+                    )
+                ],
+            )
+            for i in range(n)
+        ]
+    )
+    embeddings = MagicMock()
+    embeddings.embed_texts = AsyncMock(return_value=vectors.tolist())
+    return diff, embeddings, truth
+
+
+def _partition(groups) -> set[frozenset[str]]:
+    return {frozenset(ref.hunk_id for ref in group.hunks) for group in groups}
+
+
+class TestSemanticStrategy:
+
+    @pytest.mark.asyncio
+    async def test_small_input_uses_agglomerative(self):
+        diff, embeddings, _ = _topic_diff(40, topics=4)
+
+        with patch("backend.clustering.semantic.AgglomerativeClustering") as agglomerative:
+            agglomerative.return_value.fit_predict.return_value = np.zeros(40, dtype=int)
+            groups = await SemanticStrategy(embeddings).cluster(diff)
+
+        agglomerative.assert_called_once()
+        assert len(groups) == 1
+
+    @pytest.mark.asyncio
+    async def test_graph_mode_above_threshold(self):
+        diff, embeddings, truth = _topic_diff(300, topics=6)
+
+        with patch("backend.clustering.semantic.AgglomerativeClustering") as agglomerative:
+            groups = await SemanticStrategy(embeddings, graph_threshold=100).cluster(diff)
+
+        agglomerative.assert_not_called()
+        expected = {
+            frozenset(f"f{i}.py:0" for i in np.flatnonzero(truth == topic))
+            for topic in np.unique(truth)
+        }
+        assert _partition(groups) == expected
+
+    @pytest.mark.asyncio
+    async def test_graph_mode_matches_agglomerative(self):
+        diff, embeddings, _ = _topic_diff(200, topics=5, seed=3)
+
+        exact = await SemanticStrategy(embeddings).cluster(diff)
+        graph = await SemanticStrategy(embeddings, graph_threshold=0).cluster(diff)
+
+        assert _partition(graph) == _partition(exact)
+
+    def test_graph_links_only_above_threshold(self):
+        vectors = np.array([[1.0, 0.0], [0.9, 0.1], [0.0, 1.0], [0.0, 0.0]])
+        strategy = SemanticStrategy(MagicMock(), similarity_threshold=0.9)
+
+        labels = strategy._graph_labels(vectors)
+
+        assert labels[0] == labels[1]
+        assert len({labels[0], labels[2], labels[3]}) == 3
+
+
 class TestCommitGroup:
 
     def test_commit_group_file_count(self):
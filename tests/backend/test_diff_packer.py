@@ -0,0 +1,191 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from backend.diff import DiffParser, LineType, pack_diff
+from backend.diff.packer import estimate_tokens_ceil, file_priority
+from backend.utils.cost import diff_token_budget, llm_diff_token_budget
+
+
+def _file_diff(path: str, changed: int, context: int = 3, start: int = 1) -> str:
+    """One modified file with a single hunk of ``changed`` replaced lines."""
+    lines = [f" ctx_{i}\n" for i in range(context)]
+    lines += [f"-old_{i}\n" for i in range(changed)]
+    lines += [f"+new_{i}\n" for i in range(changed)]
+    lines += [f" tail_{i}\n" for i in range(context)]
+    length = 2 * context + changed
+    return (
+        f"diff --git a/{path} b/{path}\n"
+        f"--- a/{path}\n+++ b/{path}\n"
+        f"@@ -{start},{length} +{start},{length} @@\n" + "".join(lines)
+    )
+
+
+class TestPackDiff:
+
+    def test_fitting_diff_unchanged(self):
+        diff = _file_diff("app.py", 2)
+
+        packed = pack_diff(diff, max_tokens=10_000)
+
+        assert packed.text == diff
+        assert not packed.truncated
+
+    def test_source_ranked_over_lockfile(self):
+        diff = _file_diff("package-lock.json", 200) + _file_diff("src/app.py", 5)
+
+        packed = pack_diff(diff, max_tokens=200)
+
+        assert "+++ b/src/app.py" in packed.text
+        assert "+++ b/package-lock.json" not in packed.text
+        assert packed.files_omitted == ["package-lock.json"]
+        assert "#   M package-lock.json (+200/-200)" in packed.text
+
+    def test_larger_change_ranked_first(self):
+        diff = _file_diff("small.py", 2) + _file_diff("large.py", 20)
+
+        packed = pack_diff(diff, max_tokens=140)
+
+        assert "+++ b/large.py" in packed.text
+        assert packed.files_omitted == ["small.py"]
+
+    def test_context_trimmed_before_hunks_dropped(self):
+        diff = _file_diff("app.py", 2, context=200)
+
+        packed = pack_diff(diff, max_tokens=100)
+
+        assert packed.hunks_trimmed == 1
+        assert packed.hunks_omitted == 0
+        assert "+new_1" in packed.text
+        assert " ctx_199" in packed.text
+        assert " ctx_0\n" not in packed.text
+
+    def test_trimmed_hunks_keep_line_numbers(self):
+        body = "".join(
+            "+added\n" if i in (10, 60) else f" line_{i}\n" for i in range(80)
+        )
+        diff = (
+            "diff --git a/app.py b/app.py\n--- a/app.py\n+++ b/app.py\n"
+            f"@@ -1,78 +1,80 @@ def main():\n{body}"
+        )
+        original = {
+            line.target_line_no
+            for line in DiffParser().parse(diff).files[0].hunks[0].lines
+            if line.line_type == LineType.ADDED
+        }
+
+        packed = pack_diff(diff, max_tokens=80)
+
+        hunks = DiffParser().parse(packed.text).files[0].hunks
+        assert len(hunks) == 2
+        assert hunks[0].section_header == "def main():"
+        assert {
+            line.target_line_no
+            for hunk in hunks
+            for line in hunk.lines
+            if line.line_type == LineType.ADDED
+        } == original
+
+    def test_partially_included_file_noted(self):
+        diff = _file_diff("app.py", 30, start=1)
+        diff += "".join(_file_diff("app.py", 20, start=200).splitlines(True)[3:])
+
+        packed = pack_diff(diff, max_tokens=160)
+
+        assert packed.hunks_omitted == 1
+        assert "+new_29" in packed.text
+        assert "#   M app.py (+50/-50, 1 of 2 hunks not shown)" in packed.text
+
+    @pytest.mark.parametrize("budget", [50, 200, 1_000, 5_000])
+    def test_output_parses_and_fits(self, budget):
+        diff = "".join(
+            _file_diff(f"src/mod_{i}.py", 5 + i, context=i % 7) for i in range(40)
+        )
+        diff += "diff --git a/logo.png b/logo.png\nBinary files a/logo.png and b/logo.png differ\n"
+
+        packed = pack_diff(diff, max_tokens=budget)
+
+        assert packed.tokens <= budget
+        assert estimate_tokens_ceil(packed.text) == packed.tokens
+        DiffParser().parse(packed.text)
+
+    def test_binary_file_listed(self):
+        diff = _file_diff("app.py", 10, context=40)
+        diff += "diff --git a/logo.png b/logo.png\nBinary files a/logo.png and b/logo.png differ\n"
+
+        packed = pack_diff(diff, max_tokens=200)
+
+        assert "+++ b/app.py" in packed.text
+        assert "#   M logo.png (binary)" in packed.text
+
+    def test_long_file_list_capped(self):
+        diff = "".join(_file_diff(f"docs/page_{i}.md", 1) for i in range(300))
+
+        packed = pack_diff(diff, max_tokens=400)
+
+        assert packed.tokens <= 400
+        assert "more files\n" in packed.text
+        assert len(packed.files_omitted) > 250
+
+    def test_unparseable_text_cut_at_line(self):
+        text = "not a diff\n" * 1_000
+
+        packed = pack_diff(text, max_tokens=30)
+
+        assert packed.text == "not a diff\n" * 10
+
+    def test_custom_token_counter(self):
+        diff = _file_diff("app.py", 50)
+
+        packed = pack_diff(diff, max_tokens=40, count_tokens=lambda t: t.count("\n"))
+
+        assert packed.text.count("\n") <= 40
+
+
+class TestFilePriority:
+
+    @pytest.mark.parametrize(
+        "path,expected",
+        [
+            ("src/app.py", 2),
+            ("web/index.tsx", 2),
+            ("README.md", 1),
+            ("config/settings.yaml", 1),
+            ("package-lock.json", 0),
+            ("sub/Cargo.lock", 0),
+            ("poetry.lock", 0),
+            ("static/app.min.js", 0),
+            ("proto/api_pb2.py", 0),
+            ("vendor/lib/util.go", 0),
+            ("web/node_modules/x/index.js", 0),
+        ],
+    )
+    def test_priority(self, path, expected):
+        assert file_priority(path) == expected
+
+
+class TestDiffTokenBudget:
+
+    def test_provider_budgets(self):
+        assert diff_token_budget("ollama") < diff_token_budget("gemini")
+
+    def test_model_overrides_provider(self):
+        assert diff_token_budget("gemini", "gemini-2.5-pro") > diff_token_budget("gemini")
+
+    def test_unknown_provider_uses_max_diff_chars(self):
+        with patch("backend.utils.cost.settings") as settings:
+            settings.diff_token_budget = None
+            settings.max_diff_chars = 8_000
+            assert diff_token_budget("other") == 2_000
+
+    def test_setting_overrides_table(self):
+        with patch("backend.utils.cost.settings") as settings:
+            settings.diff_token_budget = 1_234
+            assert diff_token_budget("gemini", "gemini-2.5-pro") == 1_234
+
+    def test_from_llm_instance(self):
+        llm = MagicMock(spec=["name", "model_name"])
+        llm.name = "gemini"
+        llm.model_name = "gemini-2.5-pro"
+
+        assert llm_diff_token_budget(llm) == diff_token_budget("gemini", "gemini-2.5-pro")
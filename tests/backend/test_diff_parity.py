@@ -0,0 +1,237 @@
+import io
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from backend.diff import (
+    CompactFile,
+    DiffParser,
+    FileChangeType,
+    LineType,
+    ParsedDiff,
+    ParsedFile,
+    ParsedHunk,
+    ParsedLine,
+)
+
+unidiff = pytest.importorskip("unidiff")
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+def _reference_parse(diff_text: str) -> ParsedDiff:
+    """Build ParsedDiff through unidiff, as DiffParser did before it was native."""
+    if not diff_text.strip():
+        return ParsedDiff()
+
+    line_types = {"+": LineType.ADDED, "-": LineType.REMOVED, " ": LineType.CONTEXT}
+    patch_set = unidiff.PatchSet.from_string(diff_text)
+    files = []
+    for patched in patch_set:
+        if patched.is_added_file:
+            change_type = FileChangeType.ADDED
+        elif patched.is_removed_file:
+            change_type = FileChangeType.DELETED
+        elif patched.is_rename:
+            change_type = FileChangeType.RENAMED
+        else:
+            change_type = FileChangeType.MODIFIED
+
+        hunks = [
+            ParsedHunk(
+                id=f"{patched.path}:{idx}",
+                source_start=hunk.source_start,
+                source_length=hunk.source_length,
+                target_start=hunk.target_start,
+                target_length=hunk.target_length,
+                section_header=hunk.section_header or "",
+                lines=[
+                    ParsedLine(
+                        content=line.value.rstrip("\n"),
+                        line_type=line_types.get(line.line_type, LineType.CONTEXT),
+                        source_line_no=line.source_line_no,
+                        target_line_no=line.target_line_no,
+                    )
+                    for line in hunk
+                ],
+                added_count=hunk.added,
+                removed_count=hunk.removed,
+            )
+            for idx, hunk in enumerate(patched)
+        ]
+        files.append(
+            ParsedFile(
+                path=patched.path,
+                change_type=change_type,
+                hunks=hunks,
+                is_binary=patched.is_binary_file,
+                old_path=patched.source_file if patched.is_rename else None,
+            )
+        )
+
+    return ParsedDiff(
+        files=files, total_added=patch_set.added, total_removed=patch_set.removed
+    )
+
+
+def _git(repo: Path, *args: str) -> str:
+    result = subprocess.run(
+        ["git", "-c", "core.autocrlf=false", *args],
+        cwd=repo,
+        capture_output=True,
+        check=True,
+    )
+    return result.stdout.decode("utf-8", errors="replace")
+
+
+@pytest.fixture(scope="module")
+def corpus(tmp_path_factory) -> dict[str, str]:
+    """Real `git diff` output covering the cases the parser must agree on."""
+    repo = tmp_path_factory.mktemp("diffs")
+    _git(repo, "init", "-q")
+    _git(repo, "config", "user.email", "dev@example.com")
+    _git(repo, "config", "user.name", "dev")
+
+    (repo / "src").mkdir()
+    (repo / "src" / "app.py").write_text(
+        "".join(f"line {i}\n" for i in range(60))
+    )
+    (repo / "rename_me.py").write_text("".join(f"value_{i} = {i}\n" for i in range(30)))
+    (repo / "no_newline.txt").write_text("first\nlast")
+    (repo / "crlf.txt").write_bytes(b"one\r\ntwo\r\nthree\r\n")
+    (repo / "script.sh").write_text("echo hi\n")
+    (repo / "logo.png").write_bytes(bytes(range(256)))
+    (repo / "to_delete.py").write_text("gone = True\n")
+    (repo / "with space.md").write_text("# title\n")
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-qm", "base")
+
+    app = [f"line {i}\n" for i in range(60)]
+    app[2] = "changed 2\n"
+    app.insert(30, "inserted\n")
+    app[50] = "\n"
+    (repo / "src" / "app.py").write_text("".join(app))
+    _git(repo, "mv", "rename_me.py", "renamed.py")
+    renamed = (repo / "renamed.py").read_text().replace("value_3 = 3", "value_3 = 33")
+    (repo / "renamed.py").write_text(renamed)
+    (repo / "no_newline.txt").write_text("first\nfinal")
+    (repo / "crlf.txt").write_bytes(b"one\r\n2\r\nthree\r\n")
+    (repo / "script.sh").chmod(0o755)
+    (repo / "logo.png").write_bytes(bytes(reversed(range(256))))
+    (repo / "to_delete.py").unlink()
+    (repo / "with space.md").write_text("# title\n\nbody\n")
+    (repo / "empty.txt").write_text("")
+    (repo / "new_module.py").write_text("def f():\n    return 1\n")
+    _git(repo, "add", "-A")
+
+    diffs = {
+        "cached": _git(repo, "diff", "--cached"),
+        "cached_renames": _git(repo, "diff", "--cached", "-M"),
+        "cached_binary": _git(repo, "diff", "--cached", "-M", "--binary"),
+        "cached_no_renames": _git(repo, "diff", "--cached", "--no-renames"),
+        "cached_context0": _git(repo, "diff", "--cached", "-U0"),
+        "cached_context10": _git(repo, "diff", "--cached", "-U10", "--function-context"),
+    }
+    _git(repo, "commit", "-qm", "change")
+    diffs["log"] = _git(repo, "log", "-p", "-M", "--format=")
+
+    history = subprocess.run(
+        ["git", "log", "-p", "-M", "--format=", "-n", "50"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+    )
+    if history.returncode == 0 and history.stdout:
+        diffs["repo_history"] = history.stdout.decode("utf-8", errors="replace")
+    return diffs
+
+
+CASES = [
+    "cached",
+    "cached_renames",
+    "cached_binary",
+    "cached_no_renames",
+    "cached_context0",
+    "cached_context10",
+    "log",
+    "repo_history",
+]
+
+
+def _case(corpus: dict[str, str], name: str) -> str:
+    if name not in corpus:
+        pytest.skip(f"{name} diff not available")
+    return corpus[name]
+
+
+class TestUnidiffParity:
+
+    @pytest.mark.parametrize("name", CASES)
+    def test_parse_matches_unidiff(self, corpus, name):
+        text = _case(corpus, name)
+
+        assert DiffParser().parse(text).model_dump() == _reference_parse(text).model_dump()
+
+    @pytest.mark.parametrize("name", CASES)
+    def test_streaming_matches_unidiff(self, corpus, name):
+        text = _case(corpus, name)
+
+        streamed = list(DiffParser().iter_files(io.StringIO(text)))
+
+        reference = _reference_parse(text).files
+        assert [f.model_dump() for f in streamed] == [f.model_dump() for f in reference]
+
+    def test_corpus_covers_edge_cases(self, corpus):
+        parsed = DiffParser().parse(corpus["cached_binary"])
+        by_path = {f.path: f for f in parsed.files}
+
+        assert by_path["renamed.py"].change_type == FileChangeType.RENAMED
+        assert by_path["logo.png"].is_binary
+        assert by_path["script.sh"].hunks == []
+        assert by_path["to_delete.py"].change_type == FileChangeType.DELETED
+        assert any(
+            line.content == " No newline at end of file"
+            for hunk in by_path["no_newline.txt"].hunks
+            for line in hunk.lines
+        )
+        assert any(
+            line.content.endswith("\r")
+            for hunk in by_path["crlf.txt"].hunks
+            for line in hunk.lines
+        )
+
+
+class TestStreamingParser:
+
+    def test_yields_before_input_is_exhausted(self, corpus):
+        consumed = []
+
+        def lines():
+            for line in io.StringIO(corpus["cached"]):
+                consumed.append(line)
+                yield line
+
+        stream = DiffParser().iter_compact(lines())
+        first = next(stream)
+
+        assert isinstance(first, CompactFile)
+        assert len(consumed) < corpus["cached"].count("\n")
+
+    def test_reads_from_file(self, corpus, tmp_path):
+        path = tmp_path / "change.diff"
+        path.write_bytes(corpus["cached_renames"].encode())
+
+        with open(path, encoding="utf-8", newline="\n") as handle:
+            files = list(DiffParser().iter_files(handle))
+
+        assert files == DiffParser().parse(corpus["cached_renames"]).files
+
+    def test_streamed_hunks_do_not_share_a_buffer(self, corpus):
+        files = list(DiffParser().iter_compact(io.StringIO(corpus["cached"])))
+        hunks = [h for f in files for h in f.hunks]
+
+        assert len({id(h._buffer) for h in hunks}) == len(hunks)
+        assert hunks[0].content == DiffParser().parse(corpus["cached"]).files[0].hunks[0].content
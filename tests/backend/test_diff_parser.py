@@ -1,5 +1,12 @@
 import pytest
-from backend.diff import DiffParser, ParsedDiff, FileChangeType, LineType
+from backend.diff import (
+    CompactDiff,
+    DiffParseError,
+    DiffParser,
+    FileChangeType,
+    LineType,
+    ParsedDiff,
+)
 
 
 @pytest.fixture
@@ -155,3 +162,154 @@ class TestDiffParser:
 
         assert isinstance(hunk.content, str)
         assert len(hunk.content) > 0
+
+
+@pytest.fixture
+def edge_case_diff():
+    return """diff --git a/old_name.py b/new_name.py
+similarity index 90%
+rename from old_name.py
+rename to new_name.py
+index 1234567..abcdefg 100644
+--- a/old_name.py
++++ b/new_name.py
+@@ -1,2 +1,2 @@
+ x = 1
+-y = 2
+\\ No newline at end of file
++y = 3
+\\ No newline at end of file
+diff --git a/script.sh b/script.sh
+old mode 100644
+new mode 100755
+diff --git a/logo.png b/logo.png
+index 1234567..abcdefg 100644
+Binary files a/logo.png and b/logo.png differ
+diff --git a/notes.txt b/notes.txt
+index 1234567..abcdefg 100644
+--- a/notes.txt
++++ b/notes.txt
+@@ -1,3 +1,3 @@
+ first
+
+-last
++final
+"""
+
+
+class TestCompactDiff:
+
+    def test_compact_matches_model(self, parser, multi_file_diff):
+        compact = parser.parse_compact(multi_file_diff)
+
+        assert isinstance(compact, CompactDiff)
+        assert compact.to_model() == parser.parse(multi_file_diff)
+        assert compact.total_added == 6
+
+    def test_hunk_content_is_lazy_and_cached(self, parser, simple_diff):
+        hunk = parser.parse_compact(simple_diff).files[0].hunks[0]
+
+        assert hunk._content is None
+        content = hunk.content
+        assert content.splitlines()[0] == "def hello():"
+        assert hunk.content is content
+
+    def test_hunk_keeps_span_of_original_text(self, parser, simple_diff):
+        hunk = parser.parse_compact(simple_diff).files[0].hunks[0]
+
+        assert hunk._buffer is simple_diff
+        assert hunk.raw.startswith(" def hello():\n-")
+
+    def test_line_numbers(self, parser, simple_diff):
+        lines = parser.parse_compact(simple_diff).files[0].hunks[0].lines
+
+        removed = next(l for l in lines if l.line_type == LineType.REMOVED)
+        added = [l for l in lines if l.line_type == LineType.ADDED]
+        assert (removed.source_line_no, removed.target_line_no) == (2, None)
+        assert [l.target_line_no for l in added] == [2, 3]
+
+    def test_file_properties(self, parser, multi_file_diff):
+        files = parser.parse_compact(multi_file_diff).files
+
+        assert files[0].directory == "src"
+        assert files[1].extension == ".py"
+        assert files[1].change_type == FileChangeType.ADDED
+
+
+class TestDiffParserEdgeCases:
+
+    def test_rename(self, parser, edge_case_diff):
+        renamed = parser.parse(edge_case_diff).files[0]
+
+        assert renamed.path == "new_name.py"
+        assert renamed.change_type == FileChangeType.RENAMED
+        assert renamed.old_path == "a/old_name.py"
+
+    def test_no_newline_markers(self, parser, edge_case_diff):
+        hunk = parser.parse(edge_case_diff).files[0].hunks[0]
+
+        markers = [l for l in hunk.lines if l.content == " No newline at end of file"]
+        assert len(markers) == 2
+        assert all(l.source_line_no is None for l in markers)
+        assert hunk.added_count == 1 and hunk.removed_count == 1
+
+    def test_mode_change_without_hunks(self, parser, edge_case_diff):
+        script = parser.parse(edge_case_diff).files[1]
+
+        assert script.path == "script.sh"
+        assert script.change_type == FileChangeType.MODIFIED
+        assert script.hunks == []
+
+    def test_binary_file(self, parser, edge_case_diff):
+        logo = parser.parse(edge_case_diff).files[2]
+
+        assert logo.is_binary
+        assert logo.hunks == []
+
+    def test_blank_context_line(self, parser, edge_case_diff):
+        lines = parser.parse(edge_case_diff).files[3].hunks[0].lines
+
+        assert lines[1].content == ""
+        assert lines[1].line_type == LineType.CONTEXT
+        assert lines[1].source_line_no == 2
+
+    @pytest.mark.parametrize(
+        "diff",
+        [
+            "--- a/x\n+++ b/x\n@@ -1,2 +1,2 @@\n-a\n",
+            "--- a/x\n+++ b/x\n@@ -2 +1 @@\n-a\n-b\n+c\n",
+            "@@ -1 +1 @@\n-a\n+b\n",
+            "--- a/x\n+++ b/x\n@@ -1 +1 @@\n*a\n",
+        ],
+    )
+    def test_malformed_diff_raises(self, parser, diff):
+        with pytest.raises(DiffParseError):
+            parser.parse_compact(diff)
+
+
+class TestScanStats:
+
+    def test_matches_full_parse(self, parser, edge_case_diff):
+        stats = parser.scan_stats(edge_case_diff)
+        parsed = parser.parse(edge_case_diff)
+
+        assert stats.paths == [f.path for f in parsed.files]
+        assert [s.change_type for s in stats.files] == [f.change_type for f in parsed.files]
+        assert (stats.total_added, stats.total_removed) == (
+            parsed.total_added,
+            parsed.total_removed,
+        )
+        assert [s.is_binary for s in stats.files] == [False, False, True, False]
+        assert stats.files[0].old_path == "a/old_name.py"
+
+    def test_accepts_lines(self, parser, multi_file_diff):
+        stats = parser.scan_stats(multi_file_diff.splitlines(keepends=True))
+
+        assert [(s.path, s.added, s.removed) for s in stats.files] == [
+            ("src/main.py", 1, 0),
+            ("tests/test_main.py", 5, 0),
+        ]
+        assert stats.files[1].change_type == FileChangeType.ADDED
+
+    def test_empty_diff(self, parser):
+        assert parser.scan_stats("").files == []
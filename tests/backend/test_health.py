@@ -1,3 +1,13 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from backend.services.health import HealthProber
+from backend.services.llm.gemini import GeminiProvider
+
+
 def test_root_endpoint(client):
     """Test root endpoint returns API info."""
     response = client.get("/")
@@ -18,3 +28,81 @@ def test_health_endpoint(client):
     assert "status" in data
     assert "version" in data
     assert "llm" in data
+
+
+def test_health_served_from_cache(client):
+    """Repeated /health hits reuse one provider probe."""
+    llm = AsyncMock()
+    llm.is_healthy = AsyncMock(return_value=True)
+
+    with patch("backend.services.health.get_llm_provider", return_value=llm):
+        responses = [client.get("/health") for _ in range(5)]
+
+    assert llm.is_healthy.await_count == 1
+    data = responses[-1].json()
+    assert data["status"] == "healthy"
+    assert data["llm"]["connected"] is True
+    assert data["llm"]["stale"] is False
+
+
+def test_stale_probe_reported_degraded(client):
+    """A cached result older than max_age no longer counts as healthy."""
+    llm = AsyncMock()
+    llm.is_healthy = AsyncMock(return_value=True)
+
+    with patch("backend.services.health.get_llm_provider", return_value=llm):
+        client.get("/health")
+    with patch("backend.services.health.time.time", return_value=time.time() + 3600):
+        data = client.get("/health").json()
+
+    assert data["status"] == "degraded"
+    assert data["llm"]["stale"] is True
+
+
+@pytest.mark.asyncio
+async def test_probe_records_timeout():
+    """A provider that hangs is marked disconnected with the reason."""
+    async def hang():
+        await asyncio.sleep(10)
+
+    llm = AsyncMock()
+    llm.is_healthy = hang
+    prober = HealthProber(interval=30, timeout=0.01)
+
+    with patch("backend.services.health.get_llm_provider", return_value=llm):
+        result = await prober.probe("ollama")
+
+    assert result.connected is False
+    assert "No response" in result.error
+    assert prober.snapshot()["ollama"]["connected"] is False
+
+
+@pytest.mark.asyncio
+async def test_prober_loop_probes_each_provider():
+    """The background loop checks the default and every configured provider."""
+    llm = AsyncMock()
+    llm.is_healthy = AsyncMock(return_value=True)
+    prober = HealthProber(interval=30, timeout=1)
+
+    with (
+        patch("backend.services.health.get_llm_provider", return_value=llm),
+        patch("backend.core.dependencies.settings.openai_api_key", "sk-test"),
+    ):
+        prober.start()
+        await asyncio.sleep(0.01)
+        await prober.stop()
+
+    assert {"openai", "ollama"} <= set(prober.snapshot())
+
+
+@pytest.mark.asyncio
+async def test_gemini_health_uses_model_lookup():
+    """Gemini health checks read model metadata instead of generating."""
+    with patch("backend.services.llm.gemini.genai.Client"):
+        provider = GeminiProvider(api_key="test-key")
+    provider.client.aio.models.get = AsyncMock(return_value=object())
+    provider.client.aio.models.generate_content = AsyncMock()
+
+    assert await provider.is_healthy() is True
+    provider.client.aio.models.get.assert_awaited_once_with(model=provider.model_name)
+    provider.client.aio.models.generate_content.assert_not_awaited()
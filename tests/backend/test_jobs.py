@@ -0,0 +1,205 @@
+import asyncio
+import json
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.core.dependencies import get_llm_from_request
+from backend.main import app
+from backend.models.events import EventType, StreamEvent
+from backend.services.jobs import JobPriority, JobQueue, JobStatus, QueueFullError, job_queue
+
+
+def _agent(result: dict, gate: asyncio.Event | None = None, fail: bool = False):
+    """Events factory that streams like an agent, optionally waiting on ``gate``."""
+
+    async def events():
+        yield StreamEvent(event=EventType.AGENT_START, agent="test")
+        if gate is not None:
+            await gate.wait()
+        if fail:
+            raise RuntimeError("boom")
+        yield StreamEvent(event=EventType.RESULT, agent="test", data=result)
+        yield StreamEvent(event=EventType.DONE, agent="test")
+
+    return events
+
+
+async def _finished(job, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not job.finished:
+        assert time.monotonic() < deadline, f"job still {job.status}"
+        await asyncio.sleep(0.005)
+    return job
+
+
+class TestJobQueue:
+
+    @pytest.mark.asyncio
+    async def test_result_retained(self):
+        queue = JobQueue(workers=1)
+        try:
+            job = queue.submit("commit", _agent({"commit_message": "feat: x"}))
+            await _finished(job)
+
+            assert job.status == JobStatus.SUCCEEDED
+            assert queue.get(job.id).result == {"commit_message": "feat: x"}
+            assert [e.event for e in job.events][-1] == EventType.DONE
+            assert job.wait_seconds >= 0
+        finally:
+            await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_higher_priority_runs_first(self):
+        queue = JobQueue(workers=1)
+        gate = asyncio.Event()
+        order = []
+
+        def recording(name):
+            async def events():
+                order.append(name)
+                yield StreamEvent(event=EventType.RESULT, data={})
+
+            return events
+
+        try:
+            blocker = queue.submit("split", _agent({}, gate))
+            await asyncio.sleep(0.01)
+            low = queue.submit("changelog", recording("low"), JobPriority.LOW)
+            high = queue.submit("commit", recording("high"), JobPriority.HIGH)
+            gate.set()
+            await _finished(low)
+
+            assert blocker.finished and high.finished
+            assert order == ["high", "low"]
+        finally:
+            await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_queue_bounded(self):
+        queue = JobQueue(workers=1, max_queued=1)
+        gate = asyncio.Event()
+        try:
+            queue.submit("split", _agent({}, gate))
+            await asyncio.sleep(0.01)
+            queue.submit("split", _agent({}))
+
+            with pytest.raises(QueueFullError):
+                queue.submit("split", _agent({}))
+            assert queue.snapshot()["queue_depth"] == 1
+        finally:
+            gate.set()
+            await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_agent_exception_fails_job(self):
+        queue = JobQueue(workers=1)
+        try:
+            job = queue.submit("review", _agent({}, fail=True))
+            await _finished(job)
+
+            assert job.status == JobStatus.FAILED
+            assert job.error == "boom"
+        finally:
+            await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_cancel_running_job(self):
+        queue = JobQueue(workers=1)
+        gate = asyncio.Event()
+        try:
+            job = queue.submit("split", _agent({}, gate))
+            await asyncio.sleep(0.01)
+            assert job.status == JobStatus.RUNNING
+
+            await queue.cancel(job.id)
+
+            assert job.status == JobStatus.CANCELLED
+            follow_up = queue.submit("commit", _agent({"ok": True}))
+            await _finished(follow_up)
+            assert follow_up.status == JobStatus.SUCCEEDED
+        finally:
+            await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_follow_replays_then_streams(self):
+        queue = JobQueue(workers=1)
+        gate = asyncio.Event()
+        try:
+            job = queue.submit("commit", _agent({"commit_message": "m"}, gate))
+            await asyncio.sleep(0.01)
+
+            async def collect():
+                return [e.event async for e in job.follow()]
+
+            follower = asyncio.ensure_future(collect())
+            await asyncio.sleep(0.01)
+            gate.set()
+
+            assert await follower == [EventType.AGENT_START, EventType.RESULT, EventType.DONE]
+        finally:
+            await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_finished_jobs_expire(self):
+        queue = JobQueue(workers=1, ttl=60)
+        try:
+            job = queue.submit("commit", _agent({}))
+            await _finished(job)
+
+            with patch("backend.services.jobs.time.time", return_value=time.time() + 120):
+                assert queue.get(job.id) is None
+        finally:
+            await queue.stop()
+
+
+class TestJobsRouter:
+
+    def setup_method(self):
+        app.dependency_overrides.clear()
+
+    def teardown_method(self):
+        app.dependency_overrides.clear()
+
+    def test_submit_poll_and_follow(self, sample_diff):
+        llm = AsyncMock()
+        llm.generate = AsyncMock(
+            return_value={"summary": "ok", "quality_score": 8, "issues": []}
+        )
+        app.dependency_overrides[get_llm_from_request] = lambda: llm
+
+        with TestClient(app) as client:
+            submitted = client.post(
+                "/api/v1/jobs/review?priority=high", json={"diff": sample_diff}
+            )
+            job_id = submitted.json()["job_id"]
+            with client.stream("GET", f"/api/v1/jobs/{job_id}/events") as response:
+                events = [
+                    json.loads(line[len("data: "):])
+                    for line in response.iter_lines()
+                    if line.startswith("data: ")
+                ]
+            polled = client.get(f"/api/v1/jobs/{job_id}").json()
+
+        assert submitted.status_code == 202
+        assert submitted.json()["priority"] == "high"
+        assert events[-1]["event"] == "done"
+        assert polled["status"] == "succeeded"
+        assert polled["result"]["review"]["quality_score"] == 8
+
+    def test_unknown_job_404(self, client):
+        assert client.get("/api/v1/jobs/missing").status_code == 404
+        assert client.delete("/api/v1/jobs/missing").status_code == 404
+
+    def test_invalid_body_rejected(self, client):
+        response = client.post("/api/v1/jobs/split", json={"diff": ""})
+
+        assert response.status_code == 422
+
+    def test_metrics_include_queue(self, client):
+        jobs = client.get("/metrics?format=json").json()["jobs"]
+
+        assert jobs["workers"] == job_queue.workers
+        assert "queue_depth" in jobs and "wait_seconds" in jobs
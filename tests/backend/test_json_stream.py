@@ -0,0 +1,117 @@
+import json
+
+import pytest
+
+from backend.services.llm.json_stream import JSONStreamParser, parse_json
+
+
+def _feed_all(parser: JSONStreamParser, chunks: list[str]) -> dict[str, str]:
+    streamed: dict[str, str] = {}
+    for chunk in chunks:
+        for field, delta in parser.feed(chunk).items():
+            streamed[field] = streamed.get(field, "") + delta
+    return streamed
+
+
+class TestJSONStreamParser:
+
+    def test_fields_stream_before_the_object_closes(self):
+        parser = JSONStreamParser()
+
+        assert parser.feed('{"subject": "add gre') == {"subject": "add gre"}
+        assert parser.feed('eting", "bo') == {"subject": "eting"}
+        assert parser.feed('dy": "Says hi') == {"body": "Says hi"}
+        assert parser.fields == {"subject": "add greeting", "body": "Says hi"}
+
+    def test_escapes_split_across_chunks(self):
+        text = json.dumps({"message": 'feat: "quoted"\n\nBody é \U0001f600'})
+        chunks = [text[i:i + 3] for i in range(0, len(text), 3)]
+        parser = JSONStreamParser()
+
+        streamed = _feed_all(parser, chunks)
+
+        assert streamed["message"] == 'feat: "quoted"\n\nBody é \U0001f600'
+        assert parser.result() == json.loads(text)
+
+    def test_nested_values_are_skipped_but_parsed(self):
+        text = '{"summary": "ok", "issues": [{"description": "x"}], "positives": ["a"], "note": "}"}'
+        parser = JSONStreamParser()
+
+        streamed = _feed_all(parser, list(text))
+
+        assert streamed == {"summary": "ok", "note": "}"}
+        assert parser.result()["issues"] == [{"description": "x"}]
+
+    def test_text_before_the_object_is_ignored_while_streaming(self):
+        parser = JSONStreamParser()
+
+        assert parser.feed('```json\n{"title": "x"}') == {"title": "x"}
+
+    def test_cut_off_result_is_recovered(self):
+        parser = JSONStreamParser()
+        parser.feed('{"title": "cut off')
+
+        assert parser.result() == {"title": "cut off"}
+
+    def test_unrecoverable_result_raises(self):
+        parser = JSONStreamParser()
+        parser.feed("I cannot help with that.")
+
+        with pytest.raises(json.JSONDecodeError):
+            parser.result()
+
+    def test_partial_includes_nested_values(self):
+        parser = JSONStreamParser()
+        parser.feed('{"subject": "add greeting", "issues": [{"severity": "high", "descr')
+
+        assert parser.partial() == {"subject": "add greeting", "issues": [{"severity": "high"}]}
+        assert not parser.complete
+        parser.feed('iption": "x"}]}\n```')
+        assert parser.complete
+
+    def test_partial_before_the_object_starts(self):
+        parser = JSONStreamParser()
+        parser.feed("```js")
+
+        assert parser.partial() == {}
+
+
+class TestParseJSON:
+
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            ('{"a": 1}', {"a": 1}),
+            ('```json\n{"a": 1}\n```', {"a": 1}),
+            ('Here you go:\n{"a": "}"} Hope this helps!', {"a": "}"}),
+            ('{"a": [1, 2,], "b": {"c": 3,},}', {"a": [1, 2], "b": {"c": 3}}),
+            ('{"message": "feat: x\n\nbody"}', {"message": "feat: x\n\nbody"}),
+            ('{"a": 1} garbage', {"a": 1}),
+        ],
+    )
+    def test_quirks(self, text, expected):
+        assert parse_json(text) == expected
+
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            ('{"subject": "add", "body": "Says h', {"subject": "add", "body": "Says h"}),
+            ('{"subject": "add", "bo', {"subject": "add"}),
+            ('{"subject": "add", "body":', {"subject": "add"}),
+            ('{"subject": "add",', {"subject": "add"}),
+            ('{"ok": tr', {}),
+            ('{"score": 7', {"score": 7}),
+            ('{"items": ["a", "b', {"items": ["a", "b"]}),
+            ('{"items": [{"x": 1}, {"y"', {"items": [{"x": 1}, {}]}),
+            ('{"path": "C:\\', {"path": "C:"}),
+            ('{"text": "caf\\u00', {"text": "caf"}),
+        ],
+    )
+    def test_cut_off_objects_close_after_the_last_value(self, text, expected):
+        assert parse_json(text) == expected
+
+    def test_unrecoverable_raises_the_original_error(self):
+        with pytest.raises(json.JSONDecodeError) as excinfo:
+            parse_json("not json")
+
+        assert excinfo.value.doc == "not json"
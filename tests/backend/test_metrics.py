@@ -0,0 +1,127 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import pytest
+
+from backend.core.dependencies import get_llm_from_request
+from backend.main import app
+from backend.services.llm.ollama import OllamaProvider
+from backend.utils.metrics import (
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+    llm_call_seconds,
+    llm_retries,
+)
+
+
+class TestRegistry:
+
+    def test_counter_and_gauge_render(self):
+        registry = MetricsRegistry()
+        hits = Counter("hits_total", "Hits.", ("cache",), registry=registry)
+        depth = Gauge("depth", "Depth.", registry=registry)
+
+        hits.inc(cache="analysis")
+        hits.inc(2, cache="analysis")
+        hits.inc(cache='say "hi"')
+        depth.set(4)
+
+        text = registry.render()
+
+        assert "# TYPE hits_total counter" in text
+        assert 'hits_total{cache="analysis"} 3' in text
+        assert 'hits_total{cache="say \\"hi\\""} 1' in text
+        assert "depth 4" in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry()
+        latency = Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1), registry=registry)
+
+        for value in (0.05, 0.1, 0.5, 3):
+            latency.observe(value, route="/x")
+
+        lines = registry.render().splitlines()
+
+        assert 'latency_seconds_bucket{route="/x",le="0.1"} 2' in lines
+        assert 'latency_seconds_bucket{route="/x",le="1"} 3' in lines
+        assert 'latency_seconds_bucket{route="/x",le="+Inf"} 4' in lines
+        assert 'latency_seconds_count{route="/x"} 4' in lines
+        assert 'latency_seconds_sum{route="/x"} 3.65' in lines
+
+    def test_duplicate_name_rejected(self):
+        registry = MetricsRegistry()
+        Counter("x_total", "X.", registry=registry)
+
+        with pytest.raises(ValueError):
+            Counter("x_total", "X.", registry=registry)
+
+
+class TestMetricsEndpoint:
+
+    def setup_method(self):
+        app.dependency_overrides.clear()
+
+    def teardown_method(self):
+        app.dependency_overrides.clear()
+
+    def test_prometheus_text_with_route_templates(self, client):
+        client.get("/api/v1/jobs/missing")
+        client.get("/no-such-page")
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        text = response.text
+        assert (
+            'inyeon_http_request_duration_seconds_count{method="GET",'
+            'route="/api/v1/jobs/{job_id}",status="404"}'
+        ) in text
+        assert 'route="unmatched"' in text
+        assert "/jobs/missing" not in text
+        assert "inyeon_job_queue_depth 0" in text
+
+    def test_agent_and_node_durations(self, client, sample_diff):
+        llm = AsyncMock()
+        llm.generate = AsyncMock(
+            side_effect=lambda prompt, **kwargs: (
+                {"message": "feat: greet"}
+                if "Generate a git commit message" in prompt
+                else {"summary": "greet", "needs_context": False, "files_to_read": []}
+            )
+        )
+        app.dependency_overrides[get_llm_from_request] = lambda: llm
+
+        client.post("/api/v1/agent/run", json={"diff": sample_diff})
+        text = client.get("/metrics").text
+
+        assert 'inyeon_agent_duration_seconds_count{agent="commit",status="ok"}' in text
+        assert 'inyeon_node_duration_seconds_count{agent="commit",node="generate_commit",status="ok"}' in text
+        assert 'inyeon_cache_requests_total{cache="analysis",result="miss"}' in text
+
+    def test_json_format(self, client):
+        data = client.get("/metrics?format=json").json()
+
+        assert {"llm_usage", "jobs", "metrics"} <= set(data)
+        assert "inyeon_sse_streams_in_flight" in data["metrics"]
+
+
+class TestProviderMetrics:
+
+    @pytest.mark.asyncio
+    async def test_call_latency_and_retries(self, monkeypatch):
+        monkeypatch.setattr("backend.services.llm.ollama.asyncio.sleep", AsyncMock())
+        provider = OllamaProvider(base_url="http://ollama", model="m")
+        busy = httpx.Response(503, request=httpx.Request("POST", "http://ollama/api/generate"))
+        ok = MagicMock(status_code=200)
+        ok.json.return_value = {"response": "hi", "prompt_eval_count": 1, "eval_count": 1}
+        provider._client.post = AsyncMock(side_effect=[busy, ok])
+        retries_before = llm_retries.snapshot().get("ollama,503", 0)
+        calls_before = llm_call_seconds.snapshot().get("ollama,generate,ok", {}).get("count", 0)
+
+        assert await provider.generate("hello") == {"text": "hi"}
+
+        assert llm_retries.snapshot()["ollama,503"] == retries_before + 1
+        assert llm_call_seconds.snapshot()["ollama,generate,ok"]["count"] == calls_before + 1
@@ -0,0 +1,79 @@
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from backend.core.rate_limit import MemoryBackend, RateLimiter
+from backend.main import APIKeyMiddleware, RateLimitMiddleware
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(APIKeyMiddleware)
+    app.add_middleware(RateLimitMiddleware, limiter=RateLimiter(MemoryBackend(), rpm=10))
+
+    @app.get("/api/v1/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.get("/api/v1/stream")
+    async def stream():
+        async def events():
+            for i in range(3):
+                yield f"event: progress\ndata: {i}\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/health")
+    async def health():
+        return {"ok": True}
+
+    return app
+
+
+class TestAPIKeyMiddleware:
+
+    def test_no_key_configured_allows_all(self):
+        with patch("backend.main.settings.api_key", None):
+            response = TestClient(_app()).get("/api/v1/ping")
+
+        assert response.status_code == 200
+
+    def test_missing_or_wrong_key_rejected(self):
+        client = TestClient(_app())
+
+        with patch("backend.main.settings.api_key", "secret"):
+            missing = client.get("/api/v1/ping")
+            wrong = client.get("/api/v1/ping", headers={"X-API-Key": "nope"})
+            ok = client.get("/api/v1/ping", headers={"X-API-Key": "secret"})
+
+        assert missing.status_code == 401
+        assert wrong.json() == {"detail": "Invalid or missing API key"}
+        assert ok.status_code == 200
+
+    def test_open_paths_and_preflight_skip_key(self):
+        client = TestClient(_app())
+
+        with patch("backend.main.settings.api_key", "secret"):
+            health = client.get("/health")
+            preflight = client.options("/api/v1/ping")
+
+        assert health.status_code == 200
+        assert preflight.status_code != 401
+
+
+class TestStreamingThroughMiddleware:
+
+    def test_sse_passes_through_with_rate_limit_header(self):
+        client = TestClient(_app())
+
+        with patch("backend.main.settings.api_key", "secret"):
+            with client.stream(
+                "GET", "/api/v1/stream", headers={"X-API-Key": "secret"}
+            ) as response:
+                chunks = list(response.iter_text())
+
+        assert response.status_code == 200
+        assert response.headers["X-RateLimit-Remaining"] == "9"
+        assert "".join(chunks).count("event: progress") == 3
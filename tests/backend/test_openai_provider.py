@@ -48,6 +48,14 @@ class TestOpenAIProvider:
         result = await self.provider.generate("Return JSON", json_mode=True)
         assert result == {"key": "value"}
 
+    @pytest.mark.asyncio
+    async def test_generate_json_mode_recovers_model_quirks(self):
+        self.provider.client.chat.completions.create = AsyncMock(
+            return_value=_mock_response('```json\n{"key": "value", "items": [1,],}\n```')
+        )
+        result = await self.provider.generate("Return JSON", json_mode=True)
+        assert result == {"key": "value", "items": [1]}
+
     @pytest.mark.asyncio
     async def test_generate_json_mode_passes_response_format(self):
         self.provider.client.chat.completions.create = AsyncMock(
@@ -0,0 +1,67 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from backend.agents.commit_agent import CommitAgent
+from backend.models.events import EventType
+from backend.services.llm.base import observed
+from backend.utils.profiling import profile_nodes, record_cache
+from backend.utils.usage import record_usage
+
+
+class _SlowLLM:
+    name = "openai"
+
+    @observed("generate")
+    async def generate(self, prompt, **kwargs):
+        await asyncio.sleep(0.01)
+        record_usage("openai", "gpt-4.1-mini", 30, 10)
+        if "Generate a git commit message" in prompt:
+            return {"message": "feat: greet"}
+        return {"summary": "greet", "needs_context": False, "files_to_read": []}
+
+
+class TestNodeEvents:
+
+    @pytest.mark.asyncio
+    async def test_start_and_complete_with_profile(self, sample_diff):
+        agent = CommitAgent(_SlowLLM())
+
+        events = [event async for event in agent.run_stream(diff=sample_diff)]
+
+        node_events = [
+            (e.event, e.node) for e in events
+            if e.event in (EventType.NODE_START, EventType.NODE_COMPLETE)
+        ]
+        assert node_events == [
+            (EventType.NODE_START, "analyze"),
+            (EventType.NODE_COMPLETE, "analyze"),
+            (EventType.NODE_START, "generate_commit"),
+            (EventType.NODE_COMPLETE, "generate_commit"),
+        ]
+        complete = next(
+            e for e in events
+            if e.event == EventType.NODE_COMPLETE and e.node == "generate_commit"
+        )
+        assert complete.data["llm_calls"] == 1
+        assert complete.data["llm_ms"] >= 10
+        assert complete.data["duration_ms"] >= complete.data["llm_ms"]
+        assert (complete.data["prompt_tokens"], complete.data["completion_tokens"]) == (30, 10)
+        assert events[-2].event == EventType.RESULT
+
+    @pytest.mark.asyncio
+    async def test_run_without_stream_unaffected(self, sample_diff):
+        llm = AsyncMock()
+        llm.generate = AsyncMock(return_value={"message": "feat: greet"})
+
+        result = await CommitAgent(llm).run(diff=sample_diff)
+
+        assert result["commit_message"] == "feat: greet"
+
+
+def test_recording_outside_a_node_is_ignored():
+    with profile_nodes() as profiles:
+        record_cache(True)
+
+    assert profiles == {}
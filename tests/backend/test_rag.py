@@ -0,0 +1,316 @@
+import gzip
+import json
+import zlib
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.main import app
+from backend.rag import CodeRetriever, VectorStore, VectorStoreError
+
+
+def _query_result(per_query: list[list[tuple[str, float]]]) -> dict:
+    return {
+        "ids": [[path for path, _ in items] for items in per_query],
+        "documents": [[f"content of {path}" for path, _ in items] for items in per_query],
+        "metadatas": [[{"path": path} for path, _ in items] for items in per_query],
+        "distances": [[dist for _, dist in items] for items in per_query],
+    }
+
+
+@pytest.fixture
+def store():
+    store = VectorStore.__new__(VectorStore)
+    store.collection = MagicMock()
+    return store
+
+
+@pytest.fixture
+def retriever(store):
+    embeddings = MagicMock()
+    embeddings.embed_text = AsyncMock(return_value=[0.1, 0.2])
+    embeddings.embed_texts = AsyncMock(return_value=[[0.1, 0.2], [0.3, 0.4]])
+    return CodeRetriever(embedding_service=embeddings, vector_store=store)
+
+
+class TestVectorStoreSearchMany:
+
+    def test_groups_results_per_query(self, store):
+        store.collection.query.return_value = _query_result(
+            [[("a.py", 0.1), ("b.py", 0.3)], [("c.py", 0.2)]]
+        )
+
+        grouped = store.search_many([[0.1], [0.2]], n_results=2)
+
+        assert len(grouped) == 2
+        assert [item["id"] for item in grouped[0]] == ["a.py", "b.py"]
+        assert grouped[1][0]["metadata"] == {"path": "c.py"}
+        store.collection.query.assert_called_once()
+        assert store.collection.query.call_args[1]["query_embeddings"] == [[0.1], [0.2]]
+
+    def test_empty_queries_skip_collection(self, store):
+        assert store.search_many([]) == []
+        store.collection.query.assert_not_called()
+
+    def test_search_delegates_to_single_query(self, store):
+        store.collection.query.return_value = _query_result([[("a.py", 0.25)]])
+
+        items = store.search([0.1], n_results=1)
+
+        assert items[0]["distance"] == 0.25
+
+    def test_failure_wrapped(self, store):
+        store.collection.query.side_effect = RuntimeError("boom")
+
+        with pytest.raises(VectorStoreError):
+            store.search_many([[0.1]])
+
+
+class TestCodeRetrieverSearchMany:
+
+    @pytest.mark.asyncio
+    async def test_one_embedding_call_and_one_query(self, retriever, store):
+        store.collection.query.return_value = _query_result(
+            [[("a.py", 0.1)], [("b.py", 0.4)]]
+        )
+
+        grouped = await retriever.search_many(["auth", "db"], n_results=1)
+
+        retriever.embeddings.embed_texts.assert_awaited_once_with(["auth", "db"])
+        retriever.embeddings.embed_text.assert_not_called()
+        store.collection.query.assert_called_once()
+        assert grouped[0][0]["path"] == "a.py"
+        assert grouped[1][0]["score"] == pytest.approx(0.6)
+
+    @pytest.mark.asyncio
+    async def test_empty_queries(self, retriever):
+        assert await retriever.search_many([]) == []
+        retriever.embeddings.embed_texts.assert_not_called()
+
+
+class TestRetrieverCache:
+
+    @pytest.mark.asyncio
+    async def test_repeated_search_reuses_result(self, retriever, store):
+        store.collection.query.return_value = _query_result([[("a.py", 0.1)]])
+
+        first = await retriever.search_for_diff("diff --git a/a.py b/a.py")
+        second = await retriever.search_for_diff("diff --git a/a.py b/a.py")
+
+        assert first == second
+        retriever.embeddings.embed_text.assert_awaited_once()
+        store.collection.query.assert_called_once()
+        assert (retriever.cache_hits, retriever.cache_misses) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_cached_result_is_a_copy(self, retriever, store):
+        store.collection.query.return_value = _query_result([[("a.py", 0.1)]])
+
+        first = await retriever.search("q")
+        first[0]["content"] = "mutated"
+
+        assert (await retriever.search("q"))[0]["content"] == "content of a.py"
+
+    @pytest.mark.asyncio
+    async def test_n_results_is_part_of_key(self, retriever, store):
+        store.collection.query.return_value = _query_result([[("a.py", 0.1)]])
+
+        await retriever.search("q", n_results=1)
+        await retriever.search("q", n_results=3)
+
+        assert store.collection.query.call_count == 2
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("write", ["index", "delete", "clear"])
+    async def test_index_writes_invalidate(self, retriever, store, write):
+        store.collection.query.return_value = _query_result([[("a.py", 0.1)]])
+        store.clear = MagicMock()
+        retriever.embeddings.embed_texts = AsyncMock(return_value=[[0.5, 0.5]])
+        await retriever.search("q")
+        version = retriever.version
+
+        if write == "index":
+            await retriever.index_files({"b.py": "b = 1"})
+        elif write == "delete":
+            retriever.delete(["a.py"])
+        else:
+            retriever.clear()
+        await retriever.search("q")
+
+        assert retriever.version == version + 1
+        assert store.collection.query.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_search_many_only_embeds_misses(self, retriever, store):
+        store.collection.query.return_value = _query_result([[("a.py", 0.1)]])
+        await retriever.search("cached")
+        retriever.embeddings.embed_texts = AsyncMock(return_value=[[0.3, 0.4]])
+        store.collection.query.return_value = _query_result([[("b.py", 0.2)]])
+
+        grouped = await retriever.search_many(["cached", "fresh"])
+
+        retriever.embeddings.embed_texts.assert_awaited_once_with(["fresh"])
+        assert grouped[0][0]["path"] == "a.py"
+        assert grouped[1][0]["path"] == "b.py"
+
+    @pytest.mark.asyncio
+    async def test_lru_evicts_oldest(self, store):
+        embeddings = MagicMock()
+        embeddings.embed_text = AsyncMock(return_value=[0.1])
+        retriever = CodeRetriever(
+            embedding_service=embeddings, vector_store=store, cache_size=2
+        )
+        store.collection.query.return_value = _query_result([[("a.py", 0.1)]])
+
+        for q in ["one", "two", "three", "one"]:
+            await retriever.search(q)
+
+        assert store.collection.query.call_count == 4
+
+    def test_count_cached_until_version_changes(self, retriever, store):
+        store.collection.count.return_value = 3
+
+        assert retriever.count() == 3
+        assert retriever.count() == 3
+        store.collection.count.assert_called_once()
+
+        retriever.delete(["a.py"])
+        retriever.count()
+        assert store.collection.count.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_writes_by_other_processes_invalidate(self, retriever, store):
+        store.collection.query.return_value = _query_result([[("a.py", 0.1)]])
+        store.collection.count.return_value = 1
+        await retriever.search("q")
+        await retriever.search("q")
+        # Another process indexes a file into the same store
+        store.collection.count.return_value = 2
+
+        with patch("backend.rag.retriever.time.monotonic", return_value=1e12):
+            await retriever.search("q")
+            assert retriever.count() == 2
+
+        assert store.collection.query.call_count == 2
+        assert store.collection.count.call_count == 2
+
+
+class TestBatchSearchRouter:
+
+    def test_batch_search_groups_by_query(self):
+        mock_retriever = MagicMock()
+        mock_retriever.search_many = AsyncMock(
+            return_value=[
+                [{"path": "a.py", "content": "a", "score": 0.9}],
+                [],
+            ]
+        )
+
+        with patch("backend.routers.rag.get_retriever", return_value=mock_retriever):
+            response = TestClient(app).post(
+                "/api/v1/rag/search/batch",
+                json={"repo_id": "repo", "queries": ["auth", "db"], "n_results": 1},
+            )
+
+        assert response.status_code == 200
+        data = response.json()["results"]
+        assert [r["query"] for r in data] == ["auth", "db"]
+        assert data[0]["results"][0]["path"] == "a.py"
+        assert data[1]["results"] == []
+        mock_retriever.search_many.assert_awaited_once_with(["auth", "db"], 1)
+
+    def test_batch_search_requires_queries(self):
+        response = TestClient(app).post(
+            "/api/v1/rag/search/batch",
+            json={"repo_id": "repo", "queries": []},
+        )
+        assert response.status_code == 422
+
+    @pytest.mark.parametrize("n_results", [0, -1, 51])
+    def test_batch_search_bounds_n_results(self, n_results):
+        response = TestClient(app).post(
+            "/api/v1/rag/search/batch",
+            json={"repo_id": "repo", "queries": ["auth"], "n_results": n_results},
+        )
+        assert response.status_code == 422
+
+
+class TestStreamingIndexRouter:
+
+    def _ndjson(self, count: int) -> bytes:
+        return b"".join(
+            json.dumps({"path": f"src/f{i}.py", "content": f"x = {i}"}).encode() + b"\n"
+            for i in range(count)
+        )
+
+    def _retriever(self) -> MagicMock:
+        ret = MagicMock()
+        ret.index_files = AsyncMock(side_effect=lambda files: list(files))
+        ret.count.return_value = 70
+        return ret
+
+    def _post(self, ret, body: bytes, **headers):
+        with patch("backend.routers.rag.get_retriever", return_value=ret):
+            return TestClient(app).post(
+                "/api/v1/rag/index/stream?repo_id=repo", content=body, headers=headers
+            )
+
+    def test_gzip_body_indexed_in_batches(self):
+        ret = self._retriever()
+
+        response = self._post(
+            ret, gzip.compress(self._ndjson(70)), **{"Content-Encoding": "gzip"}
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"indexed": 70, "total": 70, "batches": 3}
+        assert [len(c.args[0]) for c in ret.index_files.await_args_list] == [32, 32, 6]
+
+    def test_uncompressed_body(self):
+        response = self._post(self._retriever(), self._ndjson(2))
+
+        assert response.status_code == 200
+        assert response.json()["indexed"] == 2
+
+    def test_missing_field_rejected(self):
+        response = self._post(self._retriever(), b'{"path": "a.py"}\n')
+        assert response.status_code == 400
+
+    def test_non_string_content_rejected(self):
+        ret = self._retriever()
+
+        response = self._post(ret, b'{"path": "a.py", "content": 5}\n')
+
+        assert response.status_code == 400
+        ret.index_files.assert_not_called()
+
+    def test_truncated_gzip_rejected(self):
+        compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+        body = compressor.compress(self._ndjson(3)) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+        response = self._post(self._retriever(), body, **{"Content-Encoding": "gzip"})
+
+        assert response.status_code == 400
+        assert "truncated" in response.json()["detail"]
+
+    def test_oversize_line_rejected(self):
+        body = b'{"path": "a.py", "content": "' + b"x" * 3_000_000 + b'"}\n'
+
+        response = self._post(self._retriever(), body)
+
+        assert response.status_code == 400
+        assert "size limit" in response.json()["detail"]
+
+    def test_compressed_bomb_rejected_without_inflating(self):
+        # 64 MB of zeros with no newline compresses to ~64 KB
+        body = gzip.compress(b"0" * 64_000_000)
+
+        response = self._post(self._retriever(), body, **{"Content-Encoding": "gzip"})
+
+        assert response.status_code == 400
+        assert "size limit" in response.json()["detail"]
+
+    def test_unsupported_encoding(self):
+        response = self._post(self._retriever(), b"", **{"Content-Encoding": "br"})
+        assert response.status_code == 415
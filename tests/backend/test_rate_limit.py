@@ -0,0 +1,163 @@
+import threading
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.core.rate_limit import (
+    Limit,
+    MemoryBackend,
+    RateLimiter,
+    SQLiteBackend,
+    refill,
+)
+from backend.main import RateLimitMiddleware
+
+
+class TestRefill:
+
+    def test_spends_and_refills(self):
+        limit = Limit(rpm=60, burst=2)
+
+        assert refill(2, 0, 0, limit) == (True, 1, 0.0)
+        allowed, tokens, retry_after = refill(0, 0, 0.5, limit)
+        assert not allowed
+        assert retry_after == pytest.approx(0.5)
+        assert refill(0, 0, 10, limit)[:2] == (True, 1)
+
+
+class TestMemoryBackend:
+
+    @pytest.mark.asyncio
+    async def test_burst_then_limited(self):
+        backend = MemoryBackend()
+        limit = Limit(rpm=60, burst=3)
+
+        with patch("backend.core.rate_limit.time.monotonic", return_value=100.0):
+            results = [(await backend.take("ip:a", limit))[0] for _ in range(4)]
+            other = await backend.take("ip:b", limit)
+
+        assert results == [True, True, True, False]
+        assert other[0]
+
+    @pytest.mark.asyncio
+    async def test_idle_buckets_dropped(self):
+        backend = MemoryBackend(shards=1)
+        limit = Limit(rpm=60, burst=1)
+
+        with patch("backend.core.rate_limit.time.monotonic", return_value=0.0):
+            for i in range(5):
+                await backend.take(f"ip:{i}", limit)
+        with patch("backend.core.rate_limit.time.monotonic", return_value=10.0):
+            for _ in range(3):
+                await backend.take("ip:new", limit)
+
+        assert len(backend) < 6
+
+
+class TestSQLiteBackend:
+
+    @pytest.mark.asyncio
+    async def test_buckets_shared_between_instances(self, tmp_path):
+        path = str(tmp_path / "limits.sqlite3")
+        first, second = SQLiteBackend(path), SQLiteBackend(path)
+        limit = Limit(rpm=1, burst=2)
+
+        results = [
+            (await first.take("ip:a", limit))[0],
+            (await second.take("ip:a", limit))[0],
+            (await first.take("ip:a", limit))[0],
+        ]
+
+        assert results == [True, True, False]
+
+    def test_concurrent_connections_never_exceed_burst(self, tmp_path):
+        path = str(tmp_path / "limits.sqlite3")
+        SQLiteBackend(path)
+        limit = Limit(rpm=1, burst=10)
+        allowed = []
+
+        def worker():
+            backend = SQLiteBackend(path)
+            for _ in range(10):
+                allowed.append(backend._take("ip:a", limit)[0])
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sum(allowed) == 10
+
+
+class TestRateLimiter:
+
+    @pytest.mark.asyncio
+    async def test_listed_api_key_gets_own_limit(self):
+        limiter = RateLimiter(MemoryBackend(), rpm=1, api_keys={"ci-key": 60})
+
+        keyed = [(await limiter.check("/api/v1/x", "1.1.1.1", "ci-key")).allowed for _ in range(5)]
+        by_ip = [(await limiter.check("/api/v1/x", "1.1.1.1")).allowed for _ in range(2)]
+
+        assert all(keyed)
+        assert by_ip == [True, False]
+
+    @pytest.mark.asyncio
+    async def test_unknown_api_key_limited_by_ip(self):
+        limiter = RateLimiter(MemoryBackend(), rpm=1)
+
+        first = await limiter.check("/api/v1/x", "1.1.1.1", "made-up-1")
+        second = await limiter.check("/api/v1/x", "1.1.1.1", "made-up-2")
+
+        assert first.allowed and not second.allowed
+
+    @pytest.mark.asyncio
+    async def test_route_limit_applies_on_top(self):
+        limiter = RateLimiter(
+            MemoryBackend(), rpm=100, routes={"/api/v1/batch": 1, "/api/v1": 50}
+        )
+
+        batch = [(await limiter.check("/api/v1/batch", "ip")).allowed for _ in range(2)]
+        other = await limiter.check("/api/v1/agent/run", "ip")
+
+        assert batch == [True, False]
+        assert other.allowed
+
+    @pytest.mark.asyncio
+    async def test_zero_rpm_disables(self):
+        limiter = RateLimiter(MemoryBackend(), rpm=0)
+
+        assert all([(await limiter.check("/api/v1/x", "ip")).allowed for _ in range(50)])
+
+
+class TestRateLimitMiddleware:
+
+    def _client(self, limiter: RateLimiter) -> TestClient:
+        app = FastAPI()
+        app.add_middleware(RateLimitMiddleware, limiter=limiter)
+
+        @app.get("/api/v1/ping")
+        async def ping():
+            return {"ok": True}
+
+        @app.get("/health")
+        async def health():
+            return {"ok": True}
+
+        return TestClient(app)
+
+    def test_429_with_retry_after(self):
+        client = self._client(RateLimiter(MemoryBackend(), rpm=2))
+
+        responses = [client.get("/api/v1/ping") for _ in range(3)]
+
+        assert [r.status_code for r in responses] == [200, 200, 429]
+        assert responses[0].headers["X-RateLimit-Remaining"] == "1"
+        assert int(responses[2].headers["Retry-After"]) >= 1
+
+    def test_non_api_paths_not_limited(self):
+        client = self._client(RateLimiter(MemoryBackend(), rpm=1))
+
+        assert all(client.get("/health").status_code == 200 for _ in range(3))
@@ -151,6 +151,19 @@ class TestSplitAgent:
         assert "backend/main.py" in all_files
         assert "backend/routers/split.py" in all_files
 
+    @pytest.mark.asyncio
+    async def test_split_agent_reports_hunk_ranges(self, mock_llm, sample_diff):
+        agent = SplitAgent(llm=mock_llm, retriever=None)
+        result = await agent.run(diff=sample_diff, strategy="directory")
+
+        hunks = [h for split in result["splits"] for h in split["hunks"]]
+        assert {"file_path": "backend/main.py", "source_start": 1, "source_length": 2} in hunks
+        assert {
+            "file_path": "backend/routers/split.py",
+            "source_start": 0,
+            "source_length": 0,
+        } in hunks
+
 
 class TestSplitAgentState:
 
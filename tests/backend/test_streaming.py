@@ -0,0 +1,114 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from backend.agents.commit_agent import CommitAgent
+from backend.core.dependencies import get_llm_from_request
+from backend.main import app
+from backend.models.events import EventType, StreamEvent
+from backend.routers.streaming import HEARTBEAT, sse_generator
+from backend.utils.metrics import sse_disconnects, sse_streams_in_flight
+
+
+class _Request:
+    """Stands in for a Starlette request whose client leaves after ``polls`` checks."""
+
+    def __init__(self, polls: int = 0):
+        self.polls = polls
+
+    async def is_disconnected(self) -> bool:
+        self.polls -= 1
+        return self.polls < 0
+
+
+async def _slow_events(delay: float):
+    await asyncio.sleep(delay)
+    yield StreamEvent(event=EventType.DONE)
+
+
+class TestSSEGenerator:
+
+    @pytest.mark.asyncio
+    async def test_heartbeats_while_the_agent_is_silent(self):
+        chunks = [c async for c in sse_generator(_slow_events(0.05), heartbeat=0.01)]
+
+        assert chunks[0] == HEARTBEAT
+        assert chunks[-1].startswith("event: done\n")
+
+    @pytest.mark.asyncio
+    async def test_disconnect_cancels_the_agent_and_provider_call(self, sample_diff):
+        cancelled = asyncio.Event()
+
+        async def generate(prompt, **kwargs):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        llm = AsyncMock()
+        llm.generate = AsyncMock(side_effect=generate)
+        events = CommitAgent(llm).run_stream(diff=sample_diff)
+        disconnects_before = sse_disconnects.snapshot()[""]
+
+        chunks = [
+            c async for c in sse_generator(events, _Request(polls=2), heartbeat=0.01)
+        ]
+
+        assert chunks.count(HEARTBEAT) == 2
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        assert sse_disconnects.snapshot()[""] == disconnects_before + 1
+        assert sse_streams_in_flight.snapshot()[""] == 0
+
+    @pytest.mark.asyncio
+    async def test_slow_client_pauses_the_agent(self):
+        produced = 0
+
+        async def events():
+            nonlocal produced
+            for _ in range(20):
+                produced += 1
+                yield StreamEvent(event=EventType.PROGRESS, data={"message": "x"})
+
+        stream = sse_generator(events(), max_buffered=3)
+        await anext(stream)
+        await asyncio.sleep(0.05)
+
+        # One delivered, three queued, one waiting to be queued
+        assert produced == 5
+        await stream.aclose()
+
+    @pytest.mark.asyncio
+    async def test_stream_error_becomes_an_error_event(self):
+        async def events():
+            yield StreamEvent(event=EventType.AGENT_START)
+            raise RuntimeError("boom")
+
+        chunks = [c async for c in sse_generator(events())]
+
+        assert chunks[-1].startswith("event: error\n")
+        assert "boom" in chunks[-1]
+
+
+class TestStreamEndpoint:
+
+    def teardown_method(self):
+        app.dependency_overrides.clear()
+
+    def test_commit_stream(self, client, sample_diff):
+        llm = AsyncMock()
+        llm.generate = AsyncMock(
+            side_effect=lambda prompt, **kwargs: (
+                {"message": "feat: greet"}
+                if "Generate a git commit message" in prompt
+                else {"summary": "greet", "needs_context": False, "files_to_read": []}
+            )
+        )
+        app.dependency_overrides[get_llm_from_request] = lambda: llm
+
+        response = client.post("/api/v1/agent/stream/commit", json={"diff": sample_diff})
+
+        assert response.status_code == 200
+        assert "event: result" in response.text
+        assert response.text.rstrip().endswith('"event":"done","agent":"commit","node":"","data":{}}')
@@ -0,0 +1,92 @@
+import json
+from unittest.mock import AsyncMock
+
+import pytest
+
+from backend.agents.commit_agent import CommitAgent
+from backend.agents.generation import generate_json
+from backend.models.events import EventType
+from backend.services.llm.base import LLMError
+
+_ANALYSIS = {"summary": "greet", "needs_context": False, "files_to_read": []}
+_COMMIT = {"subject": "add greeting", "message": "feat: add greeting\n\nSays hi."}
+
+
+class _StreamingLLM:
+    name = "openai"
+    streams_tokens = True
+
+    def __init__(self, fail_stream: bool = False):
+        self.fail_stream = fail_stream
+        self.generate = AsyncMock(side_effect=self._generate)
+        self.stream_calls = 0
+
+    async def _generate(self, prompt, **kwargs):
+        return _COMMIT if "Generate a git commit message" in prompt else _ANALYSIS
+
+    async def generate_stream(self, prompt, json_mode=False, temperature=0.3):
+        self.stream_calls += 1
+        if self.fail_stream:
+            raise LLMError("HTTP 429")
+        text = json.dumps(_COMMIT)
+        for i in range(0, len(text), 5):
+            yield text[i:i + 5]
+
+
+class TestTokenStreaming:
+
+    @pytest.mark.asyncio
+    async def test_final_node_streams_progress(self, sample_diff):
+        llm = _StreamingLLM()
+
+        events = [e async for e in CommitAgent(llm).run_stream(diff=sample_diff)]
+
+        kinds = [(e.event, e.node) for e in events if e.node == "generate_commit"]
+        assert kinds[0] == (EventType.NODE_START, "generate_commit")
+        assert kinds[-1] == (EventType.NODE_COMPLETE, "generate_commit")
+        progress = [e for e in events if e.event == EventType.PROGRESS]
+        assert len(progress) > 2
+        message = "".join(e.data["delta"] for e in progress if e.data["field"] == "message")
+        assert message == _COMMIT["message"]
+        result = next(e for e in events if e.event == EventType.RESULT)
+        assert result.data["commit_message"] == _COMMIT["message"]
+        # The analysis node is not a final generation node
+        assert llm.stream_calls == 1
+
+    @pytest.mark.asyncio
+    async def test_run_does_not_stream(self, sample_diff):
+        llm = _StreamingLLM()
+
+        result = await CommitAgent(llm).run(diff=sample_diff)
+
+        assert result["commit_message"] == _COMMIT["message"]
+        assert llm.stream_calls == 0
+
+    @pytest.mark.asyncio
+    async def test_stream_failure_before_tokens_falls_back(self, sample_diff):
+        llm = _StreamingLLM(fail_stream=True)
+
+        events = [e async for e in CommitAgent(llm).run_stream(diff=sample_diff)]
+
+        assert not [e for e in events if e.event == EventType.PROGRESS]
+        result = next(e for e in events if e.event == EventType.RESULT)
+        assert result.data["commit_message"] == _COMMIT["message"]
+
+    @pytest.mark.asyncio
+    async def test_providers_without_token_streaming_use_generate(self, sample_diff):
+        llm = AsyncMock()
+        llm.generate = AsyncMock(side_effect=_StreamingLLM()._generate)
+
+        events = [e async for e in CommitAgent(llm).run_stream(diff=sample_diff)]
+
+        assert not [e for e in events if e.event == EventType.PROGRESS]
+        assert any(e.event == EventType.RESULT for e in events)
+
+
+@pytest.mark.asyncio
+async def test_generate_json_outside_a_graph():
+    """Called directly, generate_json is a plain json_mode generate."""
+    llm = _StreamingLLM()
+
+    assert await generate_json(llm, "Generate a git commit message") == _COMMIT
+    assert llm.stream_calls == 0
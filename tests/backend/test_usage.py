@@ -0,0 +1,206 @@
+from typing import TypedDict
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from langgraph.graph import END, StateGraph
+
+from backend.engine.local import LocalEngine
+from backend.models.events import EventType, StreamEvent
+from backend.services.llm.ollama import OllamaProvider
+from backend.services.llm.openai import OpenAIProvider
+from backend.utils import usage as usage_module
+from backend.utils.cost import estimate_tokens
+from backend.utils.usage import (
+    count_tokens,
+    get_tokenizer,
+    record_usage,
+    register_tokenizer,
+    track_usage,
+    usage_metrics,
+    with_usage,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    usage_metrics.reset()
+    yield
+    usage_metrics.reset()
+
+
+class TestTokenizers:
+
+    def test_ratio_estimate_per_family(self):
+        text = "x" * 70
+
+        assert count_tokens(text, "gemini") == 18
+        assert count_tokens(text, "ollama") == 20
+
+    def test_registered_tokenizer_used(self):
+        with patch.dict(usage_module._tokenizers, clear=True):
+            register_tokenizer("gemini", lambda text: len(text.split()))
+
+            assert count_tokens("one two three", "gemini") == 3
+            assert estimate_tokens("one two three", provider="gemini") == 3
+
+    def test_openai_falls_back_when_tiktoken_cannot_load(self):
+        tiktoken = MagicMock()
+        tiktoken.get_encoding.side_effect = OSError("no network")
+
+        with (
+            patch.dict(usage_module._tokenizers, clear=True),
+            patch.dict("sys.modules", {"tiktoken": tiktoken}),
+        ):
+            assert count_tokens("x" * 70, "openai") == 18
+
+    def test_unknown_family_defaults_to_four_chars(self):
+        assert get_tokenizer("other")("abcdefgh") == 2
+
+    def test_estimate_tokens_default_unchanged(self):
+        assert estimate_tokens("abcdefg") == 1
+
+
+class TestRecordUsage:
+
+    def test_counts_from_response(self):
+        with track_usage("commit") as tracker:
+            record_usage("openai", "gpt-4.1-mini", 120, 30)
+
+        assert tracker.total.prompt_tokens == 120
+        assert tracker.total.completion_tokens == 30
+        assert tracker.total.estimated_calls == 0
+        assert tracker.to_dict()["by_agent"]["commit"]["total_tokens"] == 150
+
+    def test_missing_counts_estimated(self):
+        with track_usage() as tracker:
+            record_usage("gemini", "gemini-2.5-flash", None, None, "p" * 40, "c" * 8)
+
+        assert tracker.total.prompt_tokens == 10
+        assert tracker.total.completion_tokens == 2
+        assert tracker.total.estimated_calls == 1
+
+    def test_nested_tracking_shares_request_total(self):
+        with track_usage("orchestrator") as outer:
+            record_usage("ollama", "qwen", 10, 5)
+            with track_usage("commit") as inner:
+                record_usage("ollama", "qwen", 20, 5)
+
+        assert inner is outer
+        assert outer.total.total_tokens == 40
+        assert set(outer.by_agent) == {"orchestrator", "commit"}
+        assert usage_metrics.snapshot()["requests"] == 1
+
+    def test_process_metrics_by_model(self):
+        record_usage("openai", "gpt-4.1-mini", 100, 10)
+        record_usage("openai", "gpt-4.1-mini", 50, 5)
+
+        snapshot = usage_metrics.snapshot()
+
+        assert snapshot["by_model"]["openai/gpt-4.1-mini"]["calls"] == 2
+        assert snapshot["total_tokens"] == 165
+
+    @pytest.mark.asyncio
+    async def test_labels_from_langgraph_node(self):
+        class State(TypedDict):
+            done: bool
+
+        async def generate(state: State) -> dict:
+            record_usage("openai", "gpt-4.1-mini", 7, 3)
+            return {"done": True}
+
+        graph = StateGraph(State)
+        graph.add_node("generate_commit", generate)
+        graph.set_entry_point("generate_commit")
+        graph.add_edge("generate_commit", END)
+
+        with track_usage() as tracker:
+            await graph.compile().ainvoke(
+                {"done": False}, config={"metadata": {"agent": "commit"}}
+            )
+
+        assert list(tracker.by_node) == ["commit.generate_commit"]
+        assert tracker.by_node["commit.generate_commit"].total_tokens == 10
+
+
+class TestStreamUsage:
+
+    @pytest.mark.asyncio
+    async def test_result_event_carries_usage(self):
+        async def events():
+            yield StreamEvent(event=EventType.AGENT_START, agent="review")
+            record_usage("ollama", "qwen", 11, 4)
+            yield StreamEvent(event=EventType.RESULT, agent="review", data={"review": "ok"})
+
+        collected = [e async for e in with_usage(events(), "review")]
+
+        result = collected[-1]
+        assert result.data["review"] == "ok"
+        assert result.data["usage"]["total_tokens"] == 15
+        assert result.data["usage"]["by_agent"]["review"]["calls"] == 1
+
+
+class TestProviderCapture:
+
+    @pytest.mark.asyncio
+    async def test_openai_usage_field(self):
+        with patch("backend.services.llm.openai.AsyncOpenAI"):
+            provider = OpenAIProvider(api_key="test-key")
+        response = MagicMock()
+        response.choices[0].message.content = "hi"
+        response.usage.prompt_tokens = 42
+        response.usage.completion_tokens = 3
+        provider.client.chat.completions.create = AsyncMock(return_value=response)
+
+        with track_usage() as tracker:
+            await provider.generate("hello")
+
+        assert (tracker.total.prompt_tokens, tracker.total.completion_tokens) == (42, 3)
+        assert "openai/gpt-4.1-mini" in usage_metrics.snapshot()["by_model"]
+
+    @pytest.mark.asyncio
+    async def test_ollama_eval_count(self):
+        provider = OllamaProvider(base_url="http://ollama", model="qwen")
+        response = MagicMock()
+        response.json.return_value = {
+            "response": "done",
+            "prompt_eval_count": 80,
+            "eval_count": 12,
+        }
+        provider._client.post = AsyncMock(return_value=response)
+
+        with track_usage() as tracker:
+            await provider.generate("prompt")
+
+        assert tracker.total.total_tokens == 92
+        assert tracker.total.estimated_calls == 0
+
+
+class TestEngineAndEndpoint:
+
+    @pytest.mark.asyncio
+    async def test_local_engine_result_has_usage(self):
+        engine = LocalEngine()
+        agent = MagicMock()
+        agent.name = "commit"
+
+        async def run(**kwargs):
+            record_usage("ollama", "qwen", 30, 10)
+            return {"commit_message": "feat: x"}
+
+        agent.run = run
+
+        result = await engine._run(agent, diff="d")
+
+        assert result.data["commit_message"] == "feat: x"
+        assert result.usage["total_tokens"] == 40
+        assert result.usage["by_agent"]["commit"]["prompt_tokens"] == 30
+
+    def test_metrics_endpoint(self, client):
+        record_usage("gemini", "gemini-2.5-flash", 5, 5)
+
+        response = client.get("/metrics?format=json")
+
+        assert response.status_code == 200
+        usage = response.json()["llm_usage"]
+        assert usage["total_tokens"] == 10
+        assert usage["by_model"]["gemini/gemini-2.5-flash"]["calls"] == 1
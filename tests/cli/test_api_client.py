@@ -59,3 +59,112 @@ def test_analyze_sends_correct_payload(mock_client_class, api_client):
     call_kwargs = mock_client.request.call_args
     assert call_kwargs[1]["json"]["diff"] == "test diff"
     assert call_kwargs[1]["json"]["context"] == "test context"
+
+
+def test_encode_ndjson_gzip_round_trips(api_client):
+    """Test streamed index body decompresses back to one record per line."""
+    import gzip
+    import json
+
+    records = [{"path": f"f{i}.py", "content": "x" * 100} for i in range(50)]
+    body = b"".join(api_client._encode_ndjson_gzip(iter(records), chunk_size=256))
+
+    lines = gzip.decompress(body).decode().splitlines()
+    assert [json.loads(line) for line in lines] == records
+
+
+@patch("cli.api_client.httpx.Client")
+def test_rag_index_stream_sends_gzip_ndjson(mock_client_class, api_client):
+    """Test streamed index upload posts a lazily encoded gzip NDJSON body."""
+    import gzip
+    import json
+
+    mock_response = MagicMock()
+    mock_response.json.return_value = {"indexed": 2, "total": 2, "batches": 1}
+    mock_response.raise_for_status = MagicMock()
+
+    mock_client = MagicMock()
+    mock_client.__enter__ = MagicMock(return_value=mock_client)
+    mock_client.__exit__ = MagicMock(return_value=False)
+    mock_client.request.return_value = mock_response
+    mock_client_class.return_value = mock_client
+
+    result = api_client.rag_index_stream("repo", iter([("a.py", "a"), ("b.py", "b")]))
+
+    assert result["indexed"] == 2
+    args, kwargs = mock_client.request.call_args
+    assert args[1].endswith("/api/v1/rag/index/stream")
+    assert kwargs["params"] == {"repo_id": "repo"}
+    assert kwargs["headers"]["Content-Encoding"] == "gzip"
+    body = gzip.decompress(b"".join(kwargs["content"])).decode()
+    assert [json.loads(line)["path"] for line in body.splitlines()] == ["a.py", "b.py"]
+
+
+@patch("cli.api_client.httpx.Client")
+def test_rag_search_batch_sends_queries(mock_client_class, api_client):
+    """Test rag_search_batch posts all queries in one request."""
+    mock_response = MagicMock()
+    mock_response.json.return_value = {"results": []}
+    mock_response.raise_for_status = MagicMock()
+
+    mock_client = MagicMock()
+    mock_client.__enter__ = MagicMock(return_value=mock_client)
+    mock_client.__exit__ = MagicMock(return_value=False)
+    mock_client.request.return_value = mock_response
+    mock_client_class.return_value = mock_client
+
+    api_client.rag_search_batch("repo", ["auth", "db"], n_results=3)
+
+    mock_client.request.assert_called_once()
+    args, kwargs = mock_client.request.call_args
+    assert args[1].endswith("/api/v1/rag/search/batch")
+    assert kwargs["json"] == {"repo_id": "repo", "queries": ["auth", "db"], "n_results": 3}
+
+
+def test_truncate_diff_packs_source_within_limit(api_client):
+    """Test oversized diffs are packed under max_diff_chars, source first."""
+    lock = (
+        "diff --git a/poetry.lock b/poetry.lock\n--- a/poetry.lock\n+++ b/poetry.lock\n"
+        "@@ -1,4000 +1,4000 @@\n"
+        + "".join(f"-pkg{i} = 1\n" for i in range(4000))
+        + "".join(f"+pkg{i} = 2\n" for i in range(4000))
+    )
+    source = (
+        "diff --git a/app.py b/app.py\n--- a/app.py\n+++ b/app.py\n"
+        "@@ -1 +1 @@\n-x = 1\n+x = 2\n"
+    )
+    api_client._max_diff = 2000
+
+    result = api_client._truncate_diff(lock + source)
+
+    assert len(result) <= 2000
+    assert "+x = 2" in result
+    assert "poetry.lock (+4000/-4000)" in result
+
+
+@patch("cli.api_client.httpx.Client")
+def test_batch_streams_ndjson_lines(mock_client_class, api_client):
+    """Test batch posts the tasks and yields each NDJSON line."""
+    mock_response = MagicMock()
+    mock_response.is_error = False
+    mock_response.iter_lines.return_value = iter([
+        '{"type": "result", "index": 0, "status": "ok"}',
+        "",
+        '{"type": "summary", "total": 1}',
+    ])
+    mock_stream = MagicMock()
+    mock_stream.__enter__ = MagicMock(return_value=mock_response)
+    mock_stream.__exit__ = MagicMock(return_value=False)
+
+    mock_client = MagicMock()
+    mock_client.__enter__ = MagicMock(return_value=mock_client)
+    mock_client.__exit__ = MagicMock(return_value=False)
+    mock_client.stream.return_value = mock_stream
+    mock_client_class.return_value = mock_client
+
+    lines = list(api_client.batch([{"agent": "review", "input": {"diff": "d"}, "id": "x"}]))
+
+    assert [line["type"] for line in lines] == ["result", "summary"]
+    args, kwargs = mock_client.stream.call_args
+    assert args == ("POST", "http://localhost:8000/api/v1/batch")
+    assert kwargs["json"]["tasks"][0] == {"agent": "review", "input": {"diff": "d"}, "id": "x"}
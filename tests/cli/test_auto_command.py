@@ -267,3 +267,27 @@ class TestAutoCommand:
 
         assert result.exit_code == 1
         assert "error" in result.stdout
+
+    @patch("cli.commands.auto.Pipeline")
+    @patch("cli.commands.auto.get_branch_commits")
+    @patch("cli.commands.auto.get_current_branch")
+    @patch("cli.commands.auto.is_git_repo")
+    @patch("cli.commands.auto.get_staged_stats")
+    @patch("cli.commands.auto.get_staged_diff")
+    def test_passes_file_stats_to_pipeline(
+        self, mock_diff, mock_stats, mock_is_git, mock_branch, mock_commits,
+        mock_pipeline_class, runner, sample_diff, pipeline_result,
+    ):
+        mock_is_git.return_value = True
+        mock_diff.return_value = sample_diff
+        mock_stats.return_value = ["stat"]
+        mock_branch.return_value = "feature/test"
+        mock_commits.return_value = []
+
+        mock_pipeline = MagicMock()
+        mock_pipeline.run.return_value = pipeline_result
+        mock_pipeline_class.return_value = mock_pipeline
+
+        runner.invoke(app, ["auto", "--staged", "--dry-run"])
+
+        assert mock_pipeline.run.call_args.kwargs["stats"] == ["stat"]
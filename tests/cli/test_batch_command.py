@@ -0,0 +1,90 @@
+import json
+
+import pytest
+from unittest.mock import patch, MagicMock
+from typer.testing import CliRunner
+
+from cli.main import app
+
+
+@pytest.fixture
+def runner():
+    return CliRunner()
+
+
+def _client(lines: list[dict]) -> MagicMock:
+    client = MagicMock()
+    client.batch.return_value = iter(lines)
+    return client
+
+
+SUMMARY_OK = {"type": "summary", "total": 2, "unique": 2, "succeeded": 2, "failed": 0}
+
+
+class TestBatchCommand:
+
+    def test_requires_input(self, runner):
+        result = runner.invoke(app, ["batch"])
+
+        assert result.exit_code == 1
+        assert "--commits" in result.stdout
+
+    @patch("cli.commands.batch.APIClient")
+    @patch("cli.commands.batch.get_commit_diff")
+    @patch("cli.commands.batch.get_commits_between")
+    @patch("cli.commands.batch.is_git_repo")
+    def test_commits_mode_one_task_per_commit(
+        self, mock_is_git, mock_commits, mock_diff, mock_client_class, runner
+    ):
+        mock_is_git.return_value = True
+        mock_commits.return_value = [{"hash": "aaa"}, {"hash": "bbb"}]
+        mock_diff.side_effect = lambda ref, max_chars=None: f"diff of {ref}"
+        client = _client([
+            {"type": "result", "index": 1, "id": "bbb", "agent": "commit", "status": "ok",
+             "result": {"commit_message": "fix: b"}},
+            {"type": "result", "index": 0, "id": "aaa", "agent": "commit", "status": "ok",
+             "result": {"commit_message": "feat: a"}},
+            SUMMARY_OK,
+        ])
+        mock_client_class.return_value = client
+
+        result = runner.invoke(app, ["batch", "--commits", "v1..HEAD", "--agent", "commit"])
+
+        assert result.exit_code == 0
+        mock_commits.assert_called_once_with("v1", "HEAD")
+        tasks = client.batch.call_args.args[0]
+        assert tasks == [
+            {"agent": "commit", "id": "aaa", "input": {"diff": "diff of aaa"}},
+            {"agent": "commit", "id": "bbb", "input": {"diff": "diff of bbb"}},
+        ]
+        assert "feat: a" in result.stdout
+        assert "2/2 succeeded" in result.stdout
+
+    @patch("cli.commands.batch.APIClient")
+    def test_tasks_file_json_output(self, mock_client_class, runner, tmp_path):
+        tasks_file = tmp_path / "tasks.jsonl"
+        tasks_file.write_text(
+            '{"agent": "review", "input": {"diff": "d1"}}\n'
+            '{"agent": "split", "input": {"diff": "d2"}}\n'
+        )
+        lines = [
+            {"type": "result", "index": 0, "id": None, "agent": "review", "status": "ok",
+             "result": {"review": {"quality_score": 9}}},
+            {"type": "result", "index": 1, "id": None, "agent": "split", "status": "error",
+             "error": "LLM unavailable"},
+            {**SUMMARY_OK, "succeeded": 1, "failed": 1},
+        ]
+        client = _client(lines)
+        mock_client_class.return_value = client
+
+        result = runner.invoke(app, ["batch", "--file", str(tasks_file), "--json"])
+
+        assert result.exit_code == 1
+        assert len(client.batch.call_args.args[0]) == 2
+        printed = [json.loads(line) for line in result.stdout.splitlines()]
+        assert printed == lines
+
+    def test_commits_mode_rejects_other_agents(self, runner):
+        result = runner.invoke(app, ["batch", "--commits", "v1..HEAD", "--agent", "split"])
+
+        assert result.exit_code == 1
@@ -0,0 +1,89 @@
+from rich.console import Console
+
+from cli.display import render_stream
+
+
+def _render(events: list[dict]) -> tuple[dict | None, str]:
+    console = Console(record=True, width=120, force_terminal=False)
+    result = render_stream(iter(events), console)
+    return result, console.export_text()
+
+
+def _profile(duration_ms, llm_ms=0.0, llm_calls=0, tokens=0, hits=0, misses=0):
+    return {
+        "duration_ms": duration_ms,
+        "llm_ms": llm_ms,
+        "llm_calls": llm_calls,
+        "prompt_tokens": tokens,
+        "completion_tokens": 0,
+        "cache_hits": hits,
+        "cache_misses": misses,
+    }
+
+
+def test_node_latency_breakdown():
+    """Finished nodes show their time, share of the run, LLM time, tokens and cache."""
+    events = [
+        {"event": "agent_start", "agent": "commit"},
+        {"event": "node_start", "node": "analyze"},
+        {"event": "node_complete", "node": "analyze",
+         "data": _profile(250, llm_ms=240, llm_calls=1, tokens=800, misses=1)},
+        {"event": "node_start", "node": "generate_commit"},
+        {"event": "node_complete", "node": "generate_commit",
+         "data": _profile(750, llm_ms=700, llm_calls=1, tokens=1200, hits=1)},
+        {"event": "result", "data": {"commit_message": "feat: x"}},
+        {"event": "done"},
+    ]
+
+    result, text = _render(events)
+
+    assert result == {"commit_message": "feat: x"}
+    assert "analyze  0.25s  25%" in text
+    assert "generate_commit  0.75s  75%" in text
+    assert "LLM 0.70s x1 · 1200 tok · cache 1/1" in text
+    assert "total 1.00s (LLM 0.94s)" in text
+
+
+def test_repeated_node_accumulates():
+    """A node run twice keeps one line with the summed time."""
+    events = [
+        {"event": "node_complete", "node": "fix", "data": _profile(100)},
+        {"event": "node_complete", "node": "fix", "data": _profile(300)},
+        {"event": "done"},
+    ]
+
+    _, text = _render(events)
+
+    assert text.count("fix") == 1
+    assert "fix  0.40s 100%" in text
+
+
+def test_events_without_profiles_still_render():
+    """Older servers send node_complete without timings."""
+    events = [
+        {"event": "node_complete", "node": "analyze"},
+        {"event": "result", "data": {"ok": True}},
+        {"event": "done"},
+    ]
+
+    result, text = _render(events)
+
+    assert result == {"ok": True}
+    assert "analyze" in text
+    assert "total" not in text
+
+
+def test_streamed_text_shown_until_node_completes():
+    """PROGRESS deltas build up the field being generated."""
+    events = iter([
+        {"event": "node_start", "node": "generate_commit"},
+        {"event": "progress", "node": "generate_commit",
+         "data": {"field": "message", "delta": "feat: add "}},
+        {"event": "progress", "node": "generate_commit",
+         "data": {"field": "message", "delta": "greeting"}},
+    ])
+    console = Console(record=True, width=120, force_terminal=False)
+
+    render_stream(events, console)
+
+    assert "message: feat: add greeting" in console.export_text()
@@ -1,10 +1,21 @@
+import subprocess
 from unittest.mock import patch
 
+import pytest
+
 from cli.git_utils import (
+    DiffFileStat,
+    IndexPatcher,
+    parse_file_patches,
+    get_diff_stats,
+    iter_git_lines,
+    read_diff_within_budget,
+    read_git_diff,
     run_git,
     is_git_repo,
     get_staged_diff,
     get_current_branch,
+    get_tracked_files_with_sizes,
     GitError,
 )
 
@@ -51,6 +62,81 @@ def test_get_staged_diff(mock_run_git):
     mock_run_git.assert_called_once_with(["diff", "--cached"])
 
 
+def _file_section(name: str, body_lines: int) -> str:
+    return (
+        f"diff --git a/{name} b/{name}\n"
+        "index 1111111..2222222 100644\n"
+        f"--- a/{name}\n"
+        f"+++ b/{name}\n"
+        f"@@ -0,0 +1,{body_lines} @@\n"
+        + "".join(f"+line {i}\n" for i in range(body_lines))
+    )
+
+
+def test_iter_git_lines_streams_output():
+    """Test iter_git_lines yields newline-terminated lines across chunks."""
+    lines = list(iter_git_lines(["--version"], chunk_size=4))
+
+    assert len(lines) == 1
+    assert lines[0].startswith("git version")
+    assert lines[0].endswith("\n")
+
+
+def test_iter_git_lines_close_stops_process():
+    """Test closing the generator early terminates git."""
+    lines = iter_git_lines(["log", "-p"], chunk_size=256)
+
+    first = next(lines)
+    lines.close()
+
+    assert first.startswith("commit ")
+
+
+def test_read_diff_within_budget_keeps_whole_diff_when_it_fits():
+    """Test a diff under budget passes through unchanged."""
+    diff = _file_section("a.py", 3) + _file_section("b.py", 2)
+
+    assert read_diff_within_budget(diff.splitlines(keepends=True), 10_000) == diff
+
+
+def test_read_diff_within_budget_reduces_large_file_to_header():
+    """Test a file over budget keeps its header while later files still fit."""
+    small = _file_section("small.py", 2)
+    diff = _file_section("huge.lock", 5000) + small
+
+    result = read_diff_within_budget(diff.splitlines(keepends=True), 500)
+
+    assert result.startswith("diff --git a/huge.lock b/huge.lock\n")
+    assert "+line 10\n" not in result.split("diff --git a/small.py")[0]
+    assert result.endswith(small)
+    assert len(result) <= 500
+
+
+def test_read_diff_within_budget_stops_reading_when_full():
+    """Test iteration stops once no further file can fit."""
+    consumed = []
+
+    def lines():
+        for i in range(1000):
+            for line in _file_section(f"f{i}.py", 5).splitlines(keepends=True):
+                consumed.append(line)
+                yield line
+
+    result = read_diff_within_budget(lines(), 1_000)
+
+    assert len(result) <= 1_000
+    assert len(consumed) < 200
+
+
+def test_read_git_diff_budget_streams_real_output():
+    """Test the budgeted reader against real git output."""
+    full = read_git_diff(["log", "-p", "-n", "3", "--format="])
+    bounded = read_git_diff(["log", "-p", "-n", "3", "--format="], max_chars=2_000)
+
+    assert len(bounded) <= 2_000
+    assert full.startswith(bounded.split("\n", 1)[0])
+
+
 @patch("cli.git_utils.run_git")
 def test_get_current_branch(mock_run_git):
     """Test get_current_branch returns branch name."""
@@ -59,3 +145,260 @@ def test_get_current_branch(mock_run_git):
     result = get_current_branch()
 
     assert result == "main"
+
+
+def test_get_tracked_files_with_sizes_in_repo():
+    """Test tracked files come back with blob sizes from git."""
+    entries = dict(get_tracked_files_with_sizes())
+
+    assert "pyproject.toml" in entries
+    assert entries["pyproject.toml"] > 0
+
+
+@patch("cli.git_utils.run_git")
+def test_get_tracked_files_with_sizes_cat_file_fallback(mock_run_git):
+    """Test sizes are resolved via one cat-file batch on older git."""
+    mock_run_git.side_effect = [
+        ("", "fatal: bad ls-files format", 128),
+        (
+            "100644 aaa 0\ta.py\x00160000 bbb 0\tvendor/sub\x00",
+            "",
+            0,
+        ),
+        ("12\nbbb missing\n", "", 0),
+    ]
+
+    entries = get_tracked_files_with_sizes()
+
+    assert entries == [("a.py", 12), ("vendor/sub", None)]
+    assert mock_run_git.call_args_list[2][1]["input"] == "aaa\nbbb\n"
+
+
+@patch("cli.git_utils.run_git")
+def test_get_diff_stats_joins_numstat_and_name_status(mock_run_git):
+    """Test numstat counts are matched to name-status entries, renames included."""
+    numstat = "0\t0\t\0old.py\0new.py\0" "3\t1\tsrc/app.py\0" "-\t-\tlogo.png\0"
+    name_status = "R100\0old.py\0new.py\0" "M\0src/app.py\0" "A\0logo.png\0"
+    mock_run_git.side_effect = [(numstat, "", 0), (name_status, "", 0)]
+
+    stats = get_diff_stats(["--cached"])
+
+    assert stats == [
+        DiffFileStat("new.py", "R", 0, 0, "old.py"),
+        DiffFileStat("src/app.py", "M", 3, 1),
+        DiffFileStat("logo.png", "A", None, None),
+    ]
+    assert stats[2].is_binary
+    assert mock_run_git.call_args_list[0].args[0] == ["diff", "--cached", "--numstat", "-z"]
+
+
+@patch("cli.git_utils.run_git")
+def test_get_diff_stats_failure_returns_empty(mock_run_git):
+    """Test a failing git diff yields no stats."""
+    mock_run_git.return_value = ("", "fatal", 128)
+
+    assert get_diff_stats(["HEAD"]) == []
+
+
+@pytest.fixture
+def split_repo(tmp_path, monkeypatch):
+    """A repo with one file edited in three places and a few other changes staged."""
+    def git(*args):
+        subprocess.run(["git", *args], cwd=tmp_path, check=True, capture_output=True)
+
+    git("init", "-q")
+    git("config", "user.email", "dev@example.com")
+    git("config", "user.name", "dev")
+    (tmp_path / "app.txt").write_text("".join(f"line {i}\n" for i in range(1, 61)))
+    (tmp_path / "old.txt").write_text("".join(f"{i}\n" for i in range(1, 31)))
+    (tmp_path / "gone.txt").write_text("gone\n")
+    git("add", ".")
+    git("commit", "-q", "-m", "init")
+
+    lines = [f"line {i}\n" for i in range(1, 61)]
+    lines[4] = "LINE 5\nextra\n"
+    lines[29] = "LINE 30\n"
+    lines[54] = ""
+    (tmp_path / "app.txt").write_text("".join(lines))
+    git("mv", "old.txt", "new.txt")
+    (tmp_path / "new.txt").write_text(
+        "".join("three\n" if i == 3 else f"{i}\n" for i in range(1, 31))
+    )
+    git("rm", "-q", "gone.txt")
+    (tmp_path / "fresh.txt").write_text("hi\n")
+    git("add", "-A")
+
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def _range(path, hunk):
+    return {
+        "file_path": path,
+        "source_start": hunk.source_start,
+        "source_length": hunk.source_length,
+    }
+
+
+def test_parse_file_patches_names_files_like_backend():
+    """Test file sections are split with the paths the split agent reports."""
+    diff = (
+        "diff --git a/old.py b/new.py\nsimilarity index 90%\n"
+        "rename from old.py\nrename to new.py\n--- a/old.py\n+++ b/new.py\n"
+        "@@ -1,2 +1,2 @@ def f():\n-a\n+b\n c\n@@ -10 +10 @@\n-x\n+y\n"
+        "diff --git a/gone.py b/gone.py\ndeleted file mode 100644\n"
+        "--- a/gone.py\n+++ /dev/null\n@@ -1 +0,0 @@\n-x\n"
+        "diff --git a/run.sh b/run.sh\nold mode 100644\nnew mode 100755\n"
+    )
+
+    files = parse_file_patches(diff)
+
+    assert [f.path for f in files] == ["new.py", "gone.py", "run.sh"]
+    first, second = files[0].hunks
+    assert (first.source_start, first.source_length, first.section) == (1, 2, " def f():\n")
+    assert (second.source_start, second.source_length, second.body) == (10, 1, "-x\n+y\n")
+    assert files[2].hunks == []
+
+
+def test_locate_maps_packed_sub_hunks_to_original():
+    """Test ranges from a trimmed copy of a hunk resolve to that hunk."""
+    diff = (
+        "diff --git a/a.py b/a.py\n--- a/a.py\n+++ b/a.py\n"
+        "@@ -5,20 +5,21 @@\n" + " x\n" * 20 + "+y\n"
+        "@@ -40,3 +41,4 @@\n x\n+y\n x\n x\n"
+    )
+    file = parse_file_patches(diff)[0]
+
+    assert file.locate(12, 3) == 0
+    assert file.locate(24, 0) == 0
+    assert file.locate(40, 3) == 1
+    assert file.locate(1, 2) is None
+
+
+def test_index_patcher_commits_hunks_of_one_file_separately(split_repo):
+    """Test each group commits only its own hunks, applied out of order."""
+    diff = run_git(["diff", "--cached"])[0]
+    patcher = IndexPatcher(diff)
+    app = {f.path: f for f in patcher.files}["app.txt"].hunks
+    assert len(app) == 3
+
+    patcher.reset_index()
+    patcher.commit("first", ["app.txt", "fresh.txt"], [
+        _range("app.txt", app[2]),
+        _range("app.txt", app[0]),
+        {"file_path": "fresh.txt", "source_start": 0, "source_length": 0},
+    ])
+    shown = run_git(["show", "HEAD:app.txt"])[0]
+    assert "LINE 5\nextra\n" in shown
+    assert "line 30\n" in shown
+    assert "line 55\n" not in shown
+
+    patcher.commit("second", ["app.txt", "new.txt", "gone.txt"], [
+        _range("app.txt", app[1]),
+        {"file_path": "new.txt", "source_start": 1, "source_length": 6},
+        {"file_path": "gone.txt", "source_start": 1, "source_length": 1},
+    ])
+
+    status, _, _ = run_git(["status", "--porcelain"])
+    assert status == ""
+    log, _, _ = run_git(["log", "--format=%s", "-3"])
+    assert log.split() == ["second", "first", "init"]
+
+
+def test_index_patcher_without_ranges_stages_whole_files(split_repo):
+    """Test groups from servers that report no hunk ranges stage by file."""
+    patcher = IndexPatcher(run_git(["diff", "--cached"])[0])
+    patcher.reset_index()
+
+    patcher.commit("app", ["app.txt"])
+
+    stat, _, _ = run_git(["show", "--format=", "--name-only", "HEAD"])
+    assert stat.split() == ["app.txt"]
+    assert run_git(["diff", "--cached"])[0] == ""
+
+
+def test_index_patcher_failed_apply_leaves_index_at_head(split_repo):
+    """Test a patch that does not apply raises and leaves nothing staged."""
+    patcher = IndexPatcher(run_git(["diff", "--cached"])[0])
+    patcher.reset_index()
+    (split_repo / "app.txt").write_text("rewritten\n")
+    run_git(["commit", "-q", "-a", "-m", "conflict"])
+
+    with pytest.raises(GitError):
+        patcher.commit("app", ["app.txt"])
+
+    assert run_git(["diff", "--cached"])[0] == ""
+
+
+def test_index_patcher_commits_hunks_the_packer_left_out(tmp_path, monkeypatch):
+    """Test hunks missing from the agent's packed diff go to the group listing their file."""
+    from backend.diff.packer import pack_diff
+
+    def git(*args):
+        subprocess.run(["git", *args], cwd=tmp_path, check=True, capture_output=True)
+
+    git("init", "-q")
+    git("config", "user.email", "dev@example.com")
+    git("config", "user.name", "dev")
+    (tmp_path / "big.txt").write_text("".join(f"line {i}\n" for i in range(1, 401)))
+    (tmp_path / "small.txt").write_text("a\n")
+    git("add", ".")
+    git("commit", "-q", "-m", "init")
+    (tmp_path / "big.txt").write_text(
+        "".join(f"LINE {i}\n" if i % 10 == 0 else f"line {i}\n" for i in range(1, 401))
+    )
+    (tmp_path / "small.txt").write_text("b\n")
+    monkeypatch.chdir(tmp_path)
+
+    diff = run_git(["diff", "HEAD"])[0]
+    packed = parse_file_patches(pack_diff(diff, 300).text)
+    seen = {f.path: [_range(f.path, h) for h in f.hunks] for f in packed}
+    assert 0 < len(seen["big.txt"]) < 40
+
+    patcher = IndexPatcher(diff)
+    half = len(seen["big.txt"]) // 2
+    groups = [
+        (["big.txt"], seen["big.txt"][:half]),
+        (["big.txt", "small.txt"], seen["big.txt"][half:] + seen.get("small.txt", [])),
+    ]
+    patcher.plan(hunks for _, hunks in groups)
+    patcher.reset_index()
+    for idx, (files, hunks) in enumerate(groups):
+        patcher.commit(f"group {idx}", files, hunks)
+
+    assert run_git(["diff", "HEAD"])[0] == ""
+    assert patcher.remaining() == {}
+
+
+def test_index_patcher_reports_files_no_group_lists(split_repo):
+    """Test changes in files no group names are reported as not committed."""
+    patcher = IndexPatcher(run_git(["diff", "--cached"])[0])
+    app = {f.path: f for f in patcher.files}["app.txt"].hunks
+    patcher.plan([[_range("app.txt", app[0])]])
+    patcher.reset_index()
+
+    patcher.commit("app", ["app.txt"], [_range("app.txt", app[0])])
+
+    assert "app.txt" not in patcher.remaining()
+    assert set(patcher.remaining()) == {"new.txt", "gone.txt", "fresh.txt"}
+
+
+def test_index_patcher_stages_non_utf8_files_whole(split_repo):
+    """Test a Latin-1 file, whose decoded patch no longer applies, is committed whole."""
+    (split_repo / "latin.txt").write_bytes("caf\xe9\n".encode("latin-1"))
+    run_git(["add", "latin.txt"])
+    run_git(["commit", "-q", "-m", "latin"])
+    (split_repo / "latin.txt").write_bytes("caf\xe9 au lait\n".encode("latin-1"))
+    run_git(["add", "latin.txt"])
+    patcher = IndexPatcher(run_git(["diff", "--cached"])[0])
+    latin = {f.path: f for f in patcher.files}["latin.txt"]
+    assert latin.is_lossy
+    patcher.reset_index()
+
+    patcher.commit("latin", ["latin.txt"], [_range("latin.txt", latin.hunks[0])])
+
+    committed = subprocess.run(
+        ["git", "show", "HEAD:latin.txt"], capture_output=True, check=True
+    ).stdout
+    assert committed == "caf\xe9 au lait\n".encode("latin-1")
+    assert "latin.txt" not in patcher.remaining()
@@ -0,0 +1,137 @@
+import pytest
+from unittest.mock import patch, MagicMock
+from typer.testing import CliRunner
+
+from cli.api_client import APIError
+from cli.commands.index import _read_file, _read_files, _should_index
+from cli.main import app
+
+
+@pytest.fixture
+def runner():
+    return CliRunner()
+
+
+def _upload_all(repo_id, files):
+    sent = list(files)
+    return {"indexed": len(sent), "total": len(sent), "batches": 1}
+
+
+class TestIndexCommand:
+
+    @patch("cli.commands.index.APIClient")
+    @patch("cli.commands.index._read_file")
+    @patch("cli.commands.index.get_tracked_files_with_sizes")
+    @patch("cli.commands.index.get_repo_id", return_value="repo")
+    @patch("cli.commands.index.is_git_repo", return_value=True)
+    def test_index_streams_readable_files(
+        self, _is_git, _repo_id, mock_tracked, mock_read, mock_client_class, runner
+    ):
+        mock_tracked.return_value = [
+            ("src/a.py", 10),
+            ("src/b.py", 10),
+            ("src/huge.py", 10_000_000),
+            ("README.md", 10),
+        ]
+        mock_read.side_effect = lambda path, size: f"# {path}"
+        mock_client = MagicMock()
+        mock_client.rag_index_stream.side_effect = _upload_all
+        mock_client_class.return_value = mock_client
+
+        result = runner.invoke(app, ["index"])
+
+        assert result.exit_code == 0
+        assert "Indexed 2 files" in result.stdout
+        assert [c.args[0] for c in mock_read.call_args_list] == ["src/a.py", "src/b.py"]
+        mock_client.rag_index.assert_not_called()
+
+    @patch("cli.commands.index.APIClient")
+    @patch("cli.commands.index._read_file", return_value=None)
+    @patch("cli.commands.index.get_tracked_files_with_sizes", return_value=[("src/a.py", 5)])
+    @patch("cli.commands.index.get_repo_id", return_value="repo")
+    @patch("cli.commands.index.is_git_repo", return_value=True)
+    def test_index_no_readable_files_skips_upload(
+        self, _is_git, _repo_id, _tracked, _read, mock_client_class, runner
+    ):
+        mock_client = MagicMock()
+        mock_client_class.return_value = mock_client
+
+        result = runner.invoke(app, ["index"])
+
+        assert result.exit_code == 0
+        assert "No readable files found" in result.stdout
+        mock_client.rag_index_stream.assert_not_called()
+
+    @patch("cli.commands.index.APIClient")
+    @patch("cli.commands.index._read_file", return_value="x = 1")
+    @patch("cli.commands.index.get_tracked_files_with_sizes", return_value=[("src/a.py", 5)])
+    @patch("cli.commands.index.get_repo_id", return_value="repo")
+    @patch("cli.commands.index.is_git_repo", return_value=True)
+    def test_index_upload_error(
+        self, _is_git, _repo_id, _tracked, _read, mock_client_class, runner
+    ):
+        mock_client = MagicMock()
+        mock_client.rag_index_stream.side_effect = APIError("API error (400): bad body")
+        mock_client_class.return_value = mock_client
+
+        result = runner.invoke(app, ["index"])
+
+        assert result.exit_code == 1
+        assert "bad body" in result.stdout
+
+
+class TestIndexHelpers:
+
+    @pytest.mark.parametrize(
+        "path,expected",
+        [
+            ("src/app.py", True),
+            ("src/app.txt", False),
+            (".github/workflows/ci.yml", False),
+            ("src/.hidden/mod.py", False),
+            ("tests/test_app.py", False),
+            ("web/node_modules/pkg/index.js", False),
+            (".venv/lib/site.py", False),
+        ],
+    )
+    def test_should_index(self, path, expected):
+        assert _should_index(path) is expected
+
+    def test_read_small_and_mmapped_files(self, tmp_path):
+        small = tmp_path / "small.py"
+        small.write_text("x = 1\n")
+        large = tmp_path / "large.py"
+        large.write_text("y = 2\n" * 5_000)
+
+        assert _read_file(str(small)) == "x = 1\n"
+        assert _read_file(str(large)) == "y = 2\n" * 5_000
+
+    def test_read_skips_binary(self, tmp_path):
+        small = tmp_path / "small.py"
+        small.write_bytes(b"abc\0def")
+        large = tmp_path / "large.py"
+        large.write_bytes(b"\0" + b"a" * 20_000)
+
+        assert _read_file(str(small)) is None
+        assert _read_file(str(large)) is None
+
+    def test_read_skips_oversize_without_opening(self, tmp_path):
+        missing = tmp_path / "never-opened.py"
+        assert _read_file(str(missing), size=10_000_000) is None
+
+    def test_read_skips_oversize_on_disk(self, tmp_path):
+        big = tmp_path / "big.py"
+        big.write_text("z" * 60_000)
+        assert _read_file(str(big), size=10) is None
+
+    def test_read_files_preserves_order(self, tmp_path):
+        entries = []
+        for i in range(300):
+            path = tmp_path / f"f{i}.py"
+            path.write_text(f"n = {i}\n" if i % 7 else "")
+            entries.append((str(path), None))
+
+        results = list(_read_files(entries))
+
+        expected = [str(tmp_path / f"f{i}.py") for i in range(300) if i % 7]
+        assert [path for path, _ in results] == expected
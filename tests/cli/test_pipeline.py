@@ -1,7 +1,16 @@
-from unittest.mock import MagicMock
+import asyncio
+import threading
+import time
+from unittest.mock import AsyncMock, MagicMock
 
+import pytest
+
+from backend.engine.base import EngineResult
+from backend.engine.local import LocalEngine
 from cli.api_client import APIError
-from cli.pipeline import Pipeline, PipelineResult
+from cli.engine import SyncLocalBackend
+from cli.git_utils import DiffFileStat
+from cli.pipeline import Pipeline, PipelineResult, PipelineStep, run_steps
 
 
 SMALL_DIFF = """diff --git a/main.py b/main.py
@@ -47,6 +56,7 @@ def _make_client(**overrides) -> MagicMock:
         "error": None,
     }
     client.generate_commit.return_value = {"message": "feat: add print statement", "type": "feat", "scope": None}
+    client.diff_analysis.return_value = {"analysis_id": "a1b2c3", "summary": "Updates code", "risk": "low"}
     client.review.return_value = {
         "review": {"quality_score": 8, "summary": "Good", "issues": [], "positives": [], "suggestions": []},
     }
@@ -206,6 +216,34 @@ class TestPipelineErrors:
         assert "pr" in result.steps_skipped
 
 
+class TestPipelineSharedAnalysis:
+
+    def test_analysis_id_passed_to_review_and_pr(self):
+        client = _make_client()
+        result = Pipeline(client).run(LARGE_DIFF)
+
+        assert result.analysis_id == "a1b2c3"
+        assert "analyze" in result.steps_completed
+        assert client.review.call_args.kwargs["analysis_id"] == "a1b2c3"
+        assert client.generate_pr.call_args.kwargs["analysis_id"] == "a1b2c3"
+
+    def test_skipped_when_review_and_pr_skipped(self):
+        client = _make_client()
+        result = Pipeline(client).run(LARGE_DIFF, skip_review=True, skip_pr=True)
+
+        assert "analyze" in result.steps_skipped
+        client.diff_analysis.assert_not_called()
+
+    def test_analysis_error_non_critical(self):
+        client = _make_client(diff_analysis=MagicMock(side_effect=APIError("timeout")))
+        result = Pipeline(client).run(LARGE_DIFF)
+
+        assert result.error is None
+        assert "analyze" in result.steps_skipped
+        assert result.review is not None
+        assert client.review.call_args.kwargs["analysis_id"] is None
+
+
 class TestPipelineCustomThreshold:
 
     def test_threshold_3_skips_2_files(self):
@@ -221,3 +259,247 @@ class TestPipelineCustomThreshold:
 
         assert "split" in result.steps_completed
         client.split_diff.assert_called_once()
+
+
+class TestPipelineFileStats:
+
+    def test_split_decision_uses_stats(self):
+        client = _make_client()
+        stats = [DiffFileStat("main.py", "M", 1, 0), DiffFileStat("utils.py", "M", 1, 0)]
+
+        result = Pipeline(client).run(SMALL_DIFF, skip_review=True, skip_pr=True, stats=stats)
+
+        assert "split" in result.steps_completed
+        client.split_diff.assert_called_once()
+
+    def test_diff_text_ignored_when_stats_given(self):
+        client = _make_client()
+        stats = [DiffFileStat("main.py", "M", 1, 0)]
+
+        result = Pipeline(client).run(MULTI_FILE_DIFF, skip_review=True, skip_pr=True, stats=stats)
+
+        assert "split" in result.steps_skipped
+
+    def test_header_text_inside_hunk_not_counted(self):
+        client = _make_client()
+        diff = SMALL_DIFF.replace('print("Hello")', 'print("diff --git a/x b/x")')
+
+        result = Pipeline(client).run(diff, skip_review=True, skip_pr=True)
+
+        assert "split" in result.steps_skipped
+
+    def test_binary_only_change_skips_review(self):
+        client = _make_client()
+        stats = [DiffFileStat("logo.png", "M", None, None)]
+
+        result = Pipeline(client).run(LARGE_DIFF, skip_pr=True, stats=stats)
+
+        assert "review" in result.steps_skipped
+        client.review.assert_not_called()
+
+
+class TestPipelineConcurrency:
+
+    def _slow(self, value, delay=0.2):
+        def call(*args, **kwargs):
+            time.sleep(delay)
+            return value
+
+        return MagicMock(side_effect=call)
+
+    def test_review_and_pr_overlap_split_and_commit(self):
+        client = _make_client()
+        for name in ("split_diff", "review", "generate_pr"):
+            setattr(client, name, self._slow(getattr(client, name).return_value))
+        large_multi = MULTI_FILE_DIFF + "x" * 600
+
+        result = Pipeline(client).run(large_multi)
+
+        assert result.steps_completed == ["split", "analyze", "review", "pr"]
+        assert set(result.timings) == {"split", "commit", "analyze", "review", "pr"}
+        assert result.timings["review"] >= 0.2
+        assert result.elapsed < 0.5
+
+    def test_commit_waits_for_split(self):
+        order = []
+        client = _make_client()
+
+        def split_diff(diff):
+            time.sleep(0.1)
+            order.append("split")
+            return {"splits": []}
+
+        client.split_diff = MagicMock(side_effect=split_diff)
+        client.generate_commit = MagicMock(
+            side_effect=lambda diff: order.append("commit") or {"message": "feat: x"}
+        )
+
+        result = Pipeline(client).run(MULTI_FILE_DIFF, skip_review=True, skip_pr=True)
+
+        assert order == ["split", "commit"]
+        assert result.commit_message == "feat: x"
+
+    def test_split_failure_cancels_commit(self):
+        client = _make_client(split_diff=MagicMock(side_effect=APIError("timeout")))
+
+        result = Pipeline(client).run(MULTI_FILE_DIFF, skip_review=True, skip_pr=True)
+
+        assert "commit" in result.steps_cancelled
+        assert "commit" not in result.timings
+        client.generate_commit.assert_not_called()
+
+    def test_split_failure_after_analyze_keeps_review_and_pr(self):
+        client = _make_client()
+
+        def split_diff(diff):
+            time.sleep(0.1)
+            raise APIError("timeout")
+
+        client.split_diff = MagicMock(side_effect=split_diff)
+        client.review = self._slow(client.review.return_value)
+        large_multi = MULTI_FILE_DIFF + "x" * 600
+
+        result = Pipeline(client).run(large_multi)
+
+        assert result.error == "Split failed: timeout"
+        assert result.steps_cancelled == ["commit"]
+        assert result.steps_completed == ["analyze", "review", "pr"]
+        assert result.review is not None
+        assert result.pr_description is not None
+
+    def test_failure_cancels_steps_downstream_only(self):
+        ran = []
+        result = PipelineResult()
+
+        def step(name, error=None):
+            return lambda: ran.append(name) or error
+
+        steps = [
+            PipelineStep("a", step("a", "a failed")),
+            PipelineStep("b", step("b"), after=("a",)),
+            PipelineStep("c", step("c"), after=("b",)),
+            PipelineStep("d", step("d")),
+        ]
+        asyncio.run(run_steps(steps, result))
+
+        assert sorted(ran) == ["a", "d"]
+        assert result.steps_cancelled == ["b", "c"]
+        assert result.error == "a failed"
+
+    def test_unexpected_error_waits_for_running_steps(self):
+        finished = []
+
+        def slow():
+            time.sleep(0.1)
+            finished.append("slow")
+
+        def boom():
+            raise RuntimeError("boom")
+
+        steps = [
+            PipelineStep("slow", slow),
+            PipelineStep("boom", boom),
+            PipelineStep("after", lambda: finished.append("after"), after=("slow",)),
+        ]
+
+        with pytest.raises(RuntimeError, match="boom"):
+            asyncio.run(run_steps(steps, PipelineResult()))
+        assert finished == ["slow"]
+        time.sleep(0.05)
+        assert finished == ["slow"]
+
+    def test_steps_run_in_worker_threads(self):
+        threads = set()
+        result = PipelineResult()
+
+        def step():
+            threads.add(threading.current_thread().name)
+            time.sleep(0.05)
+
+        asyncio.run(run_steps([PipelineStep("a", step), PipelineStep("b", step)], result))
+
+        assert len(threads) == 2
+        assert all(name.startswith("pipeline") for name in threads)
+
+    def test_dependency_must_be_declared_first(self):
+        steps = [
+            PipelineStep("commit", lambda: None, after=("split",)),
+            PipelineStep("split", lambda: None),
+        ]
+
+        with pytest.raises(ValueError, match="split"):
+            asyncio.run(run_steps(steps, PipelineResult()))
+
+
+class _LoopRecordingEngine:
+    """Engine stand-in that records the loop each call runs on."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.loops = []
+        self.closed_on = None
+
+    async def review(self, diff, analysis_id=None):
+        self.loops.append(asyncio.get_running_loop())
+        await asyncio.sleep(self.delay)
+        return EngineResult(data={"review": {"summary": diff}})
+
+    async def aclose(self):
+        self.closed_on = asyncio.get_running_loop()
+
+
+class TestSyncLocalBackend:
+
+    def test_calls_share_one_loop(self):
+        engine = _LoopRecordingEngine()
+
+        with SyncLocalBackend(engine) as backend:
+            assert backend.review("a") == {"review": {"summary": "a"}}
+            backend.review("b")
+
+        assert len(engine.loops) == 2
+        assert engine.loops[0] is engine.loops[1]
+        assert engine.closed_on is engine.loops[0]
+        assert engine.loops[0].is_closed()
+
+    def test_calls_from_threads_overlap(self):
+        engine = _LoopRecordingEngine(delay=0.2)
+        backend = SyncLocalBackend(engine)
+        try:
+            threads = [threading.Thread(target=backend.review, args=("x",)) for _ in range(3)]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+        finally:
+            backend.close()
+
+        assert elapsed < 0.5
+        assert len(set(map(id, engine.loops))) == 1
+
+    def test_close_is_idempotent(self):
+        backend = SyncLocalBackend(_LoopRecordingEngine())
+
+        backend.close()
+        backend.close()
+
+    def test_error_result_mapped(self):
+        engine = MagicMock()
+        engine.split_diff = AsyncMock(return_value=EngineResult(error="boom"))
+        engine.aclose = AsyncMock()
+
+        with SyncLocalBackend(engine) as backend:
+            assert backend.split_diff("d") == {"error": "boom", "splits": []}
+
+    def test_local_engine_closes_provider(self):
+        engine = LocalEngine()
+        llm = MagicMock()
+        llm.aclose = AsyncMock()
+        engine._llm = llm
+
+        asyncio.run(engine.aclose())
+
+        llm.aclose.assert_awaited_once()
+        assert engine._llm is None
@@ -189,3 +189,35 @@ class TestSplitCommand:
 
         assert result.exit_code == 0
         mock_diff.assert_called_once()
+
+    @patch("cli.commands.split.IndexPatcher")
+    @patch("cli.commands.split.APIClient")
+    @patch("cli.commands.split.is_git_repo")
+    @patch("cli.commands.split.get_staged_diff")
+    def test_split_execute_applies_hunks_per_group(
+        self, mock_diff, mock_is_git, mock_client_class, mock_patcher_class,
+        runner, sample_diff, mock_api_response,
+    ):
+        mock_is_git.return_value = True
+        mock_diff.return_value = sample_diff
+        hunks = [{"file_path": "main.py", "source_start": 1, "source_length": 2}]
+        mock_api_response["splits"][0]["hunks"] = hunks
+
+        mock_client = MagicMock()
+        mock_client.split_diff.return_value = mock_api_response
+        mock_client_class.return_value = mock_client
+
+        patcher = mock_patcher_class.return_value
+        patcher.remaining.return_value = {"main.py": 2}
+
+        result = runner.invoke(app, ["split", "--staged", "--execute", "--no-stream"])
+
+        assert result.exit_code == 0
+        assert "Created 1/1 commits" in result.stdout
+        assert "2 hunk(s) in 1 file(s) were not committed" in result.stdout
+        mock_patcher_class.assert_called_once_with(sample_diff)
+        assert list(patcher.plan.call_args.args[0]) == [hunks]
+        patcher.reset_index.assert_called_once()
+        patcher.commit.assert_called_once_with(
+            "feat: add print statement", ["main.py"], hunks
+        )
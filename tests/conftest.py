@@ -1,7 +1,36 @@
 import pytest
 from fastapi.testclient import TestClient
 
-from backend.main import app
+from backend.agents.analysis import analysis_cache
+from backend.main import app, RateLimitMiddleware
+from backend.services.health import health_prober
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    """Give every test a fresh rate-limit window on the shared app."""
+    yield
+    layer = app.middleware_stack
+    while layer is not None:
+        if isinstance(layer, RateLimitMiddleware):
+            layer.limiter.backend.reset()
+        layer = getattr(layer, "app", None)
+
+
+@pytest.fixture(autouse=True)
+def reset_analysis_cache():
+    """Keep diff analyses from leaking between tests."""
+    analysis_cache.clear()
+    yield
+    analysis_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_health_cache():
+    """Make /health probe the (usually mocked) provider afresh per test."""
+    health_prober.clear()
+    yield
+    health_prober.clear()
 
 
 @pytest.fixture